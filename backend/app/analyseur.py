@@ -6,11 +6,14 @@ from pathlib import Path
 import json
 import os
 import shutil
+import time
 import pandas as pd
-import matplotlib.pyplot as plt
-import seaborn as sns
 
 from app.utils.pip_registry import get_pip  
+from app.utils.perf import add_phase, span
+from app.utils.metrics import XLSX_OPEN_SECONDS
+from app.utils.results_table import load_results
+from app.utils.run_archive import break_link, link_or_copy
  
 
 def get_session(hour):
@@ -45,10 +48,10 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
             pip_factor = 0.0001
 
     print("⚙️ pip_factor :", pip_factor)
-    # Lecture CSV
-    try:
-        df = pd.read_csv(csv_path)
-    except pd.errors.EmptyDataError:
+    # Lecture résultats (.npy binaire, ou CSV des anciens runs)
+    with span("analysis.read_csv"):
+        df = load_results(csv_path)
+    if df.empty and not len(df.columns):
         print(f"Fichier vide ignoré: {csv_path}")
         return
 
@@ -59,6 +62,7 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
             log.write(f"{csv_path} - seulement {len(df)} lignes\n")
         return
 
+    t_stats = time.perf_counter()
     # Préparation des colonnes
     df["time"] = pd.to_datetime(df["time"], errors="coerce")
     df.dropna(subset=["time"], inplace=True)
@@ -157,6 +161,11 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
     # Nom de fichier dynamique
     xlsx_filename = f"analyse_{STRATEGY_NAME}_{symbol}_SL{sl_pips}_{period}_resultats.xlsx"
 
+    # 🔗 Fichiers dédoublonnés (liens physiques du cycle de vie stockage) → inode privé avant réécriture
+    for name in (f"{STRATEGY_NAME}_global.csv", f"{STRATEGY_NAME}_sessions.csv", f"{STRATEGY_NAME}_par_heure.csv",
+                 f"{STRATEGY_NAME}_jour_semaine.csv", f"{STRATEGY_NAME}_tp2_global.csv", xlsx_filename):
+        break_link(os.path.join(export_dir, name))
+
     # CSVs intermédiaires (optionnel à renommer aussi si tu veux)
     global_stats.to_csv(os.path.join(export_dir, f"{STRATEGY_NAME}_global.csv"), index=False)
     session_stats.to_csv(os.path.join(export_dir, f"{STRATEGY_NAME}_sessions.csv"), index=False)
@@ -164,8 +173,10 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
     day_summary.to_csv(os.path.join(export_dir, f"{STRATEGY_NAME}_jour_semaine.csv"), index=False)
     tp2_stats.to_csv(os.path.join(export_dir, f"{STRATEGY_NAME}_tp2_global.csv"), index=False)
 
+    add_phase("analysis.stats", time.perf_counter() - t_stats)
+
     # Excel final unique
-    with pd.ExcelWriter(os.path.join(export_dir, xlsx_filename)) as writer:
+    with span("analysis.xlsx_write"), pd.ExcelWriter(os.path.join(export_dir, xlsx_filename)) as writer:
         global_stats.to_excel(writer, sheet_name="Global", index=False)
         session_stats.to_excel(writer, sheet_name="Sessions", index=False)
         hourly.to_excel(writer, sheet_name="Par_Heure", index=False)
@@ -175,7 +186,11 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
     print(f"✅ Analyse terminée pour : {STRATEGY_NAME}")
 
 
+    # Métadonnées du run (écrasées par le params*.json ci-dessous si présent)
+    strategy, pair, timeframe, per = STRATEGY_NAME, symbol, "?", period
+
     # ✅ Ajouter la feuille "Config" avec les paramètres du JSON (robuste)
+    t_config = time.perf_counter()
     try:
         from openpyxl import load_workbook
         from openpyxl.styles import Font, Alignment
@@ -186,10 +201,6 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
         json_path = meta_files[0] if meta_files else None
 
         params = {}
-        timeframe = "?"
-        strategy = STRATEGY_NAME
-        pair = symbol
-        per = period
         run_seq = ""
         run_id = ""
         user_id = ""
@@ -209,7 +220,8 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
             user_id = data.get("user_id") or ""
 
         xlsx_path = os.path.join(export_dir, xlsx_filename)
-        wb = load_workbook(xlsx_path)
+        with XLSX_OPEN_SECONDS.labels("analyseur").time():
+            wb = load_workbook(xlsx_path)
 
         # (Re)crée la feuille "Config" en première position
         if "Config" in wb.sheetnames:
@@ -279,8 +291,7 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
                         export_dir,
                         xlsx_filename.replace("_resultats.xlsx", f"_r{run_seq}_resultats.xlsx")
                     )
-                    import shutil as _sh
-                    _sh.copyfile(base, suffixed)
+                    link_or_copy(base, suffixed)  # lien physique : même contenu, 0 octet de plus
         except Exception:
             # silencieux : pas de régression si pas de run_seq
             pass
@@ -288,6 +299,19 @@ def analyze_file(csv_path, export_dir, STRATEGY_NAME,  symbol, sl_pips, period):
 
     except Exception as e:
         print("❌ Impossible d’ajouter la feuille Config :", e)
+    add_phase("analysis.xlsx_config", time.perf_counter() - t_config)
+
+    # Résumé pour les appelants (leaderboard, multi-symboles…)
+    return {
+        "strategy": strategy,
+        "pair": pair,
+        "timeframe": timeframe,
+        "period": per,
+        "winrate_tp1": float(winrate),
+        "winrate_tp2": float(tp2_winrate),
+        "total_trades": int(total_trades),
+        "xlsx": os.path.join(export_dir, xlsx_filename),
+    }
 
 
 if __name__ == "__main__":
@@ -17,6 +17,7 @@ Notes:
 from fastapi import APIRouter, Request, HTTPException, Header
 from fastapi.responses import HTMLResponse 
 from starlette.responses import RedirectResponse as StarletteRedirect
+from starlette.concurrency import run_in_threadpool
 from fastapi.responses import RedirectResponse  # NOTE: non utilisé actuellement (peut être retiré plus tard)
 from authlib.integrations.starlette_client import OAuth
 from dotenv import load_dotenv
@@ -34,6 +35,7 @@ from app.models.users import (
     get_user_id_by_verification_token,
     mark_email_verified_and_grant_pending_bonus,
     init_email_verification,
+    users_lock,
 )
 from app.utils.email_sender import send_email_html
 from app.utils.email_templates import verification_subject, verification_html, verification_text
@@ -164,12 +166,8 @@ async def login_user(request: Request):
         if match:
             # 🔁 Migration automatique vers bcrypt si encore en clair
             if not _looks_bcrypt(stored):
-                users_data[token]["password"] = pwd_context.hash(password)
-                try:
-                    with open(USERS_FILE, "w", encoding="utf-8") as wf:
-                        json.dump(users_data, wf, indent=2)
-                except Exception:
-                    pass  # on n'empêche pas le login si l'écriture échoue
+                # attente du verrou hors boucle asyncio (ne gèle pas les autres requêtes du worker)
+                await run_in_threadpool(_migrate_password_hash, token, password)
             return {
                 "status": "success",
                 "apiKey": token,   # ✅ attendu par ton front
@@ -307,6 +305,47 @@ def _atomic_write_json(path: Path, data: dict) -> None:
             try: os.remove(tmp)
             except: pass
 
+def _migrate_password_hash(token: str, password: str) -> None:
+    """Remplace un mot de passe stocké en clair par son hash bcrypt (sync : appelé via run_in_threadpool)."""
+    hashed = pwd_context.hash(password)
+    try:
+        # relecture sous verrou → n'écrase pas une écriture concurrente d'un autre worker
+        with users_lock():
+            fresh = json.loads(USERS_FILE.read_text(encoding="utf-8"))
+            if token in fresh:
+                fresh[token]["password"] = hashed
+                _atomic_write_json(USERS_FILE, fresh)
+    except Exception:
+        pass  # on n'empêche pas le login si l'écriture échoue
+
+
+def _persist_oauth_user(new_token: str, new_user: dict, email_norm: str, counts: dict) -> None:
+    """Écritures d'un nouvel utilisateur OAuth (sync : verrou users.json attendu hors boucle asyncio)."""
+    # --- persistance (on ne bloque pas le login si l'écriture échoue)
+    try:
+        with users_lock():  # relecture sous verrou : ajout sans perdre les écritures concurrentes
+            raw = USERS_FILE.read_text(encoding="utf-8") if USERS_FILE.exists() else ""
+            fresh = json.loads(raw) if raw.strip() else {}
+            fresh[new_token] = new_user
+            _atomic_write_json(USERS_FILE, fresh)
+    except Exception:
+        pass
+
+    # Incrémente compteur création (tolérant)
+    try:
+        counts[email_norm] = int(counts.get(email_norm, 0)) + 1
+        _atomic_write_json(RECREATE_FILE, counts)
+    except Exception:
+        pass
+
+    # (optionnel) init/verif + bonus, tolérant aux erreurs
+    try:
+        init_email_verification(new_token, pending_bonus=2)
+        mark_email_verified_and_grant_pending_bonus(new_token)
+    except Exception as e:
+        print("[google-callback] verify+bonus error:", e)
+
+
 @router.get("/auth/google")
 async def auth_google(request: Request):
     # Si le client_id/secret ne sont pas chargés → on n’envoie PAS une requête cassée à Google
@@ -402,25 +441,8 @@ async def auth_google_callback(request: Request):
         }
         users[new_token] = new_user
 
-       # --- persistance (on ne bloque pas le login si l'écriture échoue)
-        try:
-            USERS_FILE.write_text(json.dumps(users, indent=2), encoding="utf-8")
-        except Exception:
-            pass
-
-        # Incrémente compteur création (tolérant)
-        try:
-            counts[email_norm] = int(counts.get(email_norm, 0)) + 1
-            _atomic_write_json(RECREATE_FILE, counts)
-        except Exception:
-            pass
-
-        # (optionnel) init/verif + bonus, tolérant aux erreurs
-        try:
-            init_email_verification(new_token, pending_bonus=2)
-            mark_email_verified_and_grant_pending_bonus(new_token)
-        except Exception as e:
-            print("[google-callback] verify+bonus error:", e)
+        # --- persistance + compteur + vérif/bonus (verrou users.json → threadpool)
+        await run_in_threadpool(_persist_oauth_user, new_token, new_user, email_norm, counts)
 
         # ----- Nouvelle utilisateur -----
         target = f"{FRONTEND_URL}/?provider=google&apiKey={new_token}"
@@ -479,7 +501,7 @@ def _safe_next(next_url: str | None) -> str | None:
 
 
 @router.get("/auth/verify-email")
-async def verify_email(token: str):
+def verify_email(token: str):
     """
     Stateless: ne lit/écrit aucun cookie et ne log-in personne.
     - Si token invalide/expiré -> redirige vers /login?verify_error=1
@@ -501,7 +523,7 @@ async def verify_email(token: str):
     return RedirectResponse(url=LOGIN_OK, status_code=303, headers={"Cache-Control": "no-store"})
 
 @router.post("/auth/resend-verification")
-async def resend_verification(user: User = Depends(get_current_user), request: Request = None):
+def resend_verification(user: User = Depends(get_current_user), request: Request = None):
     """
     Renvoie un email de vérification (cooldown 15s). Régénère un token propre.
     """
@@ -0,0 +1,297 @@
+"""
+File: backend/app/core/admission.py
+Role: Contrôle d'admission des backtests (jobs CPU) : plafond global, plafond par user,
+      file équitable pondérée (priority_backtest), rejet précoce 429 + Retry-After.
+Depends:
+  - app.utils.metrics (attente en file, rejets, jobs en cours / en attente)
+  - app.utils.perf (phase "admission.wait" dans le run courant)
+Notes:
+  - File "start-time fair queuing" : chaque job reçoit un tag de départ
+    max(V, fin du job précédent du user) et un tag de fin = départ + coût / poids.
+    On sert le plus petit tag de départ dont le user est sous son plafond → un user qui
+    empile des runs multi-mois (coût ~ nb de mois) n'affame pas les autres, et un compte
+    priority_backtest (poids ADMISSION_PRIORITY_WEIGHT) passe proportionnellement plus souvent.
+  - Rejet immédiat (AdmissionRejected → 429) si la file globale ou celle du user est pleine,
+    ou si l'attente dépasse ADMISSION_MAX_WAIT_S ; Retry-After estimé sur la durée moyenne.
+  - Routes : décorateur @admitted(kind, who, cost). who / cost (lecture users.json) passent par
+    le threadpool avant la file ; l'attente en file se fait sur la boucle
+    asyncio (acquire_async, 0 thread bloqué) ; une route `def` n'est envoyée dans le threadpool
+    FastAPI qu'une fois admise → N requêtes en file ne peuvent pas épuiser le pool (40 threads)
+    et affamer les autres routes sync.
+  - ADMISSION_ENABLED=0 → décorateur transparent.
+"""
+
+import asyncio
+import functools
+import inspect
+import itertools
+import math
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from app.utils import perf
+from app.utils.metrics import ADMISSION_REJECTED, ADMISSION_WAIT, gauge
+
+ADMISSION_ENABLED = os.getenv("ADMISSION_ENABLED", "1").strip().lower() not in ("0", "false", "no", "")
+ADMISSION_MAX_CONCURRENT = int(os.getenv("ADMISSION_MAX_CONCURRENT", "0")) or (os.cpu_count() or 2)
+ADMISSION_PER_USER = int(os.getenv("ADMISSION_PER_USER", "2"))
+ADMISSION_MAX_QUEUE = int(os.getenv("ADMISSION_MAX_QUEUE", "0")) or 4 * ADMISSION_MAX_CONCURRENT
+ADMISSION_PER_USER_QUEUE = int(os.getenv("ADMISSION_PER_USER_QUEUE", "4"))
+ADMISSION_MAX_WAIT_S = float(os.getenv("ADMISSION_MAX_WAIT_S", "120"))
+ADMISSION_PRIORITY_WEIGHT = float(os.getenv("ADMISSION_PRIORITY_WEIGHT", "4"))
+
+
+class AdmissionRejected(Exception):
+    """Job refusé avant exécution (file pleine / attente trop longue)."""
+
+    def __init__(self, reason: str, retry_after: int):
+        super().__init__(reason)
+        self.reason = reason
+        self.retry_after = int(retry_after)
+
+
+class Ticket:
+    __slots__ = ("seq", "user", "kind", "priority", "cost", "start", "finish", "enqueued", "granted", "waker")
+
+    def __init__(self, seq, user, kind, priority, cost, start, finish, waker=None):
+        self.seq, self.user, self.kind, self.priority = seq, user, kind, priority
+        self.cost, self.start, self.finish = cost, start, finish
+        self.enqueued = time.perf_counter()
+        self.granted = None  # instant d'admission
+        self.waker = waker   # réveil d'un waiter asyncio (None = waiter thread sur la Condition)
+
+
+class AdmissionController:
+    """File équitable pondérée devant les jobs CPU (un contrôleur par process)."""
+
+    def __init__(self, capacity: int, per_user: int, max_queue: int, per_user_queue: int,
+                 max_wait: float, priority_weight: float):
+        self.capacity = max(1, int(capacity))
+        self.per_user = max(1, int(per_user))
+        self.max_queue = max(0, int(max_queue))
+        self.per_user_queue = max(0, int(per_user_queue))
+        self.max_wait = float(max_wait)
+        self.priority_weight = max(1.0, float(priority_weight))
+        self._cond = threading.Condition()
+        self._seq = itertools.count()
+        self._vtime = 0.0
+        self._last_finish = {}   # user → tag de fin de son dernier job
+        self._running = {}       # user → nb de jobs en cours
+        self._waiting = []       # tickets en attente (ordre d'arrivée)
+        self._avg_cost_s = 5.0   # durée moyenne d'une unité de coût (EWMA)
+
+    # --- état ---------------------------------------------------------------
+
+    def running(self) -> int:
+        return sum(self._running.values())
+
+    def queued(self) -> int:
+        return len(self._waiting)
+
+    def snapshot(self) -> dict:
+        with self._cond:
+            return {
+                "capacity": self.capacity, "running": self.running(), "queued": self.queued(),
+                "per_user": self.per_user, "max_queue": self.max_queue,
+                "avg_cost_seconds": round(self._avg_cost_s, 3),
+                "running_by_user": dict(self._running),
+                "waiting": [{"user": t.user, "kind": t.kind, "priority": t.priority, "cost": t.cost,
+                             "waited_s": round(time.perf_counter() - t.enqueued, 3)} for t in self._waiting],
+            }
+
+    def _retry_after(self) -> int:
+        backlog = self.running() + sum(t.cost for t in self._waiting)
+        return max(1, math.ceil(self._avg_cost_s * backlog / self.capacity))
+
+    # --- ordonnancement -----------------------------------------------------
+
+    def _dispatch(self) -> None:
+        """Admet les tickets (plus petit tag de départ d'abord) tant qu'il reste de la place."""
+        while self._waiting and self.running() < self.capacity:
+            eligible = [t for t in self._waiting if self._running.get(t.user, 0) < self.per_user]
+            if not eligible:
+                break
+            ticket = min(eligible, key=lambda t: (t.start, t.seq))
+            self._waiting.remove(ticket)
+            self._vtime = max(self._vtime, ticket.start)
+            self._running[ticket.user] = self._running.get(ticket.user, 0) + 1
+            ticket.granted = time.perf_counter()
+            if ticket.waker is not None:
+                ticket.waker()
+        self._cond.notify_all()
+
+    def _enqueue(self, user, priority, cost, kind, waker=None) -> Ticket:
+        """Place le ticket en file (admis tout de suite si possible) ; appelé sous self._cond."""
+        cost = max(float(cost), 0.01)
+        weight = self.priority_weight if priority else 1.0
+        if len(self._waiting) >= self.max_queue:
+            raise self._reject(kind, "queue_full")
+        if sum(t.user == user for t in self._waiting) >= self.per_user_queue:
+            raise self._reject(kind, "user_queue_full")
+
+        start = max(self._vtime, self._last_finish.get(user, 0.0))
+        ticket = Ticket(next(self._seq), user, kind, bool(priority), cost, start, start + cost / weight, waker)
+        self._last_finish[user] = ticket.finish
+        self._waiting.append(ticket)
+        self._dispatch()
+        return ticket
+
+    def _abandon(self, ticket: Ticket) -> bool:
+        """Retire un ticket encore en file (timeout / annulation) ; False s'il a été admis entre-temps."""
+        with self._cond:
+            if ticket.granted is not None:
+                return False
+            self._waiting.remove(ticket)
+            self._dispatch()
+            return True
+
+    @staticmethod
+    def _admitted(ticket: Ticket) -> Ticket:
+        wait = ticket.granted - ticket.enqueued
+        ADMISSION_WAIT.labels(ticket.kind, "priority" if ticket.priority else "standard").observe(wait)
+        perf.add_phase("admission.wait", wait)
+        return ticket
+
+    def acquire(self, user, priority: bool = False, cost: float = 1.0, kind: str = "backtest") -> Ticket:
+        """Bloque le thread appelant jusqu'à l'admission du job ; AdmissionRejected si refusé."""
+        with self._cond:
+            ticket = self._enqueue(user, priority, cost, kind)
+            deadline = ticket.enqueued + self.max_wait
+            while ticket.granted is None:
+                left = deadline - time.perf_counter()
+                if left <= 0:
+                    self._waiting.remove(ticket)
+                    self._dispatch()
+                    raise self._reject(kind, "timeout")
+                self._cond.wait(left)
+        return self._admitted(ticket)
+
+    async def acquire_async(self, user, priority: bool = False, cost: float = 1.0,
+                            kind: str = "backtest") -> Ticket:
+        """Comme acquire(), mais l'attente se fait sur la boucle asyncio (aucun thread occupé)."""
+        loop = asyncio.get_running_loop()
+        granted = loop.create_future()
+
+        def _wake():  # appelé sous self._cond, depuis n'importe quel thread
+            loop.call_soon_threadsafe(lambda: granted.done() or granted.set_result(None))
+
+        with self._cond:
+            ticket = self._enqueue(user, priority, cost, kind, waker=_wake)
+        if ticket.granted is None:
+            try:
+                await asyncio.wait_for(granted, self.max_wait)
+            except asyncio.TimeoutError:
+                if self._abandon(ticket):
+                    with self._cond:
+                        raise self._reject(kind, "timeout")
+            except asyncio.CancelledError:  # client parti pendant l'attente
+                if not self._abandon(ticket):
+                    self.release(ticket)
+                raise
+        return self._admitted(ticket)
+
+    def release(self, ticket: Ticket) -> None:
+        """Fin du job : libère la place, met à jour la durée moyenne, admet les suivants."""
+        elapsed = time.perf_counter() - ticket.granted
+        with self._cond:
+            self._avg_cost_s += 0.2 * (elapsed / ticket.cost - self._avg_cost_s)
+            left = self._running.get(ticket.user, 0) - 1
+            if left > 0:
+                self._running[ticket.user] = left
+            else:
+                self._running.pop(ticket.user, None)
+                if not any(t.user == ticket.user for t in self._waiting) \
+                        and self._last_finish.get(ticket.user, 0.0) <= self._vtime:
+                    self._last_finish.pop(ticket.user, None)  # user inactif : plus d'historique
+            self._dispatch()
+
+    def _reject(self, kind: str, reason: str) -> AdmissionRejected:
+        ADMISSION_REJECTED.labels(kind, reason).inc()
+        return AdmissionRejected(reason, self._retry_after())
+
+    @contextmanager
+    def slot(self, user, priority: bool = False, cost: float = 1.0, kind: str = "backtest"):
+        ticket = self.acquire(user, priority=priority, cost=cost, kind=kind)
+        try:
+            yield ticket
+        finally:
+            self.release(ticket)
+
+
+CONTROLLER = AdmissionController(
+    ADMISSION_MAX_CONCURRENT, ADMISSION_PER_USER, ADMISSION_MAX_QUEUE,
+    ADMISSION_PER_USER_QUEUE, ADMISSION_MAX_WAIT_S, ADMISSION_PRIORITY_WEIGHT,
+)
+gauge("backtradz_admission_running", "Jobs CPU admis en cours").set_function(CONTROLLER.running)
+gauge("backtradz_admission_queued", "Jobs CPU en attente d'admission").set_function(CONTROLLER.queued)
+
+
+def rejected_response(exc: AdmissionRejected):
+    """429 + Retry-After (corps au format {"error": ...} des routes)."""
+    from fastapi.responses import JSONResponse
+
+    messages = {
+        "queue_full": "Serveur saturé : trop de backtests en attente.",
+        "user_queue_full": "Trop de backtests en cours pour ce compte.",
+        "timeout": "Attente trop longue avant le démarrage du backtest.",
+    }
+    return JSONResponse(
+        status_code=429,
+        content={"error": f"{messages.get(exc.reason, exc.reason)} Réessayez dans {exc.retry_after} s.",
+                 "reason": exc.reason, "retry_after": exc.retry_after},
+        headers={"Retry-After": str(exc.retry_after)},
+    )
+
+
+def admitted(kind: str, who, cost=None):
+    """
+    Décorateur de route : admission avant l'appel, libération après.
+
+    Args:
+        who: kwargs de la route → (user_id, priority) ; None = pas d'admission
+             (token absent / invalide, crédits… : la route répond elle-même).
+        cost: kwargs → coût relatif du job (défaut 1).
+        who / cost sont sync (lecture users.json…) : appelés via run_in_threadpool AVANT la file,
+        le thread est rendu dès l'identification.
+    """
+    def _ticket_args(kwargs):
+        ident = who(kwargs)
+        if ident is None:
+            return None
+        user, priority = ident
+        return {"user": user, "priority": priority, "kind": kind,
+                "cost": cost(kwargs) if cost is not None else 1.0}
+
+    def decorator(func):
+        if not ADMISSION_ENABLED:
+            return func
+
+        is_async = inspect.iscoroutinefunction(func)
+
+        # Toujours async : l'attente d'admission ne tient aucun thread du pool ; une route `def`
+        # n'y part qu'une fois admise (FastAPI lit la signature d'origine via __wrapped__).
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            from starlette.concurrency import run_in_threadpool
+
+            async def _call():
+                if is_async:
+                    return await func(*args, **kwargs)
+                return await run_in_threadpool(func, *args, **kwargs)
+
+            # who / cost lisent users.json (get_user_by_token) : dans le pool, pas sur la boucle
+            targs = await run_in_threadpool(_ticket_args, kwargs)
+            if targs is None:
+                return await _call()
+            try:
+                ticket = await CONTROLLER.acquire_async(**targs)
+            except AdmissionRejected as exc:
+                return rejected_response(exc)
+            try:
+                return await _call()
+            finally:
+                CONTROLLER.release(ticket)
+        return wrapper
+    return decorator
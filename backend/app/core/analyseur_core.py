@@ -1,7 +1,9 @@
 from app.analyseur import analyze_file
+from app.utils.perf import span
 from pathlib import Path
 
-def run_analysis(csv_path: str, strategy_name: str, symbol: str, sl_pips: int, period: str) -> str:
+def run_analysis(csv_path: str, strategy_name: str, symbol: str, sl_pips: int, period: str,
+                 record_leaderboard: bool = True) -> str:
     """
     Lance une analyse complète sur un CSV (résultats de backtest) et génère un fichier Excel.
 
@@ -11,6 +13,7 @@ def run_analysis(csv_path: str, strategy_name: str, symbol: str, sl_pips: int, p
         symbol (str): le symbole de trading (ex: 'XAU', 'EURUSD').
         sl_pips (int): taille du stop loss utilisée (pips).
         period (str): période du backtest (souvent format "01-06,30-06-25").
+        record_leaderboard (bool): False pour un run hors ANALYSIS_DIR (replay, run isolé).
 
     Returns:
         str: chemin du fichier Excel généré (ou None en cas d'erreur).
@@ -18,7 +21,17 @@ def run_analysis(csv_path: str, strategy_name: str, symbol: str, sl_pips: int, p
     try:
         export_dir = Path(csv_path).parent  # répertoire du fichier CSV
         # 🔎 Appelle la fonction principale d’analyse définie dans backend/analyseur.py
-        analyze_file(csv_path, export_dir, strategy_name, symbol, sl_pips, period)
+        summary = analyze_file(csv_path, export_dir, strategy_name, symbol, sl_pips, period)
+
+        # 🏆 Leaderboard public mis à jour en incrémental (jamais bloquant)
+        if summary and record_leaderboard:
+            try:
+                from app.services.leaderboard_service import make_entry, record_run
+                with span("analysis.leaderboard"):
+                    record_run(make_entry(summary["strategy"], summary["pair"], summary["timeframe"],
+                                          summary["winrate_tp1"], export_dir.name, summary["period"]))
+            except Exception as e:
+                print("⚠️ Leaderboard non mis à jour :", e)
 
         # 📄 Nom standardisé du fichier de sortie Excel
         filename = f"analyse_{strategy_name}_{symbol}_SL{sl_pips}_{period}_resultats.xlsx"
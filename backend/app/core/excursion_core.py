@@ -0,0 +1,190 @@
+"""
+File: backend/app/core/excursion_core.py
+Role: Moteur d'excursions (MFE / MAE) : premiers passages des niveaux de distance après l'entrée
+      → résultat TP1/TP2/SL de n'importe quel triplet (SL, TP1, TP2) par simple lecture.
+Depends:
+  - numpy / pandas
+Notes:
+  - Chemin aval d'un signal = max courant des High et min courant des Low depuis la bougie
+    après l'entrée. Stockage compact : uniquement ses RECORDS (chaîne "prochain plus haut
+    strictement supérieur", un tableau d'entiers partagé par tous les signaux), et par signal
+    l'index du 1er passage de chaque niveau de la grille (int32, -1 = jamais).
+  - Niveaux calculés comme resolve_outcomes (entry ± pips × pip, mêmes comparaisons >= / <=)
+    → outcomes() reproduit exactement les règles du runner :
+      • TP1 gagne si touché sur la même bougie que le SL ; jamais résolu → SL
+      • phase TP2 dès la bougie du TP1 : TP2 gagne à égalité ; ni TP2 ni SL → NONE
+  - Une seule détection + un seul passage → surface de winrate sur toute une grille SL × TP.
+"""
+
+import numpy as np
+import pandas as pd
+
+
+def _next_greater(values: np.ndarray) -> np.ndarray:
+    """nxt[i] = 1er j > i avec values[j] > values[i] (len(values) si aucun) — pile, O(n)."""
+    n = len(values)
+    nxt = np.full(n, n, dtype=np.int64)
+    stack = []
+    vals = values.tolist()
+    for j, v in enumerate(vals):
+        while stack and vals[stack[-1]] < v:
+            nxt[stack.pop()] = j
+        stack.append(j)
+    return nxt
+
+
+def _first_passages(values, nxt, starts, levels, stop):
+    """
+    Pour chaque signal s et niveau k (levels[s] croissant) : 1er i >= starts[s], i < stop,
+    tel que values[i] >= levels[s, k] ; -1 si jamais.
+
+    Marche sur les records du max courant (chaîne nxt) : le 1er passage d'un niveau
+    est forcément un record. Tous les signaux avancent ensemble (NumPy).
+    """
+    n_sig, n_lvl = levels.shape
+    out = np.full((n_sig, n_lvl), -1, dtype=np.int32)
+    done = np.zeros(n_sig, dtype=np.int64)
+    pos = starts.astype(np.int64, copy=True)
+    active = np.nonzero(pos < stop)[0]
+    k = np.arange(n_lvl)
+    while len(active):
+        p = pos[active]
+        reached = (levels[active] <= values[p][:, None]).sum(axis=1)
+        fill = (k >= done[active][:, None]) & (k < reached[:, None])
+        rows, cols = np.nonzero(fill)
+        out[active[rows], cols] = p[rows]
+        done[active] = np.maximum(done[active], reached)
+        pos[active] = nxt[p]
+        keep = (pos[active] < stop) & (done[active] < n_lvl)
+        active = active[keep]
+    return out
+
+
+def _signal_positions(df, signals):
+    """
+    Signaux → (positions iloc d'entrée, prix d'entrée, buy?) avec la normalisation de
+    resolve_outcomes ; signaux mal formés ou hors index ignorés (sans muter les dicts).
+    """
+    index = df.index
+    unique = index.is_unique
+    pos, entries, is_buy = [], [], []
+    for sig in signals:
+        try:
+            entry = float(sig["entry"])
+            t = pd.to_datetime(sig["time"])
+            direction = str(sig["direction"]).lower()
+        except Exception:
+            continue
+        if t not in index:
+            continue
+        pos.append(index.get_loc(t) if unique else int(np.flatnonzero(index == t)[0]))
+        entries.append(entry)
+        is_buy.append(direction == "buy")
+    return (np.asarray(pos, dtype=np.int64), np.asarray(entries, dtype=float),
+            np.asarray(is_buy, dtype=bool))
+
+
+class Excursions:
+    """Premiers passages favorables (niveaux TP) et adverses (niveaux SL) de chaque signal."""
+
+    def __init__(self, tp_levels, sl_levels, favourable, adverse, is_buy):
+        self.tp_levels = list(tp_levels)
+        self.sl_levels = list(sl_levels)
+        self.favourable = favourable   # (signaux × niveaux TP) int32
+        self.adverse = adverse         # (signaux × niveaux SL) int32
+        self.is_buy = is_buy
+        self._tp = {v: i for i, v in enumerate(self.tp_levels)}
+        self._sl = {v: i for i, v in enumerate(self.sl_levels)}
+
+    def __len__(self) -> int:
+        return len(self.is_buy)
+
+    def outcomes(self, sl_pips, tp1_pips, tp2_pips):
+        """
+        Lecture des résultats pour un triplet de la grille.
+
+        Returns:
+            (tp1_hit bool[], tp2_code int8[]) — tp2_code : 0 = pas de phase TP2, 1 = TP2, 2 = SL, 3 = NONE
+            (mêmes codes que le mode rolling).
+        """
+        adv = self.adverse[:, self._sl[sl_pips]]
+        f1 = self.favourable[:, self._tp[tp1_pips]]
+        f2 = self.favourable[:, self._tp[tp2_pips]]
+        no_sl = adv < 0
+        tp1 = (f1 >= 0) & (no_sl | (f1 <= adv))
+        i_tp2 = np.where(f2 >= 0, np.maximum(f2, f1), -1)
+        tp2 = tp1 & (i_tp2 >= 0) & (no_sl | (i_tp2 <= adv))
+        code = np.zeros(len(adv), dtype=np.int8)
+        code[tp1] = np.where(tp2[tp1], 1, np.where(no_sl[tp1], 3, 2))
+        return tp1, code
+
+
+def build_excursions(df, signals, pip, tp_levels, sl_levels, stop=None) -> Excursions:
+    """
+    Un passage sur la série pour tous les signaux et tous les niveaux (en pips) demandés.
+
+    Args:
+        df: OHLC préparé (prepare_ohlc), index temporel.
+        signals: sortie detect_<strat> (time/entry/direction).
+        tp_levels / sl_levels: distances en pips (TP1 et TP2 partagent la même grille).
+        stop: borne (exclue) de suivi des trades, comme resolve_outcomes.
+    """
+    tp_levels = sorted(set(tp_levels))
+    sl_levels = sorted(set(sl_levels))
+    n = len(df) if stop is None else min(int(stop), len(df))
+    pos, entry, is_buy = _signal_positions(df, signals)
+    starts = pos + 1
+
+    # Max courant des High / min courant des Low (via -Low) ; NaN = jamais touché
+    up = np.nan_to_num(df["High"].to_numpy(dtype=float), nan=-np.inf)
+    down = np.nan_to_num(-df["Low"].to_numpy(dtype=float), nan=-np.inf)
+    nxt_up, nxt_down = _next_greater(up), _next_greater(down)
+
+    tp = np.asarray(tp_levels, dtype=object)
+    sl = np.asarray(sl_levels, dtype=object)
+    favourable = np.full((len(pos), len(tp_levels)), -1, dtype=np.int32)
+    adverse = np.full((len(pos), len(sl_levels)), -1, dtype=np.int32)
+    for buy in (True, False):
+        rows = np.nonzero(is_buy == buy)[0]
+        if not len(rows):
+            continue
+        e = entry[rows][:, None]
+        # Mêmes expressions que resolve_outcomes : entry ± pips * pip
+        if buy:
+            tp_px = (e + (tp * pip)[None, :]).astype(float)
+            sl_px = -(e - (sl * pip)[None, :]).astype(float)
+            fav_vals, fav_nxt, adv_vals, adv_nxt = up, nxt_up, down, nxt_down
+        else:
+            tp_px = -(e - (tp * pip)[None, :]).astype(float)
+            sl_px = (e + (sl * pip)[None, :]).astype(float)
+            fav_vals, fav_nxt, adv_vals, adv_nxt = down, nxt_down, up, nxt_up
+        favourable[rows] = _first_passages(fav_vals, fav_nxt, starts[rows], tp_px, n)
+        adverse[rows] = _first_passages(adv_vals, adv_nxt, starts[rows], sl_px, n)
+    return Excursions(tp_levels, sl_levels, favourable, adverse, is_buy)
+
+
+def sl_tp_surface(exc: Excursions, sl_grid, tp_grid, tp1_pips) -> dict:
+    """
+    Heatmaps de winrate (mêmes définitions que l'analyseur / le rolling : X / trades × 100).
+
+    Returns:
+        dict: sl_grid, tp_grid, trades,
+              winrate_tp1[i_sl][i_tp]  (TP1 = tp),
+              winrate_tp2[i_sl][i_tp]  (TP1 fixé à tp1_pips, TP2 = tp).
+    """
+    trades = len(exc)
+    wr1, wr2 = [], []
+    for sl in sl_grid:
+        row1, row2 = [], []
+        for tp in tp_grid:
+            tp1_hit, _ = exc.outcomes(sl, tp, tp)
+            _, code = exc.outcomes(sl, tp1_pips, tp)
+            row1.append(round(int(tp1_hit.sum()) / trades * 100, 2) if trades else 0)
+            row2.append(round(int((code == 1).sum()) / trades * 100, 2) if trades else 0)
+        wr1.append(row1)
+        wr2.append(row2)
+    return {
+        "sl_grid": list(sl_grid), "tp_grid": list(tp_grid), "tp1_pips": tp1_pips,
+        "trades": trades, "buy": int(exc.is_buy.sum()), "sell": int(trades - exc.is_buy.sum()),
+        "winrate_tp1": wr1, "winrate_tp2": wr2,
+    }
@@ -41,6 +41,7 @@ try:
     PRIVATE_DIR     = DATA_ROOT / "private"
     INVOICES_DIR    = PRIVATE_DIR / "invoices"
     STRATEGIES_DIR  = PRIVATE_DIR / "strategies"
+    CACHE_DIR       = DATA_ROOT / "cache"   # données dérivées (recalculables → purgeables)
 
     # 🔁 Fallback DEV: si OUTPUT_DIR n’existe pas mais que backend/app/output existe, on bascule dessus.
     if 'IS_DEV' in locals() and IS_DEV:
@@ -65,11 +66,12 @@ except Exception:
     PRIVATE_DIR     = DATA_ROOT / "private"
     INVOICES_DIR    = PRIVATE_DIR / "invoices"
     STRATEGIES_DIR  = PRIVATE_DIR / "strategies"
+    CACHE_DIR       = DATA_ROOT / "cache"
 
 
 def ensure_storage_dirs():
     """Crée tous les dossiers requis (safe en local, no-op en prod)."""
-    for d in (OUTPUT_DIR, OUTPUT_LIVE_DIR, ANALYSIS_DIR, DB_DIR, PRIVATE_DIR, INVOICES_DIR, STRATEGIES_DIR):
+    for d in (OUTPUT_DIR, OUTPUT_LIVE_DIR, ANALYSIS_DIR, DB_DIR, PRIVATE_DIR, INVOICES_DIR, STRATEGIES_DIR, CACHE_DIR):
         try:
             d.mkdir(parents=True, exist_ok=True)
         except Exception:
@@ -1,40 +1,22 @@
 from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+import os
+import re
 import pandas as pd
+import numpy as np
 import json
 import hashlib  # (au cas où pour util interne)
 from inspect import signature
 from app.utils.logger import log_params_to_file
 from app.utils.pip_registry import get_pip
 from app.utils.run_id import make_run_id
+from app.utils.perf import count, span
+from app.utils.results_table import RESULT_FILE, write_results
+from app.core.strategy_registry import spec_for_func
 
-def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp2_pips=200,
-                    symbol="XAU", timeframe="m5", period="01-06,30-06-25", auto_analyze=False,
-                    params=None, user_id=None):
-    """
-    Exécute un backtest sur un DataFrame de données OHLC avec une stratégie donnée.
-    """
-    df = df.copy()
-
-    # 🔒 Vérifie que les colonnes minimales existent
-    required_cols = {"Open", "High", "Low", "Close", "time"}
-    if not required_cols.issubset(df.columns):
-        print("❌ DF incomplet ou mal formaté :", df.columns.tolist())
-        return {"error": f"❌ Données corrompues. Colonnes requises : {required_cols}"}
-
-    if df.empty:
-        return {"error": "Le DataFrame est vide"}
-
-    # Nettoyage du DF
-    if "RSI_14" in df.columns:
-        df.rename(columns={"RSI_14": "RSI"}, inplace=True)
-    df = df[df["Open"] != "GBPUSD=X"]
-    for col in ["Open", "High", "Low", "Close"]:
-        df[col] = pd.to_numeric(df[col], errors="coerce")
-    df = df.dropna()
-
-    print("📊 DF ready V5-like:", df.shape)
 
-    # 1) --- PIP (source unique) AVANT l'appel stratégie ---
+def resolve_pip(symbol):
+    """Pip factor du symbole (pip_registry + fallbacks historiques du runner)."""
     s = (symbol or "").upper()
     pip = get_pip(s)
     if pip is None:
@@ -48,144 +30,124 @@ def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp
             pip = 1.0
         else:
             pip = 0.0001
-    print(f"📐 Pip factor pour {symbol} = {pip}")
+    return pip
 
-    # 2) --- Construire les paramètres effectifs pour la stratégie ---
-    eff_params = {}
-    if isinstance(params, dict):
-        eff_params.update(params)  # brut UI
 
-    # Compat vieux front : si "tp2" est fourni, le garder pour le log côté runner (pas pour la strat)
-    _tp2_from_params = None
-    if "tp2" in eff_params and "tp2_pips" not in eff_params:
-        try:
-            _tp2_from_params = float(eff_params.get("tp2"))
-        except Exception:
-            _tp2_from_params = None
-
-    # --- Normalisation UI -> types python ---
-    def _to_scalar(v):
-        if isinstance(v, str):
-            lv = v.strip().lower()
-            if lv in ("true", "false", "1", "0", "yes", "no"):
-                return lv in ("true", "1", "yes")
-            try:
-                if any(c in lv for c in (".", "e")):
-                    return float(lv)
-                return int(lv)
-            except Exception:
-                return v
-        return v
-    eff_params = {k: _to_scalar(v) for k, v in eff_params.items()}
+def prepare_ohlc(df):
+    """
+    Nettoyage du DF avant stratégie (colonnes requises, RSI_14 → RSI, OHLC numériques).
+    Copie superficielle : une colonne déjà propre reste une vue (frame partagé en lecture seule
+    de data_loader → 0 copie), une colonne corrigée est remplacée, jamais écrite en place.
+    Retourne le DF propre, ou un dict {"error": ...}.
+    """
+    df = df.copy(deep=False)
 
-    # Signature de la stratégie (liste des paramètres acceptés)
-    try:
-        func_sig = signature(strategy_func)
-        expected = set(func_sig.parameters.keys())
-    except Exception:
-        func_sig, expected = None, set()
+    # 🔒 Vérifie que les colonnes minimales existent
+    required_cols = {"Open", "High", "Low", "Close", "time"}
+    if not required_cols.issubset(df.columns):
+        print("❌ DF incomplet ou mal formaté :", df.columns.tolist())
+        return {"error": f"❌ Données corrompues. Colonnes requises : {required_cols}"}
 
-    # [ADD] Détection des types attendus (annotation ou type du default)
-    expected_types = {}
-    if func_sig is not None:
-        for name, p in func_sig.parameters.items():
-            if name in ("df", "data", "dataframe"):
-                continue
-            if p.annotation is not p.empty and isinstance(p.annotation, type):
-                expected_types[name] = p.annotation
-            elif p.default is not p.empty and p.default is not None:
-                expected_types[name] = type(p.default)
-
-    # [ADD] Remap robuste: UI → noms internes attendus par la stratégie
-    RAW = dict(eff_params)  # on garde l'original pour chercher des alias
-    ALIASES = {
-        # clés vraiment problématiques vues côté UI
-        "min_wait_candles": ["min_wait", "min_wait_bar", "min_wait_bars", "min_wait_candle"],
-        "max_wait_candles": ["max_wait", "max_wait_bar", "max_wait_bars", "max_wait_candle"],
-        "allow_multiple_entries": ["allow_multi", "allow_multiple", "allow_multiple_entry", "multi_entries"],
-
-        # EMA / RSI
-        "ema_key": ["ema", "EMA", "ema_col", "ema_fast"],
-        "ema_fast": ["ema1", "fast_ema", "ema_fast"],
-        "ema_slow": ["ema2", "slow_ema", "ema_slow"],
-        "rsi_key": ["rsi_key", "rsi_col", "RSI_col", "RSI"],
-        "rsi_threshold": ["rsi_threshold", "rsiValue", "rsi_value", "rsi", "RSI"],
-
-        # FVG / gaps
-        "min_pips": ["min_gap_pips", "gap_pips", "min_fvg_pips", "fvg_min_pips"],
-
-        # time key / datetime
-        "time_key": ["time_key", "Datetime", "datetime", "date_col", "timestamp_col"],
-    }
+    if df.empty:
+        return {"error": "Le DataFrame est vide"}
+
+    # Nettoyage du DF
+    if "RSI_14" in df.columns:
+        df.rename(columns={"RSI_14": "RSI"}, inplace=True)
+    parasites = df["Open"] == "GBPUSD=X"
+    if parasites.any():
+        df = df[~parasites]
+    for col in ["Open", "High", "Low", "Close"]:
+        if not pd.api.types.is_numeric_dtype(df[col]):
+            df[col] = pd.to_numeric(df[col], errors="coerce")
+    if df.isna().to_numpy().any():
+        df = df.dropna()
+    return df
 
-    if expected:
-        for target, alts in ALIASES.items():
-            if target in expected and target not in eff_params:
-                for a in alts:
-                    if a in RAW:
-                        eff_params[target] = _to_scalar(RAW[a])
-                        break
-
-    # --- Conversion auto des *_pips -> prix (détection) ---
-    for k, v in list(eff_params.items()):
-        if k.endswith("_pips") and v is not None:
-            try:
-                eff_params[k] = float(v) * float(pip)
-            except Exception:
-                # valeur illisible -> on supprime pour ne pas casser l'appel
-                del eff_params[k]
 
-    # --- Forçage time_key="time" si la strat l'accepte ---
-    if expected and "time_key" in expected and "time" in df.columns:
-        eff_params["time_key"] = "time"
+def _read_only(df) -> bool:
+    """True si toutes les colonnes sont des vues en lecture seule (frame partagé memmap)."""
+    arrays = [df[col].to_numpy() for col in df.columns]
+    return bool(arrays) and all(isinstance(a, np.ndarray) and not a.flags.writeable for a in arrays)
 
-    # Valeur par défaut raisonnable si la stratégie attend 'min_pips' mais qu'on n'a rien reçu
-    if expected and "min_pips" in expected and "min_pips" not in eff_params:
-        eff_params["min_pips"] = 5 * float(pip)
 
-    # [ADD] Coercition finale des types selon expected_types
-    def _coerce(v, typ):
+def detect_signals(strategy_func, df, eff_params):
+    """
+    Appel stratégie sur SA copie du frame (les stratégies ajoutent / remplacent des colonnes).
+    Frame partagé (lecture seule) : copie superficielle → pas de copie des données ; une
+    stratégie qui écrirait en place lève ValueError "read-only" → repli sur une copie profonde.
+    """
+    if _read_only(df):
         try:
-            if typ is bool:
-                if isinstance(v, str):
-                    return v.strip().lower() in ("true", "1", "yes")
-                return bool(v)
-            if typ is int:
-                return int(float(v))
-            if typ is float:
-                return float(v)
-            if typ is str:
-                return str(v)
-            return v
-        except Exception:
-            return v
+            return strategy_func(df.copy(deep=False), **eff_params)
+        except ValueError as e:
+            if "read-only" not in str(e):
+                raise
+    return strategy_func(df.copy(), **eff_params)
+
 
-    if expected:
-        for k in list(eff_params.keys()):
-            if k in expected_types:
-                eff_params[k] = _coerce(eff_params[k], expected_types[k])
+def build_strategy_params(strategy_func, params, pip, columns):
+    """
+    Params UI bruts → kwargs effectifs de la stratégie (alias, *_pips × pip,
+    time_key forcé, coercition selon la signature).
+    La signature / les types / les alias sont précompilés une fois par stratégie
+    (core/strategy_registry.StrategySpec) au lieu d'être recalculés à chaque run.
 
-        # Ne garder que les clés que la stratégie accepte
-        eff_params = {k: v for k, v in eff_params.items() if k in expected}
+    Returns:
+        (eff_params, func_sig, tp2_from_params)
+    """
+    spec = spec_for_func(strategy_func)
+    eff_params, _tp2_from_params = spec.normalize(params, pip, columns)
 
      # 🧩 DEBUG: afficher les paramètres réellement transmis à la stratégie
     try:
         print("🧩 Params effectifs (runner → stratégie):", eff_params)
-        if expected:
-            print("🔐 Params attendus par la stratégie:", sorted(list(expected)))
+        if spec.expected:
+            print("🔐 Params attendus par la stratégie:", sorted(list(spec.expected)))
     except Exception:
         pass
 
-    # 3) --- Appel stratégie avec les bons paramètres ---
-    try:
-        signals = strategy_func(df.copy(), **eff_params)
-    except Exception as e:
-        return {"error": f"Erreur stratégie {strategy_name} : {e}"}
+    return eff_params, spec.signature, _tp2_from_params
+
+
+def _first_hit(values, start, stop, level, above):
+    """
+    Premier index i dans [start, stop) tel que values[i] >= level (above) ou <= level.
+    Balayage par blocs croissants : O(distance au hit), pas O(len(df)).
+    Retourne -1 si aucun hit.
+    """
+    i, step = start, 256
+    while i < stop:
+        j = min(stop, i + step)
+        seg = values[i:j]
+        mask = (seg >= level) if above else (seg <= level)
+        k = int(mask.argmax())
+        if mask[k]:
+            return i + k
+        i, step = j, step * 2
+    return -1
+
+
+def resolve_outcomes(df, signals, sl_pips, tp1_pips, tp2_pips, pip, stop=None):
+    """
+    Résout chaque signal en lignes de résultats (phase TP1, puis TP2 si TP1 touché).
+
+    Sémantique identique à la boucle bougie par bougie historique :
+      - phase TP1 : TP1 gagne si touché sur la même bougie que le SL ;
+        jamais résolu → "SL".
+      - phase TP2 (dès la bougie du TP1, incluse) : TP2 gagne à égalité avec le SL ;
+        jamais résolu → "NONE".
 
-    # ✅ Toujours init, même si pip vient direct du registre
+    Args:
+        stop: borne (exclue) de position pour le suivi des trades (défaut: len(df)).
+    """
     results = []
+    high = df["High"].to_numpy(dtype=float)
+    low = df["Low"].to_numpy(dtype=float)
+    n = len(df) if stop is None else min(int(stop), len(df))
+    index = df.index
+    unique = index.is_unique
 
-    # 🧾 Boucle sur chaque signal détecté
     for sig in signals:
         try:
             sig["entry"] = float(sig["entry"])
@@ -210,29 +172,28 @@ def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp
         rr_tp1 = round(tp1_size / sl_size, 2)
         rr_tp2 = round(tp2_size / sl_size, 2)
 
-        if entry_time not in df.index:
+        if entry_time not in index:
             continue
 
-        entry_index = df.index.get_loc(entry_time)
-        tp1_hit = False
-        tp2_hit = False
-        sl_hit = False
-
-        # 📈 Boucle après l’entrée → vérifie si TP1/TP2 ou SL atteint
-        for i in range(entry_index + 1, len(df)):
-            high = df.iloc[i]["High"]
-            low = df.iloc[i]["Low"]
-
-            if direction == "buy":
-                if not tp1_hit and high >= tp1: tp1_hit = True
-                if not tp1_hit and low <= sl: break
-                if tp1_hit and high >= tp2: tp2_hit = True; break
-                if tp1_hit and low <= sl: sl_hit = True; break
-            else:
-                if not tp1_hit and low <= tp1: tp1_hit = True
-                if not tp1_hit and high >= sl: break
-                if tp1_hit and low <= tp2: tp2_hit = True; break
-                if tp1_hit and high >= sl: sl_hit = True; break
+        if unique:
+            entry_index = index.get_loc(entry_time)
+        else:
+            entry_index = int(np.flatnonzero(index == entry_time)[0])
+
+        # 📈 Premiers passages après l'entrée (buy: TP au-dessus / SL en dessous)
+        is_buy = direction == "buy"
+        tp_src, sl_src = (high, low) if is_buy else (low, high)
+        start = entry_index + 1
+
+        i_sl1 = _first_hit(sl_src, start, n, sl, not is_buy)
+        i_tp1 = _first_hit(tp_src, start, n if i_sl1 < 0 else i_sl1 + 1, tp1, is_buy)
+        tp1_hit = i_tp1 >= 0
+        tp2_hit = sl_hit = False
+        if tp1_hit:
+            i_sl2 = _first_hit(sl_src, i_tp1, n, sl, not is_buy)
+            i_tp2 = _first_hit(tp_src, i_tp1, n if i_sl2 < 0 else i_sl2 + 1, tp2, is_buy)
+            tp2_hit = i_tp2 >= 0
+            sl_hit = (not tp2_hit) and i_sl2 >= 0
 
         # Résultat TP1
         result_tp1 = "TP1" if tp1_hit else "SL"
@@ -263,6 +224,72 @@ def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp
                 "rr_tp2": rr_tp2
             })
 
+    return results
+
+
+def _params_for_log(strategy_func, func_sig, eff_params):
+    """Params réellement utilisés (defaults de la signature écrasés par eff_params), types XLSX-safe."""
+    if func_sig is None:
+        func_sig = signature(strategy_func)
+    logged = {}
+    for name, p in func_sig.parameters.items():
+        if name in ("df", "data"):
+            continue
+        if name in eff_params:
+            logged[name] = eff_params[name]
+        elif p.default is not p.empty:
+            logged[name] = p.default
+
+    # normaliser les types pour l'export XLSX
+    def _clean(v):
+        try:
+            import numpy as np  # noqa
+            if hasattr(v, "item"):
+                return v.item()
+        except Exception:
+            pass
+        if isinstance(v, (bool, int, float, str)) or v is None:
+            return v
+        return str(v)
+    logged = {k: _clean(v) for k, v in logged.items()}
+    return logged
+
+
+def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp2_pips=200,
+                    symbol="XAU", timeframe="m5", period="01-06,30-06-25", auto_analyze=False,
+                    params=None, user_id=None, output_root=None):
+    """
+    Exécute un backtest sur un DataFrame de données OHLC avec une stratégie donnée.
+    output_root: racine du dossier de résultats (défaut: ANALYSIS_DIR ; autre = run isolé, ex. replay).
+    """
+    with span("runner.prepare"):
+        df = prepare_ohlc(df)
+    if isinstance(df, dict):
+        return df
+    count("bars", len(df))
+
+    print("📊 DF ready V5-like:", df.shape)
+
+    # 1) --- PIP (source unique) AVANT l'appel stratégie ---
+    pip = resolve_pip(symbol)
+    print(f"📐 Pip factor pour {symbol} = {pip}")
+
+    # 2) --- Construire les paramètres effectifs pour la stratégie ---
+    eff_params, func_sig, _tp2_from_params = build_strategy_params(strategy_func, params, pip, df.columns)
+
+    # 3) --- Appel stratégie avec les bons paramètres ---
+    try:
+        with span("runner.detect"):
+            signals = detect_signals(strategy_func, df, eff_params)
+    except Exception as e:
+        return {"error": f"Erreur stratégie {strategy_name} : {e}"}
+    count("signals", len(signals))
+
+    # 🧾 Résolution TP1/TP2/SL de chaque signal détecté
+    with span("runner.outcomes"):
+        results = resolve_outcomes(df, signals, sl_pips, tp1_pips, tp2_pips, pip)
+    count("result_rows", len(results))
+
     print("✅ Signaux détectés :", len(signals))
     print("✅ Résultats générés :", len(results))
 
@@ -330,38 +357,17 @@ def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp
     from app.core.paths import ANALYSIS_DIR
     full_name = f"{base_name}__h{run_id}"
     # ✅ Utilisation du dossier centralisé
-    output_path = ANALYSIS_DIR / full_name
+    output_path = (Path(output_root) if output_root else ANALYSIS_DIR) / full_name
     output_path.mkdir(parents=True, exist_ok=True)
 
-    # 💾 Sauvegarde CSV résultat
-    csv_path = output_path / "backtest_result.csv"
-    pd.DataFrame(results).to_csv(csv_path, index=False)
+    # 💾 Sauvegarde résultats (table binaire colonnaire ; CSV exporté à la demande)
+    csv_path = output_path / RESULT_FILE
+    with span("runner.write"):
+        write_results(results, csv_path)
     print("📁 Résultats enregistrés dans :", csv_path)
 
     # 📝 Logging des paramètres réellement utilisés (defaults écrasés par eff_params)
-    if func_sig is None:
-        func_sig = signature(strategy_func)
-    logged = {}
-    for name, p in func_sig.parameters.items():
-        if name in ("df", "data"):
-            continue
-        if name in eff_params:
-            logged[name] = eff_params[name]
-        elif p.default is not p.empty:
-            logged[name] = p.default
-
-    # 3) normaliser les types pour l'export XLSX
-    def _clean(v):
-        try:
-            import numpy as np  # noqa
-            if hasattr(v, "item"):
-                return v.item()
-        except Exception:
-            pass
-        if isinstance(v, (bool, int, float, str)) or v is None:
-            return v
-        return str(v)
-    logged = {k: _clean(v) for k, v in logged.items()}
+    logged = _params_for_log(strategy_func, func_sig, eff_params)
 
     # 4) ajouter les infos runner utiles
     logged.update({
@@ -400,3 +406,269 @@ def run_backtest(df, strategy_name, strategy_func, sl_pips=100, tp1_pips=100, tp
             print(f"❌ Erreur injection run_id/user_id dans {file.name} → {e}")
 
     return str(csv_path)
+
+
+# ============================================================
+# 🔁 MODE ROLLING / WALK-FORWARD
+# ------------------------------------------------------------
+# Une seule série chargée, N fenêtres (window, step) → tableau de
+# métriques par fenêtre (équivalent des dossiers "ANALYSE MENSUELLE",
+# mais en un seul job).
+#   - state="shared" (défaut) : détection UNE fois sur toute la série,
+#     résolution UNE fois, puis découpage par searchsorted + cumsum.
+#     Un trade ouvert en fin de fenêtre est suivi sur la suite de la série.
+#   - state="independent" : chaque fenêtre relance détection + résolution
+#     sur sa tranche (état de stratégie remis à zéro, comme des runs isolés),
+#     en parallèle dans un pool de process.
+# ============================================================
+ROLLING_COLUMNS = [
+    "window_start", "window_end", "bars", "trades", "buy", "sell",
+    "tp1", "sl", "winrate_tp1", "tp2", "tp2_sl", "tp2_none", "winrate_tp2",
+]
+
+
+def _parse_span(value):
+    """'30D' / '12h' / '2W' → Timedelta ; '1M' / '3MS' → DateOffset(months=n)."""
+    v = str(value).strip()
+    m = re.fullmatch(r"(\d*)\s*(M|MS)", v)
+    if m:
+        return pd.DateOffset(months=int(m.group(1) or 1))
+    span = pd.Timedelta(v)
+    if span <= pd.Timedelta(0):
+        raise ValueError(f"Durée invalide : {value}")
+    return span
+
+
+def build_windows(index, window="1M", step=None):
+    """
+    Fenêtres [start, end) alignées (minuit, ou 1er du mois si mensuel) couvrant l'index trié.
+
+    Returns:
+        list[(start, end, lo, hi)] avec lo/hi = positions iloc (hi exclu), fenêtres vides omises.
+    """
+    if len(index) == 0:
+        return []
+    w = _parse_span(window)
+    st = _parse_span(step or window)
+    start = index[0].normalize()
+    if isinstance(w, pd.DateOffset) or isinstance(st, pd.DateOffset):
+        start = start.replace(day=1)
+
+    windows, last = [], index[-1]
+    while start <= last:
+        end = start + w
+        lo = int(index.searchsorted(start, side="left"))
+        hi = int(index.searchsorted(end, side="left"))
+        if hi > lo:
+            windows.append((start, end, lo, hi))
+        start = start + st
+    return windows
+
+
+def _trade_arrays(results):
+    """
+    Lignes runner (TP1 puis TP2 optionnelle) → arrays par trade :
+    temps d'entrée, buy?, TP1?, code TP2 (0 = pas de phase TP2, 1 = TP2, 2 = SL, 3 = NONE).
+    """
+    times, is_buy, tp1, tp2 = [], [], [], []
+    codes = {"TP2": 1, "SL": 2, "NONE": 3}
+    for row in results:
+        if row.get("phase") == "TP1":
+            times.append(pd.Timestamp(row["time"]))
+            is_buy.append(row.get("direction") == "buy")
+            tp1.append(row.get("result") == "TP1")
+            tp2.append(0)
+        elif row.get("phase") == "TP2" and tp2:
+            tp2[-1] = codes.get(row.get("result"), 3)
+    t = pd.DatetimeIndex(times)
+    order = np.argsort(t.values, kind="stable")
+    return (t[order], np.asarray(is_buy, dtype=bool)[order],
+            np.asarray(tp1, dtype=bool)[order], np.asarray(tp2, dtype=np.int8)[order])
+
+
+def _window_rows(windows, results):
+    """Métriques par fenêtre via sommes cumulées + searchsorted (pas de re-scan)."""
+    t, is_buy, tp1, tp2 = _trade_arrays(results)
+
+    def _cs(mask):
+        return np.concatenate(([0], np.cumsum(mask, dtype=np.int64)))
+
+    cs_all = _cs(np.ones(len(t), dtype=bool))
+    cs_buy, cs_tp1 = _cs(is_buy), _cs(tp1)
+    cs_tp2, cs_tp2_sl, cs_tp2_none = _cs(tp2 == 1), _cs(tp2 == 2), _cs(tp2 == 3)
+
+    rows = []
+    for start, end, lo, hi in windows:
+        a = int(t.searchsorted(start, side="left"))
+        b = int(t.searchsorted(end, side="left"))
+        rows.append(_metrics_row(
+            start, end, hi - lo,
+            trades=int(cs_all[b] - cs_all[a]), buy=int(cs_buy[b] - cs_buy[a]),
+            tp1=int(cs_tp1[b] - cs_tp1[a]), tp2=int(cs_tp2[b] - cs_tp2[a]),
+            tp2_sl=int(cs_tp2_sl[b] - cs_tp2_sl[a]), tp2_none=int(cs_tp2_none[b] - cs_tp2_none[a]),
+        ))
+    return rows
+
+
+def _metrics_row(start, end, bars, trades, buy, tp1, tp2, tp2_sl, tp2_none):
+    # Mêmes définitions que l'analyseur : winrate TP1 = TP1/trades, TP2 = TP2/tous les trades
+    return {
+        "window_start": start, "window_end": end, "bars": bars,
+        "trades": trades, "buy": buy, "sell": trades - buy,
+        "tp1": tp1, "sl": trades - tp1,
+        "winrate_tp1": round(tp1 / trades * 100, 2) if trades else 0,
+        "tp2": tp2, "tp2_sl": tp2_sl, "tp2_none": tp2_none,
+        "winrate_tp2": round(tp2 / trades * 100, 2) if trades else 0,
+    }
+
+
+def _rolling_window_worker(payload):
+    """Worker (process pool) : détection + résolution sur UNE tranche, état de stratégie isolé."""
+    (strategy_func, df_slice, eff_params, sl_pips, tp1_pips, tp2_pips, pip) = payload
+    try:
+        signals = detect_signals(strategy_func, df_slice, eff_params)
+    except Exception as e:
+        return {"error": str(e)}
+    return resolve_outcomes(df_slice, signals, sl_pips, tp1_pips, tp2_pips, pip)
+
+
+def run_rolling_backtest(df, strategy_name, strategy_func, window="1M", step=None,
+                         sl_pips=100, tp1_pips=100, tp2_pips=200, symbol="XAU", timeframe="m5",
+                         period="", params=None, user_id=None, state="shared", workers=None):
+    """
+    Backtest rolling/walk-forward sur une série déjà chargée.
+
+    Args:
+        window / step: "1M", "3MS", "30D", "7D", "12h"… (step = window par défaut → fenêtres contiguës)
+        state: "shared" | "independent" (voir bloc ci-dessus)
+        workers: taille du pool (mode independent), défaut = nb CPU
+
+    Returns:
+        dict {"folder", "csv", "xlsx", "windows": [...]} ou {"error": ...}
+    """
+    df = prepare_ohlc(df)
+    if isinstance(df, dict):
+        return df
+    if not df.index.is_monotonic_increasing:
+        df = df.sort_index()
+
+    pip = resolve_pip(symbol)
+    eff_params, func_sig, _tp2_from_params = build_strategy_params(strategy_func, params, pip, df.columns)
+
+    try:
+        windows = build_windows(df.index, window, step)
+    except Exception as e:
+        return {"error": f"Fenêtre invalide : {e}"}
+    if not windows:
+        return {"error": "Aucune fenêtre exploitable sur cette période"}
+    print(f"🔁 Rolling {strategy_name} {symbol} : {len(windows)} fenêtre(s) window={window} step={step or window} state={state}")
+
+    if state == "independent":
+        payloads = [(strategy_func, df.iloc[lo:hi], eff_params, sl_pips, tp1_pips, tp2_pips, pip)
+                    for _, _, lo, hi in windows]
+        try:
+            with ProcessPoolExecutor(max_workers=workers or os.cpu_count() or 1) as pool:
+                outs = list(pool.map(_rolling_window_worker, payloads))
+        except Exception as e:
+            # strat non picklable / pool indisponible → séquentiel
+            print(f"⚠️ Pool process indisponible ({e}) → exécution séquentielle")
+            outs = [_rolling_window_worker(p) for p in payloads]
+        rows = []
+        for (start, end, lo, hi), out in zip(windows, outs):
+            if isinstance(out, dict):
+                return {"error": f"Erreur stratégie {strategy_name} : {out['error']}"}
+            rows.extend(_window_rows([(start, end, lo, hi)], out))
+    else:
+        try:
+            signals = detect_signals(strategy_func, df, eff_params)
+        except Exception as e:
+            return {"error": f"Erreur stratégie {strategy_name} : {e}"}
+        results = resolve_outcomes(df, signals, sl_pips, tp1_pips, tp2_pips, pip)
+        rows = _window_rows(windows, results)
+
+    table = pd.DataFrame(rows, columns=ROLLING_COLUMNS)
+
+    # 📂 Dossier dédié (hors ANALYSIS_DIR : pas un run "classique" avec XLSX d'analyse)
+    rolling_cfg = {"window": str(window), "step": str(step or window), "state": state}
+    try:
+        run_id = make_run_id(
+            strategy_name=str(strategy_name), symbol=str(symbol), timeframe=str(timeframe),
+            period=str(period), sl_pips=int(sl_pips), tp1_pips=int(tp1_pips),
+            tp2_pips=(None if tp2_pips is None else int(tp2_pips)),
+            params={"eff": eff_params, "rolling": rolling_cfg}, user_id=(user_id or ""),
+        )
+    except Exception:
+        run_id = hashlib.sha1(json.dumps([strategy_name, symbol, timeframe, period, rolling_cfg],
+                                         default=repr).encode("utf-8")).hexdigest()[:10]
+
+    from app.core.paths import DATA_ROOT
+    period_clean = str(period).replace(" ", "").replace(":", "")
+    folder = f"{symbol}_{timeframe}_{strategy_name}_{period_clean}_sl{sl_pips}_rolling__h{run_id}"
+    output_path = DATA_ROOT / "analysis_rolling" / folder
+    output_path.mkdir(parents=True, exist_ok=True)
+
+    csv_path = output_path / "rolling_windows.csv"
+    xlsx_path = output_path / "rolling_windows.xlsx"
+    table.to_csv(csv_path, index=False)
+    with pd.ExcelWriter(xlsx_path, engine="openpyxl") as writer:
+        table.to_excel(writer, sheet_name="Fenetres", index=False)
+
+    logged = _params_for_log(strategy_func, func_sig, eff_params)
+    logged.update({"sl_pips": sl_pips, "tp1_pips": tp1_pips,
+                   "tp2_pips": (tp2_pips if tp2_pips is not None else _tp2_from_params),
+                   "pip_used": pip, **rolling_cfg})
+    log_params_to_file(strategy=strategy_name, pair=symbol, timeframe=timeframe, period=period,
+                       params=logged, output_dir=str(output_path),
+                       note=f"Rolling runner - {strategy_name}")
+
+    print(f"📁 Rolling enregistré dans : {output_path}")
+    return {
+        "folder": folder,
+        "csv": str(csv_path),
+        "xlsx": str(xlsx_path),
+        "windows": json.loads(table.to_json(orient="records", date_format="iso")),
+    }
+
+
+# ============================================================
+# 🗺️ SURFACE SL / TP (moteur d'excursions)
+# ------------------------------------------------------------
+# Détection UNE fois, premiers passages des niveaux de la grille
+# (excursion_core), puis chaque cellule SL × TP = simple lecture.
+# Mêmes résultats que N runs resolve_outcomes, sans re-scan.
+# ============================================================
+def run_sl_tp_surface(df, strategy_name, strategy_func, sl_grid, tp_grid, tp1_pips=100,
+                      symbol="XAU", params=None):
+    """
+    Heatmaps de winrate TP1 / TP2 sur une grille SL × TP en un seul passage.
+
+    Args:
+        sl_grid / tp_grid: distances en pips (> 0)
+        tp1_pips: TP1 fixé pour la heatmap TP2 (TP2 = valeurs de tp_grid)
+
+    Returns:
+        dict (voir excursion_core.sl_tp_surface) ou {"error": ...}
+    """
+    from app.core.excursion_core import build_excursions, sl_tp_surface
+
+    with span("runner.prepare"):
+        df = prepare_ohlc(df)
+    if isinstance(df, dict):
+        return df
+    count("bars", len(df))
+
+    pip = resolve_pip(symbol)
+    eff_params, _, _ = build_strategy_params(strategy_func, params, pip, df.columns)
+    try:
+        with span("runner.detect"):
+            signals = detect_signals(strategy_func, df, eff_params)
+    except Exception as e:
+        return {"error": f"Erreur stratégie {strategy_name} : {e}"}
+    count("signals", len(signals))
+
+    with span("runner.excursions"):
+        exc = build_excursions(df, signals, pip, tp_levels=[*tp_grid, tp1_pips], sl_levels=sl_grid)
+        surface = sl_tp_surface(exc, sl_grid, tp_grid, tp1_pips)
+    print(f"🗺️ Surface SL/TP {strategy_name} {symbol} : {len(exc)} trade(s), "
+          f"{len(sl_grid)}×{len(tp_grid)} cellules")
+    return {"strategy": strategy_name, "symbol": symbol, "pip_used": pip, **surface}
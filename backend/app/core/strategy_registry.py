@@ -0,0 +1,309 @@
+"""
+File: backend/app/core/strategy_registry.py
+Role: Registre des stratégies compilé une fois (callable, schéma de params, normaliseur précompilé).
+Depends:
+  - app/strategies/*.py (chaque module expose detect_<nom>)
+  - inspect.signature (introspection faite UNE fois par stratégie)
+Side-effects:
+  - Importe tous les modules de stratégie au 1er accès (ou au startup via warm_registry())
+Notes:
+  - Remplace importlib.import_module + getattr + signature() à chaque backtest.
+  - StrategySpec.normalize() reproduit à l'identique l'ancienne build_strategy_params
+    (alias UI, *_pips × pip, time_key forcé, min_pips par défaut, coercition, filtrage).
+  - Découverte par chemin absolu du package (plus de os.listdir relatif au cwd).
+  - Une stratégie qui ne s'importe pas est listée dans `errors` (et absente de names()).
+  - reload_registry() : reconstruit après ajout/modif d'un fichier de stratégie (dev).
+"""
+
+import importlib
+import inspect
+import sys
+import threading
+from pathlib import Path
+from typing import Dict, Optional
+
+import app.strategies as _strategies_pkg
+
+STRATEGIES_PKG_DIR = Path(_strategies_pkg.__file__).resolve().parent
+
+# Params internes jamais exposés à l'UI ni coercés
+INTERNAL_PARAMS = ("df", "data", "dataframe")
+
+# Remap robuste : UI → noms internes attendus par la stratégie
+STRATEGY_PARAM_ALIASES = {
+    # clés vraiment problématiques vues côté UI
+    "min_wait_candles": ["min_wait", "min_wait_bar", "min_wait_bars", "min_wait_candle"],
+    "max_wait_candles": ["max_wait", "max_wait_bar", "max_wait_bars", "max_wait_candle"],
+    "allow_multiple_entries": ["allow_multi", "allow_multiple", "allow_multiple_entry", "multi_entries"],
+
+    # EMA / RSI
+    "ema_key": ["ema", "EMA", "ema_col", "ema_fast"],
+    "ema_fast": ["ema1", "fast_ema", "ema_fast"],
+    "ema_slow": ["ema2", "slow_ema", "ema_slow"],
+    "rsi_key": ["rsi_key", "rsi_col", "RSI_col", "RSI"],
+    "rsi_threshold": ["rsi_threshold", "rsiValue", "rsi_value", "rsi", "RSI"],
+
+    # FVG / gaps
+    "min_pips": ["min_gap_pips", "gap_pips", "min_fvg_pips", "fvg_min_pips"],
+
+    # time key / datetime
+    "time_key": ["time_key", "Datetime", "datetime", "date_col", "timestamp_col"],
+}
+
+
+class UnknownStrategyError(ValueError):
+    """Stratégie absente du registre (fichier manquant ou import KO)."""
+
+
+# --- Conversions UI -> python -------------------------------------------------
+
+def to_scalar(v):
+    """"true"/"1"/"yes" → bool, "1.5" → float, "3" → int ; le reste inchangé."""
+    if isinstance(v, str):
+        lv = v.strip().lower()
+        if lv in ("true", "false", "1", "0", "yes", "no"):
+            return lv in ("true", "1", "yes")
+        try:
+            if any(c in lv for c in (".", "e")):
+                return float(lv)
+            return int(lv)
+        except Exception:
+            return v
+    return v
+
+
+def _coerce_bool(v):
+    if isinstance(v, str):
+        return v.strip().lower() in ("true", "1", "yes")
+    return bool(v)
+
+
+_COERCERS = {
+    bool: _coerce_bool,
+    int: lambda v: int(float(v)),
+    float: float,
+    str: str,
+}
+
+
+def _safe(fn):
+    def coerce(v):
+        try:
+            return fn(v)
+        except Exception:
+            return v
+    return coerce
+
+
+# --- Spec d'une stratégie ----------------------------------------------------
+
+class StrategySpec:
+    """Tout ce que le runner et l'UI doivent savoir d'une stratégie, calculé une fois."""
+
+    def __init__(self, name: str, func, module=None):
+        self.name = name
+        self.func = func
+        self.module = module
+        try:
+            self.signature = inspect.signature(func)
+            self.expected = frozenset(self.signature.parameters.keys())
+        except Exception:
+            self.signature, self.expected = None, frozenset()
+
+        # Types attendus (annotation ou type du default) → coerceurs précompilés
+        self.expected_types = {}
+        if self.signature is not None:
+            for pname, p in self.signature.parameters.items():
+                if pname in INTERNAL_PARAMS:
+                    continue
+                if p.annotation is not p.empty and isinstance(p.annotation, type):
+                    self.expected_types[pname] = p.annotation
+                elif p.default is not p.empty and p.default is not None:
+                    self.expected_types[pname] = type(p.default)
+        self._coercers = {k: _safe(_COERCERS[t]) for k, t in self.expected_types.items() if t in _COERCERS}
+
+        # Seuls les alias dont la cible est acceptée par la stratégie (ordre conservé)
+        self._aliases = tuple(
+            (target, tuple(alts)) for target, alts in STRATEGY_PARAM_ALIASES.items()
+            if target in self.expected
+        )
+        self.params = self._build_schema()
+        self.meta = self._build_meta()
+
+    def _build_schema(self) -> list:
+        """Format historique de /strategy_params (sans df/data ni *args/**kwargs)."""
+        out = []
+        if self.signature is None:
+            return out
+        for pname, p in self.signature.parameters.items():
+            if p.kind in (inspect.Parameter.VAR_POSITIONAL, inspect.Parameter.VAR_KEYWORD):
+                continue
+            if pname in INTERNAL_PARAMS:
+                continue
+            out.append({
+                "name": pname,
+                "default": None if p.default is p.empty else p.default,
+                "required": p.default is p.empty,
+                "annotation": None if p.annotation is p.empty else str(p.annotation),
+            })
+        return out
+
+    def _build_meta(self) -> dict:
+        doc = inspect.getdoc(self.func) or inspect.getdoc(self.module) or ""
+        return {
+            "family": self.name.split("_")[0],
+            "doc": doc.strip().splitlines()[0] if doc.strip() else None,
+            "accepts_kwargs": any(p.kind is inspect.Parameter.VAR_KEYWORD
+                                  for p in (self.signature.parameters.values() if self.signature else ())),
+            "pip_params": sorted(k for k in self.expected if k.endswith("_pips")),
+        }
+
+    def normalize(self, params, pip, columns):
+        """
+        Params UI bruts → kwargs effectifs (même résultat que l'ancienne build_strategy_params).
+
+        Returns:
+            (eff_params, tp2_from_params)
+        """
+        eff_params = dict(params) if isinstance(params, dict) else {}
+
+        # Compat vieux front : "tp2" gardé pour le log runner (pas pour la strat)
+        tp2_from_params = None
+        if "tp2" in eff_params and "tp2_pips" not in eff_params:
+            try:
+                tp2_from_params = float(eff_params.get("tp2"))
+            except Exception:
+                tp2_from_params = None
+
+        eff_params = {k: to_scalar(v) for k, v in eff_params.items()}
+        raw = dict(eff_params)
+        expected = self.expected
+
+        for target, alts in self._aliases:
+            if target not in eff_params:
+                for a in alts:
+                    if a in raw:
+                        eff_params[target] = to_scalar(raw[a])
+                        break
+
+        # *_pips → prix (valeur illisible supprimée pour ne pas casser l'appel)
+        for k, v in list(eff_params.items()):
+            if k.endswith("_pips") and v is not None:
+                try:
+                    eff_params[k] = float(v) * float(pip)
+                except Exception:
+                    del eff_params[k]
+
+        if expected and "time_key" in expected and "time" in columns:
+            eff_params["time_key"] = "time"
+        if expected and "min_pips" in expected and "min_pips" not in eff_params:
+            eff_params["min_pips"] = 5 * float(pip)
+
+        if expected:
+            eff_params = {
+                k: (self._coercers[k](v) if k in self._coercers else v)
+                for k, v in eff_params.items() if k in expected
+            }
+        return eff_params, tp2_from_params
+
+    def describe(self) -> dict:
+        return {"strategy": self.name, "params": self.params, **self.meta}
+
+
+# --- Registre ----------------------------------------------------------------
+
+_lock = threading.Lock()
+_specs: Optional[Dict[str, StrategySpec]] = None
+_by_func: Dict[object, StrategySpec] = {}
+_errors: Dict[str, str] = {}
+
+
+def _build():
+    specs, errors = {}, {}
+    for path in sorted(STRATEGIES_PKG_DIR.glob("*.py")):
+        name = path.stem
+        if name.startswith("_"):
+            continue
+        try:
+            module = importlib.import_module(f"app.strategies.{name}")
+            func = getattr(module, f"detect_{name}")
+            if not callable(func):
+                raise TypeError(f"detect_{name} n'est pas callable")
+        except Exception as e:
+            errors[name] = f"{type(e).__name__}: {e}"
+            print(f"⚠️ Stratégie ignorée {name} : {errors[name]}")
+            continue
+        specs[name] = StrategySpec(name, func, module)
+    return specs, errors
+
+
+def _registry() -> Dict[str, StrategySpec]:
+    global _specs
+    if _specs is None:
+        with _lock:
+            if _specs is None:
+                specs, errors = _build()
+                _errors.clear()
+                _errors.update(errors)
+                _by_func.update({s.func: s for s in specs.values()})
+                _specs = specs
+    return _specs
+
+
+def warm_registry() -> int:
+    """Construit le registre (startup) ; retourne le nb de stratégies chargées."""
+    n = len(_registry())
+    print(f"🧭 Registre stratégies : {n} chargées, {len(_errors)} en erreur")
+    return n
+
+
+def reload_registry() -> int:
+    """Reconstruit le registre (nouveau fichier / modif de stratégie)."""
+    global _specs
+    with _lock:
+        _specs = None
+        _by_func.clear()
+        for path in STRATEGIES_PKG_DIR.glob("*.py"):
+            module = sys.modules.get(f"app.strategies.{path.stem}")
+            if module is not None:
+                try:
+                    importlib.reload(module)
+                except Exception as e:
+                    print(f"⚠️ Reload KO {path.stem} : {e}")
+    return warm_registry()
+
+
+def get_strategy(name: str) -> StrategySpec:
+    spec = _registry().get(name)
+    if spec is None:
+        detail = _errors.get(name)
+        raise UnknownStrategyError(f"Stratégie inconnue : {name}" + (f" ({detail})" if detail else ""))
+    return spec
+
+
+def get_strategy_func(name: str):
+    """detect_<name> (raccourci pour les appelants du runner)."""
+    return get_strategy(name).func
+
+
+def spec_for_func(func) -> StrategySpec:
+    """
+    Spec d'un callable (celle du registre si enregistré, sinon compilée puis mise en cache).
+    Ne force pas la construction du registre complet (workers du pool rolling).
+    """
+    spec = _by_func.get(func)
+    if spec is None:
+        name = getattr(func, "__name__", "strategy")
+        spec = StrategySpec(name[7:] if name.startswith("detect_") else name, func,
+                            sys.modules.get(getattr(func, "__module__", "") or ""))
+        _by_func[func] = spec
+    return spec
+
+
+def names() -> list:
+    return sorted(_registry())
+
+
+def errors() -> dict:
+    _registry()
+    return dict(_errors)
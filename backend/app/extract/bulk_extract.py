@@ -0,0 +1,464 @@
+"""
+File: backend/app/extract/bulk_extract.py
+Role: Extraction en masse (tickers × TF × mois) → layout mensuel de OUTPUT_DIR.
+      Remplace les boucles séquentielles de backtest/extracteur_ultime/extracteur_ultime_v3.py.
+Depends:
+  - app.core.paths (OUTPUT_DIR = destination, DATA_ROOT = manifest)
+  - app.services.csv_catalog_service.invalidate_written (listings à jour après écriture)
+  - app.utils.indicators.add_rsi_ema (mêmes colonnes que extract_data_auto)
+  - yfinance (provider "yfinance", import paresseux)
+  - app.utils.synthetic_ohlc (provider "local" hors-ligne)
+Side-effects:
+  - Écrit OUTPUT_DIR/<SYM>/<YYYY-MM>/<SYM>_<TF>_<YYYY-MM>.csv (écriture atomique)
+  - Maintient DATA_ROOT/extract/bulk_manifest.json (done / failed / pending par ticker-TF-mois)
+Notes:
+  - Pool de workers borné + token bucket par provider + retries avec backoff exponentiel.
+  - Reprise : une tâche "done" dont le CSV existe n'est jamais refaite (sauf --force).
+  - Usage :
+      python -m app.extract.bulk_extract --months 2025-06 --groups 1 2 --workers 4
+      python -m app.extract.bulk_extract --months 2025-05 2025-06 --provider local
+"""
+
+import argparse
+import os
+import random
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from datetime import datetime, timedelta, timezone
+from pathlib import Path
+from typing import Dict, List, Optional
+
+import pandas as pd
+
+from app.core.paths import DATA_ROOT, OUTPUT_DIR
+from app.services.csv_catalog_service import invalidate_written
+from app.utils.indicators import FILE_COLUMNS, add_rsi_ema
+from app.utils.json_db import read_json, write_json_atomic
+from app.utils.pip_registry import get_pip
+from app.utils.synthetic_ohlc import generate_ohlc, seed_from_key
+from app.utils.timeframes import TF_MINUTES, YF_INTERVALS, normalize_tf
+
+# ===============================
+# 🔀 GROUPES DE PAIRES (repris de extracteur_ultime_v3)
+# ===============================
+PAIRS_GROUPS: Dict[int, List[str]] = {
+    # Groupe 1 : paires majeures + or + BTC
+    1: ["EURUSD=X", "GBPUSD=X", "USDJPY=X", "USDCHF=X", "AUDUSD=X", "NZDUSD=X",
+        "USDCAD=X", "GC=F", "BTC-USD"],
+    # Groupe 2 : paires croisées populaires
+    2: ["EURGBP=X", "EURJPY=X", "EURCHF=X", "GBPJPY=X", "GBPCHF=X", "AUDJPY=X",
+        "CHFJPY=X", "EURAUD=X", "AUDCHF=X", "NZDJPY=X"],
+    # Groupe 3 : paires exotiques ou moins utilisées
+    3: ["USDNOK=X", "USDSEK=X", "USDZAR=X", "USDMXN=X", "USDHKD=X", "USDSGD=X",
+        "USDTRY=X", "USDPLN=X", "USDHUF=X", "USDTHB=X"],
+    # Groupe 4 : indices boursiers majeurs
+    4: ["^GSPC", "^DJI", "^IXIC", "^FTSE", "^GDAXI", "^FCHI", "^HSI", "^N225", "^STOXX50E"],
+    # Groupe 5 : autres actifs utiles
+    5: ["ETH-USD", "LTC-USD", "XRP-USD", "CL=F", "BZ=F", "SI=F", "PL=F", "HG=F", "^TNX"],
+    # Groupe 6 : actifs secondaires / compléments long terme SaaS
+    6: ["USDILS=X", "USDRUB=X", "USDCNH=X", "CNY=X", "USDKRW=X", "^BVSP", "^AXJO",
+        "^BSESN", "^VIX", "ZC=F"],
+}
+
+MANIFEST_PATH = DATA_ROOT / "extract" / "bulk_manifest.json"
+
+# Réglages par défaut (override ENV)
+DEFAULT_WORKERS = int(os.getenv("BULK_EXTRACT_WORKERS", "4"))
+DEFAULT_RETRIES = int(os.getenv("BULK_EXTRACT_RETRIES", "3"))
+DEFAULT_BACKOFF = float(os.getenv("BULK_EXTRACT_BACKOFF", "2.0"))   # secondes (base)
+MAX_BACKOFF = float(os.getenv("BULK_EXTRACT_MAX_BACKOFF", "60"))
+
+
+def clean_symbol(ticker: str) -> str:
+    """Nom de dossier/fichier (même règle que v3 : "EURUSD=X" → "EURUSD")."""
+    return ticker.replace("=X", "")
+
+
+def month_bounds(month: str):
+    """'2025-06' → (datetime 1er du mois, datetime 1er du mois suivant)."""
+    start = datetime.strptime(month, "%Y-%m")
+    nxt = (start.replace(day=28) + timedelta(days=4)).replace(day=1)
+    return start, nxt
+
+
+class NoDataError(Exception):
+    """Le provider a répondu, mais sans aucune bougie (pas de retry)."""
+
+
+# ===============================
+# ⏱️ RATE LIMIT (token bucket par provider)
+# ===============================
+class TokenBucket:
+    """
+    Token bucket thread-safe : `rate` requêtes/s en régime, `burst` d'avance.
+    Partagé par tous les workers d'un même provider.
+    """
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.rate = max(float(rate), 1e-6)
+        self.capacity = max(int(burst), 1)
+        self.tokens = float(self.capacity)
+        self.updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+                self.updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    return
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+
+
+# ===============================
+# 📡 PROVIDERS
+# ===============================
+class BaseProvider:
+    """Interface : fetch(ticker, tf, start, end) → DataFrame brut (index ou colonne temporelle)."""
+
+    name = "base"
+
+    def __init__(self, rate: float, burst: int = 1):
+        self.limiter = TokenBucket(rate, burst)
+
+    def fetch(self, ticker: str, tf: str, start: datetime, end: datetime) -> pd.DataFrame:
+        raise NotImplementedError
+
+
+class YFinanceProvider(BaseProvider):
+    """Yahoo Finance (M1 découpé par 7 jours, limite yfinance)."""
+
+    name = "yfinance"
+
+    def __init__(self, rate: Optional[float] = None, burst: int = 2):
+        super().__init__(rate if rate is not None else float(os.getenv("BULK_YF_RPS", "1.0")), burst)
+
+    def _download(self, ticker: str, interval: str, start: datetime, end: datetime) -> pd.DataFrame:
+        import yfinance as yf  # import paresseux (lourd, et inutile en mode local)
+
+        self.limiter.acquire()
+        data = yf.download(
+            ticker,
+            interval=interval,
+            start=start.strftime("%Y-%m-%d"),
+            end=end.strftime("%Y-%m-%d"),
+            progress=False,
+        )
+        if isinstance(data.columns, pd.MultiIndex):
+            data.columns = [col[0] for col in data.columns]
+        return data
+
+    def fetch(self, ticker, tf, start, end):
+        interval = YF_INTERVALS[tf]
+        if tf != "M1":
+            return self._download(ticker, interval, start, end)
+
+        # M1 : chunks de 7 jours (une requête = un jeton)
+        chunks = []
+        current = start
+        while current < end:
+            chunk_end = min(current + timedelta(days=7), end)
+            chunk = self._download(ticker, interval, current, chunk_end)
+            if not chunk.empty:
+                chunks.append(chunk)
+            current = chunk_end
+        return pd.concat(chunks) if chunks else pd.DataFrame()
+
+
+class LocalProvider(BaseProvider):
+    """
+    Stand-in hors-ligne.
+      - source_dir fourni : relit <source_dir>/<SYM>/<YYYY-MM>/<SYM>_<TF>_<YYYY-MM>.csv
+        ou <source_dir>/<SYM>_<TF>_<YYYY-MM>.csv (ex: export brut d'un broker)
+      - sinon : série synthétique déterministe (seed = ticker|TF|mois)
+    """
+
+    name = "local"
+
+    def __init__(self, source_dir: Optional[Path] = None, rate: float = 1000.0, burst: int = 100):
+        super().__init__(rate, burst)
+        self.source_dir = Path(source_dir) if source_dir else None
+
+    def fetch(self, ticker, tf, start, end):
+        self.limiter.acquire()
+        sym = clean_symbol(ticker)
+        month = start.strftime("%Y-%m")
+
+        if self.source_dir is not None:
+            name = f"{sym}_{tf}_{month}.csv"
+            for cand in (self.source_dir / sym / month / name, self.source_dir / name):
+                if cand.exists():
+                    return pd.read_csv(cand)
+            return pd.DataFrame()
+
+        pip = get_pip(sym) or 0.0001
+        return generate_ohlc(
+            timeframe=tf,
+            start=start.strftime("%Y-%m-%d"),
+            end=end.strftime("%Y-%m-%d"),
+            seed=seed_from_key(sym, tf, month),
+            base_price=pip * 11000,
+            pip=pip,
+        )
+
+
+PROVIDERS = {
+    "yfinance": YFinanceProvider,
+    "local": LocalProvider,
+}
+
+
+# ===============================
+# 🧾 MANIFEST DE REPRISE
+# ===============================
+class ExtractionManifest:
+    """
+    JSON { tasks: { "EURUSD|M5|2025-06": {status, attempts, rows, path, error, updated_at} } }
+    Sauvegarde atomique à chaque transition (thread-safe).
+    """
+
+    def __init__(self, path: Path = MANIFEST_PATH):
+        self.path = Path(path)
+        self._lock = threading.Lock()
+        self.data = read_json(self.path, {"version": 1, "tasks": {}})
+        self.data.setdefault("tasks", {})
+
+    @staticmethod
+    def key(sym: str, tf: str, month: str) -> str:
+        return f"{sym}|{tf}|{month}"
+
+    def get(self, key: str) -> dict:
+        return self.data["tasks"].get(key, {})
+
+    def mark(self, key: str, status: str, **fields):
+        with self._lock:
+            entry = self.data["tasks"].setdefault(key, {"attempts": 0})
+            entry.update(fields)
+            entry["status"] = status
+            entry["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+            self._save()
+
+    def _save(self):
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        self.data["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+        write_json_atomic(self.path, self.data)
+
+    def summary(self, keys: Optional[List[str]] = None) -> Dict[str, int]:
+        counts = {"done": 0, "failed": 0, "pending": 0}
+        tasks = self.data["tasks"]
+        for k in (keys if keys is not None else tasks.keys()):
+            status = tasks.get(k, {}).get("status", "pending")
+            counts[status] = counts.get(status, 0) + 1
+        return counts
+
+
+# ===============================
+# 🛠️ NORMALISATION + ÉCRITURE
+# ===============================
+def finalize_frame(raw: pd.DataFrame, start: datetime, end: datetime) -> pd.DataFrame:
+    """
+    DataFrame provider → format fichier (FILE_COLUMNS), borné au mois, trié, dédoublonné.
+    """
+    if raw is None or raw.empty:
+        return pd.DataFrame(columns=FILE_COLUMNS)
+
+    data = raw.copy()
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = [col[0] for col in data.columns]
+    if "Datetime" not in data.columns:
+        data = data.reset_index()
+        for col in ("Datetime", "index", "Date", "date", "datetime", "time"):
+            if col in data.columns:
+                data = data.rename(columns={col: "Datetime"})
+                break
+    if "Datetime" not in data.columns:
+        raise ValueError("Colonne temporelle introuvable")
+
+    ts = pd.to_datetime(data["Datetime"], errors="coerce", utc=True)
+    data["Datetime"] = ts.dt.tz_localize(None)  # UTC naïf (comme load_data_or_extract)
+    for col in ["Open", "High", "Low", "Close"]:
+        data[col] = pd.to_numeric(data[col], errors="coerce")
+    if "Volume" not in data.columns:
+        data["Volume"] = 0
+    data = data.dropna(subset=["Datetime", "Open", "High", "Low", "Close"])
+    data = data[(data["Datetime"] >= start) & (data["Datetime"] < end)]
+    data = data.drop_duplicates(subset="Datetime", keep="last").sort_values("Datetime")
+    data = data.reset_index(drop=True)
+
+    add_rsi_ema(data)
+    return data[FILE_COLUMNS].dropna()
+
+
+def target_path(sym: str, tf: str, month: str, output_dir: Path = OUTPUT_DIR) -> Path:
+    return Path(output_dir) / sym / month / f"{sym}_{tf}_{month}.csv"
+
+
+def write_csv_atomic(df: pd.DataFrame, path: Path):
+    """Écrit via un .tmp puis os.replace → le loader ne voit jamais un CSV tronqué."""
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_suffix(path.suffix + ".tmp")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, path)
+    invalidate_written(path)  # listings à jour sans attendre le scan complet du catalogue
+
+
+# ===============================
+# 🚀 ORCHESTRATION
+# ===============================
+def _backoff_delay(attempt: int, base: float) -> float:
+    """base · 2^(attempt-1), plafonné, + jitter 0-25 % (évite les rafales synchronisées)."""
+    delay = min(MAX_BACKOFF, base * (2 ** (attempt - 1)))
+    return delay * (1 + random.random() * 0.25)
+
+
+def _extract_one(provider: BaseProvider, manifest: ExtractionManifest, ticker: str, tf: str,
+                 month: str, output_dir: Path, retries: int, backoff: float) -> str:
+    sym = clean_symbol(ticker)
+    key = manifest.key(sym, tf, month)
+    start, end = month_bounds(month)
+    path = target_path(sym, tf, month, output_dir)
+    attempts = int(manifest.get(key).get("attempts", 0))
+    last_error = None
+
+    for attempt in range(1, retries + 1):
+        attempts += 1
+        try:
+            raw = provider.fetch(ticker, tf, start, end)
+            df = finalize_frame(raw, start, end)
+            if df.empty:
+                raise NoDataError("aucune donnée")
+            write_csv_atomic(df, path)
+            manifest.mark(key, "done", attempts=attempts, rows=int(len(df)),
+                          path=str(path), provider=provider.name, error=None)
+            print(f"✅ {ticker} {tf} {month} : {len(df)} lignes")
+            return "done"
+        except NoDataError as e:
+            last_error = str(e)
+            break  # réponse valide mais vide → inutile d'insister
+        except Exception as e:
+            last_error = f"{type(e).__name__}: {e}"
+            if attempt < retries:
+                delay = _backoff_delay(attempt, backoff)
+                print(f"🔁 {ticker} {tf} {month} : {last_error} → retry {attempt}/{retries - 1} dans {delay:.1f}s")
+                time.sleep(delay)
+
+    manifest.mark(key, "failed", attempts=attempts, provider=provider.name, error=last_error)
+    print(f"❌ {ticker} {tf} {month} : {last_error}")
+    return "failed"
+
+
+def run_bulk_extract(
+    tickers: List[str],
+    timeframes: List[str],
+    months: List[str],
+    provider: Optional[BaseProvider] = None,
+    workers: int = DEFAULT_WORKERS,
+    retries: int = DEFAULT_RETRIES,
+    backoff: float = DEFAULT_BACKOFF,
+    force: bool = False,
+    output_dir: Path = OUTPUT_DIR,
+    manifest_path: Path = MANIFEST_PATH,
+) -> dict:
+    """
+    Lance l'extraction (tickers × timeframes × months) et retourne un résumé
+    {"done", "failed", "pending", "skipped", "tasks"}.
+    """
+    provider = provider or YFinanceProvider()
+    manifest = ExtractionManifest(manifest_path)
+    tfs = [normalize_tf(tf) for tf in timeframes]
+    unknown = [tf for tf, n in zip(timeframes, tfs) if n is None]
+    if unknown:
+        raise ValueError(f"Timeframe(s) inconnue(s) : {unknown}")
+
+    todo, keys, skipped = [], [], 0
+    for month in months:
+        month_bounds(month)  # valide le format YYYY-MM
+        for ticker in tickers:
+            sym = clean_symbol(ticker)
+            for tf in tfs:
+                key = manifest.key(sym, tf, month)
+                keys.append(key)
+                path = target_path(sym, tf, month, output_dir)
+                if not force and path.exists():
+                    # déjà fait (manifest) ou déjà présent (ancien extracteur) → reprise
+                    if manifest.get(key).get("status") != "done":
+                        manifest.mark(key, "done", path=str(path), provider="existing")
+                    skipped += 1
+                    continue
+                if manifest.get(key).get("status") != "pending":
+                    manifest.mark(key, "pending")
+                todo.append((ticker, tf, month))
+
+    print(f"📦 Bulk extract [{provider.name}] : {len(todo)} tâche(s), {skipped} déjà faite(s), {workers} worker(s)")
+
+    if todo:
+        with ThreadPoolExecutor(max_workers=max(1, int(workers))) as pool:
+            futures = [
+                pool.submit(_extract_one, provider, manifest, ticker, tf, month,
+                            Path(output_dir), max(1, int(retries)), backoff)
+                for ticker, tf, month in todo
+            ]
+            for fut in as_completed(futures):
+                fut.result()
+
+    summary = manifest.summary(keys)
+    summary.update({"skipped": skipped, "tasks": len(keys)})
+    print(f"🏁 Bulk extract terminé : {summary}")
+    return summary
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BackTradz — extraction en masse (parallèle, reprenable)")
+    parser.add_argument("--months", nargs="+", required=True, help="Mois YYYY-MM")
+    parser.add_argument("--groups", nargs="*", type=int, default=[], help="Groupes de paires (1..6)")
+    parser.add_argument("--tickers", nargs="*", default=[], help="Tickers explicites (ex: EURUSD=X GC=F)")
+    parser.add_argument("--timeframes", nargs="*", default=list(TF_MINUTES), help="TF (M1..D1)")
+    parser.add_argument("--provider", choices=sorted(PROVIDERS), default="yfinance")
+    parser.add_argument("--local-dir", default=None, help="Source CSV du provider local (sinon synthétique)")
+    parser.add_argument("--rps", type=float, default=None, help="Requêtes/s max pour le provider")
+    parser.add_argument("--workers", type=int, default=DEFAULT_WORKERS)
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument("--backoff", type=float, default=DEFAULT_BACKOFF)
+    parser.add_argument("--force", action="store_true", help="Ré-extrait même les tâches déjà faites")
+    parser.add_argument("--output-dir", default=None)
+    parser.add_argument("--manifest", default=None)
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+
+    tickers = list(args.tickers)
+    for g in args.groups:
+        tickers += PAIRS_GROUPS.get(g, [])
+    if not tickers:
+        tickers = list(PAIRS_GROUPS[1])
+    tickers = list(dict.fromkeys(tickers))  # dédoublonne en gardant l'ordre
+
+    if args.provider == "local":
+        provider = LocalProvider(source_dir=args.local_dir, **({"rate": args.rps} if args.rps else {}))
+    else:
+        provider = YFinanceProvider(rate=args.rps)
+
+    summary = run_bulk_extract(
+        tickers=tickers,
+        timeframes=args.timeframes,
+        months=args.months,
+        provider=provider,
+        workers=args.workers,
+        retries=args.retries,
+        backoff=args.backoff,
+        force=args.force,
+        output_dir=Path(args.output_dir) if args.output_dir else OUTPUT_DIR,
+        manifest_path=Path(args.manifest) if args.manifest else MANIFEST_PATH,
+    )
+    return 1 if summary.get("failed") else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
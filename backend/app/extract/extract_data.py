@@ -1,9 +1,14 @@
 
 from pathlib import Path
 from datetime import datetime, timedelta
-import yfinance as yf
+from app.utils.lazy_import import lazy_module
 import pandas as pd
 from app.core.paths import OUTPUT_LIVE_DIR  # <- DISK path
+from app.services.csv_catalog_service import invalidate_written
+from app.utils.indicators import add_rsi_ema
+from app.utils.timeframes import YF_INTERVALS, normalize_tf
+
+yf = lazy_module("yfinance")  # importé au 1er téléchargement (cold start)
 
 ###===== CLEAN V5
 # Forex = ajouter "=X" à la fin (ex: GBPUSD = "GBPUSD=X")
@@ -28,22 +33,12 @@ def extract_data():
         print(f"❌ Aucune donnée trouvée pour {ticker}. Vérifie le ticker ou la période.")
         return
 
-    # === CALCUL RSI (14)
-    delta = data['Close'].diff()
-    gain = delta.clip(lower=0)
-    loss = -delta.clip(upper=0)
-
-    avg_gain = gain.rolling(window=14).mean()
-    avg_loss = loss.rolling(window=14).mean()
+    # 🧽 Colonnes MultiIndex (yfinance récent : (Price, Ticker)) → on les aplatit
+    if isinstance(data.columns, pd.MultiIndex):
+        data.columns = [col[0] for col in data.columns]
 
-    rs = avg_gain / avg_loss
-    rsi = 100 - (100 / (1 + rs))
-    data['RSI_14'] = rsi
-
-    # === CALCUL EMA (si activé)
-    if ADD_EMA:
-        data['EMA_50'] = data['Close'].ewm(span=50).mean()
-        data['EMA_200'] = data['Close'].ewm(span=200).mean()
+    # === CALCUL RSI (14) + EMA 50/200 (EMA gardées seulement si ADD_EMA)
+    add_rsi_ema(data)
 
     # === FORMAT FINAL COMPATIBLE RUNNER
     data.reset_index(inplace=True)
@@ -66,8 +61,7 @@ if __name__ == "__main__":
 def extract_data_auto(symbol: str, tf: str, start: str, end: str):
     print(f"📡 Extraction AUTO SIMPLE : {symbol} {tf} {start} → {end}")
 
-    tf_map = {"m5": "5m", "h1": "60m", "d1": "1d"}
-    yf_tf = tf_map.get(tf.lower(), "5m")
+    yf_tf = YF_INTERVALS.get(normalize_tf(tf), "5m")
     yf_symbol = f"{symbol}=X" if not "-" in symbol and symbol != "GC=F" else symbol
 
     try:
@@ -121,19 +115,8 @@ def extract_data_auto(symbol: str, tf: str, start: str, end: str):
             return None
 
 
-        # RSI
-        delta = data["Close"].diff()
-        gain = delta.clip(lower=0)
-        loss = -delta.clip(upper=0)
-        avg_gain = gain.rolling(window=14).mean()
-        avg_loss = loss.rolling(window=14).mean()
-        rs = avg_gain / avg_loss
-        rsi = 100 - (100 / (1 + rs))
-        data["RSI_14"] = rsi
-
-        # EMA
-        data["EMA_50"] = data["Close"].ewm(span=50).mean()
-        data["EMA_200"] = data["Close"].ewm(span=200).mean()
+        # RSI / EMA
+        add_rsi_ema(data)
 
         # Nettoyage
         for col in ["Open", "High", "Low", "Close"]:
@@ -168,6 +151,7 @@ def extract_data_auto(symbol: str, tf: str, start: str, end: str):
         output_dir.mkdir(parents=True, exist_ok=True)
         name = f"{symbol}_{tf}_{start.replace('-', '')}_to_{end.replace('-', '')}.csv"
         df_clean.to_csv(output_dir / name, index=False)
+        invalidate_written(output_dir / name)  # réécriture en place : mtime du dossier inchangé
 
         print(f"✅ Données extraites et sauvegardées dans : {output_dir / name}")
         return df_clean
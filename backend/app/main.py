@@ -8,7 +8,8 @@ Depends:
   - scripts/top_strategie_generator.generate_top_strategies (APScheduler)
 Side-effects:
   - Monte le dossier /static pour le frontend.
-  - Lance des jobs planifiés (APScheduler + repeat_every).
+  - Lance des jobs planifiés (APScheduler + repeat_every) au startup, dans le seul worker
+    leader élu (app.utils.leader) → 1 exécution pour N workers.
 Security:
   - CORS actuellement en "*": à restreindre en prod.
   - OpenAPI forcé avec sécurité "X-API-Key" (cohérence à vérifier avec /auth).
@@ -27,14 +28,11 @@ try:
 except Exception:
     pass
 
-from top_strategie_generator import generate_top_strategies
-
 from fastapi import FastAPI
 from fastapi.openapi.models import APIKey, APIKeyIn, SecuritySchemeType
 from fastapi.openapi.utils import get_openapi
 from fastapi import Request
 #from fastapi.responses import HTMLResponse
-from apscheduler.schedulers.background import BackgroundScheduler
 from app.routes import user_routes  # ou le nom du fichier .py
 
 from app import auth  # ← déjà fait chez toi normalement
@@ -55,6 +53,8 @@ from app.routes.strategy_params_route import router as strategy_params_router
 from fastapi.middleware.cors import CORSMiddleware
 from app.middlewares.robots_noindex import RobotsNoIndexMiddleware
 from app.middlewares.cache_favicon import FaviconCacheMiddleware
+from app.middlewares.metrics import MetricsMiddleware
+from app.routes.metrics_routes import router as metrics_router
 
 from app.routes.analyse_routes import router as download_xlsx
 from app.routes.csv_library_routes import router as csv_library_router
@@ -159,6 +159,7 @@ app.include_router(meta_router, prefix="/api")
 
 app.add_middleware(RobotsNoIndexMiddleware)
 app.add_middleware(FaviconCacheMiddleware)
+app.add_middleware(MetricsMiddleware)  # latence/compteurs par route → GET /metrics
 
 app.include_router(auth_reset_routes.router, prefix="/api/auth")
 app.include_router(auth.router, prefix="/api")
@@ -173,6 +174,7 @@ app.include_router(run_backtest_router, prefix="/api")
 app.include_router(user_router, prefix="/api")
 app.include_router(official_data_router, prefix="/api")
 app.include_router(backtest_xlsx_routes.router, prefix="/api")  # ⬅️ mount
+app.include_router(metrics_router)  # /metrics (sans préfixe /api)
 
 
 
@@ -209,7 +211,11 @@ def run_subscription_renewal() -> None:
     """
     Tâche planifiée (via fastapi_utils.repeat_every) exécutée toutes les 24h.
     But: renouveler les abonnements et créditer automatiquement les comptes.
+    Multi-workers: seul le leader élu (app.utils.leader) exécute le renouvellement.
     """
+    from app.utils.leader import is_leader
+    if not is_leader():
+        return
     print("⏳ Vérification des abonnements...")
     renew_all_subscriptions()
 
@@ -299,10 +305,49 @@ def custom_openapi():
 app.openapi = custom_openapi
 
 # Scheduler "APScheduler" séparé (en plus de repeat_every)
-# Ici: exécute generate_top_strategies 1 fois par jour.
-scheduler = BackgroundScheduler()
-scheduler.add_job(generate_top_strategies, 'interval', days=1)
-scheduler.start()
+# Ici: exécute generate_top_strategies 1 fois par jour (worker leader uniquement).
+# ⏱️ Importé + démarré au startup (pas à l'import du module) → cold start plus court.
+scheduler = None
+
+
+@app.on_event("startup")
+def _start_scheduler():
+    # 👑 N workers uvicorn → jobs démarrés dans le seul leader élu ; les autres attendent
+    # en veille et reprennent les jobs si le leader meurt (app/utils/leader.py).
+    from app.utils.leader import on_elected
+    on_elected(_start_scheduler_jobs)
+
+
+def _start_scheduler_jobs():
+    global scheduler
+    from apscheduler.schedulers.background import BackgroundScheduler
+    from top_strategie_generator import generate_top_strategies
+
+    scheduler = BackgroundScheduler()
+    scheduler.add_job(generate_top_strategies, 'interval', days=1)
+
+    # 🛰️ Scanner live : stratégies × symboles sur les nouvelles bougies (O(nouvelles bougies))
+    from app.services.live_scan_service import LIVE_SCAN_INTERVAL_MIN, run_live_scan
+    if LIVE_SCAN_INTERVAL_MIN > 0:
+        scheduler.add_job(run_live_scan, 'interval', minutes=LIVE_SCAN_INTERVAL_MIN,
+                          max_instances=1, coalesce=True)
+
+    # 🧹 Cycle de vie stockage ANALYSIS_DIR : orphelins, doublons, compactage, quotas
+    #    (dry-run = rapport seul, tant que l'opérateur n'a pas posé STORAGE_LIFECYCLE_APPLY=1)
+    from app.services.storage_lifecycle_service import (
+        STORAGE_LIFECYCLE_APPLY, STORAGE_LIFECYCLE_INTERVAL_H, run_lifecycle,
+    )
+    if STORAGE_LIFECYCLE_INTERVAL_H > 0:
+        scheduler.add_job(run_lifecycle, 'interval', hours=STORAGE_LIFECYCLE_INTERVAL_H,
+                          kwargs={"dry_run": not STORAGE_LIFECYCLE_APPLY}, max_instances=1, coalesce=True)
+    scheduler.start()
+
+
+@app.on_event("startup")
+def _warm_strategy_registry():
+    # Registre compilé une fois (imports + signatures) → rien à refaire par backtest
+    from app.core.strategy_registry import warm_registry
+    warm_registry()
 
 # Debug: pour lister les routes à l'init si besoin
 # for route in app.routes:
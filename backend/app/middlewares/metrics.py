@@ -0,0 +1,27 @@
+# app/middlewares/metrics.py
+import time
+
+from starlette.middleware.base import BaseHTTPMiddleware
+
+from app.utils.metrics import HTTP_IN_FLIGHT, HTTP_LATENCY, HTTP_REQUESTS
+
+# Label "route" = template FastAPI (/api/x/{id}) → cardinalité bornée ; hors routes → "unmatched"
+UNMATCHED = "unmatched"
+
+
+class MetricsMiddleware(BaseHTTPMiddleware):
+    async def dispatch(self, request, call_next):
+        t0 = time.perf_counter()
+        HTTP_IN_FLIGHT.inc()
+        status = 500
+        try:
+            response = await call_next(request)
+            status = response.status_code
+            return response
+        finally:
+            HTTP_IN_FLIGHT.dec()
+            route = request.scope.get("route")
+            path = getattr(route, "path", None) or UNMATCHED
+            method = request.method
+            HTTP_LATENCY.labels(method, path).observe(time.perf_counter() - t0)
+            HTTP_REQUESTS.labels(method, path, status).inc()
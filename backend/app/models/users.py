@@ -16,6 +16,8 @@ from pathlib import Path
 from pydantic import BaseModel
 from datetime import datetime, timedelta, timezone
 from app.models.offers import get_offer_by_id
+from app.utils.metrics import USERS_JSON_SECONDS
+from app.utils.json_db import store_lock
 from passlib.context import CryptContext
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 import os
@@ -25,6 +27,15 @@ import tempfile
 
 # 📂 Chemin du fichier JSON qui fait office de "base de données" utilisateurs
 
+
+def users_lock():
+    """
+    🔒 Verrou inter-process de users.json (DB_DIR/users.json.lock, fcntl) à tenir autour de
+    TOUT cycle lecture → modification → écriture ; réentrant (un helper verrouillé peut en appeler un autre).
+    Utilisable en `with users_lock():` ou en décorateur `@users_lock()`.
+    """
+    return store_lock(USERS_FILE)
+
 AUDIT_FILE = DATA_ROOT / "audit" / "ledger.jsonl"
 AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
@@ -32,9 +43,8 @@ def _audit_append(evt: dict):
     try:
         evt = dict(evt)
         evt.setdefault("ts", datetime.utcnow().isoformat())
-        with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-            import json as _json
-            f.write(_json.dumps(evt, ensure_ascii=False) + "\n")
+        from app.utils import audit_ledger
+        audit_ledger.append(evt)  # segments journaliers + index (écriture par lots)
     except Exception:
         pass
 
@@ -59,7 +69,7 @@ class User(BaseModel):
 def get_user_by_token(token: str) -> User | None:
     if not USERS_FILE.exists():
         return None
-    with open(USERS_FILE) as f:
+    with USERS_JSON_SECONDS.labels("read").time(), open(USERS_FILE) as f:
         users = json.load(f)
 
     # Parcours de tous les utilisateurs et comparaison du token
@@ -70,6 +80,7 @@ def get_user_by_token(token: str) -> User | None:
 
 
 # ➖ Décrémenter les crédits d’un utilisateur
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def decrement_credits(user_id, amount=1):
     """
     Retire un certain nombre de crédits à l’utilisateur.
@@ -88,6 +99,7 @@ def decrement_credits(user_id, amount=1):
 
 
 # ⚠️ On CONSERVE la signature existante pour éviter toute régression
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def update_user(user_id: str, email: str | None = None,
                 full_name: str | None = None,
                 password: str | None = None) -> bool:
@@ -124,6 +136,7 @@ def update_user(user_id: str, email: str | None = None,
 
 
 # ❌ Supprimer un utilisateur
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def delete_user_by_id(user_id: str) -> bool:
     """
     Supprime complètement l’utilisateur (par ID) du fichier JSON,
@@ -152,6 +165,7 @@ def delete_user_by_id(user_id: str) -> bool:
         return True
 
 # 💳 Mettre à jour un utilisateur après un paiement
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def update_user_after_payment(user_id: str, offer_id: str, method: str = "unknown", order_id: str = None):
     """
     Applique les effets d’un paiement :
@@ -229,6 +243,7 @@ def update_user_after_payment(user_id: str, offer_id: str, method: str = "unknow
     return True
 
 # 🚫 Annuler l’abonnement d’un utilisateur
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def cancel_subscription(user_id: str) -> bool:
     """
     Met fin à l’abonnement :
@@ -266,17 +281,19 @@ def _load_users() -> dict:
     if not USERS_FILE.exists():
         return {}
     try:
-        raw = USERS_FILE.read_text(encoding="utf-8")
-        return json.loads(raw) if raw.strip() else {}
+        with USERS_JSON_SECONDS.labels("read").time():
+            raw = USERS_FILE.read_text(encoding="utf-8")
+            return json.loads(raw) if raw.strip() else {}
     except json.JSONDecodeError:
         return {}
 
 def _atomic_write_json(path: Path, data: dict) -> None:
     fd, tmp = tempfile.mkstemp(dir=str(path.parent), prefix=".tmp_", text=True)
     try:
-        with os.fdopen(fd, "w", encoding="utf-8") as f:
-            json.dump(data, f, indent=2, ensure_ascii=False)
-        os.replace(tmp, path)
+        with USERS_JSON_SECONDS.labels("write").time():
+            with os.fdopen(fd, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, ensure_ascii=False)
+            os.replace(tmp, path)
     finally:
         if os.path.exists(tmp):
             try: os.remove(tmp)
@@ -284,6 +301,7 @@ def _atomic_write_json(path: Path, data: dict) -> None:
 
 # BACKTRADZ 2025-09-07: last_seen pour activité (comptage "connectés")
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def update_last_seen(user_id: str) -> None:
     users = _load_users()
     u = users.get(user_id)
@@ -296,6 +314,7 @@ def update_last_seen(user_id: str) -> None:
 
 # BACKTRADZ 2025-09-07: débit backtest (−2 credits) + journalisation user/admin
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def charge_2_credits_for_backtest(user_id: str, meta: dict | None = None) -> dict:
     """
     Débite 2 crédits pour un backtest et ajoute une entrée d'historique.
@@ -360,6 +379,7 @@ def charge_2_credits_for_backtest(user_id: str, meta: dict | None = None) -> dic
 
 
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def grant_signup_bonus(user_id: str) -> bool:
     """
     Attribue +2 crédits une seule fois à l'utilisateur (user_id = token),
@@ -409,6 +429,7 @@ def grant_signup_bonus(user_id: str) -> bool:
 import uuid
 from datetime import datetime, timezone, timedelta
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def init_email_verification(user_id: str, pending_bonus: int = 2) -> str:
     """
     Initialise la vérification email pour un user :
@@ -438,6 +459,7 @@ def get_user_id_by_verification_token(token: str) -> str | None:
             return uid
     return None
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def mark_email_verified_and_grant_pending_bonus(user_id: str) -> bool:
     """
     Marque l’email comme vérifié et crédite le bonus 'pending' une seule fois.
@@ -478,6 +500,7 @@ def mark_email_verified_and_grant_pending_bonus(user_id: str) -> bool:
     return True
 
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def activate_subscription_without_credits(user_id: str, offer_id: str, provider: str = "stripe",
                                           stripe_customer_id: str | None = None,
                                           stripe_subscription_id: str | None = None) -> bool:
@@ -509,6 +532,7 @@ def activate_subscription_without_credits(user_id: str, offer_id: str, provider:
     return True
 
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def add_monthly_credits_after_invoice_paid(user_id: str, offer_id: str, billing_reason: str | None = None) -> bool:
     users = _load_users()
     u = users.get(user_id)
@@ -553,6 +577,7 @@ def add_monthly_credits_after_invoice_paid(user_id: str, offer_id: str, billing_
     return True
 
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def mark_subscription_payment_failed(user_id: str, reason: str | None = None) -> bool:
     users = _load_users()
     u = users.get(user_id)
@@ -580,6 +605,7 @@ def mark_subscription_payment_failed(user_id: str, reason: str | None = None) ->
 # --- Grace period helpers (ADD) ---------------------------------------------
 from datetime import datetime, timedelta, timezone
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def start_grace_period(user_id: str, days: int = 7) -> bool:
     """
     Démarre une période de grâce (par défaut 7 jours) après un échec de paiement.
@@ -598,6 +624,7 @@ def start_grace_period(user_id: str, days: int = 7) -> bool:
     _atomic_write_json(USERS_FILE, users)
     return True
 
+@users_lock()  # lecture → modification → écriture atomique entre workers
 def clear_grace_period(user_id: str) -> bool:
     """
     Efface les infos de grâce (après paiement réussi).
@@ -639,8 +666,7 @@ def compute_grace_info(u: dict) -> dict:
 
 # --- Stripe cancel helper (ADD, sans régression) ----------------------------
 import os
-import stripe
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+from app.services.stripe_service import stripe  # proxy paresseux (api_key posée au 1er usage)
 
 def cancel_stripe_subscription(user_id: str, at_period_end: bool = True) -> bool:
     """
@@ -23,13 +23,17 @@ from fastapi import Request, HTTPException
 from pydantic import BaseModel
 from app.core.admin import require_admin, require_admin_from_request_or_query
 from typing import Optional
-import os, json, pandas as pd, openpyxl, shutil
+import os, json, pandas as pd, shutil
+from app.utils.lazy_import import lazy_module
 from pathlib import Path
 from datetime import datetime, timezone
 from fastapi.responses import FileResponse
 from datetime import datetime, timezone
 import json, shutil
 import tempfile, shutil, re, traceback, urllib.request
+from app.utils.metrics import XLSX_OPEN_SECONDS
+from app.models.users import users_lock
+from app.utils.results_table import load_results, result_path
 
 # ✅ Helpers/constantes désormais importés depuis le service (aucune logique modifiée)
 from app.services.admin_service import (
@@ -53,6 +57,7 @@ from app.services.admin_service import (
 # (helpers déplacés dans admin_service)
 
 router = APIRouter()
+openpyxl = lazy_module("openpyxl")  # importé à la 1re lecture XLSX (cold start)
 
 
 
@@ -191,7 +196,7 @@ def daily_summary():
 
     Parcourt chaque dossier dans 'backend/data/analysis', détecte:
     - symbol, timeframe (tf), strategy depuis le nom du dossier,
-    - un CSV 'backtest_result.csv',
+    - les résultats 'backtest_result.npy' (ou 'backtest_result.csv' des anciens runs),
     - un JSON '...settings/result...' (facultatif) pour récupérer 'params' et 'time_key'.
 
     Retour:
@@ -220,8 +225,8 @@ def daily_summary():
             print(f"⚠️ Dossier ignoré (nom incorrect) : {folder_name}")
             continue
 
-        csv_path = folder / "backtest_result.csv"
-        if not csv_path.exists():
+        csv_path = result_path(folder)  # backtest_result.npy (ou CSV des anciens runs)
+        if csv_path is None:
             continue
 
         # 🔍 Cherche le fichier JSON (params + time_key éventuels)
@@ -246,10 +251,10 @@ def daily_summary():
 
         # 🔍 Auto-fallback si time_key non fourni ou colonne manquante
         try:
-            df_sample = pd.read_csv(csv_path, nrows=1)
-            if not time_key or time_key not in df_sample.columns:
+            df = load_results(csv_path)
+            if not time_key or time_key not in df.columns:
                 for candidate in ["entry_time", "Datetime", "time"]:
-                    if candidate in df_sample.columns:
+                    if candidate in df.columns:
                         time_key = candidate
                         break
         except Exception as e:
@@ -260,9 +265,8 @@ def daily_summary():
             print(f"❌ Aucune colonne de temps trouvée dans {csv_path.name}")
             continue
 
-        # ✅ Lecture complète + conversion date
+        # ✅ Conversion date
         try:
-            df = pd.read_csv(csv_path)
             df[time_key] = pd.to_datetime(df[time_key], errors="coerce")
             df = df.dropna(subset=[time_key])
             df["date"] = df[time_key].dt.date
@@ -305,7 +309,7 @@ def backtest_summary():
 
     Pour chaque dossier 'backend/data/analysis/...':
       - Déduit symbol/tf/strategy/period depuis le nom,
-      - Lit 'backtest_result.csv' (+ JSON params/time_key si présent),
+      - Lit les résultats du run (.npy, ou CSV historique) (+ JSON params/time_key si présent),
       - Calcule total/TP1/TP2/SL, et winrate TP1/TP2,
       - Essaie de lire les tailles depuis l'XLSX (feuille Global) si dispo :
         SL Size (avg, pips), TP1 Size (avg, pips), TP2 Size (avg, pips)
@@ -342,9 +346,9 @@ def backtest_summary():
             print(f"❌ Dossier ignoré (mauvais nom) : {folder_name}")
             continue
 
-        csv_path = folder / "backtest_result.csv"
+        csv_path = result_path(folder)  # backtest_result.npy (ou CSV des anciens runs)
         json_path = next(folder.glob("*.json"), None)
-        if not csv_path.exists():
+        if csv_path is None:
             continue
 
         # --- params + time_key depuis JSON (optionnel) ---
@@ -367,10 +371,10 @@ def backtest_summary():
 
         # --- auto-détection time_key si manquant ---
         try:
-            df_sample = pd.read_csv(csv_path, nrows=1)
-            if not time_key or time_key not in df_sample.columns:
+            df = load_results(csv_path)
+            if not time_key or time_key not in df.columns:
                 for candidate in ["entry_time", "Datetime", "time"]:
-                    if candidate in df_sample.columns:
+                    if candidate in df.columns:
                         time_key = candidate
                         break
         except Exception:
@@ -379,9 +383,8 @@ def backtest_summary():
             print(f"⛔ Aucune colonne de temps détectée dans : {folder_name}")
             continue
 
-        # --- lecture CSV + flags ---
+        # --- conversion temps + flags ---
         try:
-            df = pd.read_csv(csv_path)
             df[time_key] = pd.to_datetime(df[time_key], errors="coerce")
             df = df.dropna(subset=[time_key])
 
@@ -437,7 +440,8 @@ def backtest_summary():
                         break
 
             if xlsx_path.exists():
-                wb = openpyxl.load_workbook(xlsx_path, data_only=True)
+                with XLSX_OPEN_SECONDS.labels("admin").time():
+                    wb = openpyxl.load_workbook(xlsx_path, data_only=True)
                 if "Global" in wb.sheetnames:
                     ws = wb["Global"]
                     metrics_map = {}
@@ -481,7 +485,8 @@ def backtest_summary():
                         break
 
             if xlsx_path.exists():
-                wb = openpyxl.load_workbook(xlsx_path, data_only=True)
+                with XLSX_OPEN_SECONDS.labels("admin").time():
+                    wb = openpyxl.load_workbook(xlsx_path, data_only=True)
                 if "Global" in wb.sheetnames:
                     ws = wb["Global"]
                     metrics_map = {}
@@ -546,7 +551,8 @@ def backtest_summary():
         try:
             xlsx_file = next(folder.glob("analyse_*_resultats.xlsx"), None)
             if xlsx_file:
-                wb = openpyxl.load_workbook(xlsx_file, data_only=True)
+                with XLSX_OPEN_SECONDS.labels("admin").time():
+                    wb = openpyxl.load_workbook(xlsx_file, data_only=True)
                 if "Global" in wb.sheetnames:
                     ws = wb["Global"]
                     kv = {}
@@ -677,11 +683,12 @@ def add_credit(payload: UserAction, request: Request):
         { "detail": "..."} message simple de confirmation.
     """
     admin_required(request)
-    users = load_users()
-    if payload.user_id not in users:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-    users[payload.user_id]["credits"] = users[payload.user_id].get("credits", 0) + payload.amount
-    save_users(users)
+    with users_lock():  # lecture → modification → écriture sous verrou (workers multiples)
+        users = load_users()
+        if payload.user_id not in users:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+        users[payload.user_id]["credits"] = users[payload.user_id].get("credits", 0) + payload.amount
+        save_users(users)
     return {"detail": f"{payload.amount} crédit(s) ajouté(s)."}
 
 @router.post("/admin/remove_credit")
@@ -693,11 +700,12 @@ def remove_credit(payload: UserAction, request: Request):
         payload (UserAction): user_id cible, amount à retirer.
     """
     admin_required(request)
-    users = load_users()
-    if payload.user_id not in users:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-    users[payload.user_id]["credits"] = max(0, users[payload.user_id].get("credits", 0) - payload.amount)
-    save_users(users)
+    with users_lock():
+        users = load_users()
+        if payload.user_id not in users:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+        users[payload.user_id]["credits"] = max(0, users[payload.user_id].get("credits", 0) - payload.amount)
+        save_users(users)
     return {"detail": f"{payload.amount} crédit(s) retiré(s)."}
 
 @router.post("/admin/toggle_block_user")
@@ -709,12 +717,13 @@ def toggle_block_user(payload: UserAction, request: Request):
         payload (UserAction): user_id cible.
     """
     admin_required(request)
-    users = load_users()
-    if payload.user_id not in users:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-    current = users[payload.user_id].get("is_blocked", False)
-    users[payload.user_id]["is_blocked"] = not current
-    save_users(users)
+    with users_lock():
+        users = load_users()
+        if payload.user_id not in users:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+        current = users[payload.user_id].get("is_blocked", False)
+        users[payload.user_id]["is_blocked"] = not current
+        save_users(users)
     return {"detail": f"Utilisateur {'bloqué' if not current else 'débloqué'}."}
 
     
@@ -730,21 +739,22 @@ def delete_user(payload: UserAction, request: Request):
         payload (UserAction): user_id cible.
     """
     admin_required(request)
-    users = load_users()
-    uid = payload.user_id
-    if uid not in users:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-
-    # 1) Archiver ses transactions (pour stats immuables)
-    for tx in (users[uid].get("purchase_history") or []):
-        _audit_append({"type": "tx", "user_id": uid, "data": tx})
-
-    # 2) Événement de suppression
-    _audit_append({"type": "user_deleted", "user_id": uid})
-
-    # 3) Suppression effective
-    del users[uid]
-    save_users(users)
+    with users_lock():
+        users = load_users()
+        uid = payload.user_id
+        if uid not in users:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+
+        # 1) Archiver ses transactions (pour stats immuables)
+        for tx in (users[uid].get("purchase_history") or []):
+            _audit_append({"type": "tx", "user_id": uid, "data": tx})
+
+        # 2) Événement de suppression
+        _audit_append({"type": "user_deleted", "user_id": uid})
+
+        # 3) Suppression effective
+        del users[uid]
+        save_users(users)
     return {"detail": "Utilisateur supprimé définitivement."}
     
 
@@ -966,53 +976,54 @@ def reset_history(request: Request, scope: str = Body("all")):
     ⚠️ Ne touche pas aux abonnements, crédits ou autres champs.
     """
     admin_required(request)
-    try:
-        with open(USERS_FILE, "r", encoding="utf-8") as f:
-            users = json.load(f)
-    except:
-        raise HTTPException(status_code=500, detail="Erreur lecture users.json")
+    with users_lock():
+        try:
+            with open(USERS_FILE, "r", encoding="utf-8") as f:
+                users = json.load(f)
+        except:
+            raise HTTPException(status_code=500, detail="Erreur lecture users.json")
+
+        changed = 0
+        for uid, u in users.items():
+            ph = u.get("purchase_history") or []
+            if scope == "all":
+                if ph:
+                    u["purchase_history"] = []
+                    changed += 1
+            elif scope == "sales":
+                keep = []
+                for tx in ph:
+                    ttype = (tx.get("type") or "").lower()
+                    label = (tx.get("label") or "").lower()
+                    is_backtest = (
+                        ttype == "backtest"
+                        or "backtest" in label
+                        or (tx.get("symbol") and tx.get("timeframe") and tx.get("strategy"))
+                    )
+                    if is_backtest:
+                        keep.append(tx)
+                if len(keep) != len(ph):
+                    u["purchase_history"] = keep
+                    changed += 1
+            elif scope == "backtests":
+                keep = []
+                for tx in ph:
+                    ttype = (tx.get("type") or "").lower()
+                    label = (tx.get("label") or "").lower()
+                    is_backtest = (
+                        ttype == "backtest"
+                        or "backtest" in label
+                        or (tx.get("symbol") and tx.get("timeframe") and tx.get("strategy"))
+                    )
+                    if not is_backtest:
+                        keep.append(tx)
+                if len(keep) != len(ph):
+                    u["purchase_history"] = keep
+                    changed += 1
 
-    changed = 0
-    for uid, u in users.items():
-        ph = u.get("purchase_history") or []
-        if scope == "all":
-            if ph:
-                u["purchase_history"] = []
-                changed += 1
-        elif scope == "sales":
-            keep = []
-            for tx in ph:
-                ttype = (tx.get("type") or "").lower()
-                label = (tx.get("label") or "").lower()
-                is_backtest = (
-                    ttype == "backtest"
-                    or "backtest" in label
-                    or (tx.get("symbol") and tx.get("timeframe") and tx.get("strategy"))
-                )
-                if is_backtest:
-                    keep.append(tx)
-            if len(keep) != len(ph):
-                u["purchase_history"] = keep
-                changed += 1
-        elif scope == "backtests":
-            keep = []
-            for tx in ph:
-                ttype = (tx.get("type") or "").lower()
-                label = (tx.get("label") or "").lower()
-                is_backtest = (
-                    ttype == "backtest"
-                    or "backtest" in label
-                    or (tx.get("symbol") and tx.get("timeframe") and tx.get("strategy"))
-                )
-                if not is_backtest:
-                    keep.append(tx)
-            if len(keep) != len(ph):
-                u["purchase_history"] = keep
-                changed += 1
-
-    if changed:
-        with open(USERS_FILE, "w", encoding="utf-8") as f:
-            json.dump(users, f, ensure_ascii=False, indent=2)
+        if changed:
+            with open(USERS_FILE, "w", encoding="utf-8") as f:
+                json.dump(users, f, ensure_ascii=False, indent=2)
 
     return {"status": "ok", "changed_users": changed}
 
@@ -1131,4 +1142,58 @@ def admin_import_output(
     finally:
         shutil.rmtree(tmp_dir, ignore_errors=True)
 
-    return report
\ No newline at end of file
+    return report
+
+# ============================================================
+# 🛰️ Scanner live (signaux détectés sur les nouvelles bougies)
+# ============================================================
+def _csv_list(value: Optional[str]):
+    return [s.strip() for s in value.split(",") if s.strip()] if value else None
+
+
+@router.get("/admin/live_scan/signals")
+def admin_live_scan_signals(request: Request, limit: int = 200):
+    """Derniers signaux du scanner live (DATA_ROOT/live_scan/signals.jsonl)."""
+    require_admin(request)
+    from app.services.live_scan_service import read_signals
+    return {"signals": read_signals(limit)}
+
+
+@router.post("/admin/live_scan/run")
+def admin_live_scan_run(request: Request, symbols: Optional[str] = None, strategies: Optional[str] = None):
+    """Lance un passage du scanner (hors planning) ; symbols / strategies = listes "a,b" optionnelles."""
+    require_admin(request)
+    from app.services.live_scan_service import run_live_scan
+    return run_live_scan(symbols=_csv_list(symbols), strategies=_csv_list(strategies))
+
+
+@router.get("/admin/admission")
+def admin_admission(request: Request):
+    """État du contrôle d'admission des backtests (en cours, file, attente par ticket) — process courant."""
+    require_admin(request)
+    from app.core.admission import CONTROLLER
+    return CONTROLLER.snapshot()
+
+
+@router.get("/admin/storage/lifecycle")
+def admin_storage_report(request: Request):
+    """Rapport dry-run du cycle de vie stockage (ANALYSIS_DIR) : octets récupérables par étape, rien n'est touché."""
+    require_admin(request)
+    from app.services.storage_lifecycle_service import run_lifecycle
+    return run_lifecycle(dry_run=True)
+
+
+@router.get("/admin/storage/lifecycle/last")
+def admin_storage_last(request: Request):
+    """Dernier rapport enregistré (job planifié ou passage admin)."""
+    require_admin(request)
+    from app.services.storage_lifecycle_service import last_report
+    return last_report()
+
+
+@router.post("/admin/storage/lifecycle")
+def admin_storage_apply(request: Request, dry_run: bool = False):
+    """Applique orphelins → doublons → compactage → quotas (dry_run=true : simulation)."""
+    require_admin(request)
+    from app.services.storage_lifecycle_service import run_lifecycle
+    return run_lifecycle(dry_run=dry_run)
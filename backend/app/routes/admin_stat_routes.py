@@ -7,6 +7,7 @@
 #     * /admin/metrics/users_timeseries        → sparkline inscriptions
 #     * /admin/metrics/details                 → générique (kpi=...)
 #     * /admin/metrics/details/sales|offered|bought|backtests|new_users → overlays
+#     * /admin/metrics/phases                  → latences p50/p95/p99 par phase de backtest
 #
 # - Helpers de dates/TZ centralisés (Europe/Paris).
 # - Auth admin : header "X-API-Key" avec e-mail admin strict (même logique que admin_routes).
@@ -19,8 +20,11 @@ from fastapi import APIRouter, Request, HTTPException
 from datetime import timedelta
 import builtins
 from app.core.admin import require_admin as _admin_guard
+from app.utils.perf import GROUP_KEYS, phase_percentiles
+from app.utils import audit_ledger
+from app.models.users import users_lock
 from app.services.admin_stat_service import (
-    PARIS_TZ, AUDIT_FILE,
+    PARIS_TZ,
     _tz_now, _parse_dt_any, _bounds_from_range_or_custom, _in_window, _time_bounds,
     _iter_ledger, _load_users_json, _user_name,
     _infer_subscription_price, _is_failed_payment_tx, _is_subscription_tx,
@@ -129,7 +133,7 @@ def metrics_overview(
 
 
     # === Consolidation via ledger: inclut transactions d'utilisateurs supprimés ===
-    for ev in _iter_ledger():
+    for ev in _iter_ledger(start, end, types={"tx"}):
         if ev.get("type") != "tx":
             continue
         tx = ev.get("data") or {}
@@ -168,8 +172,8 @@ def metrics_overview(
 
 
     # (enlever ces 2 lignes du bloc interne)
-    deleted_users = sum(1 for ev in _iter_ledger() if ev.get("type") == "user_deleted")
-    unsubscribed_users = sum(1 for ev in _iter_ledger() if ev.get("type") == "subscription_cancelled")
+    deleted_users = sum(1 for ev in _iter_ledger(types={"user_deleted"}) if ev.get("type") == "user_deleted")
+    unsubscribed_users = sum(1 for ev in _iter_ledger(types={"subscription_cancelled"}) if ev.get("type") == "subscription_cancelled")
 
     return {
         "total_users": total_users,
@@ -251,7 +255,7 @@ def metrics_details(kpi: str, range: str = "day", request: Request = None, start
 
     if kpi == "user_events":
         rows = []
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start, _end, types={"user_deleted", "subscription_cancelled"}):
             if ev.get("type") not in {"user_deleted", "subscription_cancelled"}:
                 continue
             ts = ev.get("ts")
@@ -350,7 +354,7 @@ def metrics_details(kpi: str, range: str = "day", request: Request = None, start
     rows.sort(key=lambda r: r["date"], reverse=True)
 
     # === Complément via ledger (inclut données d'utilisateurs supprimés) ===
-    for ev in _iter_ledger():
+    for ev in _iter_ledger(start, _end, types={"tx"}):
         if ev.get("type") != "tx":
             continue
         tx = ev.get("data") or {}
@@ -614,7 +618,7 @@ def metrics_breakdown(
 
     # (_is_backtest et _price_eur sont désormais importés du service)
 
-    # (usage du AUDIT_FILE global importé + _iter_ledger() du service)
+    # (lecture du ledger segmenté via _iter_ledger() du service)
 
     # --------- existants (inchangés) ----------
     if kind in {"sales_by_method", "credits_by_method"}:
@@ -649,7 +653,7 @@ def metrics_breakdown(
                     row["credits"] += int(ca)
 
         # 2) Consolidation depuis le ledger (utilisateurs supprimés inclus)
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -714,7 +718,7 @@ def metrics_breakdown(
                 if key in buckets:
                     buckets[key] += float(price)
         # === Consolidation ledger ===
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -749,7 +753,7 @@ def metrics_breakdown(
 
         # === Consolidation ledger ===
         # === Consolidation ledger ===
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -783,7 +787,7 @@ def metrics_breakdown(
     
         # === Consolidation ledger ===
         # === Consolidation ledger ===
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -853,7 +857,7 @@ def metrics_breakdown(
                 if sec is not None and sec >= 0:
                      put(sec)
         # === Consolidation ledger ===
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -911,7 +915,7 @@ def metrics_breakdown(
                     # si pas de delta, on débite 2 par backtest (règle métier)
                     buckets[key]["credits_out"] += 2
         # === Consolidation ledger ===
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -1054,7 +1058,7 @@ def metrics_breakdown(
                 agg[k] = agg.get(k, 0) + 1
 
         # 2) ledger (utilisateurs supprimés inclus)
-        for ev in _iter_ledger():
+        for ev in _iter_ledger(start_dt, end_dt, types={"tx"}):
             if ev.get("type") != "tx":
                 continue
             tx = ev.get("data") or {}
@@ -1127,9 +1131,7 @@ def metrics_reset(request: Request):
     _ = _admin_guard(request)
     # Purge soft: on vide le ledger (append-only) et on renvoie ok
     try:
-        AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
-        if AUDIT_FILE.exists():
-            AUDIT_FILE.write_text("", encoding="utf-8")
+        audit_ledger.clear()
         return {"status": "ok", "message": "Ledger purgé"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Reset KO: {e}")
@@ -1141,15 +1143,13 @@ def metrics_rebuild_from_users(request: Request):
     au format 'tx' minimal pour les analytics (utile après purge).
     """
     _ = _admin_guard(request)
-    import json as _json
     users = _load_users_json()
-    AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
     try:
-        with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-            for uid, u in users.items():
-                for tx in (u.get("purchase_history") or []):
-                    evt = {"type": "tx", "user_id": uid, "data": tx, "ts": (_tz_now().isoformat())}
-                    f.write(_json.dumps(evt, ensure_ascii=False) + "\n")
+        for uid, u in users.items():
+            for tx in (u.get("purchase_history") or []):
+                evt = {"type": "tx", "user_id": uid, "data": tx, "ts": (_tz_now().isoformat())}
+                audit_ledger.append(evt)
+        audit_ledger.flush()
         return {"status": "ok", "message": "Ledger reconstruit depuis users.json"}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Rebuild KO: {e}")
@@ -1165,21 +1165,52 @@ def metrics_full_reset(request: Request):
     """
     _ = _admin_guard(request)
     try:
-        # 1) reset ledger
-        AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
-        if AUDIT_FILE.exists():
-            AUDIT_FILE.write_text("", encoding="utf-8")
+        # 1) reset ledger (segments + index)
+        audit_ledger.clear()
 
         # 2) reset purchase_history de chaque user (mais garde abo + credits)
-        users = _load_users_json()
-        changed = False
-        for uid, u in users.items():
-            if u.get("purchase_history"):
-                u["purchase_history"] = []
-                changed = True
-        if changed:
-            USERS_FILE.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
+        with users_lock():
+            users = _load_users_json()
+            changed = False
+            for uid, u in users.items():
+                if u.get("purchase_history"):
+                    u["purchase_history"] = []
+                    changed = True
+            if changed:
+                USERS_FILE.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
 
         return {"status": "ok", "message": "Stats + purchase_history réinitialisés (abonnements conservés)."}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Full reset KO: {e}")
+
+
+@stats_router.get("/admin/metrics/phases")
+def metrics_phases(
+    request: Request,
+    group_by: str = ",".join(GROUP_KEYS),
+    since_hours: float | None = 168,
+    kind: str = "backtest",
+    status: str = "ok",
+    strategy: str | None = None,
+    symbol: str | None = None,
+    timeframe: str | None = None,
+):
+    """
+    ⏱️ Percentiles de latence par phase (load, runner.detect, analysis.xlsx_write, mirror, ...).
+    - group_by : sous-ensemble de "strategy,symbol,timeframe" ("" → global)
+    - status   : "ok" | "error" | "exception" | "" (tous)
+    - Durées en ms ; "counts" = bars / signals / ... par run (mêmes percentiles).
+    """
+    _ = _admin_guard(request)
+    keys = [k.strip() for k in (group_by or "").split(",") if k.strip()]
+    unknown = [k for k in keys if k not in GROUP_KEYS]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"group_by invalide : {unknown}")
+    groups = phase_percentiles(
+        group_by=keys,
+        since_hours=since_hours,
+        kind=kind or None,
+        status=status or None,
+        filters={"strategy": strategy, "symbol": symbol, "timeframe": timeframe},
+    )
+    return {"group_by": keys, "since_hours": since_hours, "kind": kind, "groups": groups}
@@ -14,6 +14,7 @@ from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import FileResponse
 from pathlib import Path
 from app.services.analyse_service import find_analysis_file, top_strategies_file
+from app.utils.results_table import CSV_FILE, RESULT_FILE, export_csv
 
 
 router = APIRouter()
@@ -31,16 +32,23 @@ def download_xlsx(
     - Cherche d'abord sous ANALYSIS_DIR (disque Render).
     - Fallback sous backend/data/analysis (ancien emplacement).
     - Si `?folder=` est fourni, on privilégie ce sous-dossier.
+    - backtest_result.csv : généré à la demande depuis backtest_result.npy.
     """
 
-    path = find_analysis_file(filename, folder)
+    path = None
+    if filename == CSV_FILE:
+        # 📄 CSV des résultats : exporté à la demande depuis backtest_result.npy (anciens runs : CSV tel quel)
+        npy = find_analysis_file(RESULT_FILE, folder)
+        path = export_csv(npy) if npy else None
+    path = path or find_analysis_file(filename, folder)
     if not path:
         raise HTTPException(status_code=404, detail="❌ Fichier non trouvé")
 
     return FileResponse(
         path=path,
         filename=filename,
-        media_type="application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
+        media_type="text/csv" if filename.endswith(".csv")
+        else "application/vnd.openxmlformats-officedocument.spreadsheetml.sheet",
     )
 
 
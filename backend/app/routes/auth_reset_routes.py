@@ -1,9 +1,11 @@
 # auth_reset_routes.py
 from fastapi import APIRouter, Request, HTTPException
+from starlette.concurrency import run_in_threadpool
 from pathlib import Path
 from datetime import datetime, timedelta, timezone
 import uuid, json, os, tempfile
 from app.utils.email_sender import send_email_html
+from app.models.users import users_lock
 from app.utils.email_templates import (
     reset_subject, reset_html, reset_text
 )
@@ -66,6 +68,18 @@ async def generate_reset_token(request: Request):
     return {"status": "success", "emailed": bool(emailed), "reset_token": reset_token}
 
 
+def _store_new_password(utok: str, new_password: str) -> bool:
+    """Écrit le hash du nouveau mot de passe sous verrou ; False si l'utilisateur n'existe plus."""
+    hashed = _hash_password(new_password)
+    with users_lock():
+        users = _load_json(USERS_FILE)
+        if utok not in users:
+            return False
+        users[utok]["password"] = hashed
+        _atomic_write_json(USERS_FILE, users)
+    return True
+
+
 @router.post("/reset-password/{reset_token}")
 async def reset_password(reset_token: str, request: Request):
     """
@@ -106,13 +120,10 @@ async def reset_password(reset_token: str, request: Request):
         raise HTTPException(status_code=400, detail="Token invalide ou expiré.")
 
     utok = entry["user_token"]
-    users = _load_json(USERS_FILE)
-    if utok not in users:
+    # hash bcrypt + verrou users.json hors boucle asyncio (ne gèle pas le worker)
+    if not await run_in_threadpool(_store_new_password, utok, new_password):
         raise HTTPException(status_code=404, detail="Utilisateur introuvable.")
 
-    users[utok]["password"] = _hash_password(new_password)
-    _atomic_write_json(USERS_FILE, users)
-
     # purge de tous les tokens de ce user
     tokens.pop(reset_token, None)
     for k in [k for k, v in tokens.items() if v.get("user_token") == utok]:
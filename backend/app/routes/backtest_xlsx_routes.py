@@ -26,7 +26,7 @@ from fastapi.responses import JSONResponse
 from pathlib import Path
 from typing import Optional, List, Dict, Any
 from app.auth import get_current_user
-import openpyxl
+from app.utils.lazy_import import lazy_module
 import json
 import os
 from datetime import datetime
@@ -36,9 +36,11 @@ from app.services.backtest_xlsx_service import (
     _guess_xlsx_path, _safe_str, _to_dt, _session_for_hour, _ensure_xlsx_ready
 )
 from app.core.admin import is_admin_user  # ✅ source of truth admin
+from app.utils.metrics import XLSX_OPEN_SECONDS
 
 
 router = APIRouter()
+openpyxl = lazy_module("openpyxl")  # importé à la 1re lecture XLSX (cold start)
 
 # -------- Routes ----------------------------------------------------------
 
@@ -61,7 +63,8 @@ def xlsx_meta(
 
     try:
         _ensure_xlsx_ready(xlsx_path)  # ⬅️ DEV-safe: attend que le .xlsx soit OK
-        wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+        with XLSX_OPEN_SECONDS.labels("backtest_xlsx").time():
+            wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
         sheets = []
         for name in wb.sheetnames:
             ws = wb[name]
@@ -112,7 +115,8 @@ def xlsx_sheet(
 
     try:
         _ensure_xlsx_ready(xlsx_path)  # ⬅️ DEV-safe
-        wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+        with XLSX_OPEN_SECONDS.labels("backtest_xlsx").time():
+            wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
         if sheet not in wb.sheetnames:
             wb.close()
             raise HTTPException(404, f"Feuille '{sheet}' introuvable")
@@ -212,7 +216,8 @@ def xlsx_aggregates(
 
     try:
         _ensure_xlsx_ready(xlsx_path)  # ⬅️ DEV-safe
-        wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
+        with XLSX_OPEN_SECONDS.labels("backtest_xlsx").time():
+            wb = openpyxl.load_workbook(xlsx_path, data_only=True, read_only=True)
         if sheet not in wb.sheetnames:
             wb.close()
             raise HTTPException(404, f"Feuille '{sheet}' introuvable")
@@ -20,6 +20,7 @@ from app.core.config import (
     NOW_MIN_CRYPTO_EUR
 )
 from fastapi import APIRouter, Request, HTTPException
+from starlette.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
 from app.utils.invoice_generator import create_invoice
 from app.models.offers import get_offer_by_id
@@ -118,6 +119,12 @@ async def nowpayments_webhook(request: Request):
     Webhook sécurisé appelé par NowPayments quand un paiement change de statut.
     """
     raw_body = await request.body()
+    # traitement (verrou users.json, facture) hors boucle asyncio
+    return await run_in_threadpool(_process_nowpayments_webhook, request, raw_body)
+
+
+def _process_nowpayments_webhook(request: Request, raw_body: bytes):
+    """Traitement du webhook NowPayments (sync, via run_in_threadpool)."""
     headers = request.headers
     signature = headers.get("x-nowpayments-sig")
 
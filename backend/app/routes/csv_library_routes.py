@@ -8,14 +8,14 @@ Depends:
   - backend/models/users (pour décrément crédits + historique)
 Side-effects:
   - Téléchargement décrémente crédits + enregistre historique achat.
-  - Récupère et expose la structure des fichiers disponibles.
+  - Récupère et expose la structure des fichiers disponibles (catalogue en mémoire,
+    app/services/csv_catalog_service.py : plus de rglob par requête).
 Security:
   - Certaines routes publiques (listage), d’autres protégées par X-API-Key.
 """
 from app.core.paths import OUTPUT_DIR, OUTPUT_LIVE_DIR, DATA_ROOT
-from fastapi import APIRouter, Request, HTTPException, Header
-from fastapi.responses import FileResponse
-from app.models.users import get_user_by_token, update_user, decrement_credits
+from fastapi import APIRouter, Request, HTTPException, Header, Query, Response
+from app.models.users import get_user_by_token, update_user, decrement_credits, users_lock
 from app.utils.data_loader import load_data_or_extract
 import json
 from app.models.users import USERS_FILE, get_user_by_token
@@ -27,48 +27,71 @@ from app.services.csv_library_service import (
     _store_extraction_log, _load_recent_extractions,
     _resolve_storage_path_for_download,
 )
+from app.services.csv_catalog_service import OUTPUT_CATALOG, query
+from app.utils import file_serving
 
 router = APIRouter()
 
+def _paginate_header(response: Response, total: int, offset: int, limit) -> None:
+    """Total filtré exposé en en-tête → le corps garde son format historique (liste / dict)."""
+    response.headers["X-Total-Count"] = str(total)
+    if limit is not None:
+        response.headers["X-Offset"] = str(offset)
+        response.headers["X-Limit"] = str(limit)
+
+
 @router.get("/list_csv_library")
-def list_csv_library():
+def list_csv_library(
+    response: Response,
+    symbol: str = Query(None),
+    timeframe: str = Query(None),
+    year: str = Query(None),
+    month: str = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(None, ge=1, le=5000),
+):
     """
-    Liste les CSV dans backend/output.
+    Liste les CSV dans backend/output (catalogue en mémoire, cf. csv_catalog_service).
+
+    Query (optionnels): symbol, timeframe, year, month, offset, limit
+    Header: X-Total-Count = nb de fichiers après filtres (avant pagination)
 
     Retour:
         list[dict]: [{
-          symbol, timeframe, year, month, filename, relative_path
+          symbol, timeframe, year, month, filename, relative_path,
+          rows, first, last, size
         }, ...]
     """
-    root_dir = OUTPUT_DIR
-    csv_files = list(root_dir.rglob("*.csv"))
-
-    library = []
-    for file in csv_files:
-        name = file.stem  # ex: AUDUSD_H4_2025-06
-        parts = name.split("_")
-
-        if len(parts) >= 3 and "-" in parts[2]:
-            symbol = parts[0]
-            timeframe = parts[1]
-            year, month = parts[2].split("-")
-            relative_path = str(file.resolve().relative_to(OUTPUT_DIR.resolve())).replace("\\", "/")
-
-            library.append({
-                "symbol": symbol,
-                "timeframe": timeframe,
-                "year": year,
-                "month": month,
-                "filename": file.name,
-                "relative_path": relative_path
-            })
-
-    return library
+    total, page = query(
+        OUTPUT_CATALOG.entries(), symbol=symbol, timeframe=timeframe, year=year, month=month,
+        offset=offset, limit=limit, where=lambda e: e["month"] is not None,
+    )
+    _paginate_header(response, total, offset, limit)
+    return [{
+        "symbol": e["symbol"],
+        "timeframe": e["timeframe"],
+        "year": e["year"],
+        "month": e["month"],
+        "filename": e["filename"],
+        "relative_path": e["rel"],
+        "rows": e["rows"],
+        "first": e["first"],
+        "last": e["last"],
+        "size": e["size"],
+    } for e in page]
 
 @router.get("/list_csv_files")
-def list_csv_files():
+def list_csv_files(
+    response: Response,
+    symbol: str = Query(None),
+    timeframe: str = Query(None),
+    offset: int = Query(0, ge=0),
+    limit: int = Query(None, ge=1, le=5000),
+):
     """
-    Liste les CSV officiels (backend/data/official).
+    Liste les CSV à la racine de OUTPUT_DIR (catalogue en mémoire).
+
+    Query (optionnels): symbol, timeframe, offset, limit (pagination sur les fichiers)
 
     Retour:
         {
@@ -76,28 +99,24 @@ def list_csv_files():
           "files_by_pair": { "AUDUSD": [ { timeframe, filename }, ... ] }
         }
     """
-    official_dir = OUTPUT_DIR
-    csv_files = list(official_dir.glob("*.csv"))
+    total, page = query(
+        OUTPUT_CATALOG.entries(), symbol=symbol, timeframe=timeframe, offset=offset, limit=limit,
+        where=lambda e: e["dir"] == "" and e["symbol"] is not None,
+    )
+    _paginate_header(response, total, offset, limit)
 
     files_by_pair = {}
-    all_pairs = set()
-
-    for file in csv_files:
-        name = file.stem  # ex: AUDUSD_m5_2025-06
-        parts = name.split("_")
-        if len(parts) >= 3:
-            symbol = parts[0]
-            timeframe = parts[1]
-            filename = file.name
-
-            all_pairs.add(symbol)
-            files_by_pair.setdefault(symbol, []).append({
-                "timeframe": timeframe,
-                "filename": filename
-            })
+    for e in page:
+        files_by_pair.setdefault(e["symbol"], []).append({
+            "timeframe": e["timeframe"],
+            "filename": e["filename"],
+            "rows": e["rows"],
+            "first": e["first"],
+            "last": e["last"],
+        })
 
     return {
-        "pairs": sorted(all_pairs),
+        "pairs": sorted(files_by_pair),
         "files_by_pair": files_by_pair
     }
 
@@ -132,31 +151,33 @@ def list_backtest_csv_from_output():
     """
     from collections import defaultdict
 
-    root_dir = OUTPUT_DIR
-    csv_files = list(root_dir.rglob("*.csv"))
-
     result = defaultdict(lambda: defaultdict(list))
-    for file in csv_files:
-        parts = file.stem.split("_")  # ex: AUDUSD_M5_2025-06
-        if len(parts) >= 3 and "-" in parts[2]:
-            symbol = parts[0]
-            timeframe = parts[1]
-            year, month = parts[2].split("-")
-
-            result[symbol][timeframe].append({
-                "year": year,
-                "month": month,
-                "filename": file.name,
-                "relative_path": str(file).replace("\\", "/")
-            })
+    for e in OUTPUT_CATALOG.entries():
+        if e["month"] is None:
+            continue
+        result[e["symbol"]][e["timeframe"]].append({
+            "year": e["year"],
+            "month": e["month"],
+            "filename": e["filename"],
+            "relative_path": str(OUTPUT_DIR / e["rel"]).replace("\\", "/")
+        })
 
     return result
 
+def _download_format(fmt):
+    """?format=csv|parquet validé AVANT tout débit (400 inconnu, 501 moteur Parquet absent)."""
+    try:
+        return file_serving.check_format(fmt)
+    except file_serving.UnsupportedFormat as e:
+        raise HTTPException(status_code=400 if (fmt or "").lower() not in file_serving.FORMATS else 501,
+                            detail=str(e))
+
 @router.get("/download_csv/{filename}")
-def download_csv(filename: str, x_api_key: str = Header(None)):
+def download_csv(filename: str, request: Request, x_api_key: str = Header(None), format: str = Query(None)):
     """
     Télécharge un CSV de la librairie (backend/assets/csv_library).
     Consomme 1 crédit utilisateur et logge l’historique.
+    HTTP: ETag / If-None-Match → 304 (sans débit), Range, gzip (.csv.gz), ?format=parquet.
 
     Auth:
         - Header X-API-Key obligatoire.
@@ -178,10 +199,15 @@ def download_csv(filename: str, x_api_key: str = Header(None)):
     if not user:
         raise HTTPException(status_code=401, detail="Token invalide")
 
+    fmt = _download_format(format)
+    cached = file_serving.conditional_response(request, file_path, fmt)
+    if cached is not None:
+        return cached  # client déjà à jour → pas de débit
+
     if user.credits < 1:
         raise HTTPException(status_code=403, detail="Pas assez de crédits")
 
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with users_lock(), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
 
         if user.id not in users:
@@ -201,19 +227,23 @@ def download_csv(filename: str, x_api_key: str = Header(None)):
         json.dump(users, f, indent=2)
         f.truncate()
 
-    return FileResponse(file_path, filename=filename, media_type="text/csv")
+    return file_serving.serve_file(request, file_path, filename, fmt=fmt)
 
 from fastapi import Query
 
 @router.get("/download_csv_by_path/{path:path}")
 def download_csv_by_path(
     path: str,
+    request: Request,
     x_api_key: str = Header(None),
     token: str = Query(None),   # 👈 Fallback via query
+    format: str = Query(None),  # csv (défaut) | parquet
 ):
     """
     Télécharge un CSV par chemin relatif (backend/…).
     Consomme 1 crédit + log l’historique.
+    HTTP: 304 sans débit si le client a déjà cette version ; Range ; gzip ; ?format=parquet.
+    Reprise d'un téléchargement déjà payé → /download_owned_csv_by_path (0 crédit).
 
     Auth:
       - Header X-API-Key ou ?token=  (fallback pour liens <a>).
@@ -239,11 +269,15 @@ def download_csv_by_path(
     
     # ✅ Résolution robuste du chemin (évite /output/output/)
     file_path, root_used, rel_for_history = _resolve_storage_path_for_download(path)
+    fmt = _download_format(format)
+    cached = file_serving.conditional_response(request, file_path, fmt)
+    if cached is not None:
+        return cached  # client déjà à jour → pas de débit
     if user.credits < 1:
         raise HTTPException(status_code=403, detail="Pas assez de crédits")
 
     # --- BTZ-PATCH: Historique achat CSV (–1 crédit) complet + normalisé ---
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with users_lock(), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
         if user.id not in users:
             raise HTTPException(status_code=404, detail="Utilisateur introuvable")
@@ -294,18 +328,21 @@ def download_csv_by_path(
         json.dump(users, f, indent=2, ensure_ascii=False)
         f.truncate()
     # On a déjà un file_path existant via _resolve_storage_path_for_download
-    return FileResponse(file_path, filename=file_path.name, media_type="text/csv")
+    return file_serving.serve_file(request, file_path, file_path.name, fmt=fmt)
 
 
 
 @router.get("/download_owned_csv_by_path/{path:path}")
 def download_owned_csv_by_path(
     path: str,
+    request: Request,
     x_api_key: str = Header(None),
     token: str = Query(None),
+    format: str = Query(None),
 ):
     """
     Télécharge un CSV déjà acquis par l'utilisateur (0 crédit).
+    HTTP: 304 (sans trace d'historique), Range pour reprendre, gzip, ?format=parquet.
    Autorisé si:
      - présent dans purchase_history (filename ou relative_path),
       - OU présent dans my_recent_extractions (TTL 48h).
@@ -344,7 +381,7 @@ def download_owned_csv_by_path(
     filename = file_path.name
 
     # --- Vérif "déjà acquis" robuste ---
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with users_lock(), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
         u = users.get(user.id)
         if not u:
@@ -372,8 +409,15 @@ def download_owned_csv_by_path(
         if not owned:
             raise HTTPException(status_code=403, detail="Non autorisé (fichier non acquis)")
 
+    if not file_path.exists():
+        raise HTTPException(status_code=404, detail="Fichier introuvable")
+    fmt = _download_format(format)
+    cached = file_serving.conditional_response(request, file_path, fmt)
+    if cached is not None:
+        return cached
+
     # Historique (trace non débitée)
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with users_lock(), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
         users[user.id].setdefault("purchase_history", []).append({
             "label": "Téléchargement (déjà acquis)",
@@ -386,9 +430,7 @@ def download_owned_csv_by_path(
         })
         f.seek(0); json.dump(users, f, indent=2); f.truncate()
 
-    if not file_path.exists():
-        raise HTTPException(status_code=404, detail="Fichier introuvable")
-    return FileResponse(file_path, filename=filename, media_type="text/csv")
+    return file_serving.serve_file(request, file_path, filename, fmt=fmt)
     # --- /BTZ-PATCH ---
 
 # --- AJOUT --- (à la fin du fichier)
@@ -0,0 +1,32 @@
+"""
+File: backend/app/routes/metrics_routes.py
+Role: GET /metrics — exposition texte (format Prometheus) du registre in-process.
+Depends:
+  - app.utils.metrics (registre + catalogue backtradz_*)
+Security:
+  - Si METRICS_TOKEN est défini : header "Authorization: Bearer <token>" obligatoire.
+  - Sinon ouvert (à filtrer côté proxy : ne pas exposer publiquement).
+Notes:
+  - Monté SANS préfixe /api (chemin standard des scrapers).
+"""
+
+import hmac
+import os
+
+from fastapi import APIRouter, HTTPException, Request
+from fastapi.responses import Response
+
+from app.utils.metrics import CONTENT_TYPE, render
+
+router = APIRouter()
+
+METRICS_TOKEN = os.getenv("METRICS_TOKEN", "").strip()
+
+
+@router.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if METRICS_TOKEN:
+        auth = request.headers.get("authorization") or ""
+        if not hmac.compare_digest(auth, f"Bearer {METRICS_TOKEN}"):
+            raise HTTPException(status_code=401, detail="Token metrics invalide")
+    return Response(content=render(), media_type=CONTENT_TYPE)
@@ -12,7 +12,7 @@ Security:
   - download_file → nécessite X-API-Key valide
 """
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Query, Response
 from fastapi.responses import FileResponse
 from app.auth import get_current_user
 from app.models.users import decrement_credits, User
@@ -23,17 +23,24 @@ from app.services.official_data_service import OFFICIAL_DIR, list_official_csv_f
 router = APIRouter()
 
 @router.get("/official_csvs")
-def list_official_csvs():
+def list_official_csvs(
+    response: Response,
+    offset: int = Query(0, ge=0),
+    limit: int = Query(None, ge=1, le=5000),
+):
     """
-    Liste les fichiers CSV officiels.
+    Liste les fichiers CSV officiels (catalogue en mémoire, pagination optionnelle).
 
     Retour:
-        { "files": [ { filename, size_kb, path }, ... ] }
+        { "files": [ { filename, size_kb, path, rows, first, last }, ... ], "total": int }
+    Header: X-Total-Count
     """
-    return {"files": list_official_csv_files()}
+    total, files = list_official_csv_files(offset=offset, limit=limit)
+    response.headers["X-Total-Count"] = str(total)
+    return {"files": files, "total": total}
 
 @router.get("/download/{filename}")
-async def download_file(filename: str, user: User = Depends(get_current_user)):
+def download_file(filename: str, user: User = Depends(get_current_user)):
     """
     Télécharge un fichier CSV officiel.
 
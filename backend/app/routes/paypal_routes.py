@@ -14,6 +14,7 @@ Security:
 """
 
 from fastapi import APIRouter, Request, HTTPException
+from starlette.concurrency import run_in_threadpool
 import requests
 from app.models.offers import get_offer_by_id
 from app.utils.invoice_generator import create_invoice
@@ -97,6 +98,12 @@ async def capture_order(request: Request):
         { "status": "success|fail", "message": "..." }
     """
     body = await request.json()
+    # capture PayPal + crédit (verrou users.json) hors boucle asyncio
+    return await run_in_threadpool(_capture_order, body)
+
+
+def _capture_order(body: dict):
+    """Capture + crédit de la commande (sync, via run_in_threadpool)."""
     order_id = body.get("orderID")
     offer_id = body.get("offer_id")
     user_token = body.get("user_token")
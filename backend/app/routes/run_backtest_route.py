@@ -3,10 +3,14 @@ File: backend/routes/run_backtest_route.py
 Role: Expose les routes de lancement de backtest:
       - /run_backtest (data officielles chargées côté backend)
       - /upload_csv_and_backtest (CSV custom uploadé)
+      - /admin/backtest/rolling (admin: métriques par fenêtre glissante, 1 seul chargement)
+      - /run_backtest_multi (1 stratégie × N symboles → classement croisé)
+      - /admin/backtest/profile_replay (admin: rejoue un run sous cProfile + tracemalloc)
+      - /backtest/sl_tp_surface (heatmap winrate TP1/TP2 sur une grille SL × TP, 1 seul passage)
 Depends:
-  - backend.core.runner_core.run_backtest
+  - backend.core.runner_core.run_backtest / run_sl_tp_surface (moteur d'excursions)
   - backend.core.analyseur_core.run_analysis
-  - backend.utils.data_loader.load_data_or_extract (chargement/filtre par période)
+  - backend.utils.data_loader.load_data_cached(readonly=True) (frame partagé lecture seule, 0 copie)
   - backend.models.users.get_user_by_token, decrement_credits
 Side-effects:
   - Lecture/écriture de fichiers (CSV résultat + XLSX analyse)
@@ -15,15 +19,21 @@ Security:
   - Auth attendue via header X-API-Key (voir paramètres 'authorization')
 Notes:
   - AUCUNE modification de logique. Ajout de docstrings + commentaires seulement.
+  - /run_backtest et /upload_csv_and_backtest sont chronométrés par phase (app.utils.perf,
+    voir /admin/metrics/phases).
+  - /run_backtest, /upload_csv_and_backtest, /backtest/sl_tp_surface, /run_backtest_multi
+    (coût = nb de symboles) et /admin/backtest/rolling (coût = nb de fenêtres) passent par le
+    contrôle d'admission (app.core.admission) : file équitable par user, 429 + Retry-After si saturé.
 """
 from app.core.admin import is_admin_user
 from fastapi import APIRouter
 from pydantic import BaseModel
-from app.core.runner_core import run_backtest
+from app.core.runner_core import build_windows, run_backtest, run_rolling_backtest, run_sl_tp_surface
 from app.core.analyseur_core import run_analysis
 from app.utils.data_loader import load_csv_filtered
+from app.utils import perf
 import json
-import importlib
+from app.core.strategy_registry import get_strategy_func
 import pandas as pd
 from pathlib import Path
 import os  # <-- nécessaire pour fsync/replace dans le bloc DEV-only
@@ -32,7 +42,11 @@ from app.models.users import get_user_by_token, decrement_credits
 from app.models.users import charge_2_credits_for_backtest
 from fastapi import Header
 from fastapi import UploadFile, File, Form
-from app.core.admin import is_admin_user
+from starlette.concurrency import run_in_threadpool
+from app.core.admin import is_admin_user, require_admin
+from fastapi import Request, HTTPException
+from fastapi.responses import FileResponse
+from typing import List, Optional
 # --- ADD: mirroring vers ANALYSIS_DIR (disque Render) ---
 
 from app.core.paths import ANALYSIS_DIR
@@ -44,9 +58,11 @@ import re
 from datetime import datetime
 from datetime import timedelta
 from app.services.run_backtest_service import (
-    _parse_date_flex, _days_inclusive,
-    _detect_symbol_from_name, _detect_tf_from_name, _infer_tf_from_df
+    _parse_date_flex, _days_inclusive, _admission_cost,
+    _detect_symbol_from_name, _detect_tf_from_name, _infer_tf_from_df, _surface_grid
 )
+from app.core.admission import admitted
+from app.utils.run_archive import link_or_copy
 
 from zoneinfo import ZoneInfo
 PARIS_TZ = ZoneInfo("Europe/Paris")
@@ -54,6 +70,58 @@ PARIS_TZ = ZoneInfo("Europe/Paris")
 
 router = APIRouter()
 
+
+def _admission_user(kwargs):
+    """(user_id, priority_backtest) pour la file d'admission ; None → la route répond seule (token, crédits)."""
+    token = kwargs.get("authorization")
+    user = get_user_by_token(token) if token else None
+    if not user or user.credits < 2:
+        return None
+    return user.id, bool(getattr(user, "priority_backtest", False))
+
+
+def _admission_admin(kwargs):
+    """Routes admin (Request) : l'admin passe aussi par la file ; non-admin → la route répond 403."""
+    request = kwargs.get("request")
+    token = request.headers.get("X-API-Key") if request is not None else None
+    user = get_user_by_token(token) if token else None
+    if not user or not is_admin_user(user):
+        return None
+    return user.id, bool(getattr(user, "priority_backtest", False))
+
+
+def _admission_rolling_cost(kwargs):
+    """1 par fenêtre du découpage demandé (mêmes règles que build_windows) ; 1 si illisible."""
+    req = kwargs.get("req")
+    try:
+        days = pd.date_range(pd.Timestamp(req.start_date).normalize(), pd.Timestamp(req.end_date), freq="D")
+        return float(max(1, len(build_windows(days, req.window, req.step))))
+    except Exception:
+        return 1.0
+
+
+def _admission_multi_cost(kwargs):
+    """1 job par symbole : coût = nb de symboles résolus (min 1)."""
+    from app.services.multi_symbol_service import resolve_symbols
+
+    req = kwargs.get("req")
+    try:
+        return float(max(1, len(resolve_symbols(req.symbols, req.group))))
+    except Exception:
+        return 1.0
+
+
+def _admission_req_cost(kwargs):
+    req = kwargs.get("req")
+    return _admission_cost(req.start_date, req.end_date) if req is not None else 1.0
+
+
+def _admission_form_cost(kwargs):
+    if kwargs.get("start_date") and kwargs.get("end_date"):
+        return _admission_cost(kwargs["start_date"], kwargs["end_date"])
+    return 1.0
+
+
 class BacktestRequest(BaseModel):
     """
     Payload d'entrée pour /run_backtest (données officielles chargées côté backend).
@@ -86,6 +154,8 @@ class BacktestRequest(BaseModel):
 
 
 @router.post("/run_backtest")
+@perf.timed_run("backtest")
+@admitted("backtest", _admission_user, _admission_req_cost)
 def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alias="X-API-Key")):
     """
     Lance un backtest à partir des données officielles (chargées par util interne).
@@ -95,7 +165,7 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
 
     Flow (inchangé):
       1) Vérifie token + crédits.
-      2) Charge la data via load_data_or_extract(symbol, timeframe, start, end).
+      2) Charge la data via load_data_cached(symbol, timeframe, start, end, readonly=True).
       3) Import dynamique du module stratégie (detect_<strategy>).
       4) Exécute run_backtest → renvoie chemin CSV résultat.
       5) Exécute run_analysis → renvoie chemin XLSX analyse.
@@ -115,6 +185,7 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
         print("🧠 DEBUG HEADERS")
         print("  • Authorization param reçu :", authorization)
         t0 = time.perf_counter()
+        perf.tag(strategy=req.strategy, symbol=req.symbol, timeframe=req.timeframe)
 
 
          # ✅ Vérification crédits
@@ -142,47 +213,48 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
                 return {"error": f"Période trop longue ({days} jours). Maximum autorisé: 31 jours."}
 
         # 1. Chargement CSV filtré par dates
-        from app.utils.data_loader import load_data_or_extract
-        df = load_data_or_extract(req.symbol, req.timeframe, req.start_date, req.end_date)
+        from app.utils.data_loader import load_data_cached
+        with perf.span("load"):
+            df = load_data_cached(req.symbol, req.timeframe, req.start_date, req.end_date, readonly=True)
 
         if df.empty:
             return {"error": "Aucune donnée trouvée pour cette période."}
 
-        # 2. Import dynamique de la stratégie
-        module_path = f"app.strategies.{req.strategy}"
-        print("📦 Chargement module :", module_path)
-        strategy_module = importlib.import_module(module_path)
-        strategy_func = getattr(strategy_module, f"detect_{req.strategy}")
+        # 2. Stratégie depuis le registre (compilé au démarrage)
+        with perf.span("strategy_import"):
+            strategy_func = get_strategy_func(req.strategy)
         print("✅ Fonction chargée :", strategy_func)
 
         # 3. Exécution du runner
         print("🏃 Lancement du backtest...")
         period_str = f"{req.start_date} to {req.end_date}"
-        csv_result_path = run_backtest(
-            df=df,
-            strategy_name=req.strategy,
-            strategy_func=strategy_func,
-            sl_pips=req.sl_pips,
-            tp1_pips=req.tp1_pips,
-            tp2_pips=req.tp2_pips,
-            symbol=req.symbol,
-            timeframe=req.timeframe,
-            period=period_str,
-            auto_analyze=False,
-            params=req.params,
-            user_id=user.id  # 🔥 On passe le user ici
-        )
+        with perf.span("runner"):
+            csv_result_path = run_backtest(
+                df=df,
+                strategy_name=req.strategy,
+                strategy_func=strategy_func,
+                sl_pips=req.sl_pips,
+                tp1_pips=req.tp1_pips,
+                tp2_pips=req.tp2_pips,
+                symbol=req.symbol,
+                timeframe=req.timeframe,
+                period=period_str,
+                auto_analyze=False,
+                params=req.params,
+                user_id=user.id  # 🔥 On passe le user ici
+            )
         print("✅ Résultat backtest :", csv_result_path)
 
         # 4. Lancement de l’analyse
         print("📊 Lancement de l’analyse...")
-        analysis_xlsx_path = run_analysis(
-            csv_result_path,
-            req.strategy,
-            req.symbol,
-            req.sl_pips,
-            period_str
-        )
+        with perf.span("analysis"):
+            analysis_xlsx_path = run_analysis(
+                csv_result_path,
+                req.strategy,
+                req.symbol,
+                req.sl_pips,
+                period_str
+            )
 
         if not analysis_xlsx_path or not Path(analysis_xlsx_path).exists():
             print("❌ Analyse échouée ou pas assez de données, crédit NON décompté.")
@@ -195,16 +267,17 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
         try:
             # On ne copie que si la source est sous 'backend/data/analysis'
             if "backend/data/analysis" in str(src_dir).replace("\\", "/"):
-                dest_dir = ANALYSIS_DIR / src_dir.name
-                # ⚠️ DEV: si src == dest, on ne fait rien (évite copy sur soi-même)
-                try:
-                    if src_dir.resolve() != dest_dir.resolve():
-                        dest_dir.parent.mkdir(parents=True, exist_ok=True)
-                        shutil.copytree(src_dir, dest_dir, dirs_exist_ok=True)
-                        analysis_xlsx_path = str(dest_dir / Path(analysis_xlsx_path).name)
-                        print(f"🔁 Miroir ANALYSIS_DIR: {dest_dir}")
-                except Exception as _sub_e:
-                    print("⚠️ Mirror vers ANALYSIS_DIR ignoré:", _sub_e)
+                with perf.span("mirror"):
+                    dest_dir = ANALYSIS_DIR / src_dir.name
+                    # ⚠️ DEV: si src == dest, on ne fait rien (évite copy sur soi-même)
+                    try:
+                        if src_dir.resolve() != dest_dir.resolve():
+                            dest_dir.parent.mkdir(parents=True, exist_ok=True)
+                            shutil.copytree(src_dir, dest_dir, dirs_exist_ok=True, copy_function=link_or_copy)
+                            analysis_xlsx_path = str(dest_dir / Path(analysis_xlsx_path).name)
+                            print(f"🔁 Miroir ANALYSIS_DIR: {dest_dir}")
+                    except Exception as _sub_e:
+                        print("⚠️ Mirror vers ANALYSIS_DIR ignoré:", _sub_e)
         except Exception as _e:
             print("⚠️ Mirror vers ANALYSIS_DIR échoué:", _e)
 
@@ -213,18 +286,20 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
         try:
             # Métadonnées pour historiser proprement dans admin/user
             folder = Path(analysis_xlsx_path).parent.name if analysis_xlsx_path else None
+            perf.tag(folder=folder)
             period_str = f"{req.start_date} to {req.end_date}"
-            charge_2_credits_for_backtest(user.id, {
-                "symbol": req.symbol,
-                "timeframe": req.timeframe,
-                "strategy": req.strategy,
-                "period": period_str,
-                "folder": folder,
-                "duration_ms": elapsed_ms,   # NEW: perf backtest
-                "credits_delta": -2,          # NEW: utile pour credits_flow
-                "type": "backtest",                                              # NEW
-                "label": f"Backtest {req.symbol} {req.timeframe} {req.strategy}" # NEW
-            })
+            with perf.span("credits"):
+                charge_2_credits_for_backtest(user.id, {
+                    "symbol": req.symbol,
+                    "timeframe": req.timeframe,
+                    "strategy": req.strategy,
+                    "period": period_str,
+                    "folder": folder,
+                    "duration_ms": elapsed_ms,   # NEW: perf backtest
+                    "credits_delta": -2,          # NEW: utile pour credits_flow
+                    "type": "backtest",                                              # NEW
+                    "label": f"Backtest {req.symbol} {req.timeframe} {req.strategy}" # NEW
+                })
         except ValueError as e:
             # Cas très rare: si solde a changé entre-temps → on ne bloque pas le succès,
             # on retourne l'info de solde et on log client-side si besoin.
@@ -248,6 +323,8 @@ def launch_backtest(req: BacktestRequest, authorization: str = Header(None, alia
 
 
 @router.post("/upload_csv_and_backtest")
+@perf.timed_run("backtest_upload")
+@admitted("backtest_upload", _admission_user, _admission_form_cost)
 async def upload_csv_and_backtest(
     strategy: str = Form(...),
     sl_pips: int = Form(100),
@@ -282,6 +359,7 @@ async def upload_csv_and_backtest(
     """
     try:
         print("🚀 CSV utilisateur reçu :", csv_file.filename)
+        perf.tag(strategy=strategy, symbol=symbol, timeframe=timeframe)
         print("• Stratégie :", strategy)
         print("• SL / TP :", sl_pips, "/", tp1_pips, "/", tp2_pips)
         print("🧠 DEBUG HEADERS")
@@ -364,11 +442,8 @@ async def upload_csv_and_backtest(
 
         print(f"🧭 Symbol/TF utilisés → {sym} / {tf} (filename='{csv_file.filename}')")
 
-        # 🧠 Chargement dynamique de la stratégie
-        module_path = f"app.strategies.{strategy}"
-        print("📦 Import :", module_path)
-        strategy_module = importlib.import_module(module_path)
-        strategy_func = getattr(strategy_module, f"detect_{strategy}")
+        # 🧠 Stratégie depuis le registre
+        strategy_func = get_strategy_func(strategy)
 
         # 🎛️ Params stratégie (depuis le form) — par défaut {}
         params_dict = {}
@@ -419,7 +494,7 @@ async def upload_csv_and_backtest(
             if "backend/data/analysis" in str(src_dir).replace("\\", "/"):
                 dest_dir = ANALYSIS_DIR / src_dir.name
                 dest_dir.parent.mkdir(parents=True, exist_ok=True)
-                shutil.copytree(src_dir, dest_dir, dirs_exist_ok=True)
+                shutil.copytree(src_dir, dest_dir, dirs_exist_ok=True, copy_function=link_or_copy)
                 analysis_xlsx_path = str(dest_dir / Path(analysis_xlsx_path).name)
                 print(f"🔁 Miroir ANALYSIS_DIR: {dest_dir}")
         except Exception as _e:
@@ -451,7 +526,7 @@ async def upload_csv_and_backtest(
         try:
             folder = Path(analysis_xlsx_path).parent.name if analysis_xlsx_path else None
             period_str = f"{start_date} to {end_date}" if start_date and end_date else ""
-            charge_2_credits_for_backtest(user.id, {
+            await run_in_threadpool(charge_2_credits_for_backtest, user.id, {  # verrou users.json hors boucle
                 "symbol": sym,
                 "timeframe": tf,
                 "strategy": strategy,
@@ -477,3 +552,312 @@ async def upload_csv_and_backtest(
     except Exception as e:
         print("❌ ERREUR GLOBALE (UPLOAD) :", str(e))
         return {"error": str(e)}
+
+
+class RollingBacktestRequest(BacktestRequest):
+    """
+    Payload /admin/backtest/rolling = BacktestRequest + découpage.
+
+    Fields:
+        window (str): longueur de fenêtre ("1M", "3M", "30D", "7D"…)
+        step (str|None): pas entre fenêtres (défaut = window → fenêtres contiguës)
+        state (str): "shared" (détection unique) | "independent" (état strat remis à zéro par fenêtre)
+        workers (int|None): taille du pool de process en mode independent
+    """
+    window: str = "1M"
+    step: Optional[str] = None
+    state: str = "shared"
+    workers: Optional[int] = None
+
+
+@router.post("/admin/backtest/rolling")
+@admitted("backtest_rolling", _admission_admin, _admission_rolling_cost)
+def launch_rolling_backtest(req: RollingBacktestRequest, request: Request):
+    """
+    Walk-forward admin : charge la série UNE fois puis produit un tableau
+    de métriques par fenêtre (trades, winrate TP1/TP2). Pas de débit de crédits.
+
+    Returns:
+        dict: folder, csv, xlsx, windows[] (ou error).
+    """
+    user = require_admin(request)
+    if req.state not in ("shared", "independent"):
+        return {"error": "state doit valoir 'shared' ou 'independent'"}
+    try:
+        from app.utils.data_loader import load_data_cached
+        df = load_data_cached(req.symbol, req.timeframe, req.start_date, req.end_date, readonly=True)
+        if df.empty:
+            return {"error": "Aucune donnée trouvée pour cette période."}
+
+        strategy_func = get_strategy_func(req.strategy)
+
+        return run_rolling_backtest(
+            df=df,
+            strategy_name=req.strategy,
+            strategy_func=strategy_func,
+            window=req.window,
+            step=req.step,
+            sl_pips=req.sl_pips,
+            tp1_pips=req.tp1_pips,
+            tp2_pips=req.tp2_pips,
+            symbol=req.symbol,
+            timeframe=req.timeframe,
+            period=f"{req.start_date} to {req.end_date}",
+            params=req.params,
+            user_id=user.id,
+            state=req.state,
+            workers=req.workers,
+        )
+    except Exception as e:
+        print("❌ ERREUR ROLLING :", str(e))
+        return {"error": str(e)}
+
+
+class ProfileReplayRequest(BaseModel):
+    """
+    Payload /admin/backtest/profile_replay.
+
+    Fields:
+        folder (str): dossier du run dans ANALYSIS_DIR (contient params.json)
+        keep_output (bool): conserver les résultats du replay dans profile/<stamp>/output (défaut: supprimés)
+        top (int): nb de lignes des rapports cProfile / tracemalloc
+    """
+    folder: str
+    keep_output: bool = False
+    top: int = 40
+
+
+@router.post("/admin/backtest/profile_replay")
+def profile_replay(req: ProfileReplayRequest, request: Request):
+    """
+    Rejoue un run existant (mêmes stratégie / symbole / période / params) sous cProfile
+    + tracemalloc. Artefacts : ANALYSIS_DIR/<folder>/profile/<stamp>/ (run.prof, tops, summary).
+    Le chemin normal /run_backtest n'est pas touché (0 overhead hors replay).
+    """
+    user = require_admin(request)
+    from app.services.profile_replay_service import replay_with_profile
+    from app.utils.profiling import ProfileBusyError
+    try:
+        return replay_with_profile(req.folder, user_id=user.id, keep_output=req.keep_output,
+                                   top=max(5, min(int(req.top), 200)))
+    except ProfileBusyError as e:
+        raise HTTPException(status_code=409, detail=str(e))
+    except (FileNotFoundError, ValueError) as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except Exception as e:
+        print("❌ ERREUR PROFILE REPLAY :", str(e))
+        return {"error": str(e)}
+
+
+@router.get("/admin/backtest/profile/{folder}")
+def list_run_profiles(folder: str, request: Request):
+    """Captures de profil existantes pour un run (plus récente d'abord)."""
+    require_admin(request)
+    from app.services.profile_replay_service import list_profiles, run_dir
+    if run_dir(folder) is None:
+        raise HTTPException(status_code=404, detail="Run introuvable")
+    return {"folder": folder, "profiles": list_profiles(folder)}
+
+
+@router.get("/admin/backtest/profile/{folder}/{stamp}/{filename}")
+def download_run_profile(folder: str, stamp: str, filename: str, request: Request):
+    """Télécharge un artefact (run.prof → snakeviz / pstats ; *.txt ; summary.json)."""
+    require_admin(request)
+    from app.services.profile_replay_service import profile_file
+    path = profile_file(folder, stamp, filename)
+    if path is None:
+        raise HTTPException(status_code=404, detail="Artefact introuvable")
+    media = {".prof": "application/octet-stream", ".txt": "text/plain", ".json": "application/json"}
+    return FileResponse(path, filename=f"{folder}__{stamp}__{filename}",
+                        media_type=media.get(path.suffix, "application/octet-stream"))
+
+
+class MultiBacktestRequest(BacktestRequest):
+    """
+    Payload /run_backtest_multi = BacktestRequest (symbol ignoré) + univers.
+
+    Fields:
+        symbols (list[str]): symboles explicites (ex: ["EURUSD", "GBPUSD"])
+        group (str|None): groupe du pip_registry (fx, fx_jpy, indices, crypto, metals, energy, commodities, all)
+    """
+    symbols: List[str] = []
+    group: Optional[str] = None
+
+
+@router.post("/run_backtest_multi")
+@admitted("backtest_multi", _admission_user, _admission_multi_cost)
+def launch_multi_backtest(req: MultiBacktestRequest, authorization: str = Header(None, alias="X-API-Key")):
+    """
+    Fan-out d'une stratégie sur plusieurs symboles (pool de process global plafonné).
+    Débit : 2 crédits par symbole analysé avec succès (comme /run_backtest).
+
+    Returns:
+        dict: message, credits_remaining, league[], league_csv/xlsx, results[] (ou error).
+    """
+    from app.services.multi_symbol_service import MULTI_SYMBOL_MAX, resolve_symbols, run_multi_symbol_backtest
+    try:
+        if not authorization:
+            return {"error": "Token manquant dans les headers"}
+        user = get_user_by_token(authorization)
+        if not user:
+            return {"error": "Utilisateur non trouvé (token invalide)"}
+        is_admin = is_admin_user(user)
+
+        try:
+            symbols = resolve_symbols(req.symbols, req.group)
+        except ValueError as e:
+            return {"error": str(e)}
+        if not symbols:
+            return {"error": "Aucun symbole à backtester (liste vide ou aucune donnée pour ce groupe)."}
+        if len(symbols) > MULTI_SYMBOL_MAX and not is_admin:
+            return {"error": f"Trop de symboles ({len(symbols)}). Maximum autorisé: {MULTI_SYMBOL_MAX}."}
+        if user.credits < 2 * len(symbols):
+            return {"error": f"Crédits insuffisants : {2 * len(symbols)} requis pour {len(symbols)} symbole(s)."}
+
+        # 🗓️ Garde-fou 31 jours — seulement si pas admin
+        if not is_admin:
+            sd = _parse_date_flex(req.start_date)
+            ed = _parse_date_flex(req.end_date)
+            if not sd or not ed:
+                return {"error": "Format de date invalide (YYYY-MM-DD attendu)."}
+            days = _days_inclusive(sd, ed)
+            if days > 31:
+                return {"error": f"Période trop longue ({days} jours). Maximum autorisé: 31 jours."}
+
+        out = run_multi_symbol_backtest(
+            strategy=req.strategy,
+            symbols=symbols,
+            timeframe=req.timeframe,
+            start_date=req.start_date,
+            end_date=req.end_date,
+            sl_pips=req.sl_pips,
+            tp1_pips=req.tp1_pips,
+            tp2_pips=req.tp2_pips,
+            params=req.params,
+            user_id=user.id,
+        )
+
+        # 🎫 -2 crédits par symbole analysé (même historique que /run_backtest)
+        period_str = f"{req.start_date} to {req.end_date}"
+        for r in out["results"]:
+            if r.get("status") != "ok":
+                continue
+            try:
+                charge_2_credits_for_backtest(user.id, {
+                    "symbol": r["symbol"],
+                    "timeframe": req.timeframe,
+                    "strategy": req.strategy,
+                    "period": period_str,
+                    "folder": r.get("folder"),
+                    "duration_ms": r.get("duration_ms"),
+                    "credits_delta": -2,
+                    "type": "backtest",
+                    "label": f"Backtest {r['symbol']} {req.timeframe} {req.strategy} (multi)",
+                })
+            except ValueError as e:
+                print("⚠️ Débit post-succès impossible:", e)
+
+        updated_user = get_user_by_token(authorization)
+        return {
+            "message": "Backtest multi-symboles terminé",
+            "credits_remaining": updated_user.credits,
+            "league": out["league"],
+            "league_csv": out["csv"],
+            "league_xlsx": out["xlsx"],
+            "results": out["results"],
+        }
+    except Exception as e:
+        print("❌ ERREUR MULTI :", str(e))
+        return {"error": str(e)}
+
+
+class SlTpSurfaceRequest(BacktestRequest):
+    """
+    Payload /backtest/sl_tp_surface = BacktestRequest + axes de la grille.
+
+    Fields:
+        sl_grid (list[float]): niveaux SL en pips (vide → multiples de sl_pips)
+        tp_grid (list[float]): niveaux TP en pips (vide → multiples de tp1_pips) ;
+                               TP1 de la heatmap TP1, TP2 de la heatmap TP2 (TP1 = tp1_pips)
+    """
+    sl_grid: List[float] = []
+    tp_grid: List[float] = []
+
+
+@router.post("/backtest/sl_tp_surface")
+@admitted("sl_tp_surface", _admission_user, _admission_req_cost)
+def launch_sl_tp_surface(req: SlTpSurfaceRequest, authorization: str = Header(None, alias="X-API-Key")):
+    """
+    Surface de winrate SL × TP : détection + premiers passages UNE fois, chaque cellule
+    est une lecture (mêmes résultats qu'un /run_backtest par cellule).
+    Débit : 2 crédits (comme un backtest), uniquement si au moins un trade.
+
+    Returns:
+        dict: sl_grid, tp_grid, trades, winrate_tp1[][], winrate_tp2[][], credits_remaining (ou error).
+    """
+    try:
+        if not authorization:
+            return {"error": "Token manquant dans les headers"}
+        user = get_user_by_token(authorization)
+        if not user:
+            return {"error": "Utilisateur non trouvé (token invalide)"}
+        if user.credits < 2:
+            return {"error": "Crédits insuffisants pour lancer un backtest"}
+
+        # 🗓️ Garde-fou 31 jours — seulement si pas admin
+        if not is_admin_user(user):
+            sd = _parse_date_flex(req.start_date)
+            ed = _parse_date_flex(req.end_date)
+            if not sd or not ed:
+                return {"error": "Format de date invalide (YYYY-MM-DD attendu)."}
+            days = _days_inclusive(sd, ed)
+            if days > 31:
+                return {"error": f"Période trop longue ({days} jours). Maximum autorisé: 31 jours."}
+
+        try:
+            sl_grid = _surface_grid(req.sl_grid, req.sl_pips)
+            tp_grid = _surface_grid(req.tp_grid, req.tp1_pips)
+        except ValueError as e:
+            return {"error": str(e)}
+
+        from app.utils.data_loader import load_data_cached
+        t0 = time.perf_counter()
+        df = load_data_cached(req.symbol, req.timeframe, req.start_date, req.end_date, readonly=True)
+        if df.empty:
+            return {"error": "Aucune donnée trouvée pour cette période."}
+
+        out = run_sl_tp_surface(
+            df=df,
+            strategy_name=req.strategy,
+            strategy_func=get_strategy_func(req.strategy),
+            sl_grid=sl_grid,
+            tp_grid=tp_grid,
+            tp1_pips=req.tp1_pips,
+            symbol=req.symbol,
+            params=req.params,
+        )
+        if "error" in out:
+            return out
+        if not out["trades"]:
+            return {"error": "Aucun trade détecté sur cette période. Aucun crédit décompté."}
+
+        try:
+            charge_2_credits_for_backtest(user.id, {
+                "symbol": req.symbol,
+                "timeframe": req.timeframe,
+                "strategy": req.strategy,
+                "period": f"{req.start_date} to {req.end_date}",
+                "duration_ms": int((time.perf_counter() - t0) * 1000),
+                "credits_delta": -2,
+                "type": "backtest",
+                "label": f"Surface SL/TP {req.symbol} {req.timeframe} {req.strategy}",
+            })
+        except ValueError as e:
+            print("⚠️ Débit post-succès impossible:", e)
+
+        updated_user = get_user_by_token(authorization)
+        return {"message": "Surface SL/TP calculée", "credits_remaining": updated_user.credits,
+                "timeframe": req.timeframe, **out}
+    except Exception as e:
+        print("❌ ERREUR SURFACE :", str(e))
+        return {"error": str(e)}
@@ -13,7 +13,7 @@ Notes importantes:
 
 Depends:
   - backend/strategies/*.py (chaque module doit définir detect_<strategy>)
-  - inspect.signature pour récupérer les paramètres
+  - app.core.strategy_registry (signatures introspectées une fois au démarrage)
 
 Side-effects: Aucun (lecture/inspection uniquement)
 Security: Public (selon ton choix d’expo). Ne change pas la logique.
@@ -18,8 +18,8 @@ Notes:
 """
 
 from fastapi import APIRouter, Request, HTTPException
+from starlette.concurrency import run_in_threadpool
 from fastapi.responses import JSONResponse
-import stripe
 import os
 import json
 from dotenv import load_dotenv
@@ -45,7 +45,7 @@ from app.utils.email_templates import (
     subscription_failed_text,
 )
 from app.models.users import USERS_FILE as USERS_JSON_PATH
-from app.services.stripe_service import resolve_price_for_offer
+from app.services.stripe_service import resolve_price_for_offer, stripe  # proxy paresseux
 
 load_dotenv()
 
@@ -223,6 +223,12 @@ async def stripe_webhook(request: Request):
     - invoice.payment_failed    → désactive l'abo (past_due) + email d'échec (hosted_invoice_url si dispo) + cancel_at=J+7
     """
     payload = await request.body()
+    # traitement (verrou users.json, appels Stripe, e-mails) hors boucle asyncio
+    return await run_in_threadpool(_process_stripe_webhook, request, payload)
+
+
+def _process_stripe_webhook(request: Request, payload: bytes):
+    """Traitement du webhook Stripe (sync, via run_in_threadpool)."""
     # Header case-insensitive, on gère les deux par sécurité
     sig_header = request.headers.get("Stripe-Signature") or request.headers.get("stripe-signature")
 
@@ -1,72 +1,48 @@
 from pathlib import Path
-from fastapi import APIRouter, HTTPException, Query
-from fastapi.responses import JSONResponse
+from fastapi import APIRouter, HTTPException, Query, Request
+from fastapi.responses import JSONResponse, Response
 import pandas as pd
-from app.core.paths import ANALYSIS_DIR
 from app.services.top_strategy_service import BASE_ANALYSIS, _find_xlsx_in_folder
+from app.services.leaderboard_service import load_leaderboard, rebuild_from_disk
+from app.core.admin import require_admin
 
 router = APIRouter()
 
 @router.get("/top-strategy")
-def get_top_strategies():
-    base_path = ANALYSIS_DIR
-    results = []
+def get_top_strategies(request: Request):
+    """
+    TOP 3 public (winrate TP1) servi depuis le leaderboard matérialisé
+    (mis à jour à chaque analyse, cf. leaderboard_service) — plus de scan XLSX par hit.
+    Conditional GET : ETag / Last-Modified → 304 si inchangé.
+    """
+    board = load_leaderboard()
+    headers = {"Cache-Control": "public, max-age=60"}
+    if board.get("etag"):
+        headers["ETag"] = board["etag"]
+        headers["Last-Modified"] = board["last_modified"]
 
-    for file in base_path.rglob("*.xlsx"):
-        try:
-            # Lis uniquement les feuilles utiles
-            df_global = pd.read_excel(file, sheet_name="Global")
-            df_config = pd.read_excel(file, sheet_name="Config")
+        inm = request.headers.get("if-none-match")
+        ims = request.headers.get("if-modified-since")
+        if inm is not None:
+            if board["etag"] in [t.strip() for t in inm.split(",")] or inm.strip() == "*":
+                return Response(status_code=304, headers=headers)
+        elif ims and ims == board["last_modified"]:
+            return Response(status_code=304, headers=headers)
 
-            # -- Winrate Global
-            winrate = df_global.loc[
-                df_global["Metric"].astype(str).str.contains("Winrate Global", case=False, na=False),
-                "Value"
-            ].iloc[0]
-            winrate = float(winrate)
-
-            # -- Meta depuis Config
-            get_cfg = lambda key: df_config.loc[
-                df_config["Paramètre"].astype(str).str.contains(key, case=False, na=False),
-                "Valeur"
-            ].iloc[0]
-
-            strategy_name = get_cfg("Stratégie")
-            pair         = get_cfg("Paire")
-            timeframe    = get_cfg("Timeframe")
-            period_raw   = get_cfg("Période")  # ex: "2025-06-01 to 2025-06-30"
-
-            # Essaie d'extraire from/to pour le front
-            from_date, to_date = None, None
-            if isinstance(period_raw, str) and "to" in period_raw:
-                left, right = [s.strip() for s in period_raw.split("to", 1)]
-                from_date, to_date = left, right
-
-            # -- le "folder" est le nom du dossier parent contenant ce xlsx
-            folder = file.parent.name
-
-            results.append({
-                "strategy_name": strategy_name,
-                "pair": pair,
-                "timeframe": timeframe,
-                "winrate_tp1": round(winrate, 2),
-                "folder": folder,           # <<< indispensable pour l’overlay public
-                "period": period_raw,       # ex: "YYYY-MM-DD to YYYY-MM-DD"
-                "from_date": from_date,
-                "to_date": to_date,
-            })
-        except Exception:
-            # Ignore les xlsx cassés/incomplets
-            continue
-
-    # TOP 3 par winrate (desc)
-    results.sort(key=lambda x: x["winrate_tp1"], reverse=True)
-    top_3 = results[:3]
+    top_3 = board.get("entries", [])[:3]
 
     if not top_3:
         return JSONResponse(content={"message": "❌ Aucune stratégie disponible pour l’instant."}, status_code=404)
 
-    return top_3
+    return JSONResponse(content=top_3, headers=headers)
+
+
+@router.post("/admin/leaderboard/rebuild")
+def rebuild_leaderboard(request: Request):
+    """Admin : reconstruit le leaderboard depuis tous les XLSX de ANALYSIS_DIR."""
+    require_admin(request)
+    data = rebuild_from_disk()
+    return {"message": "Leaderboard reconstruit", "entries": len(data.get("entries", []))}
 
 ## Helpers déplacés dans services/top_strategy_service.py (même logique)
 
@@ -19,18 +19,20 @@ from app.core.paths import ANALYSIS_DIR, DATA_ROOT
 from app.auth import get_current_user, get_user_by_token  # get_user_by_token si besoin
 import json
 from typing import List
-import openpyxl
+from app.utils.lazy_import import lazy_module
 import os
 from fastapi.responses import JSONResponse
 import shutil
 from fastapi import Query, Body
 from fastapi.responses import Response
 from app.services.user_dashboard_service import _normalize_backend_rel, _delete_csv_file
+from app.utils.metrics import XLSX_OPEN_SECONDS
 
 
 
 
 router = APIRouter()
+openpyxl = lazy_module("openpyxl")  # importé à la 1re lecture XLSX (cold start)
 
 @router.get("/user/backtests")
 def get_user_backtests(request: Request, user=Depends(get_current_user)):
@@ -99,7 +101,8 @@ def get_user_backtests(request: Request, user=Depends(get_current_user)):
             metrics_payload = None
             if xlsx_path and xlsx_path.exists():
                 try:
-                    wb = openpyxl.load_workbook(xlsx_path, data_only=True)
+                    with XLSX_OPEN_SECONDS.labels("user_dashboard").time():
+                        wb = openpyxl.load_workbook(xlsx_path, data_only=True)
                     if "Global" in wb.sheetnames:
                         ws = wb["Global"]
                         metrics = {}
@@ -223,6 +226,11 @@ def delete_backtest(folder: str, user=Depends(get_current_user)):
     try:
         shutil.rmtree(target_path)
         print(f"🗑️ Dossier supprimé : {folder}")
+        try:
+            from app.services.leaderboard_service import remove_folder
+            remove_folder(target_path.name)  # 🏆 ne plus exposer un run supprimé
+        except Exception as e:
+            print("⚠️ Leaderboard non mis à jour :", e)
         return JSONResponse(content={"message": "Backtest supprimé avec succès"})
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Erreur suppression dossier: {e}")
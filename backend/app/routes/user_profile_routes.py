@@ -62,7 +62,7 @@ def profile_page(request: Request, token: str = Query(None)):
     })
 
 @router.post("/profile/update")
-async def update_profile(
+def update_profile(
     request: Request,
     x_api_key: str = Header(None, alias="X-API-Key"),
     email: str = Form(...),
@@ -86,7 +86,7 @@ async def update_profile(
 
 
 @router.post("/profile/delete")
-async def delete_account(user: User = Depends(get_current_user)):
+def delete_account(user: User = Depends(get_current_user)):
     """
     Supprime définitivement le compte de l'utilisateur courant.
     """
@@ -97,7 +97,7 @@ async def delete_account(user: User = Depends(get_current_user)):
 
 
 @router.post("/profile/unsubscribe")
-async def unsubscribe(user: User = Depends(get_current_user)):
+def unsubscribe(user: User = Depends(get_current_user)):
     """
     Annule l'abonnement (si présent) de l'utilisateur courant.
     """
@@ -15,6 +15,7 @@ Notes:
 """
 from app.core.paths import USERS_JSON as USERS_FILE, DB_DIR, DATA_ROOT
 from fastapi import APIRouter, Depends, Request
+from starlette.concurrency import run_in_threadpool
 from app.auth import get_current_user
 from app.models.users import User
 from app.models.users import update_user
@@ -26,7 +27,7 @@ from app.utils.email_sender import send_email_html
 from app.utils.email_templates import verification_subject, verification_html, verification_text
 from datetime import datetime
 from app.models.users import compute_grace_info  # ADD en haut du fichier si absent
-from app.models.users import cancel_stripe_subscription, cancel_subscription
+from app.models.users import cancel_stripe_subscription, cancel_subscription, users_lock
 from app.models.offers import OFFERS
 
 from pydantic import BaseModel, EmailStr, validator
@@ -194,7 +195,8 @@ async def update_profile(request: Request, user: User = Depends(get_current_user
     # hash si fourni (optionnel, comme avant)
     hashed_pw = hash_password(password) if password else None
 
-    success = update_user(
+    success = await run_in_threadpool(  # verrou users.json attendu hors boucle asyncio
+        update_user,
         user.id,
         email=email,
         first_name=first_name,
@@ -222,34 +224,35 @@ def _new_pwd_strength(cls, v: str) -> str:
     return v
 
 @router.post("/profile/set-password")
-async def set_password(payload: SetPasswordPayload, user: User = Depends(get_current_user)):
+def set_password(payload: SetPasswordPayload, user: User = Depends(get_current_user)):
     """
     Définit ou change le mot de passe :
     - Si aucun mot de passe n'était défini (compte Google), on autorise le set direct.
     - Sinon, on exige current_password correct.
     """
-    users = load_users()
-    u = users.get(user.id)
-    if not u:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
-
-    stored = u.get("password") or ""
-
-    # Si un mdp existe déjà -> vérifier current_password
-    if stored:
-        if not payload.current_password:
-            return JSONResponse({"status": "error", "message": "Mot de passe actuel requis."}, status_code=400)
-        try:
-            looks_hash = isinstance(stored, str) and stored.startswith("$2")
-            ok = pwd_context.verify(payload.current_password, stored) if looks_hash else (payload.current_password == stored)
-        except UnknownHashError:
-            ok = (payload.current_password == stored)
-        if not ok:
-            return JSONResponse({"status": "error", "message": "Mot de passe actuel invalide."}, status_code=400)
-
-    # Set du nouveau mdp (toujours hashé)
-    u["password"] = hash_password(payload.new_password)
-    _atomic_write_json(USERS_FILE, users)
+    with users_lock():  # lecture → écriture atomique entre workers
+        users = load_users()
+        u = users.get(user.id)
+        if not u:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+
+        stored = u.get("password") or ""
+
+        # Si un mdp existe déjà -> vérifier current_password
+        if stored:
+            if not payload.current_password:
+                return JSONResponse({"status": "error", "message": "Mot de passe actuel requis."}, status_code=400)
+            try:
+                looks_hash = isinstance(stored, str) and stored.startswith("$2")
+                ok = pwd_context.verify(payload.current_password, stored) if looks_hash else (payload.current_password == stored)
+            except UnknownHashError:
+                ok = (payload.current_password == stored)
+            if not ok:
+                return JSONResponse({"status": "error", "message": "Mot de passe actuel invalide."}, status_code=400)
+
+        # Set du nouveau mdp (toujours hashé)
+        u["password"] = hash_password(payload.new_password)
+        _atomic_write_json(USERS_FILE, users)
 
     return {"status": "success"}
 
@@ -302,7 +305,12 @@ async def register_user(request: Request):
         payload = RegisterPayload(**(await request.json()))
     except Exception as e:
         return JSONResponse({"status": "error", "message": str(e)}, status_code=400)
+    # hash bcrypt, verrou users.json et envoi d'e-mail hors boucle asyncio
+    return await run_in_threadpool(_register_user, request, payload)
+
 
+def _register_user(request: Request, payload: RegisterPayload):
+    """Inscription proprement dite (sync, via run_in_threadpool)."""
     email_norm = payload.email.strip().lower()
     # 🔒 limite 3 créations par email
     counts = _load_json_safe(RECREATE_FILE)
@@ -310,42 +318,44 @@ async def register_user(request: Request):
         return JSONResponse({"status": "error", "message": "Limite de recréation atteinte pour cet email."}, status_code=403)
     username_norm = payload.username.strip()
 
-    users = load_users()
-
-    # Doublons insensibles à la casse
-    for u in users.values():
-        if (u.get("email", "").strip().lower() == email_norm) or \
-           (u.get("username", "").strip().lower() == username_norm.lower()):
-            return JSONResponse(
-                {"status": "error", "message": "Email ou nom d’utilisateur déjà utilisé."},
-                status_code=400
-            )
-
-    token = str(uuid.uuid4())
-    hashed_pw = hash_password(payload.password)  # ✅ bcrypt via pwd_context du fichier
-
-    new_user = {
-        "email": email_norm,
-        "username": username_norm,
-        "password": hashed_pw,           # ⚠️ jamais stocker le clair
-        "first_name": (payload.first_name or "").strip() or None,
-        "last_name": (payload.last_name or "").strip() or None,
-        "credits": 0,
-        "token": token,
-        "plan": "free",
-        "purchase_history": [],
-        "subscription": {
-            "type": None,
-            "start_date": None,
-            "renew_date": None,
-            "active": False
-        },
-        "priority_backtest": False,
-        "has_discount": False
-    }
-
-    users[token] = new_user
-    _atomic_write_json(USERS_FILE, users)
+    hashed_pw = hash_password(payload.password)  # ✅ bcrypt via pwd_context du fichier (hors verrou : ~coûteux)
+
+    with users_lock():  # doublons + ajout sous verrou (pas de double inscription)
+        users = load_users()
+
+        # Doublons insensibles à la casse
+        for u in users.values():
+            if (u.get("email", "").strip().lower() == email_norm) or \
+               (u.get("username", "").strip().lower() == username_norm.lower()):
+                return JSONResponse(
+                    {"status": "error", "message": "Email ou nom d’utilisateur déjà utilisé."},
+                    status_code=400
+                )
+
+        token = str(uuid.uuid4())
+
+        new_user = {
+            "email": email_norm,
+            "username": username_norm,
+            "password": hashed_pw,           # ⚠️ jamais stocker le clair
+            "first_name": (payload.first_name or "").strip() or None,
+            "last_name": (payload.last_name or "").strip() or None,
+            "credits": 0,
+            "token": token,
+            "plan": "free",
+            "purchase_history": [],
+            "subscription": {
+                "type": None,
+                "start_date": None,
+                "renew_date": None,
+                "active": False
+            },
+            "priority_backtest": False,
+            "has_discount": False
+        }
+
+        users[token] = new_user
+        _atomic_write_json(USERS_FILE, users)
 
     # ✅ incrémente le compteur de créations
     try:
@@ -425,31 +435,32 @@ async def register_user(request: Request):
 
 
 @router.post("/user/delete_account")
-async def delete_own_account(request: Request, user: User = Depends(get_current_user)):
+def delete_own_account(request: Request, user: User = Depends(get_current_user)):
     """
     Suppression par l'utilisateur lui-même :
     - archive ses transactions dans le ledger (événements 'tx')
     - loggue 'user_deleted' dans le ledger
     - supprime l'entrée du users.json
     """
-    users = _load_json_safe(USERS_FILE)
-    uid = user.id
-    if uid not in users:
-        raise HTTPException(status_code=404, detail="Utilisateur introuvable")
+    with users_lock():
+        users = _load_json_safe(USERS_FILE)
+        uid = user.id
+        if uid not in users:
+            raise HTTPException(status_code=404, detail="Utilisateur introuvable")
 
-    # 1) archiver ses achats pour stats immuables
-    for tx in (users[uid].get("purchase_history") or []):
-        _audit_append({"type": "tx", "user_id": uid, "data": tx})
+        # 1) archiver ses achats pour stats immuables
+        for tx in (users[uid].get("purchase_history") or []):
+            _audit_append({"type": "tx", "user_id": uid, "data": tx})
 
-    # 2) event de suppression
-    _audit_append({"type": "user_deleted", "user_id": uid})
+        # 2) event de suppression
+        _audit_append({"type": "user_deleted", "user_id": uid})
 
-    # 3) suppression effective
-    try:
-        del users[uid]
-        USERS_FILE.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
-    except Exception:
-        raise HTTPException(status_code=500, detail="Erreur lors de la suppression")
+        # 3) suppression effective
+        try:
+            del users[uid]
+            USERS_FILE.write_text(json.dumps(users, indent=2, ensure_ascii=False), encoding="utf-8")
+        except Exception:
+            raise HTTPException(status_code=500, detail="Erreur lors de la suppression")
 
     return {"detail": "Compte supprimé."}
 
@@ -473,13 +484,14 @@ async def cancel_my_subscription(request: Request, user: User = Depends(get_curr
         raise HTTPException(status_code=400, detail="Aucun abonnement actif.")
 
     provider = (sub.get("provider") if isinstance(sub, dict) else getattr(sub, "provider", None))
+    # appel Stripe + verrou users.json hors boucle asyncio
     if provider == "stripe":
-        ok = cancel_stripe_subscription(user.id, at_period_end=(not immediate))
+        ok = await run_in_threadpool(cancel_stripe_subscription, user.id, at_period_end=(not immediate))
         if not ok:
             raise HTTPException(status_code=500, detail="Annulation Stripe impossible.")
     else:
         # ex: abo local non-Stripe
-        if not cancel_subscription(user.id):
+        if not await run_in_threadpool(cancel_subscription, user.id):
             raise HTTPException(status_code=500, detail="Annulation locale impossible.")
 
     return {"status": "success"}
@@ -0,0 +1,237 @@
+# backend/app/scripts/bench_strategies.py
+# =========================================
+# 📌 Benchmark de performance des stratégies (app/strategies/*) et du runner.
+#
+# Fonctionnement :
+# 1. Génère des OHLC synthétiques déterministes (10k / 100k bougies par défaut, 1M en option)
+#    + charge des mois réels depuis OUTPUT_DIR (--real)
+# 2. Pour chaque stratégie detect_<nom> : chronomètre séparément
+#      - la détection (strategy_func)
+#      - la résolution des résultats (runner_core.resolve_outcomes)
+#    puis mesure le pic mémoire (tracemalloc, passe séparée pour ne pas fausser les temps)
+# 3. Ajoute le run à DATA_ROOT/bench/history.jsonl
+# 4. Compare à DATA_ROOT/bench/baseline.json → exit 1 si une stratégie régresse
+#    au-delà du seuil (--threshold, défaut 25 %)
+#
+# 💡 Usage :
+#     python -m app.scripts.bench_strategies                       # 10k + 100k
+#     python -m app.scripts.bench_strategies --sizes 1000000 --strategies fvg_pullback_multi
+#     python -m app.scripts.bench_strategies --real --real-limit 2 --save-baseline
+#
+# ⚠️ Baseline = machine dépendante : la (re)générer sur la machine qui compare.
+
+import argparse
+import contextlib
+import io
+import json
+import platform
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from app.core import strategy_registry
+from app.core.paths import DATA_ROOT, OUTPUT_DIR
+from app.core.runner_core import build_strategy_params, prepare_ohlc, resolve_outcomes, resolve_pip
+from app.utils.indicators import add_rsi_ema
+from app.utils.synthetic_ohlc import generate_ohlc
+
+STRATEGIES_PKG_DIR = strategy_registry.STRATEGIES_PKG_DIR
+BENCH_DIR = DATA_ROOT / "bench"
+HISTORY_PATH = BENCH_DIR / "history.jsonl"
+BASELINE_PATH = BENCH_DIR / "baseline.json"
+
+DEFAULT_SIZES = [10_000, 100_000]
+SYNTH_SYMBOL = "EURUSD"
+# SL/TP raisonnables pour une vol synthétique de ~3 pips / bougie M5
+SL_PIPS, TP1_PIPS, TP2_PIPS = 10, 10, 20
+# En dessous de ce delta absolu, une "régression" est du bruit de mesure
+NOISE_FLOOR_S = 0.005
+
+
+def discover_strategies(only=None):
+    """[(nom, detect_<nom>)] depuis le registre des stratégies (imports KO signalés)."""
+    for name, err in strategy_registry.errors().items():
+        if not only or name in only:
+            print(f"⚠️ Import impossible {name} : {err}")
+    return [(name, strategy_registry.get_strategy_func(name))
+            for name in strategy_registry.names() if not only or name in only]
+
+
+def _finalize(df):
+    """Format load_data_or_extract : index Datetime + colonne 'time'."""
+    df = df.copy()
+    df["Datetime"] = pd.to_datetime(df["Datetime"]).dt.tz_localize(None)
+    df = df.set_index("Datetime").sort_index()
+    df["time"] = df.index
+    return df
+
+
+def synthetic_dataset(n_bars, seed=42):
+    df = generate_ohlc(n_bars + 200, "M5", seed=seed)  # +200 : chauffe EMA/RSI
+    add_rsi_ema(df)
+    return _finalize(df.dropna().tail(n_bars))
+
+
+def real_datasets(limit=2, timeframe="M5"):
+    """Mois réels : OUTPUT_DIR/<SYM>/<YYYY-MM>/<SYM>_<TF>_<YYYY-MM>.csv (les plus récents d'abord)."""
+    files = sorted(OUTPUT_DIR.glob(f"*/*/*_{timeframe}_*.csv"), key=lambda p: p.name, reverse=True)
+    for path in files[:limit]:
+        try:
+            df = pd.read_csv(path)
+            yield f"real:{path.stem}", path.stem.split("_")[0], _finalize(df)
+        except Exception as e:
+            print(f"⚠️ Lecture impossible {path} : {e}")
+
+
+def _quiet(fn, *args, **kwargs):
+    with contextlib.redirect_stdout(io.StringIO()):
+        return fn(*args, **kwargs)
+
+
+def bench_one(name, func, df, symbol, repeat=1, measure_mem=True):
+    """Chronomètre détection et résolution séparément (min sur `repeat` passes)."""
+    df = prepare_ohlc(df)
+    pip = resolve_pip(symbol)
+    eff_params, _, _ = _quiet(build_strategy_params, func, {}, pip, df.columns)
+
+    detect_s = outcome_s = float("inf")
+    n_signals = n_rows = 0
+    for _ in range(max(1, repeat)):
+        t0 = time.perf_counter()
+        signals = func(df.copy(), **eff_params)
+        t1 = time.perf_counter()
+        results = _quiet(resolve_outcomes, df, signals, SL_PIPS, TP1_PIPS, TP2_PIPS, pip)
+        t2 = time.perf_counter()
+        detect_s, outcome_s = min(detect_s, t1 - t0), min(outcome_s, t2 - t1)
+        n_signals, n_rows = len(signals), len(results)
+
+    peak_mb = None
+    if measure_mem:
+        tracemalloc.start()
+        try:
+            signals = func(df.copy(), **eff_params)
+            _quiet(resolve_outcomes, df, signals, SL_PIPS, TP1_PIPS, TP2_PIPS, pip)
+            peak_mb = round(tracemalloc.get_traced_memory()[1] / 1e6, 2)
+        finally:
+            tracemalloc.stop()
+
+    bars = len(df)
+    return {
+        "bars": bars,
+        "signals": n_signals,
+        "result_rows": n_rows,
+        "detect_s": round(detect_s, 4),
+        "outcome_s": round(outcome_s, 4),
+        "bars_per_s": round(bars / detect_s, 1) if detect_s > 0 else None,
+        "signals_per_s": round(n_signals / outcome_s, 1) if outcome_s > 0 else None,
+        "peak_mem_mb": peak_mb,
+    }
+
+
+def compare_to_baseline(results, baseline, threshold):
+    """Liste des régressions (detect_s / outcome_s) > baseline × (1 + threshold)."""
+    regressions = []
+    for key, cur in results.items():
+        ref = baseline.get(key)
+        if not ref:
+            continue
+        for metric in ("detect_s", "outcome_s"):
+            old, new = ref.get(metric), cur.get(metric)
+            if not old or new is None:
+                continue
+            if new > old * (1 + threshold) and (new - old) > NOISE_FLOOR_S:
+                regressions.append({"key": key, "metric": metric, "baseline": old, "current": new,
+                                    "ratio": round(new / old, 2)})
+    return regressions
+
+
+def _git_rev():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"],
+                                       cwd=str(STRATEGIES_PKG_DIR), stderr=subprocess.DEVNULL,
+                                       text=True).strip()
+    except Exception:
+        return None
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BackTradz — benchmark des stratégies")
+    parser.add_argument("--sizes", nargs="*", type=int, default=DEFAULT_SIZES, help="Tailles synthétiques (bougies)")
+    parser.add_argument("--strategies", nargs="*", default=None, help="Sous-ensemble de stratégies")
+    parser.add_argument("--real", action="store_true", help="Ajoute des mois réels depuis OUTPUT_DIR")
+    parser.add_argument("--real-limit", type=int, default=2)
+    parser.add_argument("--repeat", type=int, default=1, help="Passes de chrono (on garde le min)")
+    parser.add_argument("--no-mem", action="store_true", help="Sans passe tracemalloc")
+    parser.add_argument("--threshold", type=float, default=0.25, help="Tolérance de régression (0.25 = +25 %%)")
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--history", default=str(HISTORY_PATH))
+    parser.add_argument("--save-baseline", action="store_true", help="Écrase la baseline avec ce run")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    strategies = discover_strategies(set(args.strategies) if args.strategies else None)
+    if not strategies:
+        print("❌ Aucune stratégie trouvée")
+        return 1
+
+    datasets = [(f"synthetic_{n}", SYNTH_SYMBOL, synthetic_dataset(n)) for n in args.sizes]
+    if args.real:
+        datasets += list(real_datasets(args.real_limit))
+
+    results = {}
+    for ds_name, symbol, df in datasets:
+        print(f"📊 Dataset {ds_name} ({len(df)} bougies)")
+        for name, func in strategies:
+            key = f"{name}|{ds_name}"
+            try:
+                res = bench_one(name, func, df, symbol, repeat=args.repeat, measure_mem=not args.no_mem)
+            except Exception as e:
+                print(f"   ❌ {name} : {e}")
+                continue
+            results[key] = res
+            print(f"   {name:40s} detect={res['detect_s']:8.3f}s outcome={res['outcome_s']:8.3f}s "
+                  f"signals={res['signals']:6d} mem={res['peak_mem_mb'] if res['peak_mem_mb'] is not None else '-'}MB")
+
+    run = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "git_rev": _git_rev(),
+        "python": platform.python_version(),
+        "machine": platform.node(),
+        "results": results,
+    }
+    history = Path(args.history)
+    history.parent.mkdir(parents=True, exist_ok=True)
+    with history.open("a", encoding="utf-8") as f:
+        f.write(json.dumps(run, ensure_ascii=False) + "\n")
+    print(f"📝 Historique : {history}")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps(results, indent=2), encoding="utf-8")
+        print(f"✅ Baseline enregistrée : {baseline_path}")
+        return 0
+
+    if not baseline_path.exists():
+        print("ℹ️ Pas de baseline (lancer avec --save-baseline)")
+        return 0
+
+    regressions = compare_to_baseline(results, json.loads(baseline_path.read_text(encoding="utf-8")),
+                                      args.threshold)
+    for r in regressions:
+        print(f"❌ Régression {r['key']} {r['metric']} : {r['baseline']}s → {r['current']}s (x{r['ratio']})")
+    if regressions:
+        return 1
+    print("✅ Aucune régression")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,145 @@
+# backend/app/scripts/startup_budget.py
+# =====================================
+# 📌 Budget de démarrage à froid de l'API (import de app.main).
+#
+# Fonctionnement :
+# 1. Lance `python -X importtime -c "import app.main"` dans un process neuf (--repeat fois,
+#    on garde le run le plus rapide)
+# 2. Parse le rapport importtime (self / cumulé par module)
+# 3. Échoue (exit 1) si :
+#      - un module lourd interdit au démarrage est importé (yfinance, stripe, openpyxl, …)
+#      - le temps d'import total dépasse --budget-ms (STARTUP_BUDGET_MS)
+#      - il régresse de plus de --threshold par rapport à la baseline enregistrée
+#
+# 💡 Usage :
+#     python -m app.scripts.startup_budget                     # depuis backend/
+#     python -m app.scripts.startup_budget --save-baseline
+#     python -m app.scripts.startup_budget --top 25 --budget-ms 1500
+#
+# ⚠️ Temps machine-dépendants : baseline à générer sur la machine qui compare (CI / Render).
+
+import argparse
+import json
+import os
+import re
+import subprocess
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.paths import DATA_ROOT
+
+BACKEND_DIR = Path(__file__).resolve().parents[2]
+BASELINE_PATH = DATA_ROOT / "bench" / "startup_baseline.json"
+TARGET_MODULE = "app.main"
+
+# Modules qui doivent rester paresseux (chargés au 1er usage, jamais à l'import de l'app)
+FORBIDDEN_AT_STARTUP = ("yfinance", "matplotlib", "seaborn", "stripe", "openpyxl", "apscheduler")
+DEFAULT_BUDGET_MS = float(os.getenv("STARTUP_BUDGET_MS", "2000"))
+# En dessous de ce delta absolu, une "régression" est du bruit de mesure
+NOISE_FLOOR_MS = 50
+
+_LINE_RE = re.compile(r"^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)\s*$")
+
+
+def parse_importtime(stderr: str):
+    """[{module, self_us, cumulative_us, depth}] depuis la sortie de -X importtime."""
+    rows = []
+    for line in stderr.splitlines():
+        m = _LINE_RE.match(line)
+        if m:
+            rows.append({
+                "module": m.group(4),
+                "self_us": int(m.group(1)),
+                "cumulative_us": int(m.group(2)),
+                "depth": (len(m.group(3)) - 1) // 2,
+            })
+    return rows
+
+
+def measure_once(module: str = TARGET_MODULE):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [str(BACKEND_DIR), env.get("PYTHONPATH")]))
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        cwd=str(BACKEND_DIR), env=env, capture_output=True, text=True,
+    )
+    if proc.returncode != 0:
+        raise RuntimeError(f"import {module} KO :\n{proc.stderr[-2000:]}")
+    rows = parse_importtime(proc.stderr)
+    total = next((r["cumulative_us"] for r in reversed(rows) if r["module"] == module), None)
+    if total is None:
+        raise RuntimeError(f"{module} absent du rapport importtime")
+    return total / 1000, rows
+
+
+def forbidden_imports(rows, forbidden=FORBIDDEN_AT_STARTUP):
+    roots = {r["module"].split(".")[0] for r in rows}
+    return sorted(m for m in forbidden if m in roots)
+
+
+def top_packages(rows, n=15):
+    """Coût cumulé par package racine (entrées de plus haut niveau uniquement)."""
+    seen, costs = set(), {}
+    for r in rows:
+        root = r["module"].split(".")[0]
+        if r["module"] == root and root not in seen:
+            seen.add(root)
+            costs[root] = r["cumulative_us"] / 1000
+    return sorted(costs.items(), key=lambda x: x[1], reverse=True)[:n]
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BackTradz — budget de démarrage (import app.main)")
+    parser.add_argument("--repeat", type=int, default=3, help="Mesures (on garde la plus rapide)")
+    parser.add_argument("--budget-ms", type=float, default=DEFAULT_BUDGET_MS)
+    parser.add_argument("--threshold", type=float, default=0.25, help="Tolérance vs baseline (0.25 = +25 %%)")
+    parser.add_argument("--top", type=int, default=15)
+    parser.add_argument("--baseline", default=str(BASELINE_PATH))
+    parser.add_argument("--save-baseline", action="store_true")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    best_ms, best_rows = None, None
+    for _ in range(max(1, args.repeat)):
+        total_ms, rows = measure_once()
+        if best_ms is None or total_ms < best_ms:
+            best_ms, best_rows = total_ms, rows
+
+    print(f"⏱️ import {TARGET_MODULE} : {best_ms:.0f} ms (meilleur de {args.repeat})")
+    for name, ms in top_packages(best_rows, args.top):
+        print(f"   {name:35s} {ms:8.1f} ms")
+
+    failures = []
+    bad = forbidden_imports(best_rows)
+    if bad:
+        failures.append(f"modules lourds importés au démarrage : {', '.join(bad)}")
+    if best_ms > args.budget_ms:
+        failures.append(f"budget dépassé : {best_ms:.0f} ms > {args.budget_ms:.0f} ms")
+
+    baseline_path = Path(args.baseline)
+    if args.save_baseline:
+        baseline_path.parent.mkdir(parents=True, exist_ok=True)
+        baseline_path.write_text(json.dumps({
+            "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": sys.version.split()[0],
+            "import_ms": round(best_ms, 1),
+        }, indent=2), encoding="utf-8")
+        print(f"✅ Baseline enregistrée : {baseline_path}")
+    elif baseline_path.exists():
+        ref = json.loads(baseline_path.read_text(encoding="utf-8")).get("import_ms")
+        if ref and best_ms > ref * (1 + args.threshold) and best_ms - ref > NOISE_FLOOR_MS:
+            failures.append(f"régression vs baseline : {ref:.0f} ms → {best_ms:.0f} ms (x{best_ms / ref:.2f})")
+
+    for f in failures:
+        print(f"❌ {f}")
+    if failures:
+        return 1
+    print("✅ Démarrage dans le budget")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,164 @@
+# backend/app/scripts/strategy_parity.py
+# ======================================
+# 📌 Contrôle de non-régression des SIGNAUX des stratégies (pas des temps : cf. bench_strategies).
+#
+# Fonctionnement :
+# 1. Jeux de données synthétiques déterministes (avec / sans gaps d'ouverture, RSI + EMA)
+# 2. Pour chaque stratégie detect_<nom> × jeu de params UI (passés par build_strategy_params
+#    comme dans le runner) : empreinte sha256 + nombre des signaux produits
+# 3. Compare à l'empreinte de référence versionnée (strategy_parity.json) → exit 1 si écart
+#
+# 💡 Usage :
+#     python -m app.scripts.strategy_parity                        # depuis backend/
+#     python -m app.scripts.strategy_parity --strategies englobante_entry englobante_entry_rsi
+#     python -m app.scripts.strategy_parity --save                 # après un changement VOULU de logique
+#     python -m app.scripts.strategy_parity --baseline df33fe8     # détecteurs d'un commit git (pas du disque)
+#
+# ⚠️ Une réécriture (vectorisation, pipeline commun…) doit passer ce contrôle SANS --save.
+# 🧾 Référence versionnée générée avec les détecteurs d'AVANT la vectorisation :
+#     python -m app.scripts.strategy_parity --save --baseline df33fe8
+#    (138 cas ; identique octet pour octet à la sortie des détecteurs actuels).
+
+import argparse
+import contextlib
+import hashlib
+import io
+import json
+import subprocess
+import sys
+import types
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.core import strategy_registry
+from app.core.runner_core import build_strategy_params, prepare_ohlc, resolve_pip
+from app.utils.indicators import add_rsi_ema
+from app.utils.synthetic_ohlc import generate_ohlc
+
+REFERENCE_PATH = Path(__file__).with_name("strategy_parity.json")
+SYMBOL = "EURUSD"
+N_BARS = 5000
+
+# Params UI (unités pips, comme envoyés par le front)
+PARAM_SETS = {
+    "defaults": {},
+    "loose": {"min_pips": 0.5, "min_wait_candles": 1, "max_wait_candles": 30,
+              "allow_multiple_entries": True, "min_overlap_ratio": 0.3, "rsi_threshold": 60},
+    "strict": {"min_pips": 2, "confirm_candle": False, "max_touch": 1, "min_overlap_ratio": 0,
+               "rsi_threshold": 35, "ema_key": "EMA_200"},
+}
+
+
+def datasets():
+    """{nom: df au format load_data_or_extract} — mêmes seeds → mêmes séries."""
+    out = {}
+    for name, gap in (("synthetic", 0.0), ("gappy", 2.0)):
+        df = generate_ohlc(N_BARS + 200, "M5", seed=42, gap_pips=gap)
+        add_rsi_ema(df)
+        df = df.dropna().tail(N_BARS)
+        df["Datetime"] = pd.to_datetime(df["Datetime"])
+        df = df.set_index("Datetime").sort_index()
+        df["time"] = df.index
+        out[name] = prepare_ohlc(df)
+    return out
+
+
+def _canon(v):
+    if isinstance(v, pd.Timestamp):
+        return v.isoformat()
+    if isinstance(v, (bool, np.bool_)):
+        return bool(v)
+    if isinstance(v, (int, np.integer)):
+        return int(v)
+    if isinstance(v, (float, np.floating)):
+        return repr(float(v))
+    return str(v)
+
+
+def fingerprint(signals) -> dict:
+    rows = [[[k, _canon(v)] for k, v in s.items()] for s in signals]
+    digest = hashlib.sha256(json.dumps(rows, separators=(",", ":")).encode("utf-8")).hexdigest()
+    return {"count": len(signals), "sha256": digest}
+
+
+def baseline_func(name: str, rev: str):
+    """detect_<nom> tel qu'il était au commit rev (git show), sans toucher l'arbre de travail."""
+    strategies_dir = Path(strategy_registry.__file__).resolve().parents[1] / "strategies"
+    src = subprocess.run(["git", "-C", str(strategies_dir), "show", f"{rev}:./{name}.py"],
+                         capture_output=True, check=True).stdout
+    module = types.ModuleType(f"_parity_{rev}_{name}")
+    exec(compile(src, f"{rev}:{name}.py", "exec"), module.__dict__)
+    return getattr(module, f"detect_{name}")
+
+
+def run_all(only=None, baseline=None) -> dict:
+    pip = resolve_pip(SYMBOL)
+    data = datasets()
+    out = {}
+    for name in strategy_registry.names():
+        if only and name not in only:
+            continue
+        if baseline:
+            func = baseline_func(name, baseline)
+        else:
+            func = strategy_registry.get_strategy_func(name)
+        out[name] = {}
+        for ds_name, df in data.items():
+            for ps_name, ui_params in PARAM_SETS.items():
+                with contextlib.redirect_stdout(io.StringIO()):
+                    eff, _, _ = build_strategy_params(func, dict(ui_params), pip, df.columns)
+                out[name][f"{ds_name}/{ps_name}"] = fingerprint(func(df.copy(), **eff))
+    return out
+
+
+def _parse_args(argv=None):
+    parser = argparse.ArgumentParser(description="BackTradz — parité des signaux des stratégies")
+    parser.add_argument("--strategies", nargs="*", help="Sous-ensemble de stratégies")
+    parser.add_argument("--reference", default=str(REFERENCE_PATH))
+    parser.add_argument("--save", action="store_true", help="Réécrit la référence (changement de logique voulu)")
+    parser.add_argument("--baseline", metavar="REV", help="Détecteurs du commit git REV au lieu de ceux du disque")
+    return parser.parse_args(argv)
+
+
+def main(argv=None) -> int:
+    args = _parse_args(argv)
+    current = run_all(args.strategies, args.baseline)
+    ref_path = Path(args.reference)
+
+    if args.save:
+        reference = json.loads(ref_path.read_text(encoding="utf-8")) if ref_path.exists() else {}
+        reference.update(current)
+        ref_path.write_text(json.dumps(reference, indent=2, sort_keys=True) + "\n", encoding="utf-8")
+        print(f"✅ Référence enregistrée : {ref_path} ({len(current)} stratégies)")
+        return 0
+
+    if not ref_path.exists():
+        print(f"❌ Référence absente : {ref_path} (lancer avec --save)")
+        return 1
+    reference = json.loads(ref_path.read_text(encoding="utf-8"))
+
+    failures = []
+    for name, cases in current.items():
+        ref_cases = reference.get(name)
+        if ref_cases is None:
+            print(f"⚠️ {name} : pas de référence (nouvelle stratégie ?)")
+            continue
+        for case, fp in cases.items():
+            ref = ref_cases.get(case)
+            if ref != fp:
+                failures.append(f"{name} [{case}] : {ref and ref['count']} → {fp['count']} signaux")
+        n = sum(fp["count"] for fp in cases.values())
+        print(f"   {name:38s} {len(cases)} cas, {n} signaux")
+
+    for f in failures:
+        print(f"❌ {f}")
+    if failures:
+        return 1
+    print("✅ Signaux identiques à la référence")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,52 +1,40 @@
 # backend/script/top_strategie_generator.py
 # =========================================
 # 📌 Script utilitaire qui génère un fichier JSON "top_strategies.json"
-# à partir des statistiques d’API (/api/admin/stats/backtest_summary).
+# à partir du leaderboard local des analyses.
 #
 # Fonctionnement :
-# 1. Appelle l’API d’admin pour récupérer toutes les stats de backtests
-# 2. Trie les stratégies par leur winrate TP1
-# 3. Sélectionne les 3 meilleures
-# 4. Sauvegarde le résultat dans backend/data/public/top_strategies.json
+# 1. Lit le leaderboard matérialisé (services/leaderboard_service.py),
+#    tenu à jour à chaque analyse terminée — plus d'appel HTTP vers notre propre API
+# 2. Sélectionne les 3 meilleures stratégies (winrate TP1)
+# 3. Sauvegarde le résultat dans DATA_ROOT/public/top_strategies.json
 #
 # 💡 Ce fichier JSON est ensuite lu par la route publique
 #     → GET /api/public/top_strategies
 # pour être affiché sur le site.
-#
-# ⚠️ Attention : la clé API est codée en dur pour l’instant,
-# il faudra la déplacer dans le .env ou une config sécurisée.
 
-import requests
 import json
-from pathlib import Path
 
 
 def generate_top_strategies():
     """
-    Récupère les stats de backtests via l'API admin
-    puis enregistre un fichier JSON contenant le TOP 3 des stratégies
-    selon leur winrate TP1.
+    Lit le leaderboard local puis enregistre un fichier JSON contenant
+    le TOP 3 des stratégies selon leur winrate TP1.
     """
-    url = "https://www.backtradz.com/api/admin/stats/backtest_summary"
-    headers = {"X-API-Key": "florian-token"}  # ⚠️ Clé codée en dur (à externaliser)
+    from app.services.leaderboard_service import load_leaderboard
 
     try:
-        # 🔎 Appel API pour récupérer toutes les stats
-        response = requests.get(url, headers=headers)
-        data = response.json()
+        top = load_leaderboard().get("entries", [])[:3]
     except Exception as e:
-        print("❌ Erreur lors de l'appel API :", e)
+        print("❌ Erreur lecture leaderboard :", e)
         return
 
-    # 📊 Trie les stratégies par winrate TP1 et prend les 3 meilleures
-    top = sorted(data, key=lambda x: x["winrate_tp1"], reverse=True)[:3]
-
     # 📝 Structure du JSON de sortie
     output = [
         {
-            "name": item["strategy"],
+            "name": item["strategy_name"],
             "winrate": item["winrate_tp1"],
-            "symbol": item["symbol"],
+            "symbol": item["pair"],
             "timeframe": item["timeframe"],
             "period": item["period"]
         }
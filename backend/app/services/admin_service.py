@@ -27,6 +27,8 @@ from app.core.paths import (
     DATA_ROOT,
 )
 from app.models.offers import OFFERS
+from app.utils import audit_ledger
+from app.utils.json_db import store_lock, write_json_atomic
 
 PARIS_TZ = ZoneInfo("Europe/Paris")
 
@@ -77,9 +79,8 @@ def audit_append(obj: Dict[str, Any]) -> None:
     N’échoue jamais (silencieux) pour ne pas bloquer une requête admin.
     """
     try:
-        with open(AUDIT_FILE, "a", encoding="utf-8") as f:
-            obj = {**obj, "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")}
-            f.write(json.dumps(obj, ensure_ascii=False) + "\n")
+        obj = {**obj, "ts": datetime.now(timezone.utc).isoformat().replace("+00:00", "Z")}
+        audit_ledger.append(obj)
     except Exception:
         pass
 
@@ -151,9 +152,9 @@ def load_users() -> dict:
 
 
 def save_users(data: dict) -> None:
-    """Écriture JSON formatée (indent=2) vers USERS_FILE."""
-    with open(USERS_FILE, "w", encoding="utf-8") as f:
-        json.dump(data, f, ensure_ascii=False, indent=2)
+    """Écriture JSON atomique (indent=2) vers USERS_FILE, sous verrou users.json."""
+    with store_lock(USERS_FILE):
+        write_json_atomic(USERS_FILE, data)
 
 
 # =======================================================================
@@ -2,7 +2,7 @@
 File: backend/app/services/admin_stat_service.py
 Role: Centralise les helpers/constantes utilisés par les routes admin stats.
 Security: Les routes restent protégées via require_admin côté routes.
-Side-effects: lecture/écriture ledger.jsonl et users.json.
+Side-effects: lecture/écriture du ledger d'audit (segments, cf. app.utils.audit_ledger) et users.json.
 """
 
 import json
@@ -14,6 +14,7 @@ from typing import Optional
 from app.models.users import USERS_FILE
 from app.models.offers import OFFERS
 from app.core.paths import DATA_ROOT
+from app.utils import audit_ledger
 
 # --- Constantes / chemins ----------------------------------------------------
 PARIS_TZ = ZoneInfo("Europe/Paris")
@@ -97,20 +98,12 @@ def _time_bounds(range_key: str):
     return None, now
 
 # --- Ledger ------------------------------------------------------------------
-def _iter_ledger():
-    if not AUDIT_FILE.exists():
-        return []
-    out = []
-    with open(AUDIT_FILE, "r", encoding="utf-8") as f:
-        for line in f:
-            line = line.strip()
-            if not line:
-                continue
-            try:
-                out.append(json.loads(line))
-            except Exception:
-                continue
-    return out
+def _iter_ledger(start: Optional[datetime] = None, end: Optional[datetime] = None, types=None):
+    """
+    Événements du ledger. start/end/types = élagage par l'index des segments
+    (seuls les blocs qui recoupent la fenêtre sont lus) ; sur-ensemble → garder _in_window.
+    """
+    return audit_ledger.read(start, end, types)
 
 # --- Users.json --------------------------------------------------------------
 def _load_users_json() -> dict:
@@ -10,6 +10,7 @@ Side-effects: lecture disque uniquement.
 from pathlib import Path
 from typing import Optional
 from app.core.paths import ANALYSIS_DIR
+from app.utils import run_archive
 
 def find_analysis_file(filename: str, folder: Optional[str] = None) -> Optional[Path]:
     """
@@ -27,6 +28,8 @@ def find_analysis_file(filename: str, folder: Optional[str] = None) -> Optional[
             p = (r / folder / filename).resolve()
             if p.exists() and p.is_file():
                 candidates.append(p)
+            elif r in p.parents and run_archive.exists(p):
+                candidates.append(run_archive.materialize(p))  # run compacté : membre remis à plat
 
     # b) fallback / complément → rglob(filename) (premier match suffisant)
     if not candidates:
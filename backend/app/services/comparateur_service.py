@@ -15,8 +15,7 @@ from pathlib import Path
 from typing import Dict, List, Optional, Tuple
 import json
 import pandas as pd
-import openpyxl  # fallback XLSX comme le dashboard
-
+from app.utils.lazy_import import lazy_module
 from app.core.paths import ANALYSIS_DIR
 from app.schemas.comparateur import (
     CompareOptionsItem, CompareOptionsResponse,
@@ -25,6 +24,10 @@ from app.schemas.comparateur import (
 from app.schemas.communs import DEFAULT_SESSIONS, DEFAULT_DAYS, DEFAULT_HOURS
 import unicodedata
 import re
+from app.utils.metrics import XLSX_OPEN_SECONDS
+from app.utils import run_archive
+
+openpyxl = lazy_module("openpyxl")  # importé à la 1re lecture XLSX (cold start)
 
 # ------------ Helpers lecture disque ------------
 
@@ -62,7 +65,8 @@ def _load_params(run_dir: Path) -> dict:
 
 def _safe_read_csv(path: Path) -> Optional[pd.DataFrame]:
     try:
-        return pd.read_csv(path)
+        with run_archive.open_file(path) as f:  # à plat ou dans run_archive.zip (run compacté)
+            return pd.read_csv(f)
     except Exception:
         return None
 
@@ -71,17 +75,17 @@ def _detect_files(run_dir: Path) -> Dict[str, Optional[Path]]:
     #    et on ajoute un slot optionnel 'tp2_global' si présent.
     files = {"global": None, "tp2_global": None, "sessions": None, "hour": None, "day": None}
     # on ignore explicitement les fichiers *_tp2_global.csv pour 'global'
-    for f in run_dir.glob("*_global.csv"):
+    for f in run_archive.glob(run_dir, "*_global.csv"):
         if not str(f.name).lower().endswith("tp2_global.csv"):
             files["global"] = f
             break
     # détection optionnelle CSV TP2
-    for f in run_dir.glob("*_tp2_global.csv"):
+    for f in run_archive.glob(run_dir, "*_tp2_global.csv"):
         files["tp2_global"] = f
         break
-    for f in run_dir.glob("*_sessions.csv"):     files["sessions"] = f; break
-    for f in run_dir.glob("*_par_heure.csv"):    files["hour"] = f;     break
-    for f in run_dir.glob("*_jour_semaine.csv"): files["day"] = f;      break
+    for f in run_archive.glob(run_dir, "*_sessions.csv"):     files["sessions"] = f; break
+    for f in run_archive.glob(run_dir, "*_par_heure.csv"):    files["hour"] = f;     break
+    for f in run_archive.glob(run_dir, "*_jour_semaine.csv"): files["day"] = f;      break
     return files
 
 def _own_by_user(params: dict, current_user_id: str) -> bool:
@@ -293,7 +297,8 @@ def list_user_compare_options(current_user_id: str) -> CompareOptionsResponse:
                 # tentative: 1er fichier 'analyse_*_resultats.xlsx' dans le dossier
                 candidates = list(run_dir.glob("analyse_*_resultats.xlsx"))
                 if candidates:
-                    wb = openpyxl.load_workbook(candidates[0], data_only=True)
+                    with XLSX_OPEN_SECONDS.labels("comparateur").time():
+                        wb = openpyxl.load_workbook(candidates[0], data_only=True)
                     if "Global" in wb.sheetnames:
                         ws = wb["Global"]
                         metrics = {}
@@ -541,7 +546,8 @@ def build_compare_series(current_user_id: str, req: CompareDataRequest) -> Compa
                 try:
                     candidates = list(run_dir.glob("analyse_*_resultats.xlsx"))
                     if candidates:
-                        wb = openpyxl.load_workbook(candidates[0], data_only=True)
+                        with XLSX_OPEN_SECONDS.labels("comparateur").time():
+                            wb = openpyxl.load_workbook(candidates[0], data_only=True)
                         if "Global" in wb.sheetnames:
                             ws = wb["Global"]
                             metrics = {}
@@ -0,0 +1,226 @@
+"""
+File: backend/app/services/csv_catalog_service.py
+Role: Catalogue en mémoire des CSV de la librairie (OUTPUT_DIR, data/official) + métadonnées de couverture.
+Depends:
+  - app.core.paths (OUTPUT_DIR, DATA_ROOT, CACHE_DIR)
+  - app.utils.json_db (persistance atomique du catalogue)
+Side-effects:
+  - CACHE_DIR/csv_catalog/<nom>.json (catalogue persistant → pas de relecture des CSV au redémarrage)
+Notes:
+  - Entrée = 1 fichier : rel, dir, filename, symbol, timeframe, year, month, rows, first, last, size, mtime_ns
+    (rows = lignes de données, first/last = 1re colonne brute de la 1re / dernière ligne → Datetime).
+  - Rafraîchissement incrémental : un dossier dont le mtime n'a pas bougé n'est pas relu
+    (ses sous-dossiers connus sont seulement stat()) ; un fichier dont (taille, mtime) n'a pas bougé
+    garde ses métadonnées. Au plus 1 rafraîchissement / CSV_CATALOG_TTL_S ; revalidation complète
+    (stat de chaque fichier, réécritures en place) toutes les CSV_CATALOG_FULL_SCAN_S.
+  - Écriture connue (extraction) → invalidate_written(path) : revalidation immédiate dans ce
+    process + mtime du dossier touché pour les autres workers (pas d'attente du scan complet).
+  - query() : filtres symbol / timeframe / year / month (insensibles à la casse) + offset / limit.
+"""
+
+import os
+import threading
+import time
+from pathlib import Path
+
+from app.core.paths import OUTPUT_DIR, DATA_ROOT, CACHE_DIR
+from app.utils.json_db import read_json, write_json_atomic
+
+CSV_CATALOG_TTL_S = float(os.getenv("CSV_CATALOG_TTL_S", "5"))
+CSV_CATALOG_FULL_SCAN_S = float(os.getenv("CSV_CATALOG_FULL_SCAN_S", "600"))
+CATALOG_DIR = CACHE_DIR / "csv_catalog"
+
+
+def _parse_name(filename: str) -> dict:
+    """AUDUSD_M5_2025-06.csv → symbol / timeframe / year / month (None si hors convention)."""
+    parts = Path(filename).stem.split("_")
+    meta = {"symbol": None, "timeframe": None, "year": None, "month": None}
+    if len(parts) >= 3:
+        meta["symbol"], meta["timeframe"] = parts[0], parts[1]
+        if "-" in parts[2]:
+            ym = parts[2].split("-")
+            meta["year"], meta["month"] = ym[0], ym[1]
+    return meta
+
+
+def _first_field(line: bytes):
+    field = line.split(b",", 1)[0].strip()
+    return field.decode("utf-8", "replace") if field else None
+
+
+def _coverage(path: Path) -> dict:
+    """Nb de lignes de données + 1re colonne de la 1re / dernière ligne (lecture binaire, sans pandas)."""
+    newlines, ends_with_nl, head = 0, True, b""
+    with open(path, "rb") as f:
+        while True:
+            chunk = f.read(1 << 20)
+            if not chunk:
+                break
+            if len(head) < 65536:
+                head += chunk[:65536]
+            newlines += chunk.count(b"\n")
+            ends_with_nl = chunk.endswith(b"\n")
+        size = f.tell()
+        f.seek(max(size - 4096, 0))
+        tail = f.read()
+    lines = newlines + (0 if ends_with_nl or not size else 1)
+    head_lines = [ln for ln in head.split(b"\n")[1:] if ln.strip()]
+    tail_lines = [ln for ln in tail.split(b"\n") if ln.strip()]
+    rows = max(lines - 1, 0)  # en-tête
+    if not rows or not head_lines:
+        return {"rows": rows, "first": None, "last": None}
+    return {"rows": rows, "first": _first_field(head_lines[0]), "last": _first_field(tail_lines[-1])}
+
+
+def _describe(root: Path, rel_dir: str, name: str, st) -> dict:
+    rel = f"{rel_dir}/{name}" if rel_dir else name
+    entry = {"rel": rel, "dir": rel_dir, "filename": name, **_parse_name(name),
+             "size": int(st.st_size), "mtime_ns": int(st.st_mtime_ns)}
+    try:
+        entry.update(_coverage(root / rel))
+    except OSError:
+        entry.update({"rows": None, "first": None, "last": None})
+    return entry
+
+
+def _flatten(dirs: dict) -> list:
+    return sorted((e for node in dirs.values() for e in node["files"].values()), key=lambda e: e["rel"])
+
+
+class CsvCatalog:
+    """Catalogue d'un dossier racine (récursif ou non), persistant, rafraîchi par mtime de dossier."""
+
+    def __init__(self, name: str, root: Path, recursive: bool = True):
+        self.name = name
+        self.root = Path(root)
+        self.recursive = recursive
+        self._lock = threading.Lock()
+        self._dirs = None          # {rel_dir: {"mtime_ns", "subdirs", "files": {name: entry}}}
+        self._entries = []
+        self._checked = 0.0
+        self._full_checked = 0.0
+
+    @property
+    def _store(self) -> Path:
+        return CATALOG_DIR / f"{self.name}.json"
+
+    def _scan_dir(self, rel: str, path: Path, cached, mtime_ns: int) -> dict:
+        old = cached["files"] if cached else {}
+        subdirs, files = [], {}
+        with os.scandir(path) as it:
+            for e in it:
+                if e.is_dir(follow_symlinks=False):
+                    if self.recursive:
+                        subdirs.append(e.name)
+                elif e.name.endswith(".csv") and e.is_file():
+                    st = e.stat()
+                    prev = old.get(e.name)
+                    if prev and prev["size"] == st.st_size and prev["mtime_ns"] == st.st_mtime_ns:
+                        files[e.name] = prev
+                    else:
+                        files[e.name] = _describe(self.root, rel, e.name, st)
+        return {"mtime_ns": mtime_ns, "subdirs": sorted(subdirs), "files": files}
+
+    def _revalidate_files(self, rel: str, node: dict) -> bool:
+        """Réécriture en place (mtime du dossier inchangé) → stat de chaque fichier connu."""
+        changed = False
+        base = self.root / rel if rel else self.root
+        for name, prev in list(node["files"].items()):
+            try:
+                st = (base / name).stat()
+            except OSError:
+                continue
+            if prev["size"] != st.st_size or prev["mtime_ns"] != st.st_mtime_ns:
+                node["files"][name] = _describe(self.root, rel, name, st)
+                changed = True
+        return changed
+
+    def _refresh(self, full: bool) -> None:
+        if self._dirs is None:
+            data = read_json(self._store, {}) if self._store.exists() else {}
+            self._dirs = data.get("dirs") if data.get("root") == str(self.root) else None
+            self._dirs = self._dirs or {}
+        new_dirs, changed, stack = {}, False, [""]
+        while stack:
+            rel = stack.pop()
+            path = self.root / rel if rel else self.root
+            try:
+                mtime_ns = path.stat().st_mtime_ns
+            except OSError:
+                continue
+            cached = self._dirs.get(rel)
+            if cached and cached["mtime_ns"] == mtime_ns:
+                node = cached
+                if full and self._revalidate_files(rel, node):
+                    changed = True
+            else:
+                try:
+                    node = self._scan_dir(rel, path, cached, mtime_ns)
+                except OSError:
+                    continue
+                changed = True
+            new_dirs[rel] = node
+            stack.extend(f"{rel}/{s}" if rel else s for s in node["subdirs"])
+        if changed or new_dirs.keys() != self._dirs.keys():
+            self._dirs = new_dirs
+            self._entries = _flatten(new_dirs)
+            try:
+                CATALOG_DIR.mkdir(parents=True, exist_ok=True)
+                write_json_atomic(self._store, {"root": str(self.root), "dirs": new_dirs})
+            except Exception as e:
+                print(f"⚠️ Catalogue CSV {self.name} non persisté : {e}")
+        elif not self._entries:
+            self._entries = _flatten(new_dirs)  # 1er appel : catalogue persistant encore valide
+
+    def entries(self) -> list:
+        """Entrées triées par chemin relatif (rafraîchies au plus toutes les CSV_CATALOG_TTL_S)."""
+        now = time.monotonic()
+        with self._lock:
+            if self._dirs is None or now - self._checked >= CSV_CATALOG_TTL_S:
+                full = self._dirs is not None and now - self._full_checked >= CSV_CATALOG_FULL_SCAN_S
+                self._refresh(full)
+                self._checked = now
+                if full or not self._full_checked:
+                    self._full_checked = now
+            return self._entries
+
+    def invalidate(self, path=None) -> None:
+        """
+        Après une écriture connue : le prochain entries() rafraîchit ET revalide les fichiers
+        (une réécriture en place ne bouge pas le mtime du dossier). path fourni → son dossier
+        est aussi "touché" : les catalogues des autres workers le relisent à leur prochain TTL.
+        """
+        if path is not None:
+            try:
+                os.utime(Path(path).parent)
+            except OSError:
+                pass
+        with self._lock:
+            self._checked = 0.0
+            self._full_checked = float("-inf")
+
+
+OUTPUT_CATALOG = CsvCatalog("output", OUTPUT_DIR, recursive=True)
+OFFICIAL_CATALOG = CsvCatalog("official", DATA_ROOT / "official", recursive=False)
+
+
+def invalidate_written(path) -> None:
+    """À appeler par les writers (extraction) : invalide le(s) catalogue(s) couvrant path."""
+    path = Path(path).resolve()
+    for catalog in (OUTPUT_CATALOG, OFFICIAL_CATALOG):
+        root = catalog.root.resolve()
+        if path.parent == root or (catalog.recursive and root in path.parents):
+            catalog.invalidate(path)
+
+
+def query(entries: list, symbol=None, timeframe=None, year=None, month=None,
+          offset: int = 0, limit=None, where=None):
+    """Filtre + pagine des entrées du catalogue → (total filtré, page)."""
+    wanted = {k: str(v).upper() for k, v in
+              (("symbol", symbol), ("timeframe", timeframe), ("year", year), ("month", month)) if v}
+    rows = [e for e in entries
+            if (where is None or where(e))
+            and all(str(e.get(k) or "").upper() == v for k, v in wanted.items())]
+    offset = max(int(offset or 0), 0)
+    page = rows[offset:offset + int(limit)] if limit is not None else rows[offset:]
+    return len(rows), page
@@ -0,0 +1,191 @@
+"""
+File: backend/app/services/leaderboard_service.py
+Role: Leaderboard matérialisé des meilleures stratégies (winrate TP1), mis à jour
+      à chaque analyse terminée au lieu de re-parser tous les XLSX à chaque hit.
+Depends:
+  - app.core.paths (DATA_ROOT → public/leaderboard.json, ANALYSIS_DIR pour le rebuild)
+  - app.utils.json_db (lock fichier + écriture atomique → sûr entre workers uvicorn)
+Side-effects:
+  - Lit/écrit DATA_ROOT/public/leaderboard.json
+Notes:
+  - Top-K borné (LEADERBOARD_K) : min-heap sur (winrate, folder), dédoublonné par folder.
+  - Entrées au format historique de /top-strategy (strategy_name, pair, timeframe,
+    winrate_tp1, folder, period, from_date, to_date).
+  - rebuild_from_disk() = bootstrap / réparation (scan complet, une seule fois).
+"""
+
+import heapq
+import os
+import threading
+from datetime import datetime, timezone
+from email.utils import formatdate
+from pathlib import Path
+from typing import List, Optional
+
+import pandas as pd
+
+from app.core.paths import ANALYSIS_DIR, DATA_ROOT
+from app.utils.json_db import file_lock, read_json, write_json_atomic
+from app.utils.metrics import CACHE_REQUESTS, XLSX_OPEN_SECONDS
+
+LEADERBOARD_PATH = DATA_ROOT / "public" / "leaderboard.json"
+LEADERBOARD_K = int(os.getenv("LEADERBOARD_K", "50"))
+
+_LOCK_PATH = LEADERBOARD_PATH.with_suffix(".lock")
+_mem_lock = threading.Lock()
+_mem_cache = {"key": None, "data": None}
+
+
+def _empty() -> dict:
+    return {"version": 0, "updated_at": None, "entries": []}
+
+
+def _split_period(period_raw):
+    """'YYYY-MM-DD to YYYY-MM-DD' → (from, to) pour le front."""
+    if isinstance(period_raw, str) and "to" in period_raw:
+        left, right = [s.strip() for s in period_raw.split("to", 1)]
+        return left, right
+    return None, None
+
+
+def make_entry(strategy_name, pair, timeframe, winrate_tp1, folder, period) -> dict:
+    from_date, to_date = _split_period(period)
+    return {
+        "strategy_name": strategy_name,
+        "pair": pair,
+        "timeframe": timeframe,
+        "winrate_tp1": round(float(winrate_tp1), 2),
+        "folder": folder,
+        "period": period,
+        "from_date": from_date,
+        "to_date": to_date,
+    }
+
+
+def _top_k(entries: List[dict], k: int = LEADERBOARD_K) -> List[dict]:
+    """
+    Min-heap borné : O(n log k). Dédoublonné par folder (la dernière entrée gagne).
+    Retourne la liste triée par winrate décroissant.
+    """
+    latest = {}
+    for e in entries:
+        if e.get("folder"):
+            latest[e["folder"]] = e
+    heap = []
+    for folder, e in latest.items():
+        item = (e["winrate_tp1"], folder, e)
+        if len(heap) < k:
+            heapq.heappush(heap, item)
+        elif item[:2] > heap[0][:2]:
+            heapq.heapreplace(heap, item)
+    return [e for _, _, e in sorted(heap, key=lambda x: x[:2], reverse=True)]
+
+
+def _save(data: dict):
+    LEADERBOARD_PATH.parent.mkdir(parents=True, exist_ok=True)
+    data["version"] = int(data.get("version", 0)) + 1
+    data["updated_at"] = datetime.now(timezone.utc).isoformat(timespec="seconds")
+    write_json_atomic(LEADERBOARD_PATH, data)
+
+
+def record_run(entry: dict) -> bool:
+    """
+    Insère/actualise une entrée (appelé par run_analysis).
+    Retourne True si le leaderboard a changé.
+    """
+    if not entry or not entry.get("folder"):
+        return False
+    LEADERBOARD_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(_LOCK_PATH):
+        data = read_json(LEADERBOARD_PATH, _empty())
+        entries = data.get("entries", [])
+        before = [(e.get("folder"), e.get("winrate_tp1")) for e in entries]
+
+        # Entrée hors top-K (et pas déjà présente) → rien à écrire
+        present = any(e.get("folder") == entry["folder"] for e in entries)
+        if not present and len(entries) >= LEADERBOARD_K and \
+                (entry["winrate_tp1"], entry["folder"]) <= (entries[-1]["winrate_tp1"], entries[-1]["folder"]):
+            return False
+
+        data["entries"] = _top_k(entries + [entry])
+        if [(e.get("folder"), e.get("winrate_tp1")) for e in data["entries"]] == before:
+            return False
+        _save(data)
+        return True
+
+
+def remove_folder(folder: str) -> bool:
+    """Retire un run supprimé (ex: purge admin)."""
+    if not LEADERBOARD_PATH.exists():
+        return False
+    with file_lock(_LOCK_PATH):
+        data = read_json(LEADERBOARD_PATH, _empty())
+        kept = [e for e in data.get("entries", []) if e.get("folder") != folder]
+        if len(kept) == len(data.get("entries", [])):
+            return False
+        data["entries"] = kept
+        _save(data)
+        return True
+
+
+def entry_from_xlsx(file: Path) -> Optional[dict]:
+    """Parse un XLSX d'analyse (feuilles Global + Config) → entrée leaderboard, ou None."""
+    try:
+        with XLSX_OPEN_SECONDS.labels("leaderboard").time():
+            df_global = pd.read_excel(file, sheet_name="Global")
+            df_config = pd.read_excel(file, sheet_name="Config")
+        winrate = float(df_global.loc[
+            df_global["Metric"].astype(str).str.contains("Winrate Global", case=False, na=False),
+            "Value"
+        ].iloc[0])
+
+        def get_cfg(key):
+            return df_config.loc[
+                df_config["Paramètre"].astype(str).str.contains(key, case=False, na=False),
+                "Valeur"
+            ].iloc[0]
+
+        return make_entry(get_cfg("Stratégie"), get_cfg("Paire"), get_cfg("Timeframe"),
+                          winrate, file.parent.name, get_cfg("Période"))
+    except Exception:
+        return None  # xlsx cassé/incomplet
+
+
+def rebuild_from_disk(base: Path = ANALYSIS_DIR) -> dict:
+    """Scan complet de ANALYSIS_DIR (bootstrap / réparation). Coûteux : à ne pas appeler par requête."""
+    entries = []
+    for file in Path(base).rglob("*.xlsx"):
+        e = entry_from_xlsx(file)
+        if e:
+            entries.append(e)
+    LEADERBOARD_PATH.parent.mkdir(parents=True, exist_ok=True)
+    with file_lock(_LOCK_PATH):
+        data = read_json(LEADERBOARD_PATH, _empty())
+        data["entries"] = _top_k(entries)
+        _save(data)
+    print(f"🏆 Leaderboard reconstruit : {len(data['entries'])} entrée(s) / {len(entries)} xlsx")
+    return data
+
+
+def load_leaderboard(bootstrap: bool = True) -> dict:
+    """
+    Lecture mémoïsée (clé = mtime/size du JSON). Bootstrap depuis le disque si absent.
+    Retourne {"version", "updated_at", "entries", "etag", "last_modified"}.
+    """
+    if not LEADERBOARD_PATH.exists():
+        if not bootstrap:
+            return {**_empty(), "etag": None, "last_modified": None}
+        rebuild_from_disk()
+
+    st = LEADERBOARD_PATH.stat()
+    key = (st.st_mtime_ns, st.st_size)
+    with _mem_lock:
+        if _mem_cache["key"] == key:
+            CACHE_REQUESTS.labels("leaderboard", "hit").inc()
+            return _mem_cache["data"]
+        CACHE_REQUESTS.labels("leaderboard", "miss").inc()
+        data = read_json(LEADERBOARD_PATH, _empty())
+        data["etag"] = f'W/"lb-{data.get("version", 0)}-{st.st_mtime_ns:x}"'
+        data["last_modified"] = formatdate(st.st_mtime, usegmt=True)
+        _mem_cache.update(key=key, data=data)
+        return data
@@ -0,0 +1,241 @@
+"""
+File: backend/app/services/live_scan_service.py
+Role: Scanner live planifié : évalue stratégies × symboles sur les NOUVELLES bougies seulement.
+Depends:
+  - app.strategies.base.streaming.VariantStream (détecteurs incrémentaux, état JSON)
+  - app.core.runner_core (prepare_ohlc, resolve_pip) / app.core.strategy_registry (params effectifs)
+  - app.utils.json_db (lecture / écriture atomique + lock inter-workers)
+Side-effects:
+  - État par flux : DATA_ROOT/live_scan/state/<SYM>__<TF>.json
+  - Signaux détectés (append) : DATA_ROOT/live_scan/signals.jsonl
+Notes:
+  - Flux = OUTPUT_LIVE_DIR/<SYM>/<TF>/*.csv. Seuls les CSV modifiés (mtime/taille) sont relus,
+    et seules leurs lignes postérieures à la dernière bougie vue sont injectées → O(nouvelles bougies).
+  - Signaux identiques au batch (detect_<strat> sur tout l'historique live) : mêmes params
+    effectifs (params UI vides → defaults, comme le runner), même nettoyage (prepare_ohlc).
+  - Amorçage (1er passage, nouvelle stratégie, params changés) : la stratégie "rejoue"
+    l'historique live SANS écrire de signaux (pas de rafale d'anciens signaux).
+  - Config : LIVE_SCAN_STRATEGIES / LIVE_SCAN_SYMBOLS (listes "a,b", vide = tout),
+    LIVE_SCAN_INTERVAL_MIN (0 = job désactivé).
+"""
+
+import json
+import os
+import threading
+from datetime import datetime, timezone
+from pathlib import Path
+
+import pandas as pd
+
+from app.core.paths import DATA_ROOT, OUTPUT_LIVE_DIR
+from app.utils.json_db import file_lock, read_json, write_json_atomic
+
+LIVE_SCAN_DIR = DATA_ROOT / "live_scan"
+STATE_DIR = LIVE_SCAN_DIR / "state"
+SIGNALS_FILE = LIVE_SCAN_DIR / "signals.jsonl"
+LOCK_FILE = LIVE_SCAN_DIR / ".scan.lock"
+LIVE_SCAN_INTERVAL_MIN = int(os.getenv("LIVE_SCAN_INTERVAL_MIN", "5"))
+STATE_VERSION = 1
+
+_RUN_LOCK = threading.Lock()
+
+
+def _env_list(name: str) -> list:
+    return [s.strip() for s in os.getenv(name, "").split(",") if s.strip()]
+
+
+def scan_strategies(only=None) -> list:
+    """Stratégies scannées : celles du pipeline (flux incrémental possible) ∩ registre."""
+    from app.core import strategy_registry
+    from app.strategies.base.pipeline import VARIANTS
+
+    wanted = list(only or _env_list("LIVE_SCAN_STRATEGIES") or strategy_registry.names())
+    return [s for s in wanted if s in VARIANTS]
+
+
+def scan_streams(symbols=None) -> list:
+    """[(symbole, timeframe)] présents dans OUTPUT_LIVE_DIR (filtrés par symboles si fournis)."""
+    wanted = set(symbols or _env_list("LIVE_SCAN_SYMBOLS"))
+    if not OUTPUT_LIVE_DIR.exists():
+        return []
+    out = []
+    for sym_dir in sorted(p for p in OUTPUT_LIVE_DIR.iterdir() if p.is_dir()):
+        if wanted and sym_dir.name not in wanted:
+            continue
+        out.extend((sym_dir.name, tf.name) for tf in sorted(sym_dir.iterdir()) if tf.is_dir())
+    return out
+
+
+def _state_path(symbol: str, tf: str) -> Path:
+    return STATE_DIR / f"{symbol}__{tf}.json"
+
+
+def _read_live(files, since=None) -> pd.DataFrame:
+    """CSV live → df au format runner (index Datetime naïf, colonne time), lignes > since."""
+    dfs = []
+    for file in files:
+        try:
+            df = pd.read_csv(file)
+        except Exception as e:
+            print(f"❌ Live scan : lecture impossible {file.name} → {e}")
+            continue
+        if "Datetime" not in df.columns:
+            for alt in ("time", "Date"):
+                if alt in df.columns:
+                    df.rename(columns={alt: "Datetime"}, inplace=True)
+                    break
+            else:
+                print(f"❌ Live scan : colonne temporelle manquante dans {file.name}")
+                continue
+        df["Datetime"] = pd.to_datetime(df["Datetime"], errors="coerce").dt.tz_localize(None)
+        df.dropna(subset=["Datetime"], inplace=True)
+        if since is not None:
+            df = df[df["Datetime"] > since]
+        if not df.empty:
+            dfs.append(df)
+    if not dfs:
+        return pd.DataFrame()
+
+    df = pd.concat(dfs).set_index("Datetime")
+    df = df[~df.index.duplicated(keep="last")].sort_index()
+    df["time"] = df.index
+    from app.core.runner_core import prepare_ohlc
+    clean = prepare_ohlc(df)
+    return pd.DataFrame() if isinstance(clean, dict) else clean
+
+
+def _effective_params(name: str, pip: float, columns) -> dict:
+    from app.core.strategy_registry import get_strategy_func, spec_for_func
+
+    eff, _ = spec_for_func(get_strategy_func(name)).normalize({}, pip, columns)
+    return eff
+
+
+def _params_key(params: dict) -> str:
+    return json.dumps(params, sort_keys=True, default=str)
+
+
+def _jsonable(value):
+    if isinstance(value, pd.Timestamp):
+        return value.isoformat()
+    if hasattr(value, "item"):  # scalaires numpy
+        return value.item()
+    return value
+
+
+def scan_stream(symbol: str, tf: str, strategies: list) -> dict:
+    """Un flux (symbole, TF) : nouvelles bougies → signaux de chaque stratégie. Retourne un résumé."""
+    from app.core.runner_core import resolve_pip
+    from app.strategies.base.streaming import VariantStream
+
+    live_dir = OUTPUT_LIVE_DIR / symbol / tf
+    state_path = _state_path(symbol, tf)
+    state = read_json(state_path, {})
+    if state.get("version") != STATE_VERSION:
+        state = {}
+    last_time = pd.Timestamp(state["last_time"]) if state.get("last_time") else None
+    seen = state.get("files") or {}
+    saved = state.get("streams") or {}
+
+    files = sorted(live_dir.glob("*.csv"))
+    prints = {f.name: [f.stat().st_mtime_ns, f.stat().st_size] for f in files}
+    changed = [f for f in files if seen.get(f.name) != prints[f.name]]
+
+    fresh = _read_live(changed, since=last_time)
+    history = None
+    if last_time is None:
+        history, fresh = fresh, pd.DataFrame()  # 1er passage : tout est historique
+
+    def _history():
+        df = _read_live(files, since=None)
+        return df if last_time is None or df.empty else df[df.index <= last_time]
+
+    missing = [s for s in strategies if s not in saved]
+    if missing and history is None and fresh.empty:
+        history = _history()
+    ref = fresh if not fresh.empty else history
+    if ref is None or ref.empty:
+        if state.get("last_time"):
+            write_json_atomic(state_path, {**state, "files": prints})
+        return {"symbol": symbol, "timeframe": tf, "new_bars": 0, "signals": 0, "bootstrapped": []}
+
+    pip = resolve_pip(symbol)
+    streams, bootstrapped, rows = {}, [], []
+    for name in strategies:
+        params = _effective_params(name, pip, ref.columns)
+        key = _params_key(params)
+        entry = saved.get(name)
+        stream = None
+        if entry and entry.get("key") == key:
+            try:
+                stream = VariantStream.from_state(entry["state"])
+            except Exception as e:
+                print(f"⚠️ Live scan : état illisible {symbol}/{tf}/{name} → réamorçage ({e})")
+        if stream is None:
+            if history is None:
+                history = _history()
+            stream = VariantStream(name, params)
+            stream.update(history)  # amorçage : signaux non écrits
+            bootstrapped.append(name)
+        for sig in stream.update(fresh):
+            rows.append({"symbol": symbol, "timeframe": tf, "strategy": name,
+                         **{k: _jsonable(v) for k, v in sig.items()}})
+        streams[name] = {"key": key, "state": stream.to_state()}
+
+    if rows:
+        detected_at = datetime.now(timezone.utc).isoformat()
+        with SIGNALS_FILE.open("a", encoding="utf-8") as f:
+            for row in rows:
+                f.write(json.dumps({**row, "detected_at": detected_at}, ensure_ascii=False) + "\n")
+
+    new_last = max(x.index[-1] for x in (fresh, history) if x is not None and not x.empty)
+    if last_time is not None:
+        new_last = max(new_last, last_time)
+    write_json_atomic(state_path, {
+        "version": STATE_VERSION, "symbol": symbol, "timeframe": tf,
+        "last_time": new_last.isoformat(), "files": prints,
+        "streams": streams,  # stratégies retirées : état abandonné (réamorcées si réactivées)
+    })
+    return {"symbol": symbol, "timeframe": tf, "new_bars": len(fresh), "signals": len(rows),
+            "bootstrapped": bootstrapped}
+
+
+def run_live_scan(symbols=None, strategies=None) -> dict:
+    """Passage complet (job planifié / admin). Un seul passage à la fois (thread + workers)."""
+    if not _RUN_LOCK.acquire(blocking=False):
+        return {"status": "busy"}
+    try:
+        STATE_DIR.mkdir(parents=True, exist_ok=True)
+        names = scan_strategies(strategies)
+        results = []
+        try:
+            with file_lock(LOCK_FILE, timeout=0):
+                for symbol, tf in scan_streams(symbols):
+                    try:
+                        results.append(scan_stream(symbol, tf, names))
+                    except Exception as e:
+                        print(f"❌ Live scan {symbol}/{tf} : {e}")
+                        results.append({"symbol": symbol, "timeframe": tf, "error": str(e)})
+        except TimeoutError:
+            return {"status": "busy"}
+        total = sum(r.get("signals", 0) for r in results)
+        print(f"🛰️ Live scan : {len(results)} flux, {len(names)} stratégies, {total} signaux")
+        return {"status": "ok", "strategies": len(names), "streams": results, "signals": total}
+    finally:
+        _RUN_LOCK.release()
+
+
+def read_signals(limit: int = 200) -> list:
+    """Derniers signaux détectés (les plus récents en dernier)."""
+    if not SIGNALS_FILE.exists():
+        return []
+    out = []
+    with SIGNALS_FILE.open("r", encoding="utf-8") as f:
+        for line in f:
+            line = line.strip()
+            if line:
+                try:
+                    out.append(json.loads(line))
+                except json.JSONDecodeError:
+                    continue
+    return out[-max(int(limit), 0):] if limit else out
@@ -0,0 +1,200 @@
+"""
+File: backend/app/services/multi_symbol_service.py
+Role: Backtest "fan-out" d'une stratégie sur une liste (ou un groupe du pip_registry) de symboles.
+Depends:
+  - app.utils.data_loader.load_data_cached (cache mémoire, frame partagé lecture seule)
+  - app.core.runner_core.run_backtest / app.core.analyseur_core.run_analysis (1 run classique par symbole)
+  - app.utils.pip_registry (groupes + pip par symbole, appliqué par le runner)
+Side-effects:
+  - 1 dossier de résultats standard par symbole dans ANALYSIS_DIR
+  - Classement croisé : DATA_ROOT/analysis_multi/<strat>_<tf>_<période>__<ts>/league.{csv,xlsx}
+Notes:
+  - Pool de process PARTAGÉ entre requêtes (MULTI_SYMBOL_PROCS) = plafond global de CPU.
+  - Chaque requête n'a au plus que MULTI_SYMBOL_PER_REQUEST symboles en vol :
+    une requête "30 symboles" ne monopolise pas le pool, les autres s'intercalent.
+  - Pool "spawn" (pas de fork d'un process uvicorn multi-thread) ; les workers vivent
+    entre les requêtes → leur cache data reste chaud.
+"""
+
+import multiprocessing
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+from datetime import datetime
+from pathlib import Path
+from typing import List, Optional
+
+import numpy as np
+import pandas as pd
+
+from app.core.paths import DATA_ROOT, OUTPUT_DIR, OUTPUT_LIVE_DIR
+from app.core.strategy_registry import get_strategy_func
+from app.utils.pip_registry import list_registry_symbols
+from app.utils.results_table import code, open_results
+
+MULTI_SYMBOL_PROCS = int(os.getenv("MULTI_SYMBOL_PROCS", str(max(1, (os.cpu_count() or 2) - 1))))
+MULTI_SYMBOL_PER_REQUEST = int(os.getenv("MULTI_SYMBOL_PER_REQUEST", str(max(1, MULTI_SYMBOL_PROCS // 2))))
+MULTI_SYMBOL_MAX = int(os.getenv("MULTI_SYMBOL_MAX", "40"))
+MULTI_DIR = DATA_ROOT / "analysis_multi"
+
+LEAGUE_COLUMNS = [
+    "rank", "symbol", "status", "trades", "winrate_tp1", "winrate_tp2",
+    "tp1", "sl", "tp2", "pip", "duration_ms", "folder", "error",
+]
+
+_POOL: Optional[ProcessPoolExecutor] = None
+_POOL_LOCK = threading.Lock()
+
+
+def _get_pool() -> ProcessPoolExecutor:
+    """Pool global paresseux (recréé s'il a été cassé par un worker mort)."""
+    global _POOL
+    with _POOL_LOCK:
+        if _POOL is None or getattr(_POOL, "_broken", False):
+            _POOL = ProcessPoolExecutor(
+                max_workers=MULTI_SYMBOL_PROCS,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return _POOL
+
+
+def resolve_symbols(symbols: Optional[List[str]] = None, group: Optional[str] = None) -> List[str]:
+    """
+    Liste explicite (telle quelle) ou groupe du registre (filtré sur les symboles
+    ayant des données sur disque, pour ne pas déclencher 30 extractions yfinance).
+    """
+    out = [s.strip() for s in (symbols or []) if s and s.strip()]
+    if group:
+        for sym in list_registry_symbols(group):
+            if (OUTPUT_DIR / sym).exists() or (OUTPUT_LIVE_DIR / sym).exists():
+                out.append(sym)
+    return list(dict.fromkeys(out))
+
+
+def _summarize_results(csv_path: str) -> dict:
+    """Métriques de classement depuis les résultats du run (mêmes définitions que l'analyseur)."""
+    try:
+        arr = open_results(csv_path)
+        phase, result = np.asarray(arr["phase"]), np.asarray(arr["result"])
+    except Exception:
+        phase = result = np.empty(0, dtype=np.int8)  # fichier absent / vide = 0 signal
+    p1, p2 = phase == code("phase", "TP1"), phase == code("phase", "TP2")
+    trades = int(p1.sum())
+    tp1 = int((p1 & (result == code("result", "TP1"))).sum())
+    tp2 = int((p2 & (result == code("result", "TP2"))).sum())
+    return {
+        "trades": trades,
+        "tp1": tp1,
+        "sl": trades - tp1,
+        "tp2": tp2,
+        "winrate_tp1": round(tp1 / trades * 100, 2) if trades else 0,
+        "winrate_tp2": round(tp2 / trades * 100, 2) if trades else 0,
+    }
+
+
+def _run_symbol_job(job: dict) -> dict:
+    """
+    Worker (process) : load (cache) → run_backtest (pip du symbole) → run_analysis.
+    Ne lève jamais : retourne toujours un dict avec "status".
+    """
+    from app.core.analyseur_core import run_analysis
+    from app.core.runner_core import resolve_pip, run_backtest
+    from app.utils.data_loader import load_data_cached
+
+    t0 = time.perf_counter()
+    sym = job["symbol"]
+    out = {"symbol": sym, "pip": resolve_pip(sym)}
+    try:
+        df = load_data_cached(sym, job["timeframe"], job["start_date"], job["end_date"], readonly=True)
+    except Exception as e:
+        return {**out, "status": "no_data", "error": str(e)}
+    if df is None or df.empty:
+        return {**out, "status": "no_data", "error": "Aucune donnée"}
+
+    try:
+        func = get_strategy_func(job["strategy"])
+        csv_path = run_backtest(
+            df=df, strategy_name=job["strategy"], strategy_func=func,
+            sl_pips=job["sl_pips"], tp1_pips=job["tp1_pips"], tp2_pips=job["tp2_pips"],
+            symbol=sym, timeframe=job["timeframe"], period=job["period"],
+            auto_analyze=False, params=dict(job.get("params") or {}), user_id=job.get("user_id"),
+        )
+        if isinstance(csv_path, dict):
+            return {**out, "status": "error", "error": csv_path.get("error")}
+
+        xlsx_path = run_analysis(csv_path, job["strategy"], sym, job["sl_pips"], job["period"])
+        out.update(_summarize_results(csv_path))
+        out.update({
+            "status": "ok" if xlsx_path and Path(xlsx_path).exists() else "no_analysis",
+            "folder": Path(csv_path).parent.name,
+            "csv": str(csv_path),
+            "xlsx": str(xlsx_path) if xlsx_path else None,
+        })
+    except Exception as e:
+        out.update({"status": "error", "error": str(e)})
+    out["duration_ms"] = int((time.perf_counter() - t0) * 1000)
+    return out
+
+
+def run_multi_symbol_backtest(strategy: str, symbols: List[str], timeframe: str, start_date: str,
+                              end_date: str, sl_pips: int, tp1_pips: int, tp2_pips: int,
+                              params: Optional[dict] = None, user_id: Optional[str] = None,
+                              per_request: Optional[int] = None) -> dict:
+    """
+    Exécute la stratégie sur chaque symbole (pool global, fenêtre glissante par requête)
+    et écrit un classement croisé.
+
+    Returns:
+        dict {"folder", "csv", "xlsx", "league": [...], "results": [...]}
+    """
+    period = f"{start_date} to {end_date}"
+    base_job = {
+        "strategy": strategy, "timeframe": timeframe, "start_date": start_date, "end_date": end_date,
+        "sl_pips": sl_pips, "tp1_pips": tp1_pips, "tp2_pips": tp2_pips, "period": period,
+        "params": params or {}, "user_id": user_id,
+    }
+    pending = [dict(base_job, symbol=s) for s in symbols]
+    cap = max(1, int(per_request or MULTI_SYMBOL_PER_REQUEST))
+    pool = _get_pool()
+    print(f"🌐 Multi-symbol {strategy} {timeframe} : {len(pending)} symbole(s), {cap} en vol max")
+
+    results, in_flight = [], {}
+    while pending or in_flight:
+        while pending and len(in_flight) < cap:
+            job = pending.pop(0)
+            in_flight[pool.submit(_run_symbol_job, job)] = job["symbol"]
+        done, _ = wait(list(in_flight), return_when=FIRST_COMPLETED)
+        for fut in done:
+            sym = in_flight.pop(fut)
+            try:
+                results.append(fut.result())
+            except Exception as e:  # worker mort / pool cassé
+                results.append({"symbol": sym, "status": "error", "error": str(e)})
+
+    # 🏆 Classement : symboles OK d'abord, winrate TP1 puis nb de trades
+    league = pd.DataFrame(results)
+    for col in LEAGUE_COLUMNS:
+        if col not in league.columns:
+            league[col] = None
+    league["_ok"] = league["status"].isin(["ok", "no_analysis"])
+    league = league.sort_values(
+        ["_ok", "winrate_tp1", "trades"], ascending=[False, False, False], na_position="last"
+    ).reset_index(drop=True)
+    league["rank"] = range(1, len(league) + 1)
+    league = league[LEAGUE_COLUMNS]
+
+    stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+    period_clean = period.replace(" ", "").replace(":", "")
+    folder = f"{strategy}_{timeframe}_{period_clean}_sl{sl_pips}__multi_{stamp}"
+    out_dir = MULTI_DIR / folder
+    out_dir.mkdir(parents=True, exist_ok=True)
+    csv_path, xlsx_path = out_dir / "league.csv", out_dir / "league.xlsx"
+    league.to_csv(csv_path, index=False)
+    with pd.ExcelWriter(xlsx_path, engine="openpyxl") as writer:
+        league.to_excel(writer, sheet_name="Classement", index=False)
+    print(f"🏁 Multi-symbol terminé → {out_dir}")
+
+    records = league.astype(object).where(pd.notna(league), None).to_dict(orient="records")
+    return {"folder": folder, "csv": str(csv_path), "xlsx": str(xlsx_path),
+            "league": records, "results": results}
@@ -1,25 +1,26 @@
 """
 File: backend/app/services/official_data_service.py
-Role: Helpers pour la librairie 'official' (répertoire & listing).
+Role: Helpers pour la librairie 'official' (répertoire & listing via csv_catalog_service).
 """
 
 from pathlib import Path
-import os
 from app.core.paths import DATA_ROOT
 
 OFFICIAL_DIR = DATA_ROOT / "official"
 
-def list_official_csv_files():
-    files = []
-    if not OFFICIAL_DIR.exists():
-        return files
-    for filename in os.listdir(OFFICIAL_DIR):
-        if filename.endswith(".csv"):
-            filepath = OFFICIAL_DIR / filename
-            size_kb = round(filepath.stat().st_size / 1024, 2)
-            files.append({
-                "filename": filename,
-                "size_kb": size_kb,
-                "path": str(filepath)
-            })
-    return files
+def list_official_csv_files(offset: int = 0, limit=None):
+    """
+    CSV de data/official depuis le catalogue en mémoire (pas de listdir/stat par requête).
+    Retour: (total, [ { filename, size_kb, path, rows, first, last }, ... ])
+    """
+    from app.services.csv_catalog_service import OFFICIAL_CATALOG, query
+
+    total, page = query(OFFICIAL_CATALOG.entries(), offset=offset, limit=limit)
+    return total, [{
+        "filename": e["filename"],
+        "size_kb": round(e["size"] / 1024, 2),
+        "path": str(OFFICIAL_DIR / e["filename"]),
+        "rows": e["rows"],
+        "first": e["first"],
+        "last": e["last"],
+    } for e in page]
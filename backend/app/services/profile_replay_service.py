@@ -0,0 +1,175 @@
+"""
+File: backend/app/services/profile_replay_service.py
+Role: Rejoue un run existant (dossier ANALYSIS_DIR + params.json) sous cProfile/tracemalloc
+      et range les artefacts à côté du run d'origine.
+Depends:
+  - app.utils.profiling.ProfileCapture
+  - app.utils.data_loader / app.core.runner_core / app.core.analyseur_core (pipeline normal)
+Side-effects:
+  - Écrit ANALYSIS_DIR/<folder>/profile/<stamp>/{run.prof, cprofile_top.txt, tracemalloc_top.txt, summary.json}
+  - Résultats du replay écrits dans un dossier temporaire isolé (jamais dans ANALYSIS_DIR, pas de
+    leaderboard) puis supprimés ; keep_output=True → déplacés dans profile/<stamp>/output/
+Notes:
+  - symbol + période ne sont pas dans params.json → relus depuis le nom du dossier
+    (<SYM>_<TF>_<strat>_<YYYY-MM-DD>to<YYYY-MM-DD>_sl<N>__h<run_id>).
+  - params.json contient les params EFFECTIFS (*_pips déjà × pip) → reconvertis en pips
+    avant de repasser dans build_strategy_params (arrondi : 0.5 / 0.1 → 5, pas 5.000000000000001,
+    pour retrouver exactement les valeurs UI et donc le même run_id / les mêmes params effectifs).
+"""
+
+import re
+import shutil
+import tempfile
+from datetime import datetime
+from pathlib import Path
+from typing import Optional
+
+from app.core.paths import ANALYSIS_DIR, CACHE_DIR
+from app.core.strategy_registry import get_strategy_func
+from app.utils.json_db import read_json
+from app.utils.profiling import PROFILE_FILES, ProfileCapture
+
+FOLDER_RE = re.compile(
+    r"^(?P<symbol>[^_]+)_(?P<timeframe>[^_]+)_(?P<strategy>.+)_"
+    r"(?P<start_date>\d{4}-\d{2}-\d{2})to(?P<end_date>\d{4}-\d{2}-\d{2})"
+    r"_sl(?P<sl_pips>\d+)__h(?P<run_id>[A-Za-z0-9]+)$"
+)
+RUNNER_KEYS = ("sl_pips", "tp1_pips", "tp2_pips", "pip_used")
+PROFILE_SUBDIR = "profile"
+
+
+def _safe_name(name: str) -> bool:
+    return bool(name) and "/" not in name and "\\" not in name and name not in (".", "..")
+
+
+def run_dir(folder: str) -> Optional[Path]:
+    """Dossier de run (enfant direct de ANALYSIS_DIR) ou None."""
+    if not _safe_name(folder):
+        return None
+    path = ANALYSIS_DIR / folder
+    return path if path.is_dir() else None
+
+
+def _ui_pips(value: float, pip) -> float:
+    """Valeur effective (prix) → pips UI d'origine, sans bruit flottant (int si entier)."""
+    v = round(float(value) / float(pip), 6)
+    return int(v) if v.is_integer() else v
+
+
+def load_run_config(folder: str) -> dict:
+    """
+    Reconstitue la requête d'origine d'un run.
+
+    Raises:
+        FileNotFoundError / ValueError si le dossier ou params.json est inexploitable.
+    """
+    path = run_dir(folder)
+    if path is None:
+        raise FileNotFoundError(f"Run introuvable : {folder}")
+    m = FOLDER_RE.match(folder)
+    if not m:
+        raise ValueError(f"Nom de dossier non reconnu : {folder}")
+    meta = read_json(path / "params.json", None)
+    if not meta:
+        raise FileNotFoundError("params.json absent")
+
+    logged = dict(meta.get("params") or {})
+    pip = logged.get("pip_used")
+    ui_params = {}
+    for k, v in logged.items():
+        if k in RUNNER_KEYS:
+            continue
+        if k.endswith("_pips") and pip and isinstance(v, (int, float)) and not isinstance(v, bool):
+            v = _ui_pips(v, pip)  # le runner re-multiplie par pip
+        ui_params[k] = v
+
+    tp2 = logged.get("tp2_pips")
+    return {
+        "strategy": meta.get("strategy") or m["strategy"],
+        "symbol": m["symbol"],
+        "timeframe": meta.get("timeframe") or m["timeframe"],
+        "start_date": m["start_date"],
+        "end_date": m["end_date"],
+        "sl_pips": int(logged.get("sl_pips", m["sl_pips"])),
+        "tp1_pips": int(logged.get("tp1_pips", 100)),
+        "tp2_pips": int(tp2) if tp2 is not None else 200,
+        "params": ui_params,
+        "run_id": meta.get("run_id") or m["run_id"],
+    }
+
+
+def replay_with_profile(folder: str, user_id: Optional[str] = None, keep_output: bool = False,
+                        top: int = 40) -> dict:
+    """
+    Rejoue load → run_backtest → run_analysis sous ProfileCapture.
+
+    Returns:
+        dict résumé (summary.json) + "stamp", "profile_dir", "replay_folder".
+    """
+    from app.core.analyseur_core import run_analysis
+    from app.core.runner_core import run_backtest
+    from app.utils.data_loader import load_data_or_extract
+
+    cfg = load_run_config(folder)
+    strategy_func = get_strategy_func(cfg["strategy"])
+    period = f"{cfg['start_date']} to {cfg['end_date']}"
+
+    error, csv_path, xlsx_path, bars = None, None, None, 0
+    # 🔒 Racine isolée : le run_id est déterministe → dans ANALYSIS_DIR le replay pourrait écraser
+    #    (ou, au nettoyage, supprimer) un vrai run identique de l'admin.
+    CACHE_DIR.mkdir(parents=True, exist_ok=True)
+    scratch = Path(tempfile.mkdtemp(prefix="profile_replay_", dir=CACHE_DIR))
+    try:
+        with ProfileCapture(top=top) as cap:
+            df = load_data_or_extract(cfg["symbol"], cfg["timeframe"], cfg["start_date"], cfg["end_date"])
+            bars = len(df)
+            csv_path = run_backtest(
+                df=df, strategy_name=cfg["strategy"], strategy_func=strategy_func,
+                sl_pips=cfg["sl_pips"], tp1_pips=cfg["tp1_pips"], tp2_pips=cfg["tp2_pips"],
+                symbol=cfg["symbol"], timeframe=cfg["timeframe"], period=period,
+                auto_analyze=False, params=dict(cfg["params"]), user_id=user_id, output_root=scratch,
+            )
+            if isinstance(csv_path, dict):
+                error, csv_path = csv_path.get("error"), None
+            else:
+                xlsx_path = run_analysis(csv_path, cfg["strategy"], cfg["symbol"], cfg["sl_pips"], period,
+                                         record_leaderboard=False)
+
+        stamp = datetime.now().strftime("%Y%m%d_%H%M%S")
+        out_dir = ANALYSIS_DIR / folder / PROFILE_SUBDIR / stamp
+        replay_folder = Path(csv_path).parent.name if csv_path else None
+        summary = cap.save(out_dir, meta={
+            "folder": folder, "replay_folder": replay_folder, "bars": bars,
+            "config": cfg, "error": error, "xlsx_ok": bool(xlsx_path and Path(xlsx_path).exists()),
+        })
+
+        if keep_output and replay_folder:
+            shutil.move(str(scratch / replay_folder), str(out_dir / "output"))
+    finally:
+        # 🧹 Seul le dossier temporaire du replay est supprimé : aucun run existant n'est touché
+        shutil.rmtree(scratch, ignore_errors=True)
+
+    print(f"🔬 Profil enregistré : {out_dir}")
+    return {**summary, "stamp": stamp, "profile_dir": str(out_dir)}
+
+
+def list_profiles(folder: str) -> list:
+    """Captures existantes d'un run (plus récente d'abord)."""
+    path = run_dir(folder)
+    if path is None or not (path / PROFILE_SUBDIR).is_dir():
+        return []
+    out = []
+    for d in sorted((path / PROFILE_SUBDIR).iterdir(), reverse=True):
+        if d.is_dir():
+            out.append({"stamp": d.name, "summary": read_json(d / "summary.json", None),
+                        "files": [f for f in PROFILE_FILES if (d / f).exists()]})
+    return out
+
+
+def profile_file(folder: str, stamp: str, filename: str) -> Optional[Path]:
+    """Chemin d'un artefact de profil (noms whitelistés) ou None."""
+    path = run_dir(folder)
+    if path is None or not _safe_name(stamp) or filename not in PROFILE_FILES:
+        return None
+    f = path / PROFILE_SUBDIR / stamp / filename
+    return f if f.is_file() else None
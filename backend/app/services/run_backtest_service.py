@@ -1,8 +1,9 @@
 """
 File: backend/app/services/run_backtest_service.py
-Role: Helpers utilisés par les routes de backtest (dates, symbol, timeframe).
+Role: Helpers utilisés par les routes de backtest (dates, symbol, timeframe, grilles SL/TP).
 """
 
+import os
 import re
 import pandas as pd
 from datetime import datetime, timedelta
@@ -11,6 +12,10 @@ DATE_PATTERNS = ("%Y-%m-%d", "%d-%m-%Y", "%d/%m/%Y", "%Y/%m/%d")
 PAIR_RE = re.compile(r'([A-Z0-9]{2,6}[-_/]?[A-Z0-9]{2,6})', re.IGNORECASE)
 TF_RE   = re.compile(r'\b(M5|M15|M30|H1|H4|D1)\b', re.IGNORECASE)
 
+# Surface SL/TP : taille max d'un axe + multiples par défaut de la valeur du run
+SURFACE_MAX_LEVELS = int(os.getenv("SURFACE_MAX_LEVELS", "40"))
+SURFACE_DEFAULT_STEPS = (0.25, 0.5, 0.75, 1, 1.25, 1.5, 2, 3)
+
 def _parse_date_flex(s: str) -> datetime | None:
     if not s: return None
     s = str(s).strip().replace("Z", "")
@@ -29,6 +34,13 @@ def _parse_date_flex(s: str) -> datetime | None:
 def _days_inclusive(d1: datetime, d2: datetime) -> int:
     return (d2.date() - d1.date()).days + 1
 
+def _admission_cost(start_date: str, end_date: str) -> float:
+    """Coût relatif pour l'admission : 1 par tranche de 31 jours (min 1, 1 si dates illisibles)."""
+    sd, ed = _parse_date_flex(start_date), _parse_date_flex(end_date)
+    if not sd or not ed:
+        return 1.0
+    return max(1.0, _days_inclusive(sd, ed) / 31)
+
 def _detect_symbol_from_name(name: str) -> str | None:
     if not name: return None
     core = TF_RE.sub(" ", name)
@@ -52,3 +64,14 @@ def _infer_tf_from_df(df: pd.DataFrame) -> str | None:
     minutes = int(dt / timedelta(minutes=1))
     mapping = {5:"M5",15:"M15",30:"M30",60:"H1",240:"H4",1440:"D1"}
     return mapping.get(minutes)
+
+def _surface_grid(values, ref) -> list:
+    """Axe SL ou TP de la surface (pips > 0, triés, dédoublonnés) ; vide → multiples de ref."""
+    if not values:
+        values = [float(round(ref * k, 1)) for k in SURFACE_DEFAULT_STEPS]
+    grid = sorted(set(values))
+    if not grid or grid[0] <= 0:
+        raise ValueError("Les niveaux SL/TP doivent être > 0 pips.")
+    if len(grid) > SURFACE_MAX_LEVELS:
+        raise ValueError(f"Grille trop grande ({len(grid)} niveaux). Maximum autorisé: {SURFACE_MAX_LEVELS}.")
+    return grid
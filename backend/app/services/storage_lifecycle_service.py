@@ -0,0 +1,351 @@
+"""
+File: backend/app/services/storage_lifecycle_service.py
+Role: Cycle de vie du stockage ANALYSIS_DIR : orphelins, dédoublonnage (liens physiques),
+      compactage des runs froids, quotas par utilisateur / global — avec rapport dry-run.
+Depends:
+  - app.utils.run_archive (archive run_archive.zip lisible en transparence, liens physiques)
+  - app.services.leaderboard_service.remove_folder (runs supprimés retirés du classement)
+  - app.utils.json_db (lock inter-workers, lecture users.json)
+Side-effects:
+  - Supprime / remplace des fichiers sous ANALYSIS_DIR (sauf dry_run=True)
+  - Dernier rapport : DATA_ROOT/storage/lifecycle_report.json
+Notes:
+  - Ordre des étapes : orphelins → doublons → compactage → quotas (les quotas voient
+    les tailles après récupération ; en dry-run la même simulation est appliquée).
+  - Orphelins : dossier sans params*.json ni .xlsx, run d'un user supprimé, fichiers .tmp abandonnés.
+  - Doublons : fichiers ≥ STORAGE_DEDUPE_MIN_KB (hors .json / .txt, réécrits en place) de contenu
+    identique (sha1) → 1 seul inode ; les écrivains appellent run_archive.break_link avant réécriture.
+  - Compactage : run inactif depuis STORAGE_COLD_DAYS → .csv / .txt / .npy dans run_archive.zip
+    (XLSX déjà compressé et params.json scannés par le dashboard : laissés à plat).
+  - Quotas : runs les plus anciens évincés d'abord ; rien de plus récent que STORAGE_MIN_AGE_H
+    n'est jamais touché (run en cours d'écriture / de consultation).
+  - Config : STORAGE_USER_QUOTA_MB (0 = off), STORAGE_GLOBAL_QUOTA_MB (0 = off),
+    STORAGE_LIFECYCLE_INTERVAL_H (24, 0 = job désactivé).
+  - ⚠️ Le job planifié tourne en dry-run (rapport seul) tant que STORAGE_LIFECYCLE_APPLY=1
+    n'est pas posé par l'opérateur : rien n'est supprimé / évincé par défaut au déploiement.
+"""
+
+import hashlib
+import io
+import os
+import shutil
+import time
+import uuid
+import zipfile
+from datetime import datetime, timezone
+from pathlib import Path
+
+from app.core.paths import ANALYSIS_DIR, DATA_ROOT, USERS_JSON
+from app.utils import run_archive
+from app.utils.json_db import file_lock, read_json, write_json_atomic
+
+STORAGE_DIR = DATA_ROOT / "storage"
+REPORT_FILE = STORAGE_DIR / "lifecycle_report.json"
+LOCK_FILE = STORAGE_DIR / ".lifecycle.lock"
+
+STORAGE_COLD_DAYS = float(os.getenv("STORAGE_COLD_DAYS", "14"))
+STORAGE_MIN_AGE_H = float(os.getenv("STORAGE_MIN_AGE_H", "24"))
+STORAGE_USER_QUOTA_MB = float(os.getenv("STORAGE_USER_QUOTA_MB", "0"))
+STORAGE_GLOBAL_QUOTA_MB = float(os.getenv("STORAGE_GLOBAL_QUOTA_MB", "0"))
+STORAGE_DEDUPE_MIN_KB = int(os.getenv("STORAGE_DEDUPE_MIN_KB", "64"))
+STORAGE_LIFECYCLE_INTERVAL_H = int(os.getenv("STORAGE_LIFECYCLE_INTERVAL_H", "24"))
+# Opt-in explicite : sans lui, le job planifié ne fait que produire le rapport dry-run
+STORAGE_LIFECYCLE_APPLY = os.getenv("STORAGE_LIFECYCLE_APPLY", "0").strip().lower() in ("1", "true", "yes")
+
+COMPACT_SUFFIXES = (".csv", ".txt", ".npy")
+_NO_DEDUPE_SUFFIXES = (".json", ".txt")  # réécrits / complétés en place
+
+
+# --- inventaire ---------------------------------------------------------------
+
+def _files(folder: Path) -> list:
+    return [p for p in folder.rglob("*") if p.is_file()]
+
+
+def _owner(folder: Path):
+    for meta in sorted(folder.glob("params*.json")):
+        data = read_json(meta, {})
+        if isinstance(data, dict) and data.get("user_id"):
+            return str(data["user_id"])
+    return None
+
+
+def scan_runs(base: Path = ANALYSIS_DIR) -> list:
+    """[{folder, path, owner, bytes, last, files}] des dossiers de run (plus ancien d'abord)."""
+    runs = []
+    if not Path(base).exists():
+        return runs
+    for folder in Path(base).iterdir():
+        if not folder.is_dir() or folder.name.startswith("."):
+            continue
+        files = _files(folder)
+        stats = [f.stat() for f in files]
+        runs.append({
+            "folder": folder.name, "path": folder, "owner": _owner(folder),
+            "bytes": sum(st.st_size for st in stats),
+            "last": max([st.st_mtime for st in stats] + [folder.stat().st_mtime]),
+            "files": files,
+        })
+    runs.sort(key=lambda r: r["last"])
+    return runs
+
+
+def _known_users():
+    """Identifiants connus (clés token + champ id) ; None si users.json illisible → pas de purge."""
+    users = read_json(USERS_JSON, None)
+    if not isinstance(users, dict) or not users:
+        return None
+    ids = set(users)
+    ids.update(str(u["id"]) for u in users.values() if isinstance(u, dict) and u.get("id"))
+    return ids
+
+
+class _Links:
+    """Liens restants par inode (simulés en dry-run) → octets réellement libérés, liens physiques compris."""
+
+    def __init__(self, runs: list):
+        self.key, self.count, self.size = {}, {}, {}
+        for run in runs:
+            for f in run["files"]:
+                st = f.stat()
+                k = (st.st_dev, st.st_ino)
+                self.key[f] = k
+                self.count[k] = st.st_nlink  # liens hors ANALYSIS_DIR compris : jamais "libérés"
+                self.size[k] = st.st_size
+
+    def total(self) -> int:
+        return sum(self.size[k] for k, n in self.count.items() if n > 0)
+
+    def unlink(self, path) -> int:
+        k = self.key.pop(path, None)
+        if k is None:
+            return 0
+        self.count[k] -= 1
+        return self.size[k] if self.count[k] == 0 else 0
+
+    def link(self, path, canonical) -> int:
+        freed = self.unlink(path)
+        self.key[path] = self.key[canonical]
+        self.count[self.key[path]] += 1
+        return freed
+
+    def add(self, path, size: int) -> None:
+        k = ("new", str(path))
+        self.key[path], self.count[k], self.size[k] = k, 1, size
+
+
+def _remove_run(run: dict, links: _Links, dry_run: bool) -> int:
+    freed = sum(links.unlink(f) for f in run["files"])
+    if dry_run:
+        return freed
+    shutil.rmtree(run["path"], ignore_errors=True)
+    try:
+        from app.services.leaderboard_service import remove_folder
+        remove_folder(run["folder"])
+    except Exception as e:
+        print("⚠️ Leaderboard non mis à jour :", e)
+    return freed
+
+
+# --- étapes -------------------------------------------------------------------
+
+def purge_orphans(runs: list, links: _Links, now: float, dry_run: bool) -> dict:
+    """Dossiers sans métadonnées, runs de users supprimés, fichiers temporaires abandonnés."""
+    min_age = STORAGE_MIN_AGE_H * 3600
+    users = _known_users()
+    out = {"runs": [], "files": 0, "bytes": 0}
+    for run in list(runs):
+        if now - run["last"] < min_age:
+            continue
+        names = [f.name for f in run["files"]]
+        no_meta = not any(n.startswith("params") and n.endswith(".json") for n in names) \
+            and not any(n.endswith(".xlsx") for n in names)
+        gone = users is not None and run["owner"] is not None and run["owner"] not in users
+        if no_meta or gone:
+            out["runs"].append({"folder": run["folder"], "reason": "no_metadata" if no_meta else "user_deleted",
+                                "bytes": run["bytes"]})
+            out["bytes"] += _remove_run(run, links, dry_run)
+            runs.remove(run)
+            continue
+        stale = [f for f in run["files"]
+                 if f.name.startswith(".") and f.name.endswith(".tmp") and now - f.stat().st_mtime > min_age]
+        for f in stale:
+            out["files"] += 1
+            out["bytes"] += links.unlink(f)
+            run["bytes"] -= f.stat().st_size
+            if not dry_run:
+                f.unlink(missing_ok=True)
+        run["files"] = [f for f in run["files"] if f not in stale]
+    return out
+
+
+def _sha1(path: Path) -> str:
+    h = hashlib.sha1()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(1 << 20), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def dedupe(runs: list, links: _Links, now: float, dry_run: bool) -> dict:
+    """Fichiers identiques (toutes runs confondues) → liens physiques vers un seul inode."""
+    min_age = STORAGE_MIN_AGE_H * 3600
+    by_size = {}
+    for run in runs:
+        for f in run["files"]:
+            if f.suffix.lower() in _NO_DEDUPE_SUFFIXES or f.name.startswith("."):
+                continue
+            st = f.stat()
+            if st.st_size >= STORAGE_DEDUPE_MIN_KB * 1024 and now - st.st_mtime > min_age:
+                by_size.setdefault((st.st_dev, st.st_size), []).append(f)
+
+    out = {"files": 0, "bytes": 0}
+    for (_, size), paths in by_size.items():
+        if len({p.stat().st_ino for p in paths}) < 2:
+            continue
+        by_hash = {}
+        for p in paths:
+            by_hash.setdefault(_sha1(p), []).append(p)
+        for group in by_hash.values():
+            canonical = group[0]
+            ino = canonical.stat().st_ino
+            for p in group[1:]:
+                st = p.stat()
+                if st.st_ino == ino:
+                    continue
+                out["files"] += 1
+                out["bytes"] += links.link(p, canonical)
+                if not dry_run:
+                    run_archive.link_or_copy(canonical, p)
+    return out
+
+
+def _compact_payload(folder: Path, loose: list, target) -> int:
+    """Écrit l'archive (membres existants non remplacés + fichiers à plat) dans target ; retourne sa taille."""
+    old = run_archive.archive_path(folder)
+    loose_names = {p.name for p in loose}
+    with zipfile.ZipFile(target, "w", compression=zipfile.ZIP_DEFLATED, compresslevel=6) as zf:
+        if old.is_file():
+            with zipfile.ZipFile(old) as prev:
+                for name in prev.namelist():
+                    if name in loose_names and not name.endswith(".txt"):
+                        continue  # version à plat plus récente (run relancé)
+                    data = prev.read(name)
+                    if name in loose_names:  # log append-only : ancien contenu + suite
+                        data += (folder / name).read_bytes()
+                        loose_names.discard(name)
+                    zf.writestr(name, data)
+        for p in loose:
+            if p.name in loose_names:
+                zf.write(p, p.name)
+    return target.tell() if hasattr(target, "tell") else Path(target).stat().st_size
+
+
+def compact(runs: list, links: _Links, now: float, dry_run: bool) -> dict:
+    """Runs froids : .csv / .txt / .npy → run_archive.zip (lecture transparente via run_archive)."""
+    cold = STORAGE_COLD_DAYS * 86400
+    out = {"runs": 0, "files": 0, "bytes": 0}
+    for run in runs:
+        if now - run["last"] < max(cold, STORAGE_MIN_AGE_H * 3600):
+            continue
+        folder = run["path"]
+        loose = [f for f in folder.iterdir()
+                 if f.is_file() and f.suffix.lower() in COMPACT_SUFFIXES and not f.name.startswith(".")]
+        if not loose:
+            continue
+        old = run_archive.archive_path(folder)
+        apparent = sum(f.stat().st_size for f in loose) + (old.stat().st_size if old.is_file() else 0)
+        try:
+            if dry_run:
+                new_size = _compact_payload(folder, loose, io.BytesIO())
+            else:
+                tmp = folder / f".{run_archive.ARCHIVE_NAME}.{uuid.uuid4().hex[:8]}.tmp"
+                try:
+                    new_size = _compact_payload(folder, loose, tmp)
+                    os.replace(tmp, old)
+                finally:
+                    tmp.unlink(missing_ok=True)
+                for f in loose:
+                    f.unlink(missing_ok=True)
+        except (OSError, zipfile.BadZipFile) as e:
+            print(f"⚠️ Compactage ignoré {run['folder']} : {e}")
+            continue
+        gain = sum(links.unlink(f) for f in loose) + links.unlink(old) - new_size
+        links.add(old, new_size)
+        run["files"] = [f for f in run["files"] if f not in loose and f != old] + [old]
+        out["runs"] += 1
+        out["files"] += len(loose)
+        out["bytes"] += gain
+        run["bytes"] -= apparent - new_size
+    return out
+
+
+def enforce_quotas(runs: list, links: _Links, now: float, dry_run: bool) -> dict:
+    """Évince les runs les plus anciens au-delà du quota du user, puis du quota global."""
+    min_age = STORAGE_MIN_AGE_H * 3600
+    out = {"runs": [], "bytes": 0}
+
+    def _evict(candidates, excess, reason):
+        for run in candidates:
+            if excess <= 0:
+                break
+            if now - run["last"] < min_age or run not in runs:
+                continue
+            out["runs"].append({"folder": run["folder"], "owner": run["owner"], "reason": reason,
+                                "bytes": run["bytes"]})
+            excess -= run["bytes"]
+            out["bytes"] += _remove_run(run, links, dry_run)
+            runs.remove(run)
+
+    if STORAGE_USER_QUOTA_MB > 0:
+        quota = STORAGE_USER_QUOTA_MB * 1024 * 1024
+        per_user = {}
+        for run in runs:
+            if run["owner"]:
+                per_user.setdefault(run["owner"], []).append(run)
+        for owner, owned in per_user.items():
+            _evict(owned, sum(r["bytes"] for r in owned) - quota, "user_quota")
+
+    if STORAGE_GLOBAL_QUOTA_MB > 0:
+        _evict(list(runs), sum(r["bytes"] for r in runs) - STORAGE_GLOBAL_QUOTA_MB * 1024 * 1024,
+               "global_quota")
+    return out
+
+
+# --- orchestration ------------------------------------------------------------
+
+def run_lifecycle(dry_run: bool = True, base: Path = ANALYSIS_DIR) -> dict:
+    """Passage complet (job planifié / admin). dry_run=True : rapport seul, aucun fichier touché."""
+    STORAGE_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with file_lock(LOCK_FILE, timeout=0):
+            t0 = time.perf_counter()
+            now = time.time()
+            runs = scan_runs(base)
+            links = _Links(runs)
+            before = links.total()
+            stages = {}
+            for name, stage in (("orphans", purge_orphans), ("dedupe", dedupe),
+                                ("compact", compact), ("quota", enforce_quotas)):
+                try:
+                    stages[name] = stage(runs, links, now, dry_run)
+                except Exception as e:
+                    print(f"❌ Stockage ({name}) : {e}")
+                    stages[name] = {"error": str(e), "bytes": 0}
+            reclaimed = sum(s.get("bytes", 0) for s in stages.values())
+            report = {
+                "dry_run": bool(dry_run), "at": datetime.now(timezone.utc).isoformat(),
+                "runs": len(runs), "bytes_before": before, "reclaimed_bytes": reclaimed,
+                "bytes_after": before - reclaimed, "stages": stages,
+                "seconds": round(time.perf_counter() - t0, 3),
+            }
+    except TimeoutError:
+        return {"status": "busy"}
+    write_json_atomic(REPORT_FILE, report)
+    mode = "simulation" if dry_run else "appliqué"
+    print(f"🧹 Stockage ({mode}) : {reclaimed / 1e6:.1f} Mo récupérés sur {before / 1e6:.1f} Mo")
+    return report
+
+
+def last_report() -> dict:
+    return read_json(REPORT_FILE, {})
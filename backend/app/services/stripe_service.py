@@ -3,11 +3,18 @@ File: backend/app/services/stripe_service.py
 Role: Helpers pour intégration Stripe (clé API, resolver de price).
 """
 
-import os, stripe
+import os
 from fastapi import HTTPException
 from app.utils.logger import logger
+from app.utils.lazy_import import lazy_module
 
-stripe.api_key = os.getenv("STRIPE_SECRET_KEY")
+
+def _configure_stripe(mod):
+    mod.api_key = os.getenv("STRIPE_SECRET_KEY")
+
+
+# SDK Stripe importé au 1er appel (cold start) ; clé API posée à ce moment-là
+stripe = lazy_module("stripe", on_load=_configure_stripe)
 
 def resolve_price_for_offer(offer_id: str, offer: dict) -> str:
     env_direct = os.getenv(f"STRIPE_PRICE_{offer_id}")
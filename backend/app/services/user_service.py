@@ -5,8 +5,9 @@ Role: Helpers généraux utilisateur (hash, json atomique, audit, url abs, load/
 
 from pathlib import Path
 from passlib.context import CryptContext
-from app.core.paths import USERS_JSON as USERS_FILE, DB_DIR, DATA_ROOT
-from app.utils.json_db import read_json, write_json_atomic, file_lock
+from app.core.paths import USERS_JSON as USERS_FILE, DATA_ROOT
+from app.utils.json_db import read_json, write_json_atomic, store_lock
+from app.utils import audit_ledger
 from fastapi import Request
 import json, os, tempfile
 from datetime import datetime
@@ -41,8 +42,7 @@ def load_users() -> dict:
     return read_json(USERS_FILE, {})
 
 def save_users(users: dict) -> None:
-    lock = DB_DIR / "users.json.lock"
-    with file_lock(lock):
+    with store_lock(USERS_FILE):  # = DB_DIR/users.json.lock (flock, réentrant)
         write_json_atomic(USERS_FILE, users)
 
 # --- Audit append-only -------------------------------------------------------
@@ -50,13 +50,10 @@ AUDIT_FILE = (DATA_ROOT / "audit" / "ledger.jsonl")
 AUDIT_FILE.parent.mkdir(parents=True, exist_ok=True)
 
 def _audit_append(evt: dict) -> None:
-    path = AUDIT_FILE
-    path.parent.mkdir(parents=True, exist_ok=True)
     try:
         data = dict(evt)
         data.setdefault("ts", datetime.utcnow().isoformat() + "Z")
-        with open(path, "a", encoding="utf-8") as f:
-            f.write(json.dumps(data, ensure_ascii=False) + "\n")
+        audit_ledger.append(data)  # segments journaliers + index (écriture par lots)
     except Exception:
         pass
 
@@ -0,0 +1,13 @@
+"""
+File: backend/app/strategies/base/__init__.py
+Role: Pipeline commun des stratégies : détecteurs de base (candidats calculés une fois)
+      + filtres EMA/RSI en masques vectorisés.
+Notes:
+  - Les detect_* de app/strategies/*.py restent les points d'entrée (runner, UI, registre) ;
+    ce sont des wrappers minces autour de run_variant().
+  - detect_variants() : toutes les variantes d'une famille en un seul passage.
+"""
+
+from app.strategies.base.pipeline import VARIANTS, detect_variants, run_variant
+
+__all__ = ["VARIANTS", "detect_variants", "run_variant"]
@@ -0,0 +1,450 @@
+"""
+File: backend/app/strategies/base/detectors.py
+Role: Détecteurs de base des familles de stratégies, découpés en 2 temps :
+      candidates() (indépendant des filtres, calculé UNE fois) → resolve(buy, sell) par variante.
+Depends:
+  - numpy / pandas
+  - app.strategies.base.filters (colonne RSI ; masques buy/sell fournis par l'appelant)
+  - app.strategies.base.zones (index des zones actives)
+Notes:
+  - Les règles reproduisent à l'identique les boucles d'origine (mêmes index, mêmes
+    comparaisons, même ordre des signaux) :
+      • fvg_impulsive      : gap i-2/i, entrée Close confirmée, filtre lu en i (buy prioritaire)
+      • fvg_impulsive_body : gap i-2/i, bougie i-1 de confirmation, entrée High/Low de i
+      • englobante         : englobante i-1 sur i-2 + continuation en i, entrée High/Low de i
+      • fvg_pullback       : zones multiples ; une zone est consommée par son 1er retour
+                             (profondeur + filtre) dans [min_wait, max_wait] bougies ;
+                             grandes fenêtres → ActiveZoneIndex (zones.py)
+      • ob_pure / ob_gap   : une seule OB active ; le filtre décide quand elle est consommée,
+                             donc la suite des OB dépend de la variante → marche zone par zone
+                             (saut direct d'OB en OB, plus de boucle par bougie sur des dicts)
+  - Mode "records" (fvg_pullback / ob_*) : la stratégie d'origine lisait
+    data.reset_index().to_dict("records") → même frame (reset_index), lu en colonnes.
+"""
+
+import numpy as np
+import pandas as pd
+
+from app.strategies.base import filters as F
+from app.strategies.base.zones import ActiveZoneIndex
+
+TIME_COL = "Datetime"
+
+
+def records_frame(data) -> pd.DataFrame:
+    """Même lignes/colonnes que les dicts `records` des stratégies d'origine."""
+    if isinstance(data, pd.DataFrame):
+        return data.reset_index()
+    return pd.DataFrame(list(data))
+
+
+def _times(frame: pd.DataFrame, idx) -> list:
+    """candle.get("Datetime", candle.get("time")) pour chaque index."""
+    for col in (TIME_COL, "time"):
+        if col in frame.columns:
+            return frame[col].take(idx).tolist()
+    return [None] * len(idx)
+
+
+def _ordered(keys, rows) -> list:
+    """Trie les signaux selon l'ordre d'émission de la boucle d'origine (tri stable)."""
+    if not rows:
+        return []
+    order = np.lexsort(tuple(np.asarray(k) for k in reversed(keys)))
+    return [rows[k] for k in order]
+
+
+def _meets_depth(high, low, lo_b, hi_b, zone_w, ratio) -> bool:
+    """Profondeur de retour dans la zone (formule scalaire d'origine, NaN compris)."""
+    overlap = max(0.0, min(high, hi_b) - max(low, lo_b))
+    if ratio > 0:
+        return (overlap / zone_w) >= ratio
+    return overlap > 1e-9
+
+
+class Candidates:
+    """Événements d'un détecteur de base (indépendants des filtres)."""
+
+    def __init__(self, frame, params, **arrays):
+        self.frame = frame
+        self.params = params
+        self.__dict__.update(arrays)
+
+
+# --- FVG impulsive ----------------------------------------------------------
+
+class FvgImpulsive:
+    """Gap i-2 / i ; signal daté i+2 (confirm) ou i+1, entrée Close[i+1] ou Close[i]."""
+    mode = "period"
+    params = ("min_pips", "confirm_candle")
+
+    @staticmethod
+    def candidates(frame, min_pips=5, confirm_candle=True):
+        n = len(frame)
+        last = n - (2 if confirm_candle else 1)
+        i = np.arange(2, max(last, 2))
+        high, low = frame["High"].to_numpy(), frame["Low"].to_numpy()
+        gap_up = low[i] - high[i - 2]
+        gap_down = low[i - 2] - high[i]
+        min_gap = float(min_pips)
+        up, down = gap_up >= min_gap, gap_down >= min_gap
+        keep = up | down
+        return Candidates(frame, {"confirm_candle": confirm_candle},
+                          i=i[keep], up=up[keep], down=down[keep],
+                          gap_up=gap_up[keep], gap_down=gap_down[keep])
+
+    @staticmethod
+    def resolve(c, buy, sell):
+        i = c.i
+        is_buy = c.up & buy[i]
+        is_sell = ~is_buy & c.down & sell[i]
+        keep = is_buy | is_sell
+        i, is_buy = i[keep], is_buy[keep]
+        if not len(i):
+            return []
+        confirm = c.params["confirm_candle"]
+        times = c.frame.index[i + (2 if confirm else 1)]
+        entries = c.frame["Close"].to_numpy()[i + 1 if confirm else i]
+        gaps = np.round(np.where(is_buy, c.gap_up[keep], c.gap_down[keep]), 8)
+        return [
+            {"time": t, "entry": e, "direction": "buy" if b else "sell", "gap": g}
+            for t, e, b, g in zip(times, entries, is_buy, gaps)
+        ]
+
+
+class FvgImpulsiveBody:
+    """Variante rsi_ema : signal sur la bougie du gap, confirmé par la couleur de i-1."""
+    mode = "period"
+    params = ("min_pips", "confirm_candle")
+
+    @staticmethod
+    def candidates(frame, min_pips=5, confirm_candle=True):
+        n = len(frame)
+        i = np.arange(2, max(n, 2))
+        high, low = frame["High"].to_numpy(), frame["Low"].to_numpy()
+        close, open_ = frame["Close"].to_numpy(), frame["Open"].to_numpy()
+        min_gap = float(min_pips)
+        up = (low[i] - high[i - 2]) >= min_gap
+        down = (low[i - 2] - high[i]) >= min_gap
+        if confirm_candle:
+            up &= close[i - 1] > open_[i - 1]
+            down &= close[i - 1] < open_[i - 1]
+        keep = up | down
+        return Candidates(frame, {}, i=i[keep], up=up[keep], down=down[keep])
+
+    @staticmethod
+    def resolve(c, buy, sell):
+        is_buy = c.up & buy[c.i]
+        is_sell = c.down & sell[c.i]
+        high, low = c.frame["High"].to_numpy(), c.frame["Low"].to_numpy()
+        bars, sides, rows = [], [], []
+        for side, mask, entry, label in ((0, is_buy, high, "buy"), (1, is_sell, low, "sell")):
+            i = c.i[mask]
+            times = c.frame.index[i]
+            rows.extend({"time": t, "entry": e, "direction": label} for t, e in zip(times, entry[i]))
+            bars.append(i)
+            sides.append(np.full(len(i), side))
+        return _ordered((np.concatenate(bars), np.concatenate(sides)), rows)
+
+
+# --- Englobante (3 bougies) ------------------------------------------------
+
+class Englobante:
+    """
+    Bougie i-1 qui englobe i-2, puis i qui continue (plus haut ET plus bas décalés).
+    Comparaisons sur les tableaux High/Low décalés : plus aucun .iloc par bougie.
+    """
+    mode = "period"
+    params = ()
+    tag_rsi = False  # englobante_entry_rsi : valeur RSI recopiée dans le signal
+
+    @classmethod
+    def candidates(cls, frame):
+        n = len(frame)
+        i = np.arange(2, max(n - 1, 2))
+        high, low = frame["High"].to_numpy(), frame["Low"].to_numpy()
+        high0, low0 = high[i - 2], low[i - 2]
+        high1, low1 = high[i - 1], low[i - 1]
+        high2, low2 = high[i], low[i]
+        engulf = (low1 < low0) & (high1 > high0)
+        up = engulf & (low2 > low1) & (high2 > high1)
+        down = engulf & (high2 < high1) & (low2 < low1)
+        keep = up | down
+        rsi = frame[F.RSI_COL].to_numpy() if cls.tag_rsi and len(i) else None  # KeyError comme l'original
+        return Candidates(frame, {}, i=i[keep], up=up[keep], down=down[keep], rsi=rsi)
+
+    @staticmethod
+    def resolve(c, buy, sell):
+        i = c.i
+        is_buy = c.up & buy[i]
+        is_sell = ~is_buy & c.down & sell[i]
+        keep = is_buy | is_sell
+        i, is_buy = i[keep], is_buy[keep]
+        if not len(i):
+            return []
+        times = c.frame.index[i + 1]
+        entries = np.where(is_buy, c.frame["High"].to_numpy()[i], c.frame["Low"].to_numpy()[i])
+        rows = [{"time": t, "entry": e, "direction": "buy" if b else "sell"}
+                for t, e, b in zip(times, entries, is_buy)]
+        if c.rsi is not None:
+            for row, r in zip(rows, c.rsi[i]):
+                row["rsi"] = r
+        return rows
+
+
+class EnglobanteRsi(Englobante):
+    tag_rsi = True
+
+
+# --- FVG pullback multi -----------------------------------------------------
+
+# Fenêtre d'âge au-delà de laquelle le balayage indexé bat le balayage par âge
+# (mesuré sur 50k bougies M1 : par âge ≈ O(fenêtre × zones en attente), explose en tendance)
+INDEX_MIN_WINDOW = 512
+
+
+def _first_touches(c, buy, sell, first_age, last_age, width, ratio) -> np.ndarray:
+    """
+    1re bougie de retour valide (profondeur + filtre) de chaque zone, -1 sinon.
+    Zone z active des bougies c + first_age - 1 à c + last_age - 1 (âge a ↔ bougie c + a - 1).
+    """
+    if last_age - first_age + 1 < INDEX_MIN_WINDOW:
+        return _first_touches_by_age(c, buy, sell, first_age, last_age, width, ratio)
+    return _first_touches_indexed(c, buy, sell, first_age, last_age, width, ratio)
+
+
+def _first_touches_by_age(c, buy, sell, first_age, last_age, width, ratio) -> np.ndarray:
+    """Fenêtre courte : un pas NumPy par âge sur toutes les zones encore en attente."""
+    n = len(c.frame)
+    hit_at = np.full(len(c.c), -1)
+    pending = np.nonzero(width > 0)[0]
+    for age in range(first_age, last_age + 1):
+        j = c.c[pending] + age - 1
+        alive = j < n
+        pending, j = pending[alive], j[alive]
+        if not len(pending):
+            break
+        overlap = np.maximum(0.0, np.minimum(c.high[j], c.hi[pending]) - np.maximum(c.low[j], c.lo[pending]))
+        depth = (overlap / width[pending]) >= ratio if ratio > 0 else overlap > 1e-9
+        ok = np.where(c.is_bull[pending], buy[j], sell[j])
+        hit = depth & ok
+        hit_at[pending[hit]] = j[hit]
+        pending = pending[~hit]
+    return hit_at
+
+
+def _first_touches_indexed(c, buy, sell, first_age, last_age, width, ratio) -> np.ndarray:
+    """
+    Fenêtre longue : balayage des bougies avec ActiveZoneIndex ; seules les zones chevauchant
+    [Low, High] sont examinées, les expirées sortent par seau → coût indépendant de max_wait.
+    """
+    n = len(c.frame)
+    n_zones = len(c.c)
+    hit_at = np.full(n_zones, -1)
+    act = c.c + first_age - 1
+    zones = np.nonzero((width > 0) & (act < n))[0]
+    if not len(zones):
+        return hit_at
+
+    high, low = c.high, c.low
+    # Bougies utiles : prix lisible et au moins un sens autorisé par les filtres
+    bars = np.nonzero((buy | sell) & (low <= high))[0]
+    act_z = act[zones].tolist()
+    exp_z = np.minimum(c.c[zones] + last_age, n).tolist()
+    lo, hi, w = c.lo.tolist(), c.hi.tolist(), width.tolist()
+    is_bull = c.is_bull.tolist()
+    highs, lows = high.tolist(), low.tolist()
+    buy, sell = buy.tolist(), sell.tolist()
+    bars_l = bars.tolist()
+
+    index = ActiveZoneIndex(float(np.median(width[zones])))
+    zi, n_act = 0, len(zones)
+    b = int(np.searchsorted(bars, act_z[0]))
+    while b < len(bars_l):
+        j = bars_l[b]
+        while zi < n_act and act_z[zi] <= j:
+            z = int(zones[zi])
+            index.add(z, lo[z], hi[z], exp_z[zi])
+            zi += 1
+        if index.next_expiry() is not None and index.next_expiry() <= j:
+            index.expire(j)
+        if not len(index):
+            if zi >= n_act:
+                break
+            b = int(np.searchsorted(bars, act_z[zi]))
+            continue
+        hj, lj = highs[j], lows[j]
+        for z in index.overlapping(lj, hj):
+            if (buy[j] if is_bull[z] else sell[j]) and _meets_depth(hj, lj, lo[z], hi[z], w[z], ratio):
+                hit_at[z] = j
+                index.discard(z)
+        b += 1
+    return hit_at
+
+
+class FvgPullback:
+    """Zones FVG multiples ; 1er retour (profondeur + filtre) dans la fenêtre d'âge → signal."""
+    mode = "records"
+    params = ("min_pips", "min_wait_candles", "max_wait_candles", "max_touch", "min_overlap_ratio")
+
+    @staticmethod
+    def candidates(frame, min_pips=5.0, min_wait_candles=1, max_wait_candles=20, max_touch=4,
+                   min_overlap_ratio=0.01):
+        n = len(frame)
+        params = {"min_wait": min_wait_candles, "max_wait": max_wait_candles,
+                  "max_touch": max_touch, "ratio": min_overlap_ratio}
+        if n <= 2:
+            return Candidates(frame, params, c=np.empty(0, dtype=int))
+        if TIME_COL not in frame.columns:
+            raise KeyError(TIME_COL)  # la boucle d'origine lisait candle["Datetime"]
+        high = frame["High"].to_numpy(dtype=float)
+        low = frame["Low"].to_numpy(dtype=float)
+        high0, low0, high2, low2 = high[:-2], low[:-2], high[2:], low[2:]
+        thr = min_pips * 0.0001
+        bull = (low0 > high2) & ((low0 - high2) >= thr)
+        bear = ~bull & (high0 < low2) & ((low2 - high0) >= thr)
+        k = np.nonzero(bull | bear)[0]
+        is_bull = bull[k]
+        start = np.where(is_bull, high2[k], high0[k])
+        end = np.where(is_bull, low0[k], low2[k])
+        return Candidates(frame, params, c=k + 2, is_bull=is_bull,
+                          lo=np.minimum(start, end), hi=np.maximum(start, end),
+                          entry=np.where(is_bull, end, start), high=high, low=low)
+
+    @staticmethod
+    def resolve(c, buy, sell):
+        p = c.params
+        n_zones = len(c.c)
+        first_age, last_age = max(int(p["min_wait"]), 1), int(p["max_wait"])
+        if not n_zones or last_age < first_age:
+            return []
+        width = c.hi - c.lo
+        ratio = p["ratio"]
+
+        # 1er contact : touch_count = 1 → signal si max_touch >= 1, zone consommée dans tous les cas
+        if p["max_touch"] < 1:
+            return []
+        hit_at = _first_touches(c, buy, sell, first_age, last_age, width, ratio)
+        z = np.nonzero(hit_at >= 0)[0]
+        if not len(z):
+            return []
+        bars = hit_at[z]
+        times = _times(c.frame, bars)
+        entries = c.entry[z].tolist()
+        rows = [{"time": t, "entry": e, "direction": "buy" if b else "sell"}
+                for t, e, b in zip(times, entries, c.is_bull[z])]
+        return _ordered((bars, c.c[z]), rows)
+
+
+# --- Order blocks (une OB active à la fois) ---------------------------------
+
+class ObPullback:
+    """OB (pure : i-3/i-2 ; gap : + bougie i-1 en gap) puis retour dans la zone."""
+    mode = "records"
+    params = ("min_wait_candles", "max_wait_candles", "allow_multiple_entries", "min_overlap_ratio")
+    with_gap = False
+
+    @classmethod
+    def candidates(cls, frame, min_wait_candles=3, max_wait_candles=20, allow_multiple_entries=False,
+                   min_overlap_ratio=0.01):
+        n = len(frame)
+        first = 4 if cls.with_gap else 3
+        params = {"min_wait": min_wait_candles, "max_wait": max_wait_candles,
+                  "multi": allow_multiple_entries, "ratio": float(min_overlap_ratio), "first": first}
+        if n <= first:
+            return Candidates(frame, params, pattern=np.zeros(n, dtype=np.int8))
+        o, h = frame["Open"].to_numpy(), frame["High"].to_numpy(dtype=float)
+        l, cl = frame["Low"].to_numpy(dtype=float), frame["Close"].to_numpy()
+
+        p = np.arange(first, n)
+        pre, ob = p - 3, p - 2
+        bull = (cl[pre] < o[pre]) & (cl[ob] > o[ob])
+        bear = ~bull & (cl[pre] > o[pre]) & (cl[ob] < o[ob])
+        if cls.with_gap:
+            prev = p - 1
+            bull &= (cl[prev] > o[prev]) & (o[ob] > cl[pre])
+            bear &= (cl[prev] < o[prev]) & (o[ob] < cl[pre])
+            bull &= l[prev] > h[ob]
+            bear &= h[prev] < l[ob]
+
+        pattern = np.zeros(n, dtype=np.int8)
+        pattern[p[bull]] = 1
+        pattern[p[bear]] = -1
+        # Zone de l'OB (bougie p-2) ; entrée = Open de l'OB dans les 2 sens
+        zone_o = np.zeros(n, dtype=o.dtype)
+        zone_c = np.zeros(n, dtype=cl.dtype)
+        zone_o[p] = o[ob]
+        zone_c[p] = cl[ob]
+        starts = np.nonzero(pattern)[0]
+        nxt = np.append(starts, n)[np.searchsorted(starts, np.arange(n))]
+        return Candidates(frame, params, pattern=pattern.tolist(), nxt=nxt.tolist(),
+                          zone_o=zone_o.tolist(), zone_c=zone_c.tolist(),
+                          high=h.tolist(), low=l.tolist())
+
+    @staticmethod
+    def resolve(c, buy, sell):
+        p = c.params
+        n = len(c.frame)
+        if n <= p["first"]:
+            return []
+        min_wait, max_wait, multi, ratio = int(p["min_wait"]), int(p["max_wait"]), p["multi"], p["ratio"]
+        high, low, pattern, nxt = c.high, c.low, c.pattern, c.nxt
+        buy, sell = buy.tolist(), sell.tolist()
+
+        bars, entries, dirs = [], [], []
+        i = p["first"]
+        while i < n:
+            start = nxt[i]
+            if start >= n:
+                break
+            d = pattern[start]
+            ok = buy if d > 0 else sell
+            entry = c.zone_o[start]
+            lo_b, hi_b = min(entry, c.zone_c[start]), max(entry, c.zone_c[start])
+            zone_w = hi_b - lo_b
+            # wait_count = j - start ; OB non touchée expirée à wait_count = max_wait + 1
+            end = start + max(max_wait, 0) + 1
+            j = start + max(min_wait, 1)
+            last = min(end - 1, n - 1)
+            hit = -1
+            if zone_w > 0:
+                while j <= last:
+                    if ok[j] and _meets_depth(high[j], low[j], lo_b, hi_b, zone_w, ratio):
+                        hit = j
+                        break
+                    j += 1
+            if hit < 0:
+                i = end + 1
+                continue
+            bars.append(hit)
+            entries.append(entry)
+            dirs.append(d)
+            if not multi:
+                i = hit + 1
+                continue
+            # Entrées multiples : tous les retours jusqu'à wait_count = max_wait + 1 inclus
+            for j in range(hit + 1, min(end, n - 1) + 1):
+                if ok[j] and _meets_depth(high[j], low[j], lo_b, hi_b, zone_w, ratio):
+                    bars.append(j)
+                    entries.append(entry)
+                    dirs.append(d)
+            i = end + 1
+
+        times = _times(c.frame, np.asarray(bars, dtype=int))
+        return [{"time": t, "entry": e, "direction": "buy" if d > 0 else "sell", "phase": "TP1"}
+                for t, e, d in zip(times, entries, dirs)]
+
+
+class ObPullbackGap(ObPullback):
+    with_gap = True
+
+
+BASES = {
+    "fvg_impulsive": FvgImpulsive,
+    "fvg_impulsive_body": FvgImpulsiveBody,
+    "englobante": Englobante,
+    "englobante_rsi": EnglobanteRsi,
+    "fvg_pullback": FvgPullback,
+    "ob_pure": ObPullback,
+    "ob_gap": ObPullbackGap,
+}
@@ -0,0 +1,94 @@
+"""
+File: backend/app/strategies/base/filters.py
+Role: Filtres des variantes (_ema, _rsi, _tendance_ema…) exprimés en masques booléens vectorisés.
+Depends:
+  - numpy / pandas
+Notes:
+  - Un filtre = (masque buy, masque sell) sur toutes les bougies, évalué une fois ;
+    la règle de consommation des zones reste dans le détecteur de base (detectors.py).
+  - Deux conventions héritées des stratégies :
+      • mode "period" (fvg_impulsive*, englobante*) : ema_fast/ema_slow = périodes,
+        colonne EMA_<p> calculée si absente ; RSI absent → 50 (neutre).
+      • mode "column" (fvg_pullback*, ob_pullback*) : ema_* = noms de colonnes ;
+        colonne absente → aucune entrée possible (masks() retourne None).
+"""
+
+import numpy as np
+import pandas as pd
+
+RSI_COL = "RSI"
+NEUTRAL_RSI = 50
+
+FILTERS = ("rsi", "ema_trend", "ema_price")
+
+
+def ema_column(period) -> str:
+    return f"EMA_{int(period)}"
+
+
+def ensure_ema(df: pd.DataFrame, period) -> str:
+    """Réutilise EMA_<period> si présente, sinon la calcule sur Close (modifie df)."""
+    col = ema_column(period)
+    if col not in df.columns:
+        df[col] = df["Close"].ewm(span=int(period)).mean()
+    return col
+
+
+def ema_periods(filters, params) -> list:
+    """Périodes EMA nécessaires (mode "period")."""
+    if "ema_trend" not in filters:
+        return []
+    return [params["ema_fast"], params["ema_slow"]]
+
+
+def _values(frame: pd.DataFrame, col):
+    return frame[col].to_numpy()
+
+
+def masks(frame: pd.DataFrame, filters, params: dict, mode: str):
+    """
+    Combine (ET logique) les filtres demandés.
+
+    Returns:
+        (buy, sell) : np.ndarray[bool] de len(frame), ou None si une colonne
+        requise manque en mode "column" (la stratégie d'origine n'entrait jamais).
+    """
+    n = len(frame)
+    buy = np.ones(n, dtype=bool)
+    sell = np.ones(n, dtype=bool)
+
+    for name in filters:
+        if name == "rsi":
+            thr = params["rsi_threshold"]
+            if RSI_COL in frame.columns:
+                rsi = _values(frame, RSI_COL)
+            elif mode == "period":
+                rsi = np.full(n, NEUTRAL_RSI)
+            else:
+                return None
+            buy &= rsi < thr
+            sell &= rsi > (100 - thr)
+
+        elif name == "ema_trend":
+            if mode == "period":
+                fast_col, slow_col = ema_column(params["ema_fast"]), ema_column(params["ema_slow"])
+            else:
+                fast_col, slow_col = params["ema_fast"], params["ema_slow"]
+            if fast_col not in frame.columns or slow_col not in frame.columns:
+                return None
+            fast, slow = _values(frame, fast_col), _values(frame, slow_col)
+            buy &= fast > slow
+            sell &= fast < slow
+
+        elif name == "ema_price":
+            key = params["ema_key"]
+            if key not in frame.columns:
+                return None
+            ema, close = _values(frame, key), _values(frame, "Close")
+            buy &= close > ema
+            sell &= close < ema
+
+        else:
+            raise ValueError(f"Filtre inconnu : {name}")
+
+    return buy, sell
@@ -0,0 +1,145 @@
+"""
+File: backend/app/strategies/base/pipeline.py
+Role: Catalogue variante → (détecteur de base, filtres) + exécution d'une ou de toutes les variantes.
+Depends:
+  - app.strategies.base.detectors (BASES)
+  - app.strategies.base.filters (masques, EMA)
+Notes:
+  - run_variant(name, data, **params) : ce qu'appellent les detect_* (wrappers minces),
+    prétraitement identique à la stratégie d'origine (y compris modifs in place du df).
+  - detect_variants(data, variants) : UN passage par détecteur de base (mêmes params de base),
+    puis un masque par variante → {variante: signaux}. Travaille sur une copie du df.
+    Sur un df sans NaN (cas du runner après prepare_ohlc) = appels individuels.
+  - Defaults des params = signature des detect_* (registre des stratégies).
+"""
+
+import pandas as pd
+
+from app.strategies.base import filters as F
+from app.strategies.base.detectors import BASES, records_frame
+
+OHLC = ["Open", "High", "Low", "Close"]
+
+# variante → (détecteur de base, filtres, prétraitement in place de la stratégie d'origine)
+# étapes : ohlc = OHLC numériques, rsi = RSI numérique, ema = EMA_<p> assurées, dropna
+VARIANTS = {
+    "englobante_entry": ("englobante", (), ""),
+    "englobante_entry_ema": ("englobante", ("ema_trend",), "ohlc,dropna,ema"),
+    "englobante_entry_rsi": ("englobante_rsi", ("rsi",), ""),
+    "englobante_entry_rsi_ema": ("englobante", ("rsi", "ema_trend"), "ohlc,rsi,dropna,ema"),
+
+    "fvg_impulsive": ("fvg_impulsive", (), "ohlc,dropna"),
+    "fvg_impulsive_ema": ("fvg_impulsive", ("ema_trend",), "ohlc,ema,dropna"),
+    "fvg_impulsive_rsi": ("fvg_impulsive", ("rsi",), "ohlc,rsi,dropna"),
+    "fvg_impulsive_rsi_ema": ("fvg_impulsive_body", ("rsi", "ema_trend"), "ohlc,rsi,ema,dropna"),
+
+    "fvg_pullback_multi": ("fvg_pullback", (), ""),
+    "fvg_pullback_multi_ema": ("fvg_pullback", ("ema_price",), ""),
+    "fvg_pullback_multi_rsi": ("fvg_pullback", ("rsi",), ""),
+    "fvg_pullback_tendance_ema": ("fvg_pullback", ("ema_trend",), ""),
+    # (la condition SELL "high >= start" d'origine est impliquée par la profondeur de retour)
+    "fvg_pullback_tendance_ema_rsi": ("fvg_pullback", ("rsi", "ema_trend"), ""),
+
+    "ob_pullback_pure": ("ob_pure", (), ""),
+    "ob_pullback_pure_ema_simple": ("ob_pure", ("ema_price",), ""),
+    "ob_pullback_pure_rsi": ("ob_pure", ("rsi",), ""),
+    "ob_pullback_pure_tendance_ema": ("ob_pure", ("ema_trend",), ""),
+    "ob_pullback_pure_ema_simple_rsi": ("ob_pure", ("ema_price", "rsi"), ""),
+    "ob_pullback_pure_tendance_ema_rsi": ("ob_pure", ("ema_trend", "rsi"), ""),
+
+    "ob_pullback_gap": ("ob_gap", (), ""),
+    "ob_pullback_gap_ema_simple": ("ob_gap", ("ema_price",), ""),
+    "ob_pullback_gap_rsi": ("ob_gap", ("rsi",), ""),
+    "ob_pullback_gap_tendance_ema": ("ob_gap", ("ema_trend",), ""),
+}
+
+
+def _prepare(df: pd.DataFrame, steps: str, periods) -> pd.DataFrame:
+    """Prétraitement des familles "period", étapes dans l'ordre de la stratégie d'origine (in place)."""
+    for step in filter(None, steps.split(",")):
+        if step == "ohlc":
+            df[OHLC] = df[OHLC].apply(pd.to_numeric, errors="coerce")
+        elif step == "rsi":
+            if F.RSI_COL in df.columns:
+                df[F.RSI_COL] = pd.to_numeric(df[F.RSI_COL], errors="coerce")
+        elif step == "ema":
+            for period in periods:
+                F.ensure_ema(df, period)
+        elif step == "dropna":
+            df.dropna(inplace=True)
+    return df
+
+
+def _merged_steps(all_steps) -> str:
+    """Union des prétraitements d'un groupe (EMA avant dropna ; identique sans NaN)."""
+    wanted = {s for steps in all_steps for s in steps.split(",") if s}
+    return ",".join(s for s in ("ohlc", "rsi", "ema", "dropna") if s in wanted)
+
+
+def run_variant(name: str, data, **params):
+    """Signaux d'UNE variante (params déjà complets : ceux de la signature detect_<name>)."""
+    base_name, filters, steps = VARIANTS[name]
+    base = BASES[base_name]
+    if base.mode == "period":
+        frame = _prepare(data, steps, F.ema_periods(filters, params))
+    else:
+        frame = records_frame(data)
+    cands = base.candidates(frame, **{k: params[k] for k in base.params})
+    masks = F.masks(frame, filters, params, base.mode)
+    if masks is None:
+        return []
+    return base.resolve(cands, *masks)
+
+
+def _defaults(name: str) -> dict:
+    from app.core.strategy_registry import get_strategy
+    sig = get_strategy(name).signature
+    return {k: p.default for k, p in sig.parameters.items() if p.default is not p.empty}
+
+
+def detect_variants(data, variants=None, params=None) -> dict:
+    """
+    Toutes les variantes demandées en un passage par détecteur de base.
+
+    Args:
+        data: DataFrame OHLC (+ RSI / EMA_*) — non modifié.
+        variants: liste de noms, ou dict {nom: params propres} ; None = tout le catalogue.
+        params: params communs (écrasent les defaults, écrasés par les params propres).
+
+    Returns:
+        {variante: [signaux au format runner]}
+    """
+    if variants is None:
+        variants = list(VARIANTS)
+    own = variants if isinstance(variants, dict) else {v: {} for v in variants}
+    unknown = [v for v in own if v not in VARIANTS]
+    if unknown:
+        raise KeyError(f"Variantes non gérées par le pipeline : {unknown}")
+
+    # Regroupement : même détecteur + mêmes params de base → candidats partagés
+    groups = {}
+    for name, extra in own.items():
+        full = {**_defaults(name), **(params or {}), **(extra or {})}
+        base_name = VARIANTS[name][0]
+        base = BASES[base_name]
+        key = (base_name, tuple((k, repr(full.get(k))) for k in base.params))
+        groups.setdefault(key, []).append((name, full))
+
+    out = {}
+    frames = {}
+    for (base_name, _), members in groups.items():
+        base = BASES[base_name]
+        if base.mode == "period":
+            periods = [p for name, full in members for p in F.ema_periods(VARIANTS[name][1], full)]
+            steps = _merged_steps(VARIANTS[name][2] for name, _ in members)
+            frame = _prepare(data.copy(), steps, periods)
+        else:
+            if "records" not in frames:
+                frames["records"] = records_frame(data)
+            frame = frames["records"]
+        first = members[0][1]
+        cands = base.candidates(frame, **{k: first[k] for k in base.params})
+        for name, full in members:
+            masks = F.masks(frame, VARIANTS[name][1], full, base.mode)
+            out[name] = [] if masks is None else base.resolve(cands, *masks)
+    return out
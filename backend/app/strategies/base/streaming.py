@@ -0,0 +1,296 @@
+"""
+File: backend/app/strategies/base/streaming.py
+Role: Évaluation incrémentale (bougie par bougie) des variantes du pipeline, état sérialisable.
+Depends:
+  - app.strategies.base.pipeline (VARIANTS, defaults des params)
+  - app.strategies.base.detectors (BASES, règles des familles)
+  - app.strategies.base.filters (masques EMA / RSI)
+Notes:
+  - VariantStream(name, params).update(bougies) → signaux des SEULES nouvelles bougies,
+    coût O(nouvelles bougies). La concaténation des sorties = detect_<name> sur tout
+    l'historique (mêmes dicts, même ordre), quel que soit le découpage.
+  - État par famille (to_state() / from_state(), JSON) :
+      • englobante / fvg_impulsive* : 4 dernières bougies (motifs locaux, signal daté
+        jusqu'à 2 bougies après le motif) + état EWM des EMA calculées à la volée
+        (même récurrence que pandas ewm(span, adjust=True) → valeurs identiques au bit)
+      • fvg_pullback : zones actives (création, bornes, entrée, sens) expirées à max_wait
+      • ob_* : curseur de recherche + OB active (attente, fenêtre, phase multi-entrées)
+  - Entrée attendue : bougies déjà nettoyées (prepare_ohlc), index temporel croissant,
+    uniquement des bougies postérieures à la dernière vue (flux append-only).
+"""
+
+import math
+
+import pandas as pd
+
+from app.strategies.base import filters as F
+from app.strategies.base.detectors import BASES, TIME_COL, _meets_depth, records_frame
+from app.strategies.base.pipeline import VARIANTS, _defaults, _prepare
+
+STATE_VERSION = 1
+PERIOD_TAIL = 4  # fvg_impulsive : motif i-2..i, signal daté i+2
+
+FAMILIES = {
+    "englobante": "period",
+    "englobante_rsi": "period",
+    "fvg_impulsive": "period",
+    "fvg_impulsive_body": "period",
+    "fvg_pullback": "fvg_pullback",
+    "ob_pure": "ob",
+    "ob_gap": "ob",
+}
+
+
+def _ts(value):
+    return None if value is None else pd.Timestamp(value)
+
+
+def _iso(value):
+    return None if value is None else pd.Timestamp(value).isoformat()
+
+
+def _ewm_step(state, cur, span):
+    """Un pas de pandas ewm(span).mean() (adjust=True, ignore_na=False) : [weighted, old_wt, nobs]."""
+    if state is None:
+        return [cur, 1.0, int(cur == cur)]
+    weighted, old_wt, nobs = state
+    observed = cur == cur
+    nobs += observed
+    if weighted == weighted:
+        old_wt *= 1.0 - 1.0 / (1.0 + (span - 1) / 2.0)
+        if observed:
+            if weighted != cur:
+                weighted = old_wt * weighted + 1.0 * cur
+                weighted /= (old_wt + 1.0)
+            old_wt += 1.0
+    elif observed:
+        weighted = cur
+    return [weighted, old_wt, nobs]
+
+
+class VariantStream:
+    """État incrémental d'UNE variante (params = ceux passés à detect_<name>)."""
+
+    def __init__(self, name: str, params: dict = None):
+        if name not in VARIANTS:
+            raise KeyError(f"Variante non gérée par le pipeline : {name}")
+        self.name = name
+        self.params = {**_defaults(name), **(params or {})}
+        base_name, self.filters, self.steps = VARIANTS[name]
+        self.base = BASES[base_name]
+        self.family = FAMILIES[base_name]
+        self.n = 0              # nb de bougies déjà vues (index absolu de la prochaine)
+        self.last_time = None
+        self.tail = None        # period : {"index": [...], "columns": {col: [...]}}
+        self.ema = {}           # period : {période: [weighted, old_wt, nobs]}
+        self.zones = []         # fvg_pullback : [c, lo, hi, entry, is_bull]
+        self.bars = []          # fvg_pullback / ob : dernières bougies [o, h, l, c]
+        self.ob = {"mode": "seek", "i": 0}
+
+    # --- API -----------------------------------------------------------------
+
+    def update(self, bars: pd.DataFrame) -> list:
+        """Ajoute les nouvelles bougies et retourne les signaux datés sur celles-ci."""
+        if bars is None or not len(bars):
+            return []
+        if self.family == "period":
+            out = self._update_period(bars)
+        elif self.family == "fvg_pullback":
+            out = self._update_fvg_pullback(bars)
+        else:
+            out = self._update_ob(bars)
+        self.n += len(bars)
+        self.last_time = bars.index[-1]
+        return out
+
+    def to_state(self) -> dict:
+        tail = None
+        if self.tail is not None:
+            dates = [c for c in self.tail.columns if pd.api.types.is_datetime64_any_dtype(self.tail[c])]
+            columns = self.tail.to_dict("list")
+            for col in dates:
+                columns[col] = [_iso(v) for v in columns[col]]
+            tail = {"index": [_iso(t) for t in self.tail.index], "columns": columns, "dates": dates}
+        return {
+            "version": STATE_VERSION, "name": self.name, "params": self.params,
+            "n": self.n, "last_time": _iso(self.last_time),
+            "tail": tail, "ema": {str(k): v for k, v in self.ema.items()},
+            "zones": self.zones, "bars": self.bars, "ob": self.ob,
+        }
+
+    @classmethod
+    def from_state(cls, state: dict) -> "VariantStream":
+        if state.get("version") != STATE_VERSION:
+            raise ValueError(f"Version d'état incompatible : {state.get('version')}")
+        stream = cls(state["name"], state["params"])
+        stream.n = int(state["n"])
+        stream.last_time = _ts(state.get("last_time"))
+        tail = state.get("tail")
+        if tail is not None:
+            index = pd.DatetimeIndex([pd.Timestamp(t) for t in tail["index"]], name=TIME_COL)
+            stream.tail = pd.DataFrame(tail["columns"], index=index)
+            for col in tail.get("dates", ()):
+                stream.tail[col] = pd.to_datetime(stream.tail[col])
+        stream.ema = {int(k): v for k, v in (state.get("ema") or {}).items()}
+        stream.zones = [list(z) for z in state.get("zones") or []]
+        stream.bars = [list(b) for b in state.get("bars") or []]
+        stream.ob = dict(state.get("ob") or {"mode": "seek", "i": 0})
+        return stream
+
+    # --- englobante / fvg_impulsive : motifs locaux -----------------------------
+
+    def _stream_ema(self, chunk):
+        """EMA_<p> absentes des données : poursuite de la récurrence ewm sur les nouvelles bougies."""
+        for period in F.ema_periods(self.filters, self.params):
+            col = F.ema_column(period)
+            if col in chunk.columns:
+                continue
+            state = self.ema.get(int(period))
+            values = []
+            for v in chunk["Close"].tolist():
+                state = _ewm_step(state, v, int(period))
+                values.append(state[0] if state[2] >= 1 else math.nan)
+            self.ema[int(period)] = state
+            chunk[col] = values
+
+    def _update_period(self, bars):
+        # Mêmes étapes (et même ordre) que run_variant ; seules les EMA sont incrémentales
+        chunk = bars.copy()
+        for step in filter(None, self.steps.split(",")):
+            if step == "ema":
+                self._stream_ema(chunk)
+            else:
+                _prepare(chunk, step, ())
+        if not len(chunk):
+            return []
+
+        frame = chunk if self.tail is None else pd.concat([self.tail, chunk[self.tail.columns]])
+        n_tail = 0 if self.tail is None else len(self.tail)
+        base_params = {k: self.params[k] for k in self.base.params}
+        cands = self.base.candidates(frame, **base_params)
+        masks = F.masks(frame, self.filters, self.params, "period")
+        signals = [] if masks is None else self.base.resolve(cands, *masks)
+
+        self.tail = frame.iloc[-PERIOD_TAIL:].copy()
+        if not n_tail:
+            return signals
+        first_new = frame.index[n_tail]
+        return [s for s in signals if s["time"] >= first_new]
+
+    # --- fvg_pullback : zones multiples ----------------------------------------
+
+    def _chunk_arrays(self, bars):
+        frame = records_frame(bars)
+        masks = F.masks(frame, self.filters, self.params, "column")
+        n = len(frame)
+        buy, sell = ([False] * n, [False] * n) if masks is None else (masks[0].tolist(), masks[1].tolist())
+        times = None
+        for col in (TIME_COL, "time"):
+            if col in frame.columns:
+                times = frame[col].tolist()
+                break
+        return frame, buy, sell, times or [None] * n
+
+    def _update_fvg_pullback(self, bars):
+        p = self.params
+        frame, buy, sell, times = self._chunk_arrays(bars)
+        if self.n + len(frame) > 2 and TIME_COL not in frame.columns:
+            raise KeyError(TIME_COL)  # comme le détecteur batch
+        o = frame["Open"].to_numpy(dtype=float).tolist()
+        h = frame["High"].to_numpy(dtype=float).tolist()
+        l = frame["Low"].to_numpy(dtype=float).tolist()
+        cl = frame["Close"].to_numpy(dtype=float).tolist()
+        first_age, last_age = max(int(p["min_wait_candles"]), 1), int(p["max_wait_candles"])
+        emits = p["max_touch"] >= 1 and last_age >= first_age
+        thr = p["min_pips"] * 0.0001
+        ratio = p["min_overlap_ratio"]
+
+        out = []
+        for k in range(len(frame)):
+            t = self.n + k
+            hk, lk = h[k], l[k]
+            if t >= 2 and emits:
+                h0, l0 = self.bars[-2][1], self.bars[-2][2]
+                bull = (l0 > hk) and ((l0 - hk) >= thr)
+                bear = (not bull) and (h0 < lk) and ((lk - h0) >= thr)
+                if bull or bear:
+                    start, end = (hk, l0) if bull else (h0, lk)
+                    lo, hi = min(start, end), max(start, end)
+                    if hi - lo > 0:
+                        self.zones.append([t, lo, hi, end if bull else start, bull])
+
+            alive = []
+            for zone in self.zones:
+                c, lo, hi, entry, bull = zone
+                if t > c + last_age - 1:
+                    continue
+                if t >= c + first_age - 1 and (buy[k] if bull else sell[k]) \
+                        and _meets_depth(hk, lk, lo, hi, hi - lo, ratio):
+                    out.append({"time": times[k], "entry": entry, "direction": "buy" if bull else "sell"})
+                    continue
+                alive.append(zone)
+            self.zones = alive
+            self.bars = (self.bars + [[o[k], hk, lk, cl[k]]])[-3:]
+        return out
+
+    # --- ob_* : une OB active à la fois ----------------------------------------
+
+    def _pattern(self, t):
+        """Motif OB en t (bougies t-3..t-1, mêmes comparaisons que ObPullback.candidates)."""
+        pre, ob, prev = self.bars[-3], self.bars[-2], self.bars[-1]
+        bull = (pre[3] < pre[0]) and (ob[3] > ob[0])
+        bear = (not bull) and (pre[3] > pre[0]) and (ob[3] < ob[0])
+        if self.base.with_gap:
+            bull = bull and (prev[3] > prev[0]) and (ob[0] > pre[3]) and (prev[2] > ob[1])
+            bear = bear and (prev[3] < prev[0]) and (ob[0] < pre[3]) and (prev[1] < ob[2])
+        return 1 if bull else -1 if bear else 0
+
+    def _update_ob(self, bars):
+        p = self.params
+        frame, buy, sell, times = self._chunk_arrays(bars)
+        o = frame["Open"].to_numpy().tolist()
+        h = frame["High"].to_numpy(dtype=float).tolist()
+        l = frame["Low"].to_numpy(dtype=float).tolist()
+        cl = frame["Close"].to_numpy().tolist()
+        min_wait, max_wait = int(p["min_wait_candles"]), int(p["max_wait_candles"])
+        multi, ratio = p["allow_multiple_entries"], float(p["min_overlap_ratio"])
+        first = 4 if self.base.with_gap else 3
+        st = self.ob
+
+        out = []
+        for k in range(len(frame)):
+            t = self.n + k
+            mode = st["mode"]
+            if mode == "seek":
+                if t >= max(st["i"], first):
+                    d = self._pattern(t)
+                    if d:
+                        ob = self.bars[-2]
+                        entry = ob[0]
+                        lo, hi = min(entry, ob[3]), max(entry, ob[3])
+                        st = {"mode": "active", "start": t, "d": d, "entry": entry, "lo": lo, "hi": hi,
+                              "end": t + max(max_wait, 0) + 1, "j0": t + max(min_wait, 1)}
+            else:
+                ok = buy[k] if st["d"] > 0 else sell[k]
+                w = st["hi"] - st["lo"]
+                if mode == "active":
+                    last = st["end"] - 1
+                    if w > 0 and st["j0"] <= t <= last and ok \
+                            and _meets_depth(h[k], l[k], st["lo"], st["hi"], w, ratio):
+                        out.append(self._ob_signal(times[k], st))
+                        st = dict(st, mode="multi") if multi else {"mode": "seek", "i": t + 1}
+                    elif t >= last:
+                        st = {"mode": "seek", "i": st["end"] + 1}
+                else:  # multi : tous les retours jusqu'à wait_count = max_wait + 1 inclus
+                    if ok and _meets_depth(h[k], l[k], st["lo"], st["hi"], w, ratio):
+                        out.append(self._ob_signal(times[k], st))
+                    if t >= st["end"]:
+                        st = {"mode": "seek", "i": st["end"] + 1}
+            self.bars = (self.bars + [[o[k], h[k], l[k], cl[k]]])[-3:]
+        self.ob = st
+        return out
+
+    @staticmethod
+    def _ob_signal(time, st):
+        return {"time": time, "entry": st["entry"], "direction": "buy" if st["d"] > 0 else "sell",
+                "phase": "TP1"}
@@ -0,0 +1,118 @@
+"""
+File: backend/app/strategies/base/zones.py
+Role: Index des zones actives (FVG, OB…) partagé par les stratégies multi-zones.
+Depends:
+  - heapq / math (pur Python, aucune dépendance)
+Notes:
+  - Expiration : zones rangées par seau "1re bougie où la zone n'est plus active"
+    → expire(bar) ne touche que les seaux échus (O(1) amorti par zone).
+  - Prix : grille de cellules de largeur `cell` ; une zone est inscrite dans les cellules
+    qu'elle couvre, une bougie [Low, High] ne lit que les cellules qu'elle couvre
+    → seules les zones proches du prix sont examinées (plus de rescan de toutes les zones).
+  - Zones très larges (> max_cells cellules) : liste à part, examinée à chaque requête.
+  - overlapping() renvoie les zones dont l'intervalle chevauche STRICTEMENT [low, high]
+    (chevauchement > 0) ; la règle de profondeur / filtre reste chez l'appelant.
+"""
+
+import heapq
+import math
+
+
+class ActiveZoneIndex:
+    """Zones actives indexées par expiration (seaux de bougies) et par intervalle de prix (grille)."""
+
+    def __init__(self, cell: float, max_cells: int = 64):
+        if not cell > 0 or not math.isfinite(cell):
+            raise ValueError(f"Largeur de cellule invalide : {cell}")
+        self.cell = float(cell)
+        self.max_cells = int(max_cells)
+        self._zones = {}     # zid → (lo, hi, c0, c1) ; c0 > c1 = zone "large"
+        self._cells = {}     # cellule → {zid}
+        self._wide = set()
+        self._expiry = {}    # bougie d'expiration → [zid]
+        self._keys = []      # tas des bougies d'expiration en attente
+
+    def __len__(self) -> int:
+        return len(self._zones)
+
+    def __contains__(self, zid) -> bool:
+        return zid in self._zones
+
+    def _cell(self, price: float) -> int:
+        return math.floor(price / self.cell)
+
+    def add(self, zid, lo: float, hi: float, expires_at: int) -> None:
+        """Ajoute une zone active jusqu'à la bougie expires_at - 1 incluse."""
+        c0, c1 = self._cell(lo), self._cell(hi)
+        if c1 - c0 >= self.max_cells:
+            self._wide.add(zid)
+            c0, c1 = 1, 0
+        else:
+            cells = self._cells
+            for k in range(c0, c1 + 1):
+                bucket = cells.get(k)
+                if bucket is None:
+                    cells[k] = {zid}
+                else:
+                    bucket.add(zid)
+        self._zones[zid] = (lo, hi, c0, c1)
+
+        bucket = self._expiry.get(expires_at)
+        if bucket is None:
+            self._expiry[expires_at] = [zid]
+            heapq.heappush(self._keys, expires_at)
+        else:
+            bucket.append(zid)
+
+    def discard(self, zid) -> None:
+        """Retire une zone (consommée) ; sans effet si déjà retirée ou expirée."""
+        zone = self._zones.pop(zid, None)
+        if zone is None:
+            return
+        _, _, c0, c1 = zone
+        if c0 > c1:
+            self._wide.discard(zid)
+            return
+        cells = self._cells
+        for k in range(c0, c1 + 1):
+            bucket = cells[k]
+            bucket.discard(zid)
+            if not bucket:
+                del cells[k]
+
+    def expire(self, bar: int) -> None:
+        """Retire toutes les zones dont la bougie d'expiration est <= bar."""
+        keys = self._keys
+        while keys and keys[0] <= bar:
+            for zid in self._expiry.pop(heapq.heappop(keys)):
+                self.discard(zid)
+
+    def next_expiry(self):
+        """Prochaine bougie d'expiration en attente (None si aucune)."""
+        return self._keys[0] if self._keys else None
+
+    def overlapping(self, low: float, high: float) -> list:
+        """Zones dont [lo, hi] chevauche strictement [low, high] (NaN → aucune)."""
+        if not self._zones or not (low <= high):
+            return []
+        zones = self._zones
+        c0, c1 = math.floor(low / self.cell), math.floor(high / self.cell)
+        if c1 - c0 + 1 > len(zones):
+            found = zones
+        elif c0 == c1:
+            found = self._cells.get(c0, ())
+            if self._wide:
+                found = [*found, *self._wide]
+        else:
+            cells = self._cells
+            found = set(self._wide)
+            for k in range(c0, c1 + 1):
+                bucket = cells.get(k)
+                if bucket:
+                    found |= bucket
+        out = []
+        for zid in found:
+            lo, hi, _, _ = zones[zid]
+            if lo < high and hi > low:
+                out.append(zid)
+        return out
@@ -1,5 +1,6 @@
 import pandas as pd
 from typing import List, Dict, Union
+from app.strategies.base import run_variant
 
 def detect_fvg_pullback_multi_ema(
     data: Union[pd.DataFrame, List[Dict]],
@@ -23,100 +24,13 @@ def detect_fvg_pullback_multi_ema(
     :param ema_key: Nom de la colonne EMA utilisée pour le filtre
     :return: Liste des signaux au format runner
     """
-    if isinstance(data, pd.DataFrame):
-        data = data.reset_index().to_dict(orient="records")
-
-    signals = []
-    active_fvgs = []
-
-    for i in range(2, len(data)):
-        candle0 = data[i - 2]
-        candle2 = data[i]
-
-        high0 = float(candle0["High"])
-        low0 = float(candle0["Low"])
-        high2 = float(candle2["High"])
-        low2 = float(candle2["Low"])
-        close2 = float(candle2["Close"])
-        time = candle2["Datetime"]
-
-        # FVG haussière
-        if low0 > high2 and (low0 - high2) >= min_pips * 0.0001:
-            active_fvgs.append({
-                "type": "bullish",
-                "start": high2,
-                "end": low0,
-                "created_index": i,
-                "created_time": time,
-                "touch_count": 0,
-                "age": 0
-            })
-
-        # FVG baissière
-        elif high0 < low2 and (low2 - high0) >= min_pips * 0.0001:
-            active_fvgs.append({
-                "type": "bearish",
-                "start": high0,
-                "end": low2,
-                "created_index": i,
-                "created_time": time,
-                "touch_count": 0,
-                "age": 0
-            })
-
-        # Vérification des FVG actives
-        still_active = []
-        for fvg in active_fvgs:
-            fvg["age"] += 1
-            valid = True
-
-            if fvg["age"] > max_wait_candles:
-                valid = False
-
-            elif fvg["age"] >= min_wait_candles:
-                ema_val = candle2.get(ema_key)
-                if ema_val is None:
-                    continue
-
-                # [ADD min_overlap_ratio BTZ-2025-10]
-                low_b  = min(fvg["start"], fvg["end"])
-                high_b = max(fvg["start"], fvg["end"])
-                zone_w = high_b - low_b
-                if zone_w <= 0:
-                    continue
-                overlap = max(0.0, min(high2, high_b) - max(low2, low_b))
-                if min_overlap_ratio > 0:
-                    meets_depth = (overlap / zone_w) >= min_overlap_ratio
-                else:
-                    meets_depth = overlap > 1e-9
-
-                if fvg["type"] == "bullish" and meets_depth and close2 > ema_val:
-                    fvg["touch_count"] += 1
-                    if fvg["touch_count"] <= max_touch:
-                        signals.append({
-                            "time": candle2.get("Datetime", candle2.get("time")),
-                            "entry": fvg["end"],
-                            "direction": "buy"
-                        })
-                        continue
-                    else:
-                        valid = False
-
-                elif fvg["type"] == "bearish" and meets_depth and close2 < ema_val:
-                    fvg["touch_count"] += 1
-                    if fvg["touch_count"] <= max_touch:
-                        signals.append({
-                            "time": candle2.get("Datetime", candle2.get("time")),
-                            "entry": fvg["start"],
-                            "direction": "sell"
-                        })
-                        continue
-                    else:
-                        valid = False
-
-            if valid:
-                still_active.append(fvg)
-
-        active_fvgs = still_active
-
-    return signals
+    # [BTZ] Corps mutualisé : détecteur de base + filtres en masques vectorisés (app/strategies/base)
+    return run_variant(
+        "fvg_pullback_multi_ema", data,
+        min_pips=min_pips,
+        min_wait_candles=min_wait_candles,
+        max_wait_candles=max_wait_candles,
+        max_touch=max_touch,
+        ema_key=ema_key,
+        min_overlap_ratio=min_overlap_ratio,
+    )
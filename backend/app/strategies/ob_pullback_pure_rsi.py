@@ -6,6 +6,7 @@
 
 import pandas as pd
 from typing import List, Dict, Union
+from app.strategies.base import run_variant
 
 def detect_ob_pullback_pure_rsi(
     data: Union[pd.DataFrame, List[Dict]],
@@ -21,95 +22,12 @@ def detect_ob_pullback_pure_rsi(
     - BUY si RSI < threshold
     - SELL si RSI > 100 - threshold
     """
-    TIME_COL = "Datetime"  # [BTZ]
-    RSI_COL = "RSI"        # [BTZ]
-
-    if isinstance(data, pd.DataFrame):
-        data = data.reset_index().to_dict(orient="records")
-
-    signals: List[Dict] = []
-    active_ob = None
-    wait_count = 0
-    ob_direction = None
-
-    for i in range(3, len(data)):
-        current = data[i]
-        ob_candle = data[i - 2]
-        pre_ob = data[i - 3]
-
-        # Détection OB simple
-        if active_ob is None:
-            # OB bullish
-            if pre_ob["Close"] < pre_ob["Open"] and ob_candle["Close"] > ob_candle["Open"]:
-                active_ob = {
-                    "ob_high": ob_candle["Open"],
-                    "ob_low": ob_candle["Close"],
-                    "start_index": i,
-                    "touched": False
-                }
-                ob_direction = "buy"
-                wait_count = 0
-
-            # OB bearish
-            elif pre_ob["Close"] > pre_ob["Open"] and ob_candle["Close"] < ob_candle["Open"]:
-                active_ob = {
-                    "ob_high": ob_candle["Close"],
-                    "ob_low": ob_candle["Open"],
-                    "start_index": i,
-                    "touched": False
-                }
-                ob_direction = "sell"
-                wait_count = 0
-
-        else:
-            wait_count += 1
-
-            # [FIX v1.3 wait_count logic BTZ-2025-10]
-            if wait_count > max_wait_candles and not active_ob["touched"]:
-                active_ob = None
-                continue
-            
-            # [ADD min_overlap_ratio BTZ-2025-10] normalisation zone + ratio de chevauchement
-            low_b  = min(active_ob["ob_high"], active_ob["ob_low"])
-            high_b = max(active_ob["ob_high"], active_ob["ob_low"])
-            zone_w = high_b - low_b
-            if zone_w <= 0:
-                continue
-            overlap = max(0.0, min(current["High"], high_b) - max(current["Low"], low_b))
-            _ratio = float(min_overlap_ratio)
-            meets_depth = (overlap / zone_w) >= _ratio if _ratio > 0 else (overlap > 1e-9)
-
-            rsi_val = current.get(RSI_COL)
-            if rsi_val is None:
-                continue
-
-            if ob_direction == "buy" and rsi_val < rsi_threshold:
-                if meets_depth:
-                    if wait_count >= min_wait_candles:
-                        signals.append({
-                            "time": current.get(TIME_COL, current.get("time")),
-                            "entry": active_ob["ob_high"],
-                            "direction": "buy",
-                            "phase": "TP1"
-                        })
-                        active_ob["touched"] = True
-                        if not allow_multiple_entries:
-                            active_ob = None
-
-            elif ob_direction == "sell" and rsi_val > (100 - rsi_threshold):
-                if meets_depth:
-                    if wait_count >= min_wait_candles:
-                        signals.append({
-                            "time": current.get(TIME_COL, current.get("time")),
-                            "entry": active_ob["ob_low"],
-                            "direction": "sell",
-                            "phase": "TP1"
-                        })
-                        active_ob["touched"] = True
-                        if not allow_multiple_entries:
-                            active_ob = None
-
-            if wait_count > max_wait_candles:
-                active_ob = None
-
-    return signals
+    # [BTZ] Corps mutualisé : détecteur de base + filtres en masques vectorisés (app/strategies/base)
+    return run_variant(
+        "ob_pullback_pure_rsi", data,
+        min_wait_candles=min_wait_candles,
+        max_wait_candles=max_wait_candles,
+        allow_multiple_entries=allow_multiple_entries,
+        rsi_threshold=rsi_threshold,
+        min_overlap_ratio=min_overlap_ratio,
+    )
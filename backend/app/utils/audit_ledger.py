@@ -0,0 +1,316 @@
+"""
+File: backend/app/utils/audit_ledger.py
+Role: Ledger d'audit segmenté par jour + index des blocs → requêtes par fenêtre sans relire tout l'historique.
+Depends:
+  - app.core.paths.DATA_ROOT
+  - app.utils.json_db.file_lock (écriture segment + index atomique entre workers)
+Side-effects:
+  - DATA_ROOT/audit/segments/ledger-YYYY-MM-DD.jsonl (événements, 1 JSON par ligne, append-only)
+  - DATA_ROOT/audit/segments/ledger-YYYY-MM-DD.idx.jsonl (1 ligne par bloc écrit)
+  - Migration unique de l'ancien DATA_ROOT/audit/ledger.jsonl (renommé *.migrated-<date>)
+Notes:
+  - Bloc = un lot d'append : {off, len, n, first_ts, last_ts, t0, t1, untimed, types}
+    t0/t1 = bornes (epoch) du temps "métier" : data.date pour un "tx" (ce que filtrent les stats),
+    ts sinon. read(start, end, types) n'ouvre que les segments / blocs qui recoupent la fenêtre
+    et y accède par seek ; les octets non indexés (crash entre données et index) sont toujours relus.
+  - Élagage conservateur (marge AUDIT_INDEX_SLACK_H, blocs "untimed" toujours lus) : l'appelant
+    garde son filtre exact (_in_window) → mêmes résultats que la lecture complète.
+  - Écriture bufferisée : append() ne fait qu'empiler ; un thread vide le tampon toutes les
+    AUDIT_FLUSH_MS (ou dès AUDIT_BATCH_MAX événements), fsync toutes les AUDIT_FSYNC_S
+    (0 = à chaque lot, < 0 = jamais). read() vide d'abord le tampon du process (lecture de ses écritures).
+"""
+
+import atexit
+import json
+import os
+import threading
+import time
+from datetime import datetime, timezone
+from pathlib import Path
+from zoneinfo import ZoneInfo
+
+from app.core.paths import DATA_ROOT
+from app.utils.json_db import file_lock
+
+AUDIT_DIR = DATA_ROOT / "audit"
+SEGMENTS_DIR = AUDIT_DIR / "segments"
+LEGACY_FILE = AUDIT_DIR / "ledger.jsonl"
+
+AUDIT_FLUSH_MS = int(os.getenv("AUDIT_FLUSH_MS", "200"))
+AUDIT_BATCH_MAX = int(os.getenv("AUDIT_BATCH_MAX", "256"))
+AUDIT_FSYNC_S = float(os.getenv("AUDIT_FSYNC_S", "1"))
+AUDIT_INDEX_SLACK_H = float(os.getenv("AUDIT_INDEX_SLACK_H", "24"))
+
+_PARIS_TZ = ZoneInfo("Europe/Paris")  # dates naïves = heure de Paris (comme admin_stat_service)
+
+
+# --- temps d'un événement -----------------------------------------------------
+
+def _epoch(value):
+    if not value:
+        return None
+    s = str(value)
+    try:
+        dt = datetime.fromisoformat(s.replace("Z", "+00:00"))
+    except ValueError:
+        dt = None
+        for fmt in ("%Y-%m-%d %H:%M:%S", "%d/%m/%Y %H:%M:%S", "%Y-%m-%d"):
+            try:
+                dt = datetime.strptime(s, fmt)
+                break
+            except ValueError:
+                continue
+        if dt is None:
+            return None
+    if dt.tzinfo is None:
+        dt = dt.replace(tzinfo=_PARIS_TZ)
+    return dt.timestamp()
+
+
+def event_time(evt: dict):
+    """Temps métier (epoch) : date de la transaction pour un "tx", ts sinon ; None si illisible."""
+    if evt.get("type") == "tx":
+        data = evt.get("data")
+        return _epoch(data.get("date")) if isinstance(data, dict) else None
+    return _epoch(evt.get("ts"))
+
+
+def _segment_path(day: str) -> Path:
+    return SEGMENTS_DIR / f"ledger-{day}.jsonl"
+
+
+def _index_path(segment: Path) -> Path:
+    return segment.with_name(segment.name[:-len(".jsonl")] + ".idx.jsonl")
+
+
+# --- écriture -----------------------------------------------------------------
+
+def _block_meta(events: list, off: int, length: int) -> dict:
+    times = [t for t in (event_time(e) for e in events) if t is not None]
+    return {
+        "off": off, "len": length, "n": len(events),
+        "first_ts": events[0].get("ts"), "last_ts": events[-1].get("ts"),
+        "t0": min(times) if times else None, "t1": max(times) if times else None,
+        "untimed": len(events) - len(times),
+        "types": sorted({str(e.get("type")) for e in events}),
+    }
+
+
+def _append_bytes(segment: Path, data: bytes, fsync: bool) -> int:
+    """write O_APPEND unique ; renvoie l'offset de début (taille avant écriture)."""
+    fd = os.open(segment, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    try:
+        off = os.fstat(fd).st_size
+        os.write(fd, data)
+        if fsync:
+            os.fsync(fd)
+        return off
+    finally:
+        os.close(fd)
+
+
+def _write_block(segment: Path, events: list, fsync: bool) -> None:
+    """Un lot d'événements → 1 write O_APPEND + 1 ligne d'index (sous lock du segment)."""
+    data = b"".join((json.dumps(e, ensure_ascii=False) + "\n").encode("utf-8") for e in events)
+    SEGMENTS_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with file_lock(segment.with_name(segment.name + ".lock"), timeout=5):
+            off = _append_bytes(segment, data, fsync)
+            with open(_index_path(segment), "a", encoding="utf-8") as f:
+                f.write(json.dumps(_block_meta(events, off, len(data)), ensure_ascii=False) + "\n")
+                if fsync:
+                    f.flush()
+                    os.fsync(f.fileno())
+    except TimeoutError:
+        # lock bloqué : on n'abandonne pas l'audit → zone non indexée, relue telle quelle
+        _append_bytes(segment, data, fsync)
+
+
+class _BufferedWriter:
+    """Tampon d'événements du process, vidé par lots (thread de fond + atexit)."""
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._pending = []
+        self._thread = None
+        self._last_fsync = 0.0
+        self._flush_lock = threading.Lock()
+
+    def append(self, evt: dict) -> None:
+        day = datetime.now(timezone.utc).strftime("%Y-%m-%d")
+        with self._cond:
+            self._pending.append((day, evt))
+            if self._thread is None:
+                self._thread = threading.Thread(target=self._loop, name="audit-ledger", daemon=True)
+                self._thread.start()
+            if len(self._pending) >= AUDIT_BATCH_MAX:
+                self._cond.notify()
+
+    def _loop(self) -> None:
+        while True:
+            with self._cond:
+                self._cond.wait(AUDIT_FLUSH_MS / 1000)
+            try:
+                self.flush()
+            except Exception as e:
+                print(f"⚠️ Ledger : écriture différée KO ({e})")
+
+    def flush(self) -> None:
+        with self._flush_lock:
+            with self._cond:
+                pending, self._pending = self._pending, []
+            if not pending:
+                return
+            now = time.monotonic()
+            fsync = AUDIT_FSYNC_S == 0 or (AUDIT_FSYNC_S > 0 and now - self._last_fsync >= AUDIT_FSYNC_S)
+            by_day = {}
+            for day, evt in pending:
+                by_day.setdefault(day, []).append(evt)
+            for day, events in sorted(by_day.items()):
+                _write_block(_segment_path(day), events, fsync)
+            if fsync:
+                self._last_fsync = now
+
+
+_WRITER = _BufferedWriter()
+atexit.register(_WRITER.flush)
+
+
+def append(evt: dict) -> None:
+    """Ajoute un événement (tampon ; écrit sous AUDIT_FLUSH_MS). Ne lève jamais."""
+    try:
+        _WRITER.append(dict(evt))
+    except Exception:
+        pass
+
+
+def flush() -> None:
+    _WRITER.flush()
+
+
+# --- migration ----------------------------------------------------------------
+
+def _migrate_legacy() -> None:
+    """Ancien ledger.jsonl unique → segments journaliers (une seule fois, entre workers)."""
+    if not LEGACY_FILE.exists():
+        return
+    AUDIT_DIR.mkdir(parents=True, exist_ok=True)
+    try:
+        with file_lock(AUDIT_DIR / ".migrate.lock", timeout=30):
+            if not LEGACY_FILE.exists():
+                return
+            fallback = datetime.fromtimestamp(LEGACY_FILE.stat().st_mtime, timezone.utc).strftime("%Y-%m-%d")
+            by_day = {}
+            with open(LEGACY_FILE, "r", encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if not line:
+                        continue
+                    try:
+                        evt = json.loads(line)
+                    except Exception:
+                        continue
+                    t = _epoch(evt.get("ts")) if isinstance(evt, dict) else None
+                    day = datetime.fromtimestamp(t, timezone.utc).strftime("%Y-%m-%d") if t else fallback
+                    by_day.setdefault(day, []).append(evt)
+            for day, events in sorted(by_day.items()):
+                for i in range(0, len(events), AUDIT_BATCH_MAX):
+                    _write_block(_segment_path(day), events[i:i + AUDIT_BATCH_MAX], fsync=True)
+            LEGACY_FILE.rename(LEGACY_FILE.with_name(f"ledger.jsonl.migrated-{fallback}"))
+            print(f"📒 Ledger migré : {sum(map(len, by_day.values()))} événements → {len(by_day)} segments")
+    except TimeoutError:
+        pass  # migration en cours dans un autre worker
+
+
+# --- lecture ------------------------------------------------------------------
+
+_INDEX_CACHE = {}
+
+
+def _load_index(segment: Path) -> list:
+    path = _index_path(segment)
+    try:
+        st = path.stat()
+    except OSError:
+        return []
+    key = (st.st_mtime_ns, st.st_size)
+    cached = _INDEX_CACHE.get(path)
+    if cached and cached[0] == key:
+        return cached[1]
+    blocks = []
+    with open(path, "r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                blocks.append(json.loads(line))
+            except Exception:
+                continue  # ligne d'index tronquée : zone relue comme non indexée
+    blocks.sort(key=lambda b: b["off"])
+    _INDEX_CACHE[path] = (key, blocks)
+    return blocks
+
+
+def _ranges(segment: Path, lo: float, hi: float, types) -> list:
+    """(offset, longueur) des zones à lire : blocs qui recoupent la requête + zones non indexées."""
+    size = segment.stat().st_size
+    out, pos = [], 0
+    for b in _load_index(segment):
+        if b["off"] + b["len"] > size:
+            break
+        if b["off"] > pos:
+            out.append((pos, b["off"] - pos))  # trou non indexé
+        pos = max(pos, b["off"] + b["len"])
+        if types and not types.intersection(b.get("types") or ()):
+            continue
+        if not b.get("untimed") and (b.get("t0") is None or b["t1"] < lo or b["t0"] > hi):
+            continue
+        out.append((b["off"], b["len"]))
+    if pos < size:
+        out.append((pos, size - pos))
+    return out
+
+
+def read(start=None, end=None, types=None) -> list:
+    """
+    Événements (ordre d'écriture) susceptibles d'être dans [start, end] (datetimes tz-aware ou None)
+    et de type ∈ types. Sur-ensemble garanti : l'appelant applique son filtre exact.
+    """
+    flush()
+    _migrate_legacy()
+    if not SEGMENTS_DIR.exists():
+        return []
+    slack = AUDIT_INDEX_SLACK_H * 3600
+    lo = start.timestamp() - slack if start is not None else float("-inf")
+    hi = end.timestamp() + slack if end is not None else float("inf")
+    types = set(types) if types else None
+
+    out = []
+    for segment in sorted(SEGMENTS_DIR.glob("ledger-*.jsonl")):
+        if segment.name.endswith(".idx.jsonl"):
+            continue
+        ranges = _ranges(segment, lo, hi, types)
+        if not ranges:
+            continue
+        with open(segment, "rb") as f:
+            for off, length in ranges:
+                f.seek(off)
+                for line in f.read(length).splitlines():
+                    if not line.strip():
+                        continue
+                    try:
+                        evt = json.loads(line)
+                    except Exception:
+                        continue
+                    if types is None or evt.get("type") in types:
+                        out.append(evt)
+    return out
+
+
+def clear() -> None:
+    """Vide le ledger (segments + index + ancien fichier) — reset admin des stats."""
+    flush()
+    if SEGMENTS_DIR.exists():
+        for path in SEGMENTS_DIR.iterdir():
+            if path.name.startswith("ledger-"):
+                path.unlink(missing_ok=True)
+    _INDEX_CACHE.clear()
+    LEGACY_FILE.unlink(missing_ok=True)
@@ -6,19 +6,41 @@ Depends:
   - backend/output/<SYMBOL>/<YYYY-MM>/<SYMBOL>_<TF>_<YYYY-MM>.csv
   - backend/output_live/<SYMBOL>/<TF>/*.csv
   - backend.extract.extract_data.extract_data_auto (fallback extraction)
+  - app.utils.resample (TF dérivée d'une TF plus fine stockée, ex: H1 ← M1)
 Side-effects:
   - Lecture de CSV depuis le disque.
 Returns:
   - pd.DataFrame indexé par Datetime, avec colonnes OHLC + 'time' (requis par le runner).
 Notes:
   - Ne modifie pas la logique. Ajout de docstrings & commentaires uniquement.
+  - load_data_cached() : cache LRU en mémoire (par process) devant load_data_or_extract,
+    invalidé dès qu'un fichier source change (mtime/size).
+  - Mois (natifs / resamplés) et entrées du LRU publiés en memmap partagés (app.utils.shared_frames),
+    clé (symbole, TF, mois, empreinte) → N workers = 1 lecture / parsing CSV, et le cache (mois + LRU)
+    n'est qu'1 exemplaire en RAM.
+  - load_data_cached(..., readonly=True) (routes de backtest, multi-symboles) : le runner reçoit
+    le frame partagé lui-même (0 copie : prepare_ohlc / detect_signals n'en font que des vues) →
+    le RSS d'un worker ne grossit ni avec les plages en cache ni avec les backtests en cours.
+    Sans readonly (défaut) : copie privée mutable, comme load_data_or_extract.
+  - load_data_or_extract coalescé (app.utils.single_flight) par (symbole, TF, période normalisée) :
+    threads → 1 exécution partagée ; process → verrou fichier, le 2e relit ce que le 1er a extrait.
+  - Phases chronométrées (app.utils.perf) : load.read_csv / load.resample / load.live /
+    load.extract / load.merge + compteurs files_read, bars_loaded.
 """
 
 import os
+import threading
+import time
+from collections import OrderedDict
 from datetime import datetime, timedelta
 import pandas as pd
 from pathlib import Path
 from app.extract.extract_data import extract_data_auto
+from app.utils.resample import SESSION_OFFSET, load_resampled_month, find_finest_source
+from app.utils.shared_frames import get_store
+from app.utils import single_flight
+from app.utils.perf import add_phase, count, span
+from app.utils.metrics import CACHE_REQUESTS, LOADER_BYTES_READ, gauge
 from app.core.paths import OUTPUT_DIR, OUTPUT_LIVE_DIR  # <- DISK paths
 
 
@@ -76,6 +98,35 @@ def load_data_or_extract(symbol: str, timeframe: str, start_date: str, end_date:
     Raises:
         FileNotFoundError / ValueError si aucune donnée exploitable.
     """
+    # Single-flight : N demandes identiques simultanées (threads ou workers) → 1 lecture / extraction
+    key = (str(symbol).strip(), str(timeframe).strip(),
+           datetime.strptime(start_date, "%Y-%m-%d").date().isoformat(),
+           datetime.strptime(end_date, "%Y-%m-%d").date().isoformat())
+    return single_flight.run(key, lambda: _load_shared(*key), share=lambda df: df.copy(), name="load_data")
+
+
+def _load_shared(symbol: str, timeframe: str, start_date: str, end_date: str):
+    held = []  # mois partagés attachés pendant la fusion (rendus quoi qu'il arrive)
+    try:
+        return _load_data_or_extract(symbol, timeframe, start_date, end_date, held)
+    finally:
+        store = get_store()
+        for key in held:
+            store.release(key)
+
+
+def _month_frame(key, loader, held):
+    """Mois via le store partagé (1 lecture CSV pour tous les workers) ; sinon loader() privé."""
+    store = get_store()
+    if store is None:
+        return loader()
+    df, shared = store.get_or_publish(key, loader)
+    if shared:
+        held.append(key)
+    return df
+
+
+def _load_data_or_extract(symbol: str, timeframe: str, start_date: str, end_date: str, held: list):
     start_dt = datetime.strptime(start_date, "%Y-%m-%d")
     end_dt = datetime.strptime(end_date, "%Y-%m-%d")
     dfs = []
@@ -95,23 +146,49 @@ def load_data_or_extract(symbol: str, timeframe: str, start_date: str, end_date:
 
         if file_path.exists():
             try:
-                print(f"📂 Chargement depuis output : {file_path}")
-                df = pd.read_csv(file_path)
-                df["Datetime"] = pd.to_datetime(df["Datetime"]).dt.tz_localize(None)
-                df.set_index("Datetime", inplace=True)
-                dfs.append(df)
+                def _read(file_path=file_path):
+                    print(f"📂 Chargement depuis output : {file_path}")
+                    with span("load.read_csv"):
+                        LOADER_BYTES_READ.labels("output").inc(file_path.stat().st_size)
+                        df = pd.read_csv(file_path)
+                        df["Datetime"] = pd.to_datetime(df["Datetime"]).dt.tz_localize(None)
+                        df.set_index("Datetime", inplace=True)
+                    count("files_read", 1)
+                    return df
+
+                st = file_path.stat()
+                key = (symbol, timeframe, month_str, (str(file_path), st.st_mtime_ns, st.st_size))
+                dfs.append(_month_frame(key, _read, held))
             except Exception as e:
                 print(f"❌ Erreur lecture output : {e}")
+        else:
+            # Pas de fichier natif pour cette TF → dérivée d'une TF plus fine (cache)
+            def _resample(month_str=month_str):
+                with span("load.resample"):
+                    return load_resampled_month(symbol, timeframe, month_str)
+
+            found = find_finest_source(symbol, timeframe, month_str)
+            if found is not None:
+                st = found[1].stat()
+                key = (symbol, timeframe, month_str, ("resampled", str(found[1]), st.st_mtime_ns, st.st_size,
+                                                      SESSION_OFFSET))
+                df = _month_frame(key, _resample, held)
+            else:
+                df = _resample()
+            if df is not None and not df.empty:
+                dfs.append(df)
 
         # Passe au 1er du mois suivant (truc du 28+4 pour gérer tous les mois)
         current = (current.replace(day=28) + pd.Timedelta(days=4)).replace(day=1)
 
     # === 2) Lecture live depuis OUTPUT_LIVE_DIR/<symbol>/<tf>/*.csv
     live_dir = OUTPUT_LIVE_DIR / symbol / timeframe
+    t_live = time.perf_counter()
     if live_dir.exists():
         for file in live_dir.glob("*.csv"):
             try:
                 print(f"📥 Lecture LIVE : {file.name}")
+                LOADER_BYTES_READ.labels("live").inc(file.stat().st_size)
                 df = pd.read_csv(file)
 
                 # Supprime lignes parasites (ex: "AUDUSD=" qui trainent)
@@ -140,11 +217,13 @@ def load_data_or_extract(symbol: str, timeframe: str, start_date: str, end_date:
 
             except Exception as e:
                 print(f"❌ Erreur lecture fichier live : {file.name} → {e}")
+        add_phase("load.live", time.perf_counter() - t_live)
 
     # === 3) Fallback extraction automatique si aucun morceau trouvé
     if not dfs:
         print(f"⛏ Aucune donnée trouvée → extraction automatique requise")
-        df = extract_data_auto(symbol, timeframe, start_date, end_date)
+        with span("load.extract"):
+            df = extract_data_auto(symbol, timeframe, start_date, end_date)
 
         if df is None or df.empty:
             raise FileNotFoundError("❌ Aucune donnée extraite")
@@ -180,15 +259,106 @@ def load_data_or_extract(symbol: str, timeframe: str, start_date: str, end_date:
     if not valid_dfs:
         raise FileNotFoundError("❌ Aucun DataFrame valide à fusionner")
 
-    # Première passe (doc héritée) — conservée pour transparence
-    full_df = pd.concat(valid_dfs)
-    full_df = full_df[~full_df.index.duplicated(keep="first")]
-    full_df.sort_index(inplace=True)
+    with span("load.merge"):
+        # Première passe (doc héritée) — conservée pour transparence
+        full_df = pd.concat(valid_dfs)
+        full_df = full_df[~full_df.index.duplicated(keep="first")]
+        full_df.sort_index(inplace=True)
 
-    # Deuxième passe (version finale utilisée)
-    final_df = pd.concat(valid_dfs).sort_index()
-    final_df = final_df[~final_df.index.duplicated(keep="last")]
-    final_df = final_df.loc[(final_df.index >= start_dt) & (final_df.index <= end_dt)]
-    final_df["time"] = final_df.index  # 🧠 obligatoire pour le runner_core
+        # Deuxième passe (version finale utilisée)
+        final_df = pd.concat(valid_dfs).sort_index()
+        final_df = final_df[~final_df.index.duplicated(keep="last")]
+        final_df = final_df.loc[(final_df.index >= start_dt) & (final_df.index <= end_dt)]
+        final_df["time"] = final_df.index  # 🧠 obligatoire pour le runner_core
+    count("bars_loaded", len(final_df))
     print(f"✅ DF final : {final_df.shape}")
     return final_df
+
+
+# ============================================================
+# 🧠 Cache mémoire (LRU) devant load_data_or_extract
+# ============================================================
+DATA_CACHE_MAX = int(os.getenv("DATA_CACHE_MAX", "8"))
+_DATA_CACHE: "OrderedDict[tuple, tuple]" = OrderedDict()
+_DATA_CACHE_LOCK = threading.Lock()
+gauge("backtradz_data_cache_entries", "Entrées du cache data (par process)").set_function(lambda: len(_DATA_CACHE))
+
+
+def _sources_fingerprint(symbol: str, timeframe: str, start_dt: datetime, end_dt: datetime) -> tuple:
+    """
+    Liste (chemin, mtime_ns, size) des fichiers que load_data_or_extract lirait
+    pour cette requête (mensuels natifs, sources de resampling, live).
+    Tuple vide → rien sur disque (extraction nécessaire, non mise en cache).
+    """
+    parts = []
+    current = start_dt.replace(day=1)
+    while current <= end_dt:
+        month_str = current.strftime("%Y-%m")
+        filename = f"{symbol}_{timeframe}_{month_str}.csv"
+        candA = OUTPUT_DIR / symbol / month_str / filename
+        candB = OUTPUT_DIR / symbol / timeframe / filename
+        path = candA if candA.exists() else candB if candB.exists() else None
+        if path is None:
+            found = find_finest_source(symbol, timeframe, month_str)
+            path = found[1] if found else None
+        if path is not None:
+            st = path.stat()
+            parts.append((str(path), st.st_mtime_ns, st.st_size))
+        current = (current.replace(day=28) + pd.Timedelta(days=4)).replace(day=1)
+
+    live_dir = OUTPUT_LIVE_DIR / symbol / timeframe
+    if live_dir.exists():
+        for file in sorted(live_dir.glob("*.csv")):
+            st = file.stat()
+            parts.append((str(file), st.st_mtime_ns, st.st_size))
+    return tuple(parts)
+
+
+def load_data_cached(symbol: str, timeframe: str, start_date: str, end_date: str, readonly: bool = False):
+    """
+    Même contrat que load_data_or_extract, avec cache LRU (DATA_CACHE_MAX entrées).
+    Entrées publiées dans le store partagé (shared_frames) quand il est actif : le LRU ne
+    garde alors qu'un mapping (pages communes aux workers), rendu à l'éviction.
+
+    Args:
+        readonly: False → copie privée (mutable), 1 frame par requête en cours.
+                  True → le frame du cache lui-même (memmap partagé, lecture seule) : 0 copie,
+                  l'appelant ne doit pas le muter (runner : prepare_ohlc / detect_signals).
+    """
+    start_dt = datetime.strptime(start_date, "%Y-%m-%d")
+    end_dt = datetime.strptime(end_date, "%Y-%m-%d")
+    key = (symbol, timeframe, start_date, end_date)
+    fingerprint = _sources_fingerprint(symbol, timeframe, start_dt, end_dt)
+
+    with _DATA_CACHE_LOCK:
+        hit = _DATA_CACHE.get(key)
+        if hit is not None and hit[0] == fingerprint:
+            _DATA_CACHE.move_to_end(key)
+            print(f"♻️ Cache data : {symbol} {timeframe} {start_date} → {end_date}")
+            CACHE_REQUESTS.labels("data", "hit").inc()
+            return hit[1] if readonly else hit[1].copy()
+    CACHE_REQUESTS.labels("data", "miss").inc()
+
+    df = load_data_or_extract(symbol, timeframe, start_date, end_date)
+
+    if fingerprint and DATA_CACHE_MAX > 0:
+        # Store partagé dispo → l'entrée LRU est un mapping commun à tous les workers (pas de copie privée)
+        store = get_store()
+        store_key = (symbol, timeframe, f"{start_date}..{end_date}", fingerprint)
+        cached = store.publish(store_key, df) if store is not None else None
+        if cached is None:
+            cached, store_key = df, None
+        with _DATA_CACHE_LOCK:
+            evicted = [_DATA_CACHE.pop(key, None)]
+            _DATA_CACHE[key] = (fingerprint, cached, store_key)
+            _DATA_CACHE.move_to_end(key)
+            while len(_DATA_CACHE) > DATA_CACHE_MAX:
+                evicted.append(_DATA_CACHE.popitem(last=False)[1])
+        for old in evicted:
+            if old is not None and old[2] is not None:
+                store.release(old[2])
+        if readonly:
+            return cached  # mapping partagé : le frame privé du chargement est libéré
+        if store_key is not None:
+            return df  # frame privé de ce chargement : pas besoin de copie
+    return df if readonly else df.copy()
@@ -0,0 +1,183 @@
+"""
+File: backend/app/utils/file_serving.py
+Role: Service HTTP efficace des téléchargements CSV : validation de cache (ETag / Last-Modified → 304),
+      reprise (Range, géré par FileResponse), gzip pré-calculé (.csv.gz), conversion Parquet optionnelle.
+Depends:
+  - starlette FileResponse (Range / If-Range / 206 / 416 natifs)
+  - app.utils.single_flight (1 seule génération de .gz / .parquet pour N requêtes simultanées)
+  - pyarrow (requirements.txt ; fastparquet accepté aussi) pour format=parquet
+Side-effects:
+  - Écrit <fichier>.csv.gz et <fichier>.parquet à côté du CSV (1 fois par version du CSV)
+Notes:
+  - ETag = taille + mtime_ns du CSV SOURCE (+ suffixe de variante -gz / -pq) : calculable sans
+    générer la variante → conditional_response() répond 304 AVANT tout débit de crédit.
+  - Variantes datées du mtime de la source (os.utime) : variante périmée = mtime différent → régénérée.
+  - gzip servi si Accept-Encoding l'autorise, sans en-tête Range (reprise = octets du CSV brut)
+    et au-delà de DOWNLOAD_GZIP_MIN_KB ; Vary: Accept-Encoding dans tous les cas.
+"""
+
+import gzip
+import importlib.util
+import os
+import shutil
+import uuid
+from email.utils import formatdate, parsedate_to_datetime
+from pathlib import Path
+
+import pandas as pd
+from fastapi import Request
+from fastapi.responses import FileResponse, Response
+
+from app.utils import single_flight
+
+DOWNLOAD_GZIP_MIN_KB = int(os.getenv("DOWNLOAD_GZIP_MIN_KB", "32"))
+DOWNLOAD_GZIP_LEVEL = int(os.getenv("DOWNLOAD_GZIP_LEVEL", "6"))
+# Téléchargements liés à un compte (crédits) → cache privé, revalidation systématique
+DOWNLOAD_CACHE_CONTROL = os.getenv("DOWNLOAD_CACHE_CONTROL", "private, no-cache")
+
+FORMATS = ("csv", "parquet")
+PARQUET_MEDIA_TYPE = "application/vnd.apache.parquet"
+
+
+class UnsupportedFormat(ValueError):
+    """Format demandé inconnu ou moteur Parquet absent."""
+
+
+def _etag(st, variant: str = "") -> str:
+    return f'"{st.st_size:x}-{st.st_mtime_ns:x}{variant}"'
+
+
+def _accepts_gzip(request: Request) -> bool:
+    for part in (request.headers.get("accept-encoding") or "").split(","):
+        token, _, params = part.strip().partition(";")
+        if token.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            return not (q.startswith("q=") and float(q[2:] or 0) == 0)
+    return False
+
+
+def _variant(request: Request, path: Path, st, fmt: str) -> str:
+    if fmt == "parquet":
+        return "-pq"
+    if (_accepts_gzip(request) and "range" not in request.headers
+            and st.st_size >= DOWNLOAD_GZIP_MIN_KB * 1024):
+        return "-gz"
+    return ""
+
+
+def _not_modified(request: Request, etag: str, st) -> bool:
+    inm = request.headers.get("if-none-match")
+    if inm is not None:
+        tags = {t.strip().removeprefix("W/") for t in inm.split(",")}
+        return "*" in tags or etag in tags
+    ims = request.headers.get("if-modified-since")
+    if ims:
+        try:
+            return int(st.st_mtime) <= parsedate_to_datetime(ims).timestamp()
+        except (TypeError, ValueError):
+            return False
+    return False
+
+
+def check_format(fmt) -> str:
+    """Normalise ?format= ; UnsupportedFormat si inconnu ou moteur Parquet non installé."""
+    fmt = (fmt or "csv").lower()
+    if fmt not in FORMATS:
+        raise UnsupportedFormat(f"Format inconnu : {fmt} (attendu : {', '.join(FORMATS)})")
+    if fmt == "parquet" and not any(importlib.util.find_spec(m) for m in ("pyarrow", "fastparquet")):
+        raise UnsupportedFormat("Export Parquet indisponible (pyarrow non installé)")
+    return fmt
+
+
+def conditional_response(request: Request, path, fmt: str = "csv"):
+    """304 si le client a déjà cette version (à appeler avant tout débit) ; None sinon."""
+    path = Path(path)
+    st = path.stat()
+    etag = _etag(st, _variant(request, path, st, fmt))
+    if not _not_modified(request, etag, st):
+        return None
+    return Response(status_code=304, headers={
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    })
+
+
+# --- variantes pré-calculées --------------------------------------------------
+
+def _build_sibling(src: Path, dst: Path, writer) -> Path:
+    st = src.stat()
+
+    def _make():
+        try:
+            if dst.stat().st_mtime_ns == st.st_mtime_ns:
+                return dst  # déjà générée par un autre process
+        except OSError:
+            pass
+        tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+        try:
+            writer(src, tmp)
+            os.utime(tmp, ns=(st.st_atime_ns, st.st_mtime_ns))  # version = mtime de la source
+            os.replace(tmp, dst)
+        finally:
+            tmp.unlink(missing_ok=True)
+        print(f"🗜️ Variante générée : {dst.name}")
+        return dst
+
+    try:
+        if dst.stat().st_mtime_ns == st.st_mtime_ns:
+            return dst
+    except OSError:
+        pass
+    return single_flight.run((str(dst), st.st_mtime_ns), _make, name="download_variant")
+
+
+def _write_gzip(src: Path, tmp: Path) -> None:
+    with open(src, "rb") as fin, open(tmp, "wb") as raw, \
+            gzip.GzipFile(fileobj=raw, mode="wb", compresslevel=DOWNLOAD_GZIP_LEVEL, mtime=0) as fout:
+        shutil.copyfileobj(fin, fout, 1 << 20)
+
+
+def _write_parquet(src: Path, tmp: Path) -> None:
+    pd.read_csv(src).to_parquet(tmp)
+
+
+def gzip_sibling(path) -> Path:
+    path = Path(path)
+    return _build_sibling(path, path.with_name(path.name + ".gz"), _write_gzip)
+
+
+def parquet_sibling(path) -> Path:
+    path = Path(path)
+    return _build_sibling(path, path.with_suffix(".parquet"), _write_parquet)
+
+
+# --- réponse ------------------------------------------------------------------
+
+def serve_file(request: Request, path, filename: str, media_type: str = "text/csv", fmt: str = "csv"):
+    """
+    FileResponse avec ETag / Last-Modified / 304, Range (206) et variante gzip ou Parquet.
+    fmt doit avoir été validé par check_format().
+    """
+    path = Path(path)
+    st = path.stat()
+    variant = _variant(request, path, st, fmt)
+    etag = _etag(st, variant)
+    if _not_modified(request, etag, st):
+        return conditional_response(request, path, fmt)
+
+    headers = {
+        "ETag": etag,
+        "Last-Modified": formatdate(st.st_mtime, usegmt=True),
+        "Cache-Control": DOWNLOAD_CACHE_CONTROL,
+        "Vary": "Accept-Encoding",
+    }
+    send = path
+    if variant == "-pq":
+        send = parquet_sibling(path)
+        filename, media_type = Path(filename).with_suffix(".parquet").name, PARQUET_MEDIA_TYPE
+    elif variant == "-gz":
+        send = gzip_sibling(path)
+        headers["Content-Encoding"] = "gzip"
+    return FileResponse(send, filename=filename, media_type=media_type, headers=headers)
@@ -0,0 +1,36 @@
+"""
+File: backend/app/utils/indicators.py
+Role: Indicateurs "standard fichier" ajoutés aux CSV OHLC (RSI_14, EMA_50, EMA_200).
+Depends:
+  - pandas
+Notes:
+  - Mêmes formules que extract_data_auto (RSI = moyennes glissantes 14 gains/pertes,
+    EMA = ewm(span) adjust=True) → les CSV du bulk extractor / resampling sont
+    interchangeables avec ceux de output_live.
+"""
+
+import pandas as pd
+
+# Colonnes finales attendues par load_data_or_extract / runner_core
+FILE_COLUMNS = ["Datetime", "Open", "High", "Low", "Close", "Volume", "RSI_14", "EMA_50", "EMA_200"]
+
+
+def add_rsi_ema(df: pd.DataFrame) -> pd.DataFrame:
+    """
+    Ajoute RSI_14 / EMA_50 / EMA_200 à partir de 'Close' (modifie et retourne df).
+    """
+    close = pd.to_numeric(df["Close"], errors="coerce")
+
+    # RSI (14)
+    delta = close.diff()
+    gain = delta.clip(lower=0)
+    loss = -delta.clip(upper=0)
+    avg_gain = gain.rolling(window=14).mean()
+    avg_loss = loss.rolling(window=14).mean()
+    rs = avg_gain / avg_loss
+    df["RSI_14"] = 100 - (100 / (1 + rs))
+
+    # EMA
+    df["EMA_50"] = close.ewm(span=50).mean()
+    df["EMA_200"] = close.ewm(span=200).mean()
+    return df
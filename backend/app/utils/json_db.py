@@ -1,29 +1,136 @@
 # backend/utils/json_db.py
-# E/S JSON robustes + lock simple pour éviter la corruption en écriture concurrente.
+# E/S JSON robustes + verrou inter-process (fcntl.flock, repli O_EXCL + pid) pour éviter
+# corruption et écritures perdues entre workers uvicorn.
 
-import json, os, time
+import json, os, socket, threading, time, uuid
 from pathlib import Path
 from contextlib import contextmanager
 
-@contextmanager
-def file_lock(lock_path: Path, timeout=5):
-    start = time.time()
+try:
+    import fcntl  # POSIX : verrou consultatif noyau, libéré automatiquement si le process meurt
+except ImportError:  # Windows (dev) → repli O_EXCL + pid
+    fcntl = None
+
+FILE_LOCK_STALE_S = float(os.getenv("FILE_LOCK_STALE_S", "300"))  # repli O_EXCL uniquement
+STORE_LOCK_TIMEOUT = float(os.getenv("STORE_LOCK_TIMEOUT", "10"))
+
+# Réentrance par thread : un helper verrouillé peut appeler un autre helper du même store
+_held = threading.local()
+
+
+def _pid_alive(pid: int) -> bool:
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except (PermissionError, OSError):
+        return True
+    return True
+
+
+def _break_if_stale(lock_path: Path) -> bool:
+    """Repli O_EXCL : lock laissé par un process mort (même hôte) ou trop vieux → supprimé."""
+    try:
+        st = lock_path.stat()
+        owner = lock_path.read_text(encoding="utf-8").split()
+    except (OSError, UnicodeDecodeError):
+        return False
+    stale = time.time() - st.st_mtime > FILE_LOCK_STALE_S
+    if not stale and len(owner) >= 2 and owner[1] == socket.gethostname():
+        try:
+            stale = not _pid_alive(int(owner[0]))
+        except ValueError:
+            stale = False
+    if stale:
+        print(f"🧹 Lock périmé supprimé : {lock_path.name} (détenteur {' '.join(owner) or '?'})")
+        lock_path.unlink(missing_ok=True)
+    return stale
+
+
+def _acquire_excl(lock_path: Path, deadline):
+    delay = 0.005
     while True:
         try:
             fd = os.open(str(lock_path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+            os.write(fd, f"{os.getpid()} {socket.gethostname()}".encode())
             os.close(fd)
-            break
+            return
         except FileExistsError:
-            if time.time() - start > timeout:
+            if _break_if_stale(lock_path):
+                continue
+            if deadline is not None and time.monotonic() >= deadline:
                 raise TimeoutError("DB lock timeout")
-            time.sleep(0.05)
+            time.sleep(delay)
+            delay = min(delay * 2, 0.1)
+
+
+def _acquire_flock(lock_path: Path, deadline):
+    fh = open(lock_path, "a+")
+    try:
+        if deadline is None:
+            fcntl.flock(fh, fcntl.LOCK_EX)  # attente bloquante côté noyau (pas de polling)
+        else:
+            delay = 0.002
+            while True:
+                try:
+                    fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+                    break
+                except BlockingIOError:
+                    if time.monotonic() >= deadline:
+                        raise TimeoutError("DB lock timeout")
+                    time.sleep(delay)
+                    delay = min(delay * 2, 0.05)
+        fh.seek(0)
+        fh.truncate()
+        fh.write(f"{os.getpid()} {socket.gethostname()}")  # diagnostic uniquement
+        fh.flush()
+        return fh
+    except BaseException:
+        fh.close()
+        raise
+
+
+@contextmanager
+def file_lock(lock_path: Path, timeout=5):
+    """
+    Verrou exclusif inter-process (flock) ; timeout=None → attente illimitée, 0 → essai unique.
+    Lève TimeoutError si non obtenu. Le fichier de lock n'est jamais supprimé (flock) :
+    un détenteur crashé libère le verrou immédiatement (noyau).
+    """
+    lock_path = Path(lock_path)
+    key = str(lock_path.resolve())
+    held = _held.__dict__.setdefault("paths", {})
+    if key in held:  # déjà détenu par ce thread
+        held[key] += 1
+        try:
+            yield
+        finally:
+            held[key] -= 1
+        return
+
+    deadline = None if timeout is None else time.monotonic() + timeout
+    fh = _acquire_flock(lock_path, deadline) if fcntl is not None else _acquire_excl(lock_path, deadline)
+    held[key] = 1
     try:
         yield
     finally:
-        try:
-            lock_path.unlink(missing_ok=True)
-        except Exception:
-            pass
+        del held[key]
+        if fh is not None:
+            try:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+            finally:
+                fh.close()
+        else:
+            try:
+                lock_path.unlink(missing_ok=True)
+            except Exception:
+                pass
+
+
+def store_lock(path: Path, timeout=STORE_LOCK_TIMEOUT):
+    """Verrou d'un store JSON (<fichier>.lock) à tenir pendant tout lecture → modification → écriture."""
+    path = Path(path)
+    return file_lock(path.with_name(path.name + ".lock"), timeout=timeout)
 
 def read_json(path: Path, default):
     if not path.exists(): 
@@ -32,7 +139,7 @@ def read_json(path: Path, default):
         return json.load(f)
 
 def write_json_atomic(path: Path, data):
-    tmp = path.with_suffix(path.suffix + ".tmp")
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")  # unique : pas de collision entre writers
     with tmp.open("w", encoding="utf-8") as f:
         json.dump(data, f, ensure_ascii=False, indent=2)
         f.flush(); os.fsync(f.fileno())
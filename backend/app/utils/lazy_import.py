@@ -0,0 +1,75 @@
+"""
+File: backend/app/utils/lazy_import.py
+Role: Import différé des modules lourds (stripe, yfinance, openpyxl…) pour un cold start court.
+Depends:
+  - stdlib (importlib)
+Notes:
+  - `stripe = lazy_module("stripe")` : rien n'est importé tant qu'on ne touche pas
+    un attribut (stripe.checkout…, stripe.error…) → 1er appel = import réel.
+  - on_load(mod) : configuration à faire APRÈS import (ex: stripe.api_key) ;
+    ne JAMAIS faire `proxy.attr = x` au niveau module (ça déclencherait l'import).
+  - Un seul proxy par nom de module ; plusieurs on_load possibles (exécutés dans l'ordre).
+  - Vérifier le budget de démarrage : python -m app.scripts.startup_budget
+"""
+
+import importlib
+import threading
+import types
+from typing import Callable, Dict, Optional
+
+_proxies: Dict[str, "LazyModule"] = {}
+_registry_lock = threading.Lock()
+
+
+class LazyModule(types.ModuleType):
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_lazy_module"] = None
+        self.__dict__["_lazy_hooks"] = []
+        self.__dict__["_lazy_lock"] = threading.Lock()
+
+    def _load(self):
+        mod = self.__dict__["_lazy_module"]
+        if mod is not None:
+            return mod
+        with self.__dict__["_lazy_lock"]:
+            mod = self.__dict__["_lazy_module"]
+            if mod is None:
+                mod = importlib.import_module(self.__name__)
+                for hook in self.__dict__["_lazy_hooks"]:
+                    hook(mod)
+                self.__dict__["_lazy_module"] = mod
+        return mod
+
+    def __getattr__(self, attr):
+        return getattr(self._load(), attr)
+
+    def __setattr__(self, attr, value):
+        setattr(self._load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._load())
+
+    def __repr__(self):
+        state = "loaded" if self.__dict__["_lazy_module"] is not None else "lazy"
+        return f"<LazyModule {self.__name__!r} ({state})>"
+
+
+def lazy_module(name: str, on_load: Optional[Callable] = None) -> LazyModule:
+    """Proxy paresseux vers le module `name` (partagé entre appelants)."""
+    with _registry_lock:
+        proxy = _proxies.get(name)
+        if proxy is None:
+            proxy = _proxies[name] = LazyModule(name)
+    if on_load is not None:
+        mod = proxy.__dict__["_lazy_module"]
+        if mod is not None:
+            on_load(mod)  # déjà chargé : on applique tout de suite
+        else:
+            proxy.__dict__["_lazy_hooks"].append(on_load)
+    return proxy
+
+
+def is_loaded(name: str) -> bool:
+    proxy = _proxies.get(name)
+    return proxy is not None and proxy.__dict__["_lazy_module"] is not None
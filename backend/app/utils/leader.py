@@ -0,0 +1,139 @@
+"""
+File: backend/app/utils/leader.py
+Role: Élection d'un worker leader pour les jobs planifiés → 1 seule exécution pour N workers uvicorn.
+Depends:
+  - fcntl (POSIX) ; repli bail (fichier pid + battement) si absent
+  - app.core.paths.CACHE_DIR, app.utils.metrics.SCHEDULER_LEADER
+Side-effects:
+  - CACHE_DIR/locks/scheduler.leader (verrou tenu par le leader pendant toute sa vie)
+Notes:
+  - Leader = le process qui tient le flock exclusif du fichier ; il ne le relâche jamais :
+    s'il meurt (crash, redémarrage), le noyau libère le verrou et un autre worker en attente
+    le prend sous LEADER_RETRY_S secondes, puis démarre SES jobs (on_elected).
+  - is_leader() : tente l'élection au 1er appel (utilisable dans un repeat_every dès le startup).
+  - LEADER_ELECTION=0 → chaque process se considère leader (comportement historique, 1 worker).
+  - Portée = les workers qui partagent DATA_ROOT sur le même hôte (flock non fiable sur NFS).
+"""
+
+import os
+import socket
+import threading
+import time
+
+from app.core.paths import CACHE_DIR
+from app.utils.metrics import SCHEDULER_LEADER
+
+try:
+    import fcntl
+except ImportError:  # Windows (dev)
+    fcntl = None
+
+LEADER_ELECTION = os.getenv("LEADER_ELECTION", "1").strip().lower() not in ("0", "false", "no")
+LEADER_RETRY_S = float(os.getenv("LEADER_RETRY_S", "15"))
+LEADER_LOCK_PATH = CACHE_DIR / "locks" / "scheduler.leader"
+
+
+class _Leader:
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        self._fh = None
+        self._leader = not LEADER_ELECTION
+        self._callbacks = []
+        self._standby = None
+
+    # --- acquisition --------------------------------------------------------
+
+    def _try_flock(self) -> bool:
+        fh = open(self.path, "a+")
+        try:
+            fcntl.flock(fh, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except BlockingIOError:
+            fh.close()
+            return False
+        fh.seek(0)
+        fh.truncate()
+        fh.write(f"{os.getpid()} {socket.gethostname()} {time.time():.0f}")
+        fh.flush()
+        self._fh = fh  # gardé ouvert : le verrou vit autant que le process
+        return True
+
+    def _try_lease(self) -> bool:
+        """Repli sans fcntl : bail O_EXCL, repris si le détenteur ne bat plus depuis 3 × LEADER_RETRY_S."""
+        try:
+            if time.time() - self.path.stat().st_mtime > 3 * LEADER_RETRY_S:
+                self.path.unlink(missing_ok=True)
+        except OSError:
+            pass
+        try:
+            fd = os.open(str(self.path), os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            return False
+        os.write(fd, f"{os.getpid()} {socket.gethostname()}".encode())
+        os.close(fd)
+        threading.Thread(target=self._heartbeat, name="leader-lease", daemon=True).start()
+        return True
+
+    def _heartbeat(self) -> None:
+        while True:
+            try:
+                os.utime(self.path)
+            except OSError:
+                pass
+            time.sleep(LEADER_RETRY_S)
+
+    def _try_acquire(self) -> bool:
+        with self._lock:
+            if self._leader:
+                return True
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+                won = self._try_flock() if fcntl is not None else self._try_lease()
+            except OSError as e:
+                print(f"⚠️ Élection leader impossible ({e}) → jobs non démarrés dans ce worker")
+                return False
+            if won:
+                self._leader = True
+                SCHEDULER_LEADER.set(1)
+                print(f"👑 Worker {os.getpid()} élu leader des jobs planifiés")
+            return won
+
+    # --- API ----------------------------------------------------------------
+
+    def is_leader(self) -> bool:
+        return self._leader or self._try_acquire()
+
+    def on_elected(self, fn) -> None:
+        """fn() exécuté une fois, dès que ce process est (ou devient) leader."""
+        with self._lock:
+            self._callbacks.append(fn)
+        if self.is_leader():
+            self._run_callbacks()
+        else:
+            self._start_standby()
+
+    def _run_callbacks(self) -> None:
+        with self._lock:
+            callbacks, self._callbacks = self._callbacks, []
+        for fn in callbacks:
+            try:
+                fn()
+            except Exception as e:
+                print(f"❌ Démarrage job leader KO ({getattr(fn, '__name__', fn)}) : {e}")
+
+    def _start_standby(self) -> None:
+        with self._lock:
+            if self._standby is not None:
+                return
+            self._standby = threading.Thread(target=self._standby_loop, name="leader-standby", daemon=True)
+            self._standby.start()
+
+    def _standby_loop(self) -> None:
+        while not self.is_leader():
+            time.sleep(LEADER_RETRY_S)
+        self._run_callbacks()
+
+
+_LEADER = _Leader(LEADER_LOCK_PATH)
+is_leader = _LEADER.is_leader
+on_elected = _LEADER.on_elected
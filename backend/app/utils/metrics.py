@@ -0,0 +1,298 @@
+"""
+File: backend/app/utils/metrics.py
+Role: Registre de métriques in-process (Counter / Gauge / Histogram) + exposition texte
+      format Prometheus pour GET /metrics.
+Depends:
+  - stdlib uniquement (aucun client / service externe)
+Side-effects:
+  - Aucun (état mémoire du process)
+Notes:
+  - Coût par observation ~1 µs : enfant pré-résolu par .labels(...), 1 lock + bisect.
+    Dans le code chaud, garder une référence à l'enfant (`X = METRIC.labels("a")`).
+  - Valeurs PAR PROCESS : avec plusieurs workers uvicorn, chaque scrape voit le worker
+    qui répond (label `pid` ajouté à l'exposition pour les distinguer).
+  - Catalogue des métriques applicatives en bas de fichier (noms backtradz_*).
+"""
+
+import math
+import os
+import threading
+import time
+from bisect import bisect_left
+from contextlib import contextmanager
+from typing import Callable, Dict, Optional, Sequence, Tuple
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def _fmt(v: float) -> str:
+    if v == math.inf:
+        return "+Inf"
+    if float(v).is_integer():
+        return str(int(v))
+    return repr(float(v))
+
+
+def _escape(v) -> str:
+    return str(v).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def _labels_str(names: Sequence[str], values: Sequence, extra: Tuple = ()) -> str:
+    pairs = [f'{n}="{_escape(v)}"' for n, v in zip(names, values)] + list(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+# --- Enfants (1 par combinaison de labels) -----------------------------------
+
+class _CounterChild:
+    __slots__ = ("_lock", "value")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+
+class _GaugeChild:
+    __slots__ = ("_lock", "value", "_fn")
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.value = 0.0
+        self._fn = None
+
+    def inc(self, amount: float = 1.0):
+        with self._lock:
+            self.value += amount
+
+    def dec(self, amount: float = 1.0):
+        with self._lock:
+            self.value -= amount
+
+    def set(self, value: float):
+        self.value = float(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        """Valeur calculée au scrape (ex: taille d'un cache)."""
+        self._fn = fn
+
+    def get(self) -> float:
+        if self._fn is not None:
+            try:
+                return float(self._fn())
+            except Exception:
+                return math.nan
+        return self.value
+
+    @contextmanager
+    def track_inprogress(self):
+        self.inc()
+        try:
+            yield
+        finally:
+            self.dec()
+
+
+class _HistogramChild:
+    __slots__ = ("_lock", "_upper", "counts", "sum", "count")
+
+    def __init__(self, upper: Tuple[float, ...]):
+        self._lock = threading.Lock()
+        self._upper = upper
+        self.counts = [0] * (len(upper) + 1)  # dernier = +Inf
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value: float):
+        i = bisect_left(self._upper, value)
+        with self._lock:
+            self.counts[i] += 1
+            self.sum += value
+            self.count += 1
+
+    @contextmanager
+    def time(self):
+        t0 = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - t0)
+
+
+# --- Métriques -----------------------------------------------------------------
+
+class _Metric:
+    kind = "untyped"
+
+    def __init__(self, name: str, documentation: str, labelnames: Sequence[str] = ()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        self._children: Dict[tuple, object] = {}
+        self._lock = threading.Lock()
+
+    def _new_child(self):
+        raise NotImplementedError
+
+    def labels(self, *values, **kw):
+        """Enfant pour une combinaison de labels (créé au 1er appel, puis lookup dict)."""
+        if kw:
+            values = tuple(kw[n] for n in self.labelnames)
+        key = tuple(str(v) for v in values)
+        child = self._children.get(key)
+        if child is None:
+            if len(key) != len(self.labelnames):
+                raise ValueError(f"{self.name} attend les labels {self.labelnames}")
+            with self._lock:
+                child = self._children.setdefault(key, self._new_child())
+        return child
+
+    def _default(self):
+        return self.labels()
+
+    def samples(self):
+        raise NotImplementedError
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def _new_child(self):
+        return _CounterChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield f"{self.name}_total", key, (), child.value
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def _new_child(self):
+        return _GaugeChild()
+
+    def inc(self, amount: float = 1.0):
+        self._default().inc(amount)
+
+    def dec(self, amount: float = 1.0):
+        self._default().dec(amount)
+
+    def set(self, value: float):
+        self._default().set(value)
+
+    def set_function(self, fn: Callable[[], float]):
+        self._default().set_function(fn)
+
+    def track_inprogress(self):
+        return self._default().track_inprogress()
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            yield self.name, key, (), child.get()
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, documentation, labelnames=(), buckets: Sequence[float] = DEFAULT_BUCKETS):
+        super().__init__(name, documentation, labelnames)
+        self._upper = tuple(sorted(float(b) for b in buckets))
+
+    def _new_child(self):
+        return _HistogramChild(self._upper)
+
+    def observe(self, value: float):
+        self._default().observe(value)
+
+    def time(self):
+        return self._default().time()
+
+    def samples(self):
+        for key, child in list(self._children.items()):
+            with child._lock:
+                counts, total, n = list(child.counts), child.sum, child.count
+            acc = 0
+            for upper, c in zip(self._upper + (math.inf,), counts):
+                acc += c
+                yield f"{self.name}_bucket", key, (f'le="{_fmt(upper)}"',), acc
+            yield f"{self.name}_sum", key, (), total
+            yield f"{self.name}_count", key, (), n
+
+
+# --- Registre ------------------------------------------------------------------
+
+class Registry:
+    def __init__(self):
+        self._metrics: Dict[str, _Metric] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name, documentation, labelnames, **kw) -> _Metric:
+        with self._lock:
+            m = self._metrics.get(name)
+            if m is None:
+                m = self._metrics[name] = cls(name, documentation, labelnames, **kw)
+            elif not isinstance(m, cls) or m.labelnames != tuple(labelnames):
+                raise ValueError(f"Métrique {name} déjà enregistrée avec un autre type/labels")
+            return m
+
+    def counter(self, name, documentation, labelnames=()) -> Counter:
+        return self._get_or_create(Counter, name, documentation, labelnames)
+
+    def gauge(self, name, documentation, labelnames=()) -> Gauge:
+        return self._get_or_create(Gauge, name, documentation, labelnames)
+
+    def histogram(self, name, documentation, labelnames=(), buckets=DEFAULT_BUCKETS) -> Histogram:
+        return self._get_or_create(Histogram, name, documentation, labelnames, buckets=buckets)
+
+    def render(self, pid: Optional[int] = None) -> str:
+        """Exposition texte (format Prometheus 0.0.4)."""
+        extra = (f'pid="{pid if pid is not None else os.getpid()}"',)
+        lines = []
+        for m in sorted(self._metrics.values(), key=lambda x: x.name):
+            exposed = f"{m.name}_total" if m.kind == "counter" else m.name
+            lines.append(f"# HELP {exposed} {_escape(m.documentation)}")
+            lines.append(f"# TYPE {exposed} {m.kind}")
+            for sample_name, key, sample_extra, value in m.samples():
+                labels = _labels_str(m.labelnames, key, sample_extra + extra)
+                lines.append(f"{sample_name}{labels} {_fmt(value)}")
+        return "\n".join(lines) + "\n"
+
+
+REGISTRY = Registry()
+counter = REGISTRY.counter
+gauge = REGISTRY.gauge
+histogram = REGISTRY.histogram
+render = REGISTRY.render
+
+
+# --- Catalogue applicatif ---------------------------------------------------------
+
+HTTP_REQUESTS = counter("backtradz_http_requests", "Requêtes HTTP traitées", ("method", "route", "status"))
+HTTP_LATENCY = histogram("backtradz_http_request_duration_seconds", "Latence HTTP par route", ("method", "route"))
+HTTP_IN_FLIGHT = gauge("backtradz_http_requests_in_flight", "Requêtes HTTP en cours")
+
+BACKTESTS_IN_FLIGHT = gauge("backtradz_backtests_in_flight", "Backtests en cours", ("kind",))
+BACKTESTS = counter("backtradz_backtests", "Backtests terminés", ("kind", "status"))
+BACKTEST_DURATION = histogram("backtradz_backtest_duration_seconds", "Durée totale d'un backtest", ("kind",))
+
+USERS_JSON_SECONDS = histogram("backtradz_users_json_seconds", "Lecture/écriture de users.json", ("op",),
+                               buckets=(0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 1.0))
+XLSX_OPEN_SECONDS = histogram("backtradz_xlsx_open_seconds", "Ouverture d'un XLSX d'analyse", ("site",))
+
+LOADER_BYTES_READ = counter("backtradz_data_loader_bytes_read", "Octets CSV lus par le data loader", ("source",))
+CACHE_REQUESTS = counter("backtradz_cache_requests", "Accès aux caches (hit/miss)", ("cache", "result"))
+
+ADMISSION_WAIT = histogram("backtradz_admission_wait_seconds", "Attente en file avant démarrage d'un job CPU",
+                           ("kind", "priority"),
+                           buckets=(0.001, 0.01, 0.1, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0, 120.0, 300.0))
+ADMISSION_REJECTED = counter("backtradz_admission_rejected", "Jobs CPU refusés (429)", ("kind", "reason"))
+SINGLE_FLIGHT = counter("backtradz_single_flight", "Appels coalescés (leader / follower / attente inter-process)",
+                        ("name", "role"))
+SCHEDULER_LEADER = gauge("backtradz_scheduler_leader", "1 si ce worker exécute les jobs planifiés (leader élu)")
@@ -1,6 +1,7 @@
 import json
 from datetime import datetime, timedelta
 from app.models.users import USERS_FILE
+from app.utils.json_db import store_lock
 from app.models.offers import get_offer_by_id
 
 
@@ -23,7 +24,7 @@ def update_user_after_payment(
     """
     if not USERS_FILE.exists():
         return False
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with store_lock(USERS_FILE), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
         if user_id not in users:
             return False
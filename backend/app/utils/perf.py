@@ -0,0 +1,258 @@
+"""
+File: backend/app/utils/perf.py
+Role: Chronométrage par phase des backtests (spans légers) + store glissant + percentiles.
+Depends:
+  - app.core.paths (DATA_ROOT → metrics/phases.jsonl)
+  - app.utils.json_db.file_lock (append/compaction sûrs entre workers uvicorn)
+Side-effects:
+  - Ajoute 1 ligne JSON par run terminé dans DATA_ROOT/metrics/phases.jsonl
+Notes:
+  - Contexte de run porté par un ContextVar : span() n'enregistre rien hors run
+    (coût ~nul pour les scripts / workers qui n'ouvrent pas de run).
+  - Spans imbriqués = noms pointés à plat ("runner", "runner.detect", ...) ;
+    un même nom répété dans un run est cumulé.
+  - Store borné : au-delà de PERF_STORE_MAX_RUNS lignes (vérifié par taille fichier),
+    on ne garde que la moitié la plus récente (réécriture atomique).
+  - PERF_ENABLED=0 → aucun enregistrement (les spans restent des no-op).
+  - Chaque run alimente aussi /metrics (backtests en vol, total par statut, durée).
+"""
+
+import functools
+import inspect
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from datetime import datetime, timedelta, timezone
+from typing import Iterable, Optional
+
+import numpy as np
+
+from app.core.paths import DATA_ROOT
+from app.utils.json_db import file_lock
+from app.utils.metrics import BACKTEST_DURATION, BACKTESTS, BACKTESTS_IN_FLIGHT
+
+PERF_ENABLED = os.getenv("PERF_ENABLED", "1").strip().lower() not in ("0", "false", "no", "")
+PERF_STORE_MAX_RUNS = int(os.getenv("PERF_STORE_MAX_RUNS", "5000"))
+PERF_DIR = DATA_ROOT / "metrics"
+PERF_STORE_PATH = PERF_DIR / "phases.jsonl"
+
+PERCENTILES = (50, 95, 99)
+GROUP_KEYS = ("strategy", "symbol", "timeframe")
+# Ordre de grandeur d'une ligne → seuil de taille déclenchant la compaction
+_APPROX_LINE_BYTES = 600
+
+_LOCK_PATH = PERF_STORE_PATH.with_suffix(".lock")
+_write_lock = threading.Lock()
+_current: ContextVar[Optional[dict]] = ContextVar("backtradz_perf_run", default=None)
+
+
+def _ms(seconds: float) -> float:
+    return round(seconds * 1000, 2)
+
+
+# --- API de mesure -----------------------------------------------------------
+
+@contextmanager
+def perf_run(kind: str = "backtest", **meta):
+    """
+    Ouvre un run : tous les span()/count() appelés dans ce contexte (même thread / tâche)
+    s'y rattachent. Enregistré dans le store à la sortie, même en cas d'exception.
+    """
+    trace = {
+        "ts": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "kind": kind,
+        "status": "ok",
+        **meta,
+        "phases": {},
+        "counts": {},
+    }
+    token = _current.set(trace)
+    in_flight = BACKTESTS_IN_FLIGHT.labels(kind)
+    in_flight.inc()
+    t0 = time.perf_counter()
+    try:
+        yield trace
+    except Exception:
+        trace["status"] = "exception"
+        raise
+    finally:
+        elapsed = time.perf_counter() - t0
+        in_flight.dec()
+        BACKTESTS.labels(kind, trace["status"]).inc()
+        BACKTEST_DURATION.labels(kind).observe(elapsed)
+        trace["phases"]["total"] = _ms(elapsed)
+        _current.reset(token)
+        record(trace)
+
+
+def timed_run(kind: str = "backtest"):
+    """
+    Décorateur de route : ouvre un perf_run autour de l'appel.
+    Un retour {"error": ...} (convention des routes) marque le run en "error".
+    Sync et async supportés ; la signature est préservée (injection FastAPI intacte).
+    """
+    def _status(result):
+        return "error" if isinstance(result, dict) and result.get("error") else "ok"
+
+    def decorator(func):
+        if inspect.iscoroutinefunction(func):
+            @functools.wraps(func)
+            async def async_wrapper(*args, **kwargs):
+                with perf_run(kind) as trace:
+                    result = await func(*args, **kwargs)
+                    trace["status"] = _status(result)
+                    return result
+            return async_wrapper
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            with perf_run(kind) as trace:
+                result = func(*args, **kwargs)
+                trace["status"] = _status(result)
+                return result
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def span(name: str):
+    """Chronomètre un bloc dans le run courant (no-op hors run)."""
+    trace = _current.get()
+    if trace is None:
+        yield
+        return
+    t0 = time.perf_counter()
+    try:
+        yield
+    finally:
+        add_phase(name, time.perf_counter() - t0)
+
+
+def add_phase(name: str, seconds: float):
+    """Ajoute une durée (secondes) à la phase `name` — pour les blocs trop longs pour un `with`."""
+    trace = _current.get()
+    if trace is not None:
+        phases = trace["phases"]
+        phases[name] = round(phases.get(name, 0.0) + _ms(seconds), 2)
+
+
+def count(name: str, n):
+    """Cumule un compteur (bars, signals, ...) sur le run courant."""
+    trace = _current.get()
+    if trace is not None and n is not None:
+        counts = trace["counts"]
+        counts[name] = counts.get(name, 0) + int(n)
+
+
+def tag(**meta):
+    """Renseigne les dimensions du run (strategy, symbol, timeframe, ...)."""
+    trace = _current.get()
+    if trace is not None:
+        trace.update({k: v for k, v in meta.items() if k not in ("phases", "counts")})
+
+
+# --- Store glissant ----------------------------------------------------------
+
+def _compact_locked():
+    """Garde la moitié la plus récente des lignes (appelé sous lock)."""
+    with PERF_STORE_PATH.open("r", encoding="utf-8") as f:
+        lines = f.readlines()
+    if len(lines) <= PERF_STORE_MAX_RUNS:
+        return
+    keep = lines[-(PERF_STORE_MAX_RUNS // 2):]
+    tmp = PERF_STORE_PATH.with_suffix(".jsonl.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        f.writelines(keep)
+    os.replace(tmp, PERF_STORE_PATH)
+    print(f"🧹 Store perf compacté : {len(lines)} → {len(keep)} runs")
+
+
+def record(trace: dict):
+    """Append d'un run terminé (jamais bloquant pour l'appelant)."""
+    if not PERF_ENABLED:
+        return
+    try:
+        line = json.dumps(trace, ensure_ascii=False, default=str) + "\n"
+        PERF_DIR.mkdir(parents=True, exist_ok=True)
+        with _write_lock, file_lock(_LOCK_PATH):
+            with PERF_STORE_PATH.open("a", encoding="utf-8") as f:
+                f.write(line)
+            if PERF_STORE_PATH.stat().st_size > PERF_STORE_MAX_RUNS * _APPROX_LINE_BYTES:
+                _compact_locked()
+    except Exception as e:
+        print("⚠️ Mesure perf non enregistrée :", e)
+
+
+def iter_runs(since: Optional[datetime] = None, kind: Optional[str] = None):
+    """Runs du store (lignes illisibles ignorées), filtrés par date (UTC) et type."""
+    if not PERF_STORE_PATH.exists():
+        return
+    with PERF_STORE_PATH.open("r", encoding="utf-8") as f:
+        for line in f:
+            try:
+                run = json.loads(line)
+            except Exception:
+                continue
+            if kind and run.get("kind") != kind:
+                continue
+            if since is not None:
+                try:
+                    if datetime.fromisoformat(run["ts"]) < since:
+                        continue
+                except Exception:
+                    continue
+            yield run
+
+
+def _stats(values) -> dict:
+    arr = np.asarray(values, dtype=float)
+    out = {"count": int(arr.size)}
+    for p, v in zip(PERCENTILES, np.percentile(arr, PERCENTILES)):
+        out[f"p{p}"] = round(float(v), 2)
+    out["max"] = round(float(arr.max()), 2)
+    return out
+
+
+def phase_percentiles(group_by: Iterable[str] = GROUP_KEYS, since_hours: Optional[float] = None,
+                      kind: Optional[str] = "backtest", status: Optional[str] = "ok",
+                      filters: Optional[dict] = None) -> list:
+    """
+    Percentiles (p50/p95/p99, ms) par phase, groupés par dimensions (strategy/symbol/timeframe).
+
+    Returns:
+        list[dict] triée par nb de runs décroissant :
+        {<dims>, "runs", "phases": {phase: {count,p50,p95,p99,max}}, "counts": {bars: {...}, ...}}
+    """
+    group_by = tuple(k for k in group_by if k in GROUP_KEYS)
+    filters = {k: v for k, v in (filters or {}).items() if v not in (None, "")}
+    since = None
+    if since_hours:
+        since = datetime.now(timezone.utc) - timedelta(hours=float(since_hours))
+
+    groups = {}
+    for run in iter_runs(since=since, kind=kind):
+        if status and run.get("status") != status:
+            continue
+        if any(str(run.get(k)) != str(v) for k, v in filters.items()):
+            continue
+        key = tuple(run.get(k) for k in group_by)
+        g = groups.setdefault(key, {"runs": 0, "phases": {}, "counts": {}})
+        g["runs"] += 1
+        for name, ms in (run.get("phases") or {}).items():
+            g["phases"].setdefault(name, []).append(ms)
+        for name, n in (run.get("counts") or {}).items():
+            g["counts"].setdefault(name, []).append(n)
+
+    out = []
+    for key, g in groups.items():
+        out.append({
+            **dict(zip(group_by, key)),
+            "runs": g["runs"],
+            "phases": {name: _stats(v) for name, v in sorted(g["phases"].items())},
+            "counts": {name: _stats(v) for name, v in sorted(g["counts"].items())},
+        })
+    out.sort(key=lambda r: r["runs"], reverse=True)
+    return out
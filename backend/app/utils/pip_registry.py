@@ -96,3 +96,60 @@ def get_pip(symbol: str) -> Optional[float]:
 
     # Futures non mappés explicitement → prudence: None
     return None
+
+
+# === Univers / groupes (screening multi-symboles) ===
+# Alias de saisie (même instrument qu'une autre clé) → exclus de l'univers
+_REGISTRY_ALIASES = {"XAUUSD", "XRPUSD", "XRP-USDT", "XRPUSDT", "CHF/JPY"}
+_METALS = {"GC=F", "SI=F", "PL=F", "HG=F"}
+_ENERGY = {"CL=F", "BZ=F"}
+_AGRI = {"ZC=F"}
+_CONTEXT = {"^TNX", "^VIX"}  # non exécutés → hors "all"
+
+REGISTRY_GROUPS = ("all", "fx", "fx_jpy", "indices", "crypto", "metals", "energy", "commodities")
+
+
+def classify_symbol(symbol: str) -> Optional[str]:
+    """Classe un symbole : fx | indices | crypto | metals | energy | agri | context (None si inconnu)."""
+    sym = (symbol or "").strip().upper()
+    if sym in _CONTEXT:
+        return "context"
+    if sym in _METALS:
+        return "metals"
+    if sym in _ENERGY:
+        return "energy"
+    if sym in _AGRI:
+        return "agri"
+    if _is_index(sym):
+        return "indices"
+    if _is_crypto(sym):
+        return "crypto"
+    if _is_fx(sym):
+        return "fx"
+    return None
+
+
+def list_registry_symbols(group: str = "all") -> list:
+    """
+    Symboles canoniques du registre pour un groupe (ordre de PAIR_PIPS).
+    Groupes : all, fx, fx_jpy, indices, crypto, metals, energy, commodities.
+    """
+    g = (group or "all").strip().lower()
+    if g not in REGISTRY_GROUPS:
+        raise ValueError(f"Groupe inconnu : {group} (attendu: {', '.join(REGISTRY_GROUPS)})")
+    out = []
+    for sym in PAIR_PIPS:
+        if sym in _REGISTRY_ALIASES:
+            continue
+        kind = classify_symbol(sym)
+        if kind is None:
+            continue
+        if g == "all" and kind != "context":
+            out.append(sym)
+        elif g == "fx_jpy" and _is_fx_jpy(sym):
+            out.append(sym)
+        elif g == "commodities" and kind in ("metals", "energy", "agri"):
+            out.append(sym)
+        elif g == kind:
+            out.append(sym)
+    return out
@@ -0,0 +1,115 @@
+"""
+File: backend/app/utils/profiling.py
+Role: Capture cProfile + tracemalloc autour d'un bloc (profil d'UN run de backtest).
+Depends:
+  - stdlib (cProfile, pstats, tracemalloc)
+Side-effects:
+  - save() écrit run.prof / cprofile_top.txt / tracemalloc_top.txt / summary.json
+Notes:
+  - Une seule capture à la fois par process (cProfile est global au thread et
+    tracemalloc au process) → ProfileBusyError si une capture est déjà en cours.
+  - Aucun coût hors capture : rien n'est activé tant qu'on n'entre pas dans le `with`.
+"""
+
+import cProfile
+import io
+import json
+import pstats
+import threading
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from pathlib import Path
+
+PROFILE_FILES = ("run.prof", "cprofile_top.txt", "tracemalloc_top.txt", "summary.json")
+
+_capture_lock = threading.Lock()
+
+
+class ProfileBusyError(RuntimeError):
+    """Une capture est déjà en cours dans ce process."""
+
+
+class ProfileCapture:
+    """
+    with ProfileCapture() as cap:
+        ...                      # code profilé
+    cap.save(dossier)            # artefacts sur disque
+    """
+
+    def __init__(self, top: int = 40, frames: int = 8):
+        self.top = top
+        self.frames = frames
+        self.profile = None
+        self.snapshot = None
+        self.elapsed_s = None
+        self.mem_current = self.mem_peak = None
+        self._owns_tracemalloc = False
+
+    def __enter__(self):
+        if not _capture_lock.acquire(blocking=False):
+            raise ProfileBusyError("Une capture de profil est déjà en cours")
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(self.frames)
+            self._owns_tracemalloc = True
+        tracemalloc.reset_peak()
+        self.profile = cProfile.Profile()
+        self._t0 = time.perf_counter()
+        self.profile.enable()
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        try:
+            self.profile.disable()
+            self.elapsed_s = time.perf_counter() - self._t0
+            self.mem_current, self.mem_peak = tracemalloc.get_traced_memory()
+            self.snapshot = tracemalloc.take_snapshot().filter_traces((
+                tracemalloc.Filter(False, tracemalloc.__file__),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap>"),
+                tracemalloc.Filter(False, "<frozen importlib._bootstrap_external>"),
+            ))
+        finally:
+            if self._owns_tracemalloc:
+                tracemalloc.stop()
+            _capture_lock.release()
+        return False
+
+    def _cprofile_report(self) -> str:
+        buf = io.StringIO()
+        stats = pstats.Stats(self.profile, stream=buf).strip_dirs()
+        stats.sort_stats("cumulative").print_stats(self.top)
+        buf.write("\n")
+        stats.sort_stats("tottime").print_stats(self.top)
+        return buf.getvalue()
+
+    def _tracemalloc_report(self) -> str:
+        lines = [f"Pic mémoire : {self.mem_peak / 1e6:.2f} MB | fin de run : {self.mem_current / 1e6:.2f} MB", ""]
+        lines.append(f"Top {self.top} allocations encore vivantes (par ligne) :")
+        for i, stat in enumerate(self.snapshot.statistics("lineno")[:self.top], 1):
+            frame = stat.traceback[0]
+            lines.append(f"{i:3d}. {frame.filename}:{frame.lineno} — {stat.size / 1024:.1f} KiB ({stat.count} blocs)")
+        lines.append("")
+        lines.append("Top 10 par pile complète :")
+        for i, stat in enumerate(self.snapshot.statistics("traceback")[:10], 1):
+            lines.append(f"{i:3d}. {stat.size / 1024:.1f} KiB ({stat.count} blocs)")
+            lines.extend(f"      {l}" for l in stat.traceback.format(limit=self.frames))
+        return "\n".join(lines) + "\n"
+
+    def save(self, out_dir: Path, meta: dict = None) -> dict:
+        """Écrit les artefacts dans out_dir et retourne le résumé (summary.json)."""
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        self.profile.dump_stats(str(out_dir / "run.prof"))
+        (out_dir / "cprofile_top.txt").write_text(self._cprofile_report(), encoding="utf-8")
+        (out_dir / "tracemalloc_top.txt").write_text(self._tracemalloc_report(), encoding="utf-8")
+        summary = {
+            "captured_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "elapsed_s": round(self.elapsed_s, 4),
+            "mem_peak_mb": round(self.mem_peak / 1e6, 2),
+            "mem_end_mb": round(self.mem_current / 1e6, 2),
+            "files": list(PROFILE_FILES),
+            **(meta or {}),
+        }
+        (out_dir / "summary.json").write_text(json.dumps(summary, indent=2, ensure_ascii=False, default=str),
+                                              encoding="utf-8")
+        return summary
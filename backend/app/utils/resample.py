@@ -0,0 +1,180 @@
+"""
+File: backend/app/utils/resample.py
+Role: Dériver localement une TF large (M5…D1) depuis la série la plus fine stockée (idéalement M1).
+Depends:
+  - app.core.paths (OUTPUT_DIR = sources, CACHE_DIR = sorties resamplées)
+  - app.utils.indicators.add_rsi_ema (RSI_14 / EMA recalculés sur la TF cible)
+  - app.utils.timeframes (durées TF)
+Side-effects:
+  - Écrit CACHE_DIR/resampled/<SYM>/<YYYY-MM>/<SYM>_<TF>_<YYYY-MM>.csv (+ .meta.json)
+Notes:
+  - Agrégation vectorisée pandas : Open=first, High=max, Low=min, Close=last, Volume=sum.
+  - Bins alignés sur la session : origine epoch + RESAMPLE_SESSION_OFFSET
+    (ex: "22h" → bougies D1 de 22:00 à 22:00 UTC, H4 à 02/06/10…).
+    Les bins sont donc identiques d'un mois à l'autre (pas de dérive).
+  - Cache invalidé si la source change (mtime/size) ou si l'offset change.
+  - Indicateurs recalculés par mois → les 14 premières bougies ont un RSI NaN
+    (lignes conservées, contrairement aux CSV natifs qui les dropent).
+"""
+
+import json
+import os
+from pathlib import Path
+from typing import Optional, Tuple
+
+import pandas as pd
+
+from app.core.paths import CACHE_DIR, OUTPUT_DIR
+from app.utils.indicators import FILE_COLUMNS, add_rsi_ema
+from app.utils.metrics import CACHE_REQUESTS, LOADER_BYTES_READ
+from app.utils.timeframes import TF_MINUTES, normalize_tf
+
+RESAMPLE_ENABLED = os.getenv("RESAMPLE_ENABLED", "1").strip().lower() not in ("0", "false", "no", "")
+SESSION_OFFSET = os.getenv("RESAMPLE_SESSION_OFFSET", "0min").strip() or "0min"
+RESAMPLE_CACHE_DIR = CACHE_DIR / "resampled"
+
+_AGG = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum"}
+
+
+def resample_ohlc(df: pd.DataFrame, target_tf: str, offset: str = SESSION_OFFSET) -> pd.DataFrame:
+    """
+    Agrège un DataFrame OHLC (index Datetime) vers `target_tf`.
+
+    Returns:
+        pd.DataFrame indexé par Datetime (ouverture du bin), colonnes OHLC + Volume
+        + RSI_14/EMA_50/EMA_200 recalculés. Les bins sans bougie source sont supprimés.
+    """
+    minutes = TF_MINUTES[normalize_tf(target_tf)]
+    cols = {k: v for k, v in _AGG.items() if k in df.columns}
+    out = (
+        df[list(cols)]
+        .resample(f"{minutes}min", origin="epoch", offset=pd.Timedelta(offset),
+                  label="left", closed="left")
+        .agg(cols)
+        .dropna(subset=["Open", "High", "Low", "Close"])
+    )
+    if "Volume" not in out.columns:
+        out["Volume"] = 0
+    out.index.name = "Datetime"
+    return add_rsi_ema(out)
+
+
+def _candidates(output_dir: Path, symbol: str, tf_label: str, month: str):
+    """Chemins possibles d'un CSV natif (layouts A et B, TF maj/min)."""
+    for tf in dict.fromkeys((tf_label, tf_label.lower())):
+        filename = f"{symbol}_{tf}_{month}.csv"
+        yield output_dir / symbol / month / filename
+        yield output_dir / symbol / tf / filename
+
+
+def find_native_file(symbol: str, timeframe: str, month: str, output_dir: Path = OUTPUT_DIR) -> Optional[Path]:
+    tf_label = normalize_tf(timeframe) or str(timeframe)
+    for cand in _candidates(Path(output_dir), symbol, tf_label, month):
+        if cand.exists():
+            return cand
+    return None
+
+
+def find_finest_source(symbol: str, target_tf: str, month: str,
+                       output_dir: Path = OUTPUT_DIR) -> Optional[Tuple[str, Path]]:
+    """
+    Source la plus fine stockée dont la durée divise celle de la cible
+    (M1 → tout ; M5 → M15/M30/H1… ; H1 → H4/D1).
+    """
+    target = normalize_tf(target_tf)
+    if not target:
+        return None
+    target_min = TF_MINUTES[target]
+    for tf, minutes in TF_MINUTES.items():  # ordre = du plus fin au plus large
+        if minutes >= target_min or target_min % minutes:
+            continue
+        path = find_native_file(symbol, tf, month, output_dir)
+        if path is not None:
+            return tf, path
+    return None
+
+
+def _read_source(path: Path) -> pd.DataFrame:
+    df = pd.read_csv(path)
+    df["Datetime"] = pd.to_datetime(df["Datetime"]).dt.tz_localize(None)
+    for col in ["Open", "High", "Low", "Close"]:
+        df[col] = pd.to_numeric(df[col], errors="coerce")
+    df.dropna(subset=["Open", "High", "Low", "Close"], inplace=True)
+    return df.set_index("Datetime").sort_index()
+
+
+def _cache_paths(symbol: str, tf_label: str, month: str) -> Tuple[Path, Path]:
+    csv_path = RESAMPLE_CACHE_DIR / symbol / month / f"{symbol}_{tf_label}_{month}.csv"
+    return csv_path, csv_path.with_suffix(".meta.json")
+
+
+def _source_signature(source_tf: str, source: Path, offset: str) -> dict:
+    st = source.stat()
+    return {
+        "source": str(source),
+        "source_tf": source_tf,
+        "source_mtime_ns": st.st_mtime_ns,
+        "source_size": st.st_size,
+        "offset": offset,
+    }
+
+
+def load_resampled_month(symbol: str, timeframe: str, month: str,
+                         output_dir: Path = OUTPUT_DIR) -> Optional[pd.DataFrame]:
+    """
+    Sert `symbol`/`timeframe` pour le mois `month` (YYYY-MM) depuis une TF plus fine.
+    Lit le cache si la signature source correspond, sinon resample et met en cache.
+
+    Returns:
+        pd.DataFrame indexé par Datetime (format load_data_or_extract), ou None
+        si aucune source exploitable.
+    """
+    if not RESAMPLE_ENABLED:
+        return None
+    tf_label = normalize_tf(timeframe)
+    if not tf_label:
+        return None
+    found = find_finest_source(symbol, tf_label, month, output_dir)
+    if found is None:
+        return None
+    source_tf, source = found
+
+    csv_path, meta_path = _cache_paths(symbol, tf_label, month)
+    signature = _source_signature(source_tf, source, SESSION_OFFSET)
+
+    # 1) Cache valide → lecture directe
+    try:
+        if csv_path.exists() and meta_path.exists():
+            meta = json.loads(meta_path.read_text(encoding="utf-8"))
+            if meta == signature:
+                CACHE_REQUESTS.labels("resample", "hit").inc()
+                LOADER_BYTES_READ.labels("resample_cache").inc(csv_path.stat().st_size)
+                df = pd.read_csv(csv_path)
+                df["Datetime"] = pd.to_datetime(df["Datetime"])
+                print(f"♻️ Resample (cache) : {symbol} {tf_label} {month} ← {source_tf}")
+                return df.set_index("Datetime")
+    except Exception as e:
+        print(f"⚠️ Cache resample illisible ({csv_path.name}) : {e}")
+
+    # 2) Resample + écriture atomique du cache
+    CACHE_REQUESTS.labels("resample", "miss").inc()
+    LOADER_BYTES_READ.labels("resample_source").inc(signature["source_size"])
+    try:
+        out = resample_ohlc(_read_source(source), tf_label)
+    except Exception as e:
+        print(f"❌ Resample impossible {symbol} {tf_label} {month} ← {source_tf} : {e}")
+        return None
+    if out.empty:
+        return None
+
+    try:
+        csv_path.parent.mkdir(parents=True, exist_ok=True)
+        tmp = csv_path.with_suffix(".csv.tmp")
+        out.reset_index()[FILE_COLUMNS].to_csv(tmp, index=False)
+        os.replace(tmp, csv_path)
+        meta_path.write_text(json.dumps(signature), encoding="utf-8")
+    except Exception as e:
+        print(f"⚠️ Cache resample non écrit ({csv_path.name}) : {e}")
+
+    print(f"🧮 Resample : {symbol} {tf_label} {month} ← {source_tf} ({len(out)} bougies)")
+    return out
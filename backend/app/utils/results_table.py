@@ -0,0 +1,144 @@
+"""
+File: backend/app/utils/results_table.py
+Role: Format binaire colonnaire des résultats de backtest (backtest_result.npy) + export CSV à la demande.
+Depends:
+  - numpy (tableau structuré, np.load(mmap_mode="r")), pandas
+  - app.utils.run_archive (lecture des runs compactés)
+Side-effects:
+  - Écrit <run>/backtest_result.npy (atomique) ; export_csv() écrit <run>/backtest_result.csv
+Notes:
+  - 1 ligne = 1 phase de trade (TP1, puis TP2 si TP1 touché), mêmes colonnes que l'ancien CSV :
+      time int64 (ns, naïf) | entry/sl/tp float64 | direction/result/phase int8 (codes ci-dessous)
+      sl_size/tp1_size/rr_tp1 (lignes TP1) et rr_tp2 (lignes TP2) : float64, NaN ailleurs.
+  - Lecture sans parsing texte : open_results() = vue memmap ; results_frame() = DataFrame
+    (libellés par indexation des tables de codes) ; les lecteurs simples comptent sur les codes.
+  - load_results() accepte aussi un backtest_result.csv historique (runs antérieurs),
+    et lit dans run_archive.zip quand le run a été compacté (app.utils.run_archive).
+  - Jeu de colonnes exposé = celui de l'ancien CSV (rr_tp2 absente sans ligne TP2…)
+    → analyseur / résumés admin inchangés.
+"""
+
+import os
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.utils import run_archive
+
+RESULT_FILE = "backtest_result.npy"
+CSV_FILE = "backtest_result.csv"
+
+DIRECTIONS = ("buy", "sell")
+RESULTS = ("TP1", "SL", "TP2", "NONE")
+PHASES = ("TP1", "TP2")
+
+RESULT_DTYPE = np.dtype([
+    ("time", "<i8"), ("direction", "i1"), ("entry", "<f8"), ("sl", "<f8"), ("tp", "<f8"),
+    ("result", "i1"), ("phase", "i1"),
+    ("sl_size", "<f8"), ("tp1_size", "<f8"), ("rr_tp1", "<f8"), ("rr_tp2", "<f8"),
+])
+COLUMNS = RESULT_DTYPE.names
+_CODED = {"direction": DIRECTIONS, "result": RESULTS, "phase": PHASES}
+_TP1_ONLY = ("sl_size", "tp1_size", "rr_tp1")
+
+
+def code(column: str, label) -> int:
+    """Code int8 d'un libellé (ex. code("phase", "TP2") → 1) ; -1 si inconnu."""
+    try:
+        return _CODED[column].index(label)
+    except ValueError:
+        return -1
+
+
+def _labels(column: str, codes) -> np.ndarray:
+    table = np.array([*_CODED[column], None], dtype=object)  # -1 → None
+    return table[np.asarray(codes, dtype=np.int64)]
+
+
+def write_results(results: list, path) -> Path:
+    """Liste de lignes (dicts de resolve_outcomes) → fichier .npy (écriture atomique)."""
+    path = Path(path)
+    arr = np.empty(len(results), dtype=RESULT_DTYPE)
+    if results:
+        times = pd.DatetimeIndex([r["time"] for r in results])
+        if times.tz is not None:
+            times = times.tz_localize(None)
+        arr["time"] = times.as_unit("ns").asi8
+        for col, labels in _CODED.items():
+            lookup = {label: i for i, label in enumerate(labels)}
+            arr[col] = [lookup.get(r.get(col), -1) for r in results]
+        for col in ("entry", "sl", "tp", *_TP1_ONLY, "rr_tp2"):
+            arr[col] = [r.get(col, np.nan) for r in results]
+
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open(tmp, "wb") as f:
+        np.save(f, arr)
+    os.replace(tmp, path)
+    return path
+
+
+def open_results(path, mmap: bool = True) -> np.ndarray:
+    """Tableau structuré (memmap lecture seule par défaut ; en mémoire si le run est compacté)."""
+    if not Path(path).is_file():
+        with run_archive.open_file(path) as f:
+            return np.load(f)
+    return np.load(path, mmap_mode="r" if mmap else None)
+
+
+def results_frame(arr) -> pd.DataFrame:
+    """Tableau structuré → DataFrame au format de l'ancien CSV (libellés texte, time datetime64)."""
+    if not isinstance(arr, np.ndarray):
+        arr = open_results(arr)
+    phase = np.asarray(arr["phase"])
+    columns = [c for c in COLUMNS
+               if not (c in _TP1_ONLY and not (phase == 0).any())
+               and not (c == "rr_tp2" and not (phase == 1).any())]
+    data = {}
+    for col in columns:
+        if col == "time":
+            data[col] = pd.to_datetime(np.asarray(arr["time"]).view("datetime64[ns]"))
+        elif col in _CODED:
+            data[col] = _labels(col, arr[col])
+        else:
+            data[col] = np.array(arr[col], dtype=float)
+    return pd.DataFrame(data, columns=columns if len(arr) else [])
+
+
+def result_path(folder) -> Path:
+    """Fichier de résultats d'un dossier de run : .npy, sinon CSV historique, sinon None."""
+    folder = Path(folder)
+    for name in (RESULT_FILE, CSV_FILE):
+        if run_archive.exists(folder / name):
+            return folder / name
+    return None
+
+
+def load_results(path) -> pd.DataFrame:
+    """DataFrame des résultats depuis un .npy (sans parsing) ou un CSV historique."""
+    path = Path(path)
+    if path.is_dir():
+        path = result_path(path)
+        if path is None:
+            raise FileNotFoundError("Aucun fichier de résultats")
+    if path.suffix == ".npy":
+        return results_frame(open_results(path))
+    try:
+        with run_archive.open_file(path) as f:
+            return pd.read_csv(f)
+    except pd.errors.EmptyDataError:
+        return pd.DataFrame()
+
+
+def export_csv(path, csv_path=None) -> Path:
+    """Export CSV (format historique) d'un .npy ; réutilisé tant qu'il est plus récent que le .npy."""
+    path = Path(path)
+    csv_path = Path(csv_path) if csv_path else path.with_name(CSV_FILE)
+    if csv_path.exists() and (not path.is_file() or csv_path.stat().st_mtime_ns >= path.stat().st_mtime_ns):
+        return csv_path
+    df = results_frame(open_results(path))
+    tmp = csv_path.with_name(f".{csv_path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    df.to_csv(tmp, index=False)
+    os.replace(tmp, csv_path)
+    return csv_path
@@ -0,0 +1,106 @@
+"""
+File: backend/app/utils/run_archive.py
+Role: Accès transparent aux artefacts d'un dossier de run, qu'ils soient sur disque ou compactés
+      dans <run>/run_archive.zip (+ liens physiques pour les copies identiques).
+Depends:
+  - zipfile (stdlib)
+Notes:
+  - Fichier présent sur disque = prioritaire (un run relancé réécrit ses fichiers à plat).
+  - open_file(path) / glob(dossier, motif) / exists(path) : mêmes usages qu'open / Path.glob
+    pour les lecteurs (comparateur, résultats, admin) → aucune extraction pour lire ;
+    materialize(path) remet un seul membre à plat quand un vrai fichier est requis (téléchargement).
+  - link_or_copy() : copie = lien physique (tmp + rename, repli copie si autre disque) ;
+    break_link() : redonne un inode privé avant une réécriture en place (to_csv, ExcelWriter).
+"""
+
+import fnmatch
+import io
+import os
+import shutil
+import uuid
+import zipfile
+from pathlib import Path
+
+ARCHIVE_NAME = "run_archive.zip"
+
+
+def archive_path(folder) -> Path:
+    return Path(folder) / ARCHIVE_NAME
+
+
+def members(folder) -> list:
+    """Noms des fichiers compactés du dossier ([] si pas d'archive)."""
+    path = archive_path(folder)
+    if not path.is_file():
+        return []
+    try:
+        with zipfile.ZipFile(path) as zf:
+            return zf.namelist()
+    except (OSError, zipfile.BadZipFile):
+        return []
+
+
+def exists(path) -> bool:
+    path = Path(path)
+    return path.is_file() or path.name in members(path.parent)
+
+
+def glob(folder, pattern: str) -> list:
+    """Path.glob(motif) + membres de l'archive (chemins virtuels dans le dossier), triés."""
+    folder = Path(folder)
+    found = {p.name: p for p in folder.glob(pattern) if p.is_file() and p.name != ARCHIVE_NAME}
+    for name in members(folder):
+        if name not in found and fnmatch.fnmatch(name, pattern):
+            found[name] = folder / name
+    return [found[n] for n in sorted(found)]
+
+
+def open_file(path):
+    """Fichier binaire en lecture (disque, sinon membre de l'archive) ; FileNotFoundError sinon."""
+    path = Path(path)
+    if path.is_file():
+        return open(path, "rb")
+    try:
+        with zipfile.ZipFile(archive_path(path.parent)) as zf:
+            return io.BytesIO(zf.read(path.name))
+    except (OSError, KeyError, zipfile.BadZipFile):
+        raise FileNotFoundError(str(path))
+
+
+def materialize(path) -> Path:
+    """Remet un membre de l'archive à plat (pour FileResponse…) ; fichier déjà présent = inchangé."""
+    path = Path(path)
+    if path.is_file():
+        return path
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    with open_file(path) as src, open(tmp, "wb") as dst:
+        shutil.copyfileobj(src, dst)
+    os.replace(tmp, path)
+    return path
+
+
+def link_or_copy(src, dst) -> str:
+    """dst = lien physique vers src (remplacement atomique) ; copie si le lien est impossible."""
+    src, dst = Path(src), Path(dst)
+    tmp = dst.with_name(f".{dst.name}.{uuid.uuid4().hex[:8]}.tmp")
+    try:
+        os.link(src, tmp)
+        how = "link"
+    except OSError:
+        shutil.copy2(src, tmp)
+        how = "copy"
+    os.replace(tmp, dst)
+    return how
+
+
+def break_link(path) -> None:
+    """Fichier partagé (nlink > 1) → copie privée, avant une réécriture en place."""
+    path = Path(path)
+    try:
+        if path.stat().st_nlink <= 1:
+            return
+    except OSError:
+        return
+    tmp = path.with_name(f".{path.name}.{uuid.uuid4().hex[:8]}.tmp")
+    shutil.copy2(path, tmp)
+    os.replace(tmp, path)
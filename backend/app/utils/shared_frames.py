@@ -0,0 +1,303 @@
+"""
+File: backend/app/utils/shared_frames.py
+Role: Frames OHLC / indicateurs publiés UNE fois en fichiers mémoire (memmap) partagés entre process.
+Depends:
+  - numpy (np.save / np.load(mmap_mode="r")), pandas
+  - app.core.paths.CACHE_DIR (repli si /dev/shm absent)
+Side-effects:
+  - Écrit SHARED_FRAMES_DIR/<entrée>/{meta.json, index.npy, c<i>.npy, refs/<pid>}
+Notes:
+  - Clé = tuple libre, ex. (symbole, TF, mois, empreinte source) : un fichier source modifié
+    → nouvelle clé (l'ancienne entrée vieillit puis est évincée).
+  - attach() : colonnes = vues numpy sur le mapping (zéro copie, lecture seule) ; les pages
+    sont celles du page cache → N workers = 1 exemplaire en RAM des frames PUBLIÉS. Ce que
+    l'appelant en dérive (concat, copie mutable) reste privé à son process.
+  - Comptage de références : en process (même mapping réutilisé, compteur), entre process
+    (1 fichier refs/<pid> par détenteur). Éviction LRU des seules entrées sans détenteur vivant,
+    AVANT d'écrire ; un mapping déjà ouvert reste valide même après suppression (POSIX).
+  - Budget = min(SHARED_FRAMES_MAX_MB, place du dossier − SHARED_FRAMES_RESERVE_MB), relu à chaque
+    publication (tmpfs /dev/shm de conteneur = 64 Mo) ; frame hors budget → non publié (copie privée).
+  - Publication atomique (dossier temporaire + rename) : 2 process qui publient la même clé
+    → un seul gagne, l'autre s'attache.
+  - Frames non publiables (colonnes object / tz-aware, noms non str ou dupliqués) → None,
+    l'appelant garde sa copie privée (comportement historique).
+"""
+
+import atexit
+import hashlib
+import json
+import os
+import re
+import shutil
+import threading
+import time
+import uuid
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+from app.core.paths import CACHE_DIR
+from app.utils.metrics import CACHE_REQUESTS
+
+SHARED_FRAMES_ENABLED = os.getenv("SHARED_FRAMES", "1").strip().lower() not in ("0", "false", "no", "")
+_DEFAULT_DIR = Path("/dev/shm/backtradz_frames") if os.path.isdir("/dev/shm") else CACHE_DIR / "shared_frames"
+SHARED_FRAMES_DIR = Path(os.getenv("SHARED_FRAMES_DIR", "").strip() or _DEFAULT_DIR)
+SHARED_FRAMES_MAX_MB = int(os.getenv("SHARED_FRAMES_MAX_MB", "512"))
+SHARED_FRAMES_RESERVE_MB = int(os.getenv("SHARED_FRAMES_RESERVE_MB", "16"))  # laissé libre sur le tmpfs
+
+_NUMERIC_KINDS = "biufM"
+
+
+def entry_name(key) -> str:
+    """Nom de dossier lisible + stable pour une clé (préfixe = 3 premiers éléments)."""
+    digest = hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:16]
+    prefix = "_".join(str(k) for k in key[:3]) if isinstance(key, tuple) else "frame"
+    return f"{re.sub(r'[^A-Za-z0-9.=-]+', '-', prefix)[:60]}__{digest}"
+
+
+def _publishable(df: pd.DataFrame) -> bool:
+    if not df.columns.is_unique or not all(isinstance(c, str) for c in df.columns):
+        return False
+    dtypes = [*df.dtypes, df.index.dtype]
+    return all(isinstance(d, np.dtype) and d.kind in _NUMERIC_KINDS for d in dtypes)
+
+
+def _pid_alive(pid: int) -> bool:
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+class SharedFrameStore:
+    """Entrées memmap partagées + détenteurs (process) ; une instance par process suffit."""
+
+    def __init__(self, root: Path, max_bytes: int, reserve_bytes: int = 0):
+        self.root = Path(root)
+        self.max_bytes = int(max_bytes)
+        self.reserve_bytes = int(reserve_bytes)
+        self._lock = threading.Lock()
+        self._attached = {}  # nom → [frame, compteur]
+
+    # --- lecture ------------------------------------------------------------
+
+    def _open(self, path: Path):
+        meta = json.loads((path / "meta.json").read_text(encoding="utf-8"))
+        index = np.load(path / "index.npy", mmap_mode="r")
+        columns = {col: np.load(path / f"c{i}.npy", mmap_mode="r") for i, col in enumerate(meta["columns"])}
+        if index.dtype.kind == "M":
+            idx = pd.DatetimeIndex(index, name=meta["index_name"], copy=False)
+        else:
+            idx = pd.Index(index, name=meta["index_name"], copy=False)
+        return pd.DataFrame(columns, index=idx, copy=False)
+
+    def attach(self, key):
+        """Frame partagé (lecture seule) de la clé, ou None s'il n'est pas publié."""
+        name = entry_name(key)
+        with self._lock:
+            held = self._attached.get(name)
+            if held is not None:
+                held[1] += 1
+                CACHE_REQUESTS.labels("shared_frames", "hit").inc()
+                return held[0]
+            path = self.root / name
+            ref = path / "refs" / str(os.getpid())
+            try:
+                ref.touch()  # détenteur AVANT ouverture : l'éviction ne peut plus la retirer
+                frame = self._open(path)
+                os.utime(path / "meta.json")  # LRU inter-process
+            except (OSError, ValueError):
+                try:
+                    ref.unlink(missing_ok=True)
+                except OSError:
+                    pass
+                CACHE_REQUESTS.labels("shared_frames", "miss").inc()
+                return None
+            self._attached[name] = [frame, 1]
+        CACHE_REQUESTS.labels("shared_frames", "hit").inc()
+        return frame
+
+    def release(self, key) -> None:
+        """Rend une référence ; à 0 le process n'est plus détenteur (entrée évinçable)."""
+        name = entry_name(key)
+        with self._lock:
+            held = self._attached.get(name)
+            if held is None:
+                return
+            held[1] -= 1
+            if held[1] > 0:
+                return
+            del self._attached[name]
+        try:
+            (self.root / name / "refs" / str(os.getpid())).unlink(missing_ok=True)
+        except OSError:
+            pass
+
+    def release_all(self) -> None:
+        for name in list(self._attached):
+            with self._lock:
+                self._attached.pop(name, None)
+            try:
+                (self.root / name / "refs" / str(os.getpid())).unlink(missing_ok=True)
+            except OSError:
+                pass
+
+    # --- écriture -----------------------------------------------------------
+
+    def budget(self) -> int:
+        """
+        Plafond effectif : max_bytes borné par la place réelle du dossier (entrées déjà publiées
+        + espace libre − réserve) → un /dev/shm de conteneur (64 Mo) ne se remplit jamais.
+        """
+        try:
+            free = shutil.disk_usage(self.root).free
+        except OSError:
+            return 0
+        used = sum(size for _, size, _ in self.entries())
+        return max(0, min(self.max_bytes, used + free - self.reserve_bytes))
+
+    def publish(self, key, df: pd.DataFrame):
+        """Publie df (si besoin) puis s'y attache ; None si df n'est pas publiable / trop gros."""
+        if not _publishable(df):
+            return None
+        shared = self.attach(key)
+        if shared is not None:
+            return shared
+
+        size = df.index.to_numpy().nbytes + sum(df[col].to_numpy().nbytes for col in df.columns)
+        budget = self.budget()
+        if size > budget or self.evict(incoming=size, budget=budget) > budget:
+            CACHE_REQUESTS.labels("shared_frames", "too_large").inc()
+            return None  # l'appelant garde sa copie privée
+
+        name = entry_name(key)
+        final = self.root / name
+        tmp = self.root / f".tmp-{name}-{os.getpid()}-{uuid.uuid4().hex[:8]}"
+        try:
+            (tmp / "refs").mkdir(parents=True)
+            np.save(tmp / "index.npy", df.index.to_numpy())
+            size = df.index.to_numpy().nbytes
+            for i, col in enumerate(df.columns):
+                values = np.ascontiguousarray(df[col].to_numpy())
+                np.save(tmp / f"c{i}.npy", values)
+                size += values.nbytes
+            (tmp / "meta.json").write_text(json.dumps({
+                "key": repr(key), "columns": list(df.columns), "index_name": df.index.name,
+                "rows": len(df), "bytes": size, "created": time.time(),
+            }), encoding="utf-8")
+            try:
+                os.rename(tmp, final)
+            except OSError:
+                pass  # publié entre-temps par un autre process
+        except OSError as e:
+            print(f"⚠️ Shared frames : publication impossible ({e})")
+            return None
+        finally:
+            shutil.rmtree(tmp, ignore_errors=True)
+
+        return self.attach(key)
+
+    def get_or_publish(self, key, loader):
+        """
+        Frame partagé de la clé ; sinon loader() puis publication.
+
+        Returns:
+            (frame, partagé?) — frame privé de loader() si non publiable / store indisponible.
+        """
+        shared = self.attach(key)
+        if shared is not None:
+            return shared, True
+        df = loader()
+        if df is None or not isinstance(df, pd.DataFrame):
+            return df, False
+        shared = self.publish(key, df)
+        return (shared, True) if shared is not None else (df, False)
+
+    # --- éviction -----------------------------------------------------------
+
+    def _holders(self, path: Path) -> int:
+        alive = 0
+        refs = path / "refs"
+        for ref in (refs.iterdir() if refs.exists() else ()):
+            try:
+                pid = int(ref.name)
+            except ValueError:
+                continue
+            if _pid_alive(pid):
+                alive += 1
+            else:
+                ref.unlink(missing_ok=True)  # détenteur mort (crash, kill)
+        return alive
+
+    def entries(self) -> list:
+        """[(dernier accès, octets, chemin)] des entrées publiées, plus ancienne d'abord."""
+        out = []
+        if not self.root.exists():
+            return out
+        for path in self.root.iterdir():
+            if path.name.startswith("."):
+                continue
+            try:
+                meta_path = path / "meta.json"
+                meta = json.loads(meta_path.read_text(encoding="utf-8"))
+                out.append((meta_path.stat().st_mtime, int(meta.get("bytes", 0)), path))
+            except (OSError, ValueError):
+                continue
+        return sorted(out)
+
+    def evict(self, incoming: int = 0, budget: int = None) -> int:
+        """
+        Supprime les entrées LRU sans détenteur tant que total + incoming dépasse le budget.
+        Retourne le total projeté (entrées restantes + incoming).
+        """
+        budget = self.budget() if budget is None else budget
+        entries = self.entries()
+        total = sum(size for _, size, _ in entries) + int(incoming)
+        for _, size, path in entries:
+            if total <= budget:
+                break
+            if self._holders(path):
+                continue
+            trash = self.root / f".trash-{path.name}-{uuid.uuid4().hex[:8]}"
+            try:
+                os.rename(path, trash)  # plus visible pour attach() avant la suppression
+            except OSError:
+                continue
+            shutil.rmtree(trash, ignore_errors=True)
+            total -= size
+        return total
+
+    def stats(self) -> dict:
+        entries = self.entries()
+        return {"dir": str(self.root), "entries": len(entries),
+                "bytes": sum(size for _, size, _ in entries), "max_bytes": self.max_bytes,
+                "budget_bytes": self.budget(),
+                "attached_here": len(self._attached)}
+
+
+_STORE = None
+_STORE_LOCK = threading.Lock()
+
+
+def get_store():
+    """Store du process (None si désactivé ou dossier non inscriptible)."""
+    global _STORE
+    if not SHARED_FRAMES_ENABLED:
+        return None
+    with _STORE_LOCK:
+        if _STORE is None:
+            try:
+                SHARED_FRAMES_DIR.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                print(f"⚠️ Shared frames désactivés : {SHARED_FRAMES_DIR} ({e})")
+                return None
+            _STORE = SharedFrameStore(SHARED_FRAMES_DIR, SHARED_FRAMES_MAX_MB * 1024 * 1024,
+                                      SHARED_FRAMES_RESERVE_MB * 1024 * 1024)
+            atexit.register(_STORE.release_all)
+        return _STORE
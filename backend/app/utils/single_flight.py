@@ -0,0 +1,192 @@
+"""
+File: backend/app/utils/single_flight.py
+Role: Single-flight : N appels concurrents identiques → 1 seule exécution, les autres attendent son résultat.
+Depends:
+  - fcntl (POSIX) pour le verrou inter-process ; repli app.utils.json_db.file_lock (O_EXCL)
+  - app.core.paths.CACHE_DIR (fichiers verrous)
+  - app.utils.metrics (leader / follower / attente inter-process)
+Notes:
+  - Threads d'un même process : le 1er appelant ("leader") exécute, les suivants bloquent
+    sur son résultat (ou son exception, relancée chez chacun).
+  - Process différents (workers uvicorn, pool multi-symboles) : le leader tient un verrou
+    fichier pendant l'exécution ; le leader d'un autre process attend ce verrou puis exécute
+    à son tour — le travail du 1er est alors sur disque (CSV extraits, cache resample…)
+    → lecture au lieu d'un 2e téléchargement.
+  - Verrous "à bandes" : clé hachée vers SINGLE_FLIGHT_LOCK_STRIPES fichiers fixes
+    (CACHE_DIR/locks/single_flight/stripe-NNN.lock) → le dossier ne grossit pas avec le nombre
+    de clés. Dans un process, le verrou d'une bande est partagé (compteur) par tous ses leaders :
+    2 clés différentes du même process ne s'attendent jamais (la coalescence par clé = Event).
+    Entre process, 2 clés sur la même bande se sérialisent (contention, jamais d'erreur).
+  - Appels run() imbriqués NON supportés (fn ne doit pas rappeler run()) : même clé → attente
+    de soi-même ; autre bande → attente possible d'un autre process jusqu'au timeout.
+  - Résultat partagé : share(résultat) (ex. df.copy()) pour chaque appelant dès qu'il y a
+    des followers → personne ne mute l'objet d'un autre.
+"""
+
+import hashlib
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+from app.core.paths import CACHE_DIR
+from app.utils.json_db import file_lock
+from app.utils.metrics import SINGLE_FLIGHT
+
+try:
+    import fcntl
+except ImportError:  # Windows (dev)
+    fcntl = None
+
+LOCK_DIR = CACHE_DIR / "locks" / "single_flight"
+SINGLE_FLIGHT_LOCK_TIMEOUT = float(os.getenv("SINGLE_FLIGHT_LOCK_TIMEOUT", "600"))
+SINGLE_FLIGHT_LOCK_STRIPES = max(1, int(os.getenv("SINGLE_FLIGHT_LOCK_STRIPES", "64")))
+
+
+class _Call:
+    __slots__ = ("event", "result", "error", "followers")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.result = None
+        self.error = None
+        self.followers = 0
+
+
+class _Stripe:
+    """Verrou fichier d'une bande, tenu 1 fois pour tous les leaders du process."""
+    __slots__ = ("users", "ready", "fh")
+
+    def __init__(self):
+        self.users = 0
+        self.ready = threading.Event()  # posé une fois le flock obtenu (ou abandonné)
+        self.fh = None
+
+
+_CALLS = {}
+_CALLS_LOCK = threading.Lock()
+_STRIPES = {}  # nom de bande → _Stripe (flock partagé dans le process)
+_STRIPES_LOCK = threading.Lock()
+
+
+def _lock_path(key):
+    stripe = int(hashlib.sha1(repr(key).encode("utf-8")).hexdigest()[:8], 16) % SINGLE_FLIGHT_LOCK_STRIPES
+    return LOCK_DIR / f"stripe-{stripe:03d}.lock"
+
+
+@contextmanager
+def process_lock(key, name: str = "flight", timeout: float = SINGLE_FLIGHT_LOCK_TIMEOUT):
+    """Verrou inter-process sur la clé ; au-delà de timeout on continue sans (jamais bloqué à vie)."""
+    path = _lock_path(key)
+    try:
+        LOCK_DIR.mkdir(parents=True, exist_ok=True)
+    except OSError:
+        yield
+        return
+
+    if fcntl is None:  # repli O_EXCL (dev) : verrou par thread, pas de partage
+        t0 = time.perf_counter()
+        try:
+            with file_lock(path.with_suffix(".excl"), timeout=timeout):
+                _observe_wait(name, t0)
+                yield
+        except TimeoutError:
+            print(f"⚠️ Single-flight : verrou {path.name} non obtenu, exécution sans verrou")
+            yield
+        return
+
+    with _STRIPES_LOCK:
+        stripe = _STRIPES.get(path.name)
+        owner = stripe is None
+        if owner:
+            stripe = _STRIPES[path.name] = _Stripe()
+        stripe.users += 1
+    try:
+        if owner:
+            try:
+                stripe.fh = _flock(path, name, timeout)
+            finally:
+                stripe.ready.set()
+        else:
+            stripe.ready.wait()  # bande déjà tenue (ou en cours d'obtention) par ce process
+        yield
+    finally:
+        with _STRIPES_LOCK:
+            stripe.users -= 1
+            last = stripe.users == 0
+            if last:
+                del _STRIPES[path.name]
+        if last and stripe.fh is not None:
+            try:
+                fcntl.flock(stripe.fh.fileno(), fcntl.LOCK_UN)
+            finally:
+                stripe.fh.close()
+
+
+def _flock(path, name, timeout):
+    """flock exclusif (attente bornée) → fichier ouvert, ou None si non obtenu à temps."""
+    t0 = time.perf_counter()
+    fh = open(path, "a+")
+    while True:
+        try:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+            _observe_wait(name, t0)
+            return fh
+        except BlockingIOError:
+            if time.perf_counter() - t0 > timeout:
+                print(f"⚠️ Single-flight : verrou {path.name} non obtenu, exécution sans verrou")
+                fh.close()
+                _observe_wait(name, t0)
+                return None
+            time.sleep(0.05)
+        except OSError:
+            fh.close()
+            return None
+
+
+def _observe_wait(name, t0):
+    if time.perf_counter() - t0 > 0.05:
+        SINGLE_FLIGHT.labels(name, "process_wait").inc()
+
+
+def run(key, fn, share=None, name: str = "flight", cross_process: bool = True):
+    """
+    Exécute fn() une seule fois pour tous les appels concurrents de même clé.
+
+    Args:
+        key: clé hashable (ex. ("EURUSD", "M5", "2025-01-01", "2025-01-31")).
+        share: copie du résultat remise à chaque appelant quand il y a des followers.
+        cross_process: sérialise aussi les process (verrou fichier).
+    """
+    with _CALLS_LOCK:
+        call = _CALLS.get(key)
+        leader = call is None
+        if leader:
+            call = _CALLS[key] = _Call()
+        else:
+            call.followers += 1
+
+    if not leader:
+        SINGLE_FLIGHT.labels(name, "follower").inc()
+        call.event.wait()
+        if call.error is not None:
+            raise call.error
+        return share(call.result) if share else call.result
+
+    SINGLE_FLIGHT.labels(name, "leader").inc()
+    try:
+        if cross_process:
+            with process_lock(key, name):
+                call.result = fn()
+        else:
+            call.result = fn()
+    except BaseException as e:
+        call.error = e
+        raise
+    finally:
+        with _CALLS_LOCK:
+            _CALLS.pop(key, None)
+            shared = call.followers > 0
+        call.event.set()
+    # Followers présents : ils copient l'original, le leader reçoit aussi une copie
+    return share(call.result) if (shared and share) else call.result
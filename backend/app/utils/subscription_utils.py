@@ -6,6 +6,7 @@ from app.models.offers import get_offer_by_id
 
 # BTZ-PATCH v1.1: centraliser → on prend USERS_FILE depuis app.core.paths
 from app.core.paths import USERS_JSON as USERS_FILE
+from app.utils.json_db import store_lock
 
 def renew_all_subscriptions():
     """
@@ -15,7 +16,7 @@ def renew_all_subscriptions():
     if not USERS_FILE.exists():
         return
 
-    with open(USERS_FILE, "r+", encoding="utf-8") as f:
+    with store_lock(USERS_FILE), open(USERS_FILE, "r+", encoding="utf-8") as f:
         users = json.load(f)
         updated = False
 
@@ -0,0 +1,88 @@
+"""
+File: backend/app/utils/synthetic_ohlc.py
+Role: Générer des séries OHLC synthétiques déterministes (hors-ligne).
+Depends:
+  - numpy, pandas
+  - app.utils.timeframes (durée des bougies)
+Returns:
+  - pd.DataFrame au format "extracteur" : Datetime, Open, High, Low, Close, Volume
+Notes:
+  - Sert de provider local au bulk extractor et de jeu de données pour les benchs.
+  - Même (seed, paramètres) → même série, bit à bit.
+"""
+
+import zlib
+from typing import Optional
+
+import numpy as np
+import pandas as pd
+
+from app.utils.timeframes import tf_minutes
+
+
+def seed_from_key(*parts) -> int:
+    """Seed stable (indépendant de PYTHONHASHSEED) depuis une clé texte."""
+    key = "|".join(str(p) for p in parts)
+    return zlib.crc32(key.encode("utf-8"))
+
+
+def generate_ohlc(
+    n_bars: Optional[int] = None,
+    timeframe: str = "M5",
+    start: str = "2025-06-01",
+    end: Optional[str] = None,
+    seed: int = 0,
+    base_price: float = 1.10,
+    pip: float = 0.0001,
+    vol_pips: float = 3.0,
+    gap_pips: float = 0.0,
+) -> pd.DataFrame:
+    """
+    Marche aléatoire réaliste (volatilité en pips) avec High/Low cohérents.
+
+    Args:
+        n_bars: nombre de bougies (prioritaire sur `end`).
+        timeframe: "M1".."D1".
+        start / end: bornes "YYYY-MM-DD" (end exclus) si n_bars n'est pas fourni.
+        seed: graine numpy.
+        base_price: prix de départ.
+        pip: taille du pip (cf. pip_registry).
+        vol_pips: écart-type du rendement par bougie, en pips.
+        gap_pips: écart-type du gap Open vs Close précédent (0 = open collé, série inchangée).
+    """
+    minutes = tf_minutes(timeframe) or 5
+    freq = f"{minutes}min"
+    if n_bars is not None:
+        index = pd.date_range(start=start, periods=int(n_bars), freq=freq)
+    else:
+        end_ts = pd.Timestamp(end) if end else pd.Timestamp(start) + pd.offsets.MonthBegin(1)
+        index = pd.date_range(start=start, end=end_ts, freq=freq, inclusive="left")
+
+    n = len(index)
+    rng = np.random.default_rng(seed)
+    # Vol proportionnelle à sqrt(durée) → cohérent entre TF
+    step = vol_pips * pip * np.sqrt(minutes / 5.0)
+
+    close = base_price + np.cumsum(rng.normal(0.0, step, n))
+    close = np.maximum(close, pip * 10)  # jamais négatif
+    open_ = np.empty(n)
+    if n:
+        open_[0] = base_price
+        open_[1:] = close[:-1]
+    wick_hi = np.abs(rng.normal(0.0, step * 0.6, n))
+    wick_lo = np.abs(rng.normal(0.0, step * 0.6, n))
+    volume = rng.integers(50, 5000, n)
+    if gap_pips and n > 1:
+        # tirage après les autres → gap_pips=0 reste identique bit à bit
+        open_[1:] += rng.normal(0.0, gap_pips * pip, n - 1)
+    high = np.maximum(open_, close) + wick_hi
+    low = np.minimum(open_, close) - wick_lo
+
+    return pd.DataFrame({
+        "Datetime": index,
+        "Open": open_,
+        "High": high,
+        "Low": low,
+        "Close": close,
+        "Volume": volume,
+    })
@@ -0,0 +1,47 @@
+"""
+File: backend/app/utils/timeframes.py
+Role: Référentiel unique des timeframes (labels, durées, intervalles yfinance).
+Depends:
+  - Aucun (constantes pures)
+Notes:
+  - Les fichiers du disque utilisent les labels MAJUSCULES (M1, M5, H1…),
+    les routes reçoivent souvent des minuscules ("m5") → normalize_tf().
+"""
+
+from typing import Optional
+
+# Ordre = du plus fin au plus large
+TF_MINUTES = {
+    "M1": 1,
+    "M5": 5,
+    "M15": 15,
+    "M30": 30,
+    "H1": 60,
+    "H4": 240,
+    "D1": 1440,
+}
+
+# Intervalles yfinance (cf. extracteur_ultime_v3)
+YF_INTERVALS = {
+    "M1": "1m",
+    "M5": "5m",
+    "M15": "15m",
+    "M30": "30m",
+    "H1": "1h",
+    "H4": "4h",
+    "D1": "1d",
+}
+
+
+def normalize_tf(tf: str) -> Optional[str]:
+    """
+    "m5" / "M5" / " h1 " → "M5" / "H1". Retourne None si TF inconnue.
+    """
+    label = str(tf or "").strip().upper()
+    return label if label in TF_MINUTES else None
+
+
+def tf_minutes(tf: str) -> Optional[int]:
+    """Durée d'une bougie en minutes (None si TF inconnue)."""
+    label = normalize_tf(tf)
+    return TF_MINUTES.get(label) if label else None
@@ -0,0 +1,22 @@
+"""
+File: backend/tests/conftest.py
+Role: Contexte commun des tests (import de `app` depuis backend/, stockage isolé).
+Notes:
+  - DATA_ROOT / OUTPUT_DIR / ANALYSIS_DIR / DB_DIR pointent vers un dossier temporaire
+    AVANT tout import de `app` → aucun test n'écrit dans les données réelles.
+  - Lancer depuis backend/ : python -m pytest -q
+"""
+
+import os
+import sys
+import tempfile
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parents[1]
+if str(BACKEND_DIR) not in sys.path:
+    sys.path.insert(0, str(BACKEND_DIR))
+
+_ROOT = Path(tempfile.mkdtemp(prefix="backtradz_tests_"))
+os.environ["DATA_ROOT"] = str(_ROOT)
+for _var, _sub in (("OUTPUT_DIR", "output"), ("ANALYSIS_DIR", "analysis"), ("DB_DIR", "db")):
+    os.environ[_var] = str(_ROOT / _sub)
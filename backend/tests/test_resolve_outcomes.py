@@ -0,0 +1,110 @@
+"""
+resolve_outcomes (premiers passages par blocs) = boucle bougie par bougie historique,
+ligne à ligne → CSV de résultats identique à l'octet.
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from app.core import strategy_registry
+from app.core.runner_core import build_strategy_params, resolve_outcomes, resolve_pip
+from app.scripts.strategy_parity import SYMBOL, datasets
+
+PIP = resolve_pip(SYMBOL)
+DATA = datasets()["synthetic"]
+STRATEGIES = ["englobante_entry", "fvg_pullback_tendance_ema", "ob_pullback_pure"]
+LEVELS = [(10, 10, 20), (5, 15, 30), (30, 8, 8)]
+
+
+def _reference_outcomes(df, signals, sl_pips, tp1_pips, tp2_pips, pip):
+    """Boucle historique du runner (avant vectorisation), conservée comme oracle."""
+    results = []
+    highs, lows = df["High"].to_numpy(), df["Low"].to_numpy()
+    for sig in signals:
+        entry_price = float(sig["entry"])
+        entry_time = pd.to_datetime(sig["time"])
+        direction = str(sig["direction"]).lower()
+
+        sl = entry_price - sl_pips * pip if direction == "buy" else entry_price + sl_pips * pip
+        tp1 = entry_price + tp1_pips * pip if direction == "buy" else entry_price - tp1_pips * pip
+        tp2 = entry_price + tp2_pips * pip if direction == "buy" else entry_price - tp2_pips * pip
+
+        sl_size = abs(entry_price - sl)
+        tp1_size = abs(tp1 - entry_price)
+        tp2_size = abs(tp2 - entry_price)
+        rr_tp1 = round(tp1_size / sl_size, 2)
+        rr_tp2 = round(tp2_size / sl_size, 2)
+
+        if entry_time not in df.index:
+            continue
+
+        entry_index = df.index.get_loc(entry_time)
+        tp1_hit = tp2_hit = sl_hit = False
+        for i in range(entry_index + 1, len(df)):
+            high, low = highs[i], lows[i]
+            if direction == "buy":
+                if not tp1_hit and high >= tp1:
+                    tp1_hit = True
+                if not tp1_hit and low <= sl:
+                    break
+                if tp1_hit and high >= tp2:
+                    tp2_hit = True
+                    break
+                if tp1_hit and low <= sl:
+                    sl_hit = True
+                    break
+            else:
+                if not tp1_hit and low <= tp1:
+                    tp1_hit = True
+                if not tp1_hit and high >= sl:
+                    break
+                if tp1_hit and low <= tp2:
+                    tp2_hit = True
+                    break
+                if tp1_hit and high >= sl:
+                    sl_hit = True
+                    break
+
+        results.append({
+            "time": entry_time, "direction": direction, "entry": entry_price, "sl": sl, "tp": tp1,
+            "result": "TP1" if tp1_hit else "SL", "phase": "TP1",
+            "sl_size": sl_size, "tp1_size": tp1_size, "rr_tp1": rr_tp1,
+        })
+        if tp1_hit:
+            results.append({
+                "time": entry_time, "direction": direction, "entry": entry_price, "sl": sl, "tp": tp2,
+                "result": "TP2" if tp2_hit else "SL" if sl_hit else "NONE", "phase": "TP2",
+                "rr_tp2": rr_tp2,
+            })
+    return results
+
+
+def _signals(name):
+    func = strategy_registry.get_strategy_func(name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        eff, _, _ = build_strategy_params(func, {}, PIP, DATA.columns)
+    return func(DATA.copy(), **eff)
+
+
+@pytest.mark.parametrize("name", STRATEGIES)
+@pytest.mark.parametrize("sl_pips,tp1_pips,tp2_pips", LEVELS)
+def test_matches_reference_loop(name, sl_pips, tp1_pips, tp2_pips):
+    signals = _signals(name)
+    assert signals, f"{name} : aucun signal sur le jeu synthétique"
+    expected = _reference_outcomes(DATA, signals, sl_pips, tp1_pips, tp2_pips, PIP)
+    got = resolve_outcomes(DATA, signals, sl_pips, tp1_pips, tp2_pips, PIP)
+    assert pd.DataFrame(got).to_csv(index=False) == pd.DataFrame(expected).to_csv(index=False)
+
+
+def test_same_bar_ties():
+    """TP1 gagne à égalité avec le SL ; la phase TP2 démarre sur la bougie du TP1 (TP2 gagne à égalité)."""
+    index = pd.date_range("2025-06-02", periods=4, freq="5min")
+    df = pd.DataFrame({"Open": 1.0, "High": [1.0, 1.0020, 1.0005, 1.0],
+                       "Low": [1.0, 0.9980, 0.9995, 1.0], "Close": 1.0}, index=index)
+    signals = [{"time": index[0], "entry": 1.0, "direction": "buy"}]
+    for levels in ((10, 10, 20), (10, 10, 30), (30, 30, 40)):
+        assert (resolve_outcomes(df, [dict(s) for s in signals], *levels, 0.0001)
+                == _reference_outcomes(df, signals, *levels, 0.0001))
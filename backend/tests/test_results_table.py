@@ -0,0 +1,42 @@
+"""
+backtest_result.npy → export_csv = CSV historique (pd.DataFrame(results).to_csv) à l'octet.
+"""
+
+import contextlib
+import io
+
+import pandas as pd
+import pytest
+
+from app.core import strategy_registry
+from app.core.runner_core import build_strategy_params, resolve_outcomes, resolve_pip
+from app.scripts.strategy_parity import SYMBOL, datasets
+from app.utils import results_table
+
+PIP = resolve_pip(SYMBOL)
+DATA = datasets()["synthetic"]
+
+
+def _results(name, sl_pips, tp1_pips, tp2_pips):
+    func = strategy_registry.get_strategy_func(name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        eff, _, _ = build_strategy_params(func, {}, PIP, DATA.columns)
+    return resolve_outcomes(DATA, func(DATA.copy(), **eff), sl_pips, tp1_pips, tp2_pips, PIP)
+
+
+@pytest.mark.parametrize("name,levels", [
+    ("englobante_entry", (10, 10, 20)),
+    ("fvg_pullback_multi", (5, 15, 30)),
+    ("ob_pullback_pure_rsi", (20, 10, 30)),     # résultats NONE
+    ("ob_pullback_pure_rsi", (5, 1000, 2000)),   # TP1 jamais touché → pas de ligne TP2
+])
+def test_export_csv_is_byte_identical(tmp_path, name, levels):
+    results = _results(name, *levels)
+    npy = results_table.write_results(results, tmp_path / results_table.RESULT_FILE)
+    csv_path = results_table.export_csv(npy)
+    assert csv_path.read_bytes() == pd.DataFrame(results).to_csv(index=False).encode("utf-8")
+
+
+def test_empty_run(tmp_path):
+    npy = results_table.write_results([], tmp_path / results_table.RESULT_FILE)
+    assert results_table.load_results(npy).empty
@@ -0,0 +1,64 @@
+"""
+Frames partagés (memmap lecture seule) : le runner les consomme sans copie, signaux
+identiques au frame privé, et le store reste dans la place disponible.
+"""
+
+import contextlib
+import io
+import shutil
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from app.core import strategy_registry
+from app.core.runner_core import build_strategy_params, detect_signals, prepare_ohlc, resolve_pip
+from app.scripts.strategy_parity import SYMBOL, datasets, fingerprint
+from app.utils.shared_frames import SharedFrameStore
+
+DATA = datasets()["gappy"]
+
+
+@pytest.fixture
+def store(tmp_path):
+    return SharedFrameStore(tmp_path / "frames", 1 << 30)
+
+
+@pytest.mark.parametrize("name", ["englobante_entry_rsi_ema", "fvg_pullback_multi", "ob_pullback_gap_tendance_ema"])
+def test_runner_reads_shared_frame_without_copy(store, name):
+    store.root.mkdir()
+    shared = store.publish(("test", name), DATA)
+    assert shared is not None and not shared["Close"].to_numpy().flags.writeable
+
+    clean = prepare_ohlc(shared)
+    assert np.shares_memory(clean["Close"].to_numpy(), shared["Close"].to_numpy())
+
+    func = strategy_registry.get_strategy_func(name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        eff, _, _ = build_strategy_params(func, {}, resolve_pip(SYMBOL), DATA.columns)
+    assert fingerprint(detect_signals(func, clean, eff)) == fingerprint(func(DATA.copy(), **eff))
+
+
+def test_in_place_writer_falls_back_to_private_copy(store):
+    store.root.mkdir()
+    shared = store.publish(("test", "writer"), DATA)
+
+    def writer(df):
+        df["Close"].to_numpy()[:] = 0.0  # écriture en place (interdite sur le mapping)
+        return [{"n": int((df["Close"] == 0).sum())}]
+
+    assert detect_signals(writer, shared, {}) == [{"n": len(DATA)}]
+    assert shared["Close"].to_numpy().any()
+
+
+def test_publish_respects_free_space(tmp_path):
+    root = tmp_path / "frames"
+    root.mkdir()
+    free = shutil.disk_usage(root).free
+    small = SharedFrameStore(root, 1 << 40, reserve_bytes=free - 1_000_000)  # ~1 Mo utilisables
+
+    assert small.publish(("big",), pd.DataFrame({"a": np.zeros(200_000)})) is None
+    for i in range(3):
+        assert small.publish(("small", i), pd.DataFrame({"a": np.arange(40_000, dtype=float)})) is not None
+        small.release(("small", i))
+    assert sum(size for _, size, _ in small.entries()) <= 1_000_000
@@ -0,0 +1,45 @@
+"""
+Surface SL × TP (excursion_core) = un resolve_outcomes par cellule (mêmes winrates).
+"""
+
+import contextlib
+import io
+
+import pytest
+
+from app.core import strategy_registry
+from app.core.runner_core import (
+    _trade_arrays, build_strategy_params, prepare_ohlc, resolve_outcomes, run_sl_tp_surface,
+)
+from app.scripts.strategy_parity import SYMBOL, datasets
+
+SL_GRID = [5, 10, 20, 40]
+TP_GRID = [5, 10, 15, 30]
+TP1_PIPS = 10
+
+
+def _winrates(df, signals, sl, tp1, tp2, pip):
+    _, _, tp1_hit, tp2_code = _trade_arrays(resolve_outcomes(df, [dict(s) for s in signals], sl, tp1, tp2, pip))
+    trades = len(tp1_hit)
+    if not trades:
+        return 0, 0
+    return round(int(tp1_hit.sum()) / trades * 100, 2), round(int((tp2_code == 1).sum()) / trades * 100, 2)
+
+
+@pytest.mark.parametrize("name", ["englobante_entry_rsi", "fvg_impulsive", "ob_pullback_gap"])
+def test_surface_cells_match_per_cell_backtests(name):
+    df = datasets()["gappy"]
+    func = strategy_registry.get_strategy_func(name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        surface = run_sl_tp_surface(df, name, func, SL_GRID, TP_GRID, tp1_pips=TP1_PIPS, symbol=SYMBOL)
+        eff, _, _ = build_strategy_params(func, None, surface["pip_used"], df.columns)
+    signals = func(prepare_ohlc(df).copy(), **eff)
+    pip = surface["pip_used"]
+    assert surface["trades"] == len(signals) > 0
+
+    for i, sl in enumerate(SL_GRID):
+        for j, tp in enumerate(TP_GRID):
+            wr1, _ = _winrates(df, signals, sl, tp, tp, pip)
+            _, wr2 = _winrates(df, signals, sl, TP1_PIPS, tp, pip)
+            assert surface["winrate_tp1"][i][j] == wr1, (sl, tp)
+            assert surface["winrate_tp2"][i][j] == wr2, (sl, tp)
@@ -0,0 +1,19 @@
+"""
+Parité des SIGNAUX : chaque stratégie du registre = empreinte de référence versionnée
+(app/scripts/strategy_parity.json), sur tous les jeux de données × params du script.
+"""
+
+import json
+
+import pytest
+
+from app.core import strategy_registry
+from app.scripts import strategy_parity
+
+REFERENCE = json.loads(strategy_parity.REFERENCE_PATH.read_text(encoding="utf-8"))
+
+
+@pytest.mark.parametrize("name", strategy_registry.names())
+def test_signals_match_reference(name):
+    assert name in REFERENCE, f"{name} : pas de référence (python -m app.scripts.strategy_parity --save)"
+    assert strategy_parity.run_all([name])[name] == REFERENCE[name]
@@ -0,0 +1,39 @@
+"""
+VariantStream = detect_<name> sur tout l'historique, quel que soit le découpage en
+chunks et avec des allers-retours d'état JSON (to_state / from_state) en cours de flux.
+"""
+
+import contextlib
+import io
+import json
+import random
+
+import pytest
+
+from app.core import strategy_registry
+from app.core.runner_core import build_strategy_params, resolve_pip
+from app.scripts.strategy_parity import PARAM_SETS, SYMBOL, datasets, fingerprint
+from app.strategies.base.streaming import VariantStream
+
+PIP = resolve_pip(SYMBOL)
+DATA = datasets()["gappy"]
+CHUNKS = [1, 1, 2, 3, 7, 50, 400]
+
+
+@pytest.mark.parametrize("params", ["defaults", "loose"])
+@pytest.mark.parametrize("name", strategy_registry.names())
+def test_stream_matches_batch(name, params):
+    func = strategy_registry.get_strategy_func(name)
+    with contextlib.redirect_stdout(io.StringIO()):
+        eff, _, _ = build_strategy_params(func, dict(PARAM_SETS[params]), PIP, DATA.columns)
+    expected = fingerprint(func(DATA.copy(), **eff))
+
+    rng = random.Random(f"{name}/{params}")
+    stream, out, i = VariantStream(name, eff), [], 0
+    while i < len(DATA):
+        k = rng.choice(CHUNKS)
+        out += stream.update(DATA.iloc[i:i + k])
+        i += k
+        if rng.random() < 0.1:
+            stream = VariantStream.from_state(json.loads(json.dumps(stream.to_state())))
+    assert fingerprint(out) == expected